@@ -0,0 +1,190 @@
+# batch_runner.py
+"""Module pour l'exécution en lot des scripts d'un projet
+
+Les scripts sont répartis sur plusieurs processus (un processus neuf par
+script). Un script ne démarre qu'une fois ses dépendances, déclarées dans le
+fichier .vfpproj, terminées avec succès ; il est ignoré si l'une d'elles a
+échoué.
+"""
+
+import os
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from script_host import DEFAULT_PRELOAD
+from script_runner import RunnerPool, ScriptRunner
+
+
+# États d'un script du lot
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCESS = 'ok'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+def batch_order(scripts, dependencies):
+    """Ordre d'exécution respectant les dépendances, l'ordre du lot sinon
+
+    dependencies : script → scripts à exécuter avant lui ; seules les
+    dépendances présentes dans le lot comptent. Retourne (ordre, scripts
+    pris dans un cycle de dépendances).
+    """
+    requirements = {script: [d for d in dependencies.get(script, ()) if d in scripts and d != script]
+                    for script in scripts}
+    order = []
+    done = set()
+    progress = True
+    while progress:
+        progress = False
+        for script in scripts:
+            if script not in done and all(d in done for d in requirements[script]):
+                order.append(script)
+                done.add(script)
+                progress = True
+    return order, [script for script in scripts if script not in done]
+
+
+class BatchRunner(QObject):
+    """Exécute une liste de scripts sur un pool de processus
+
+    Chaque résultat est un dictionnaire : script, status (ok, failed,
+    skipped, timeout, stopped, crashed), exit_code, elapsed (s), peak
+    (octets) et message.
+    """
+    script_started = pyqtSignal(str)
+    output = pyqtSignal(str, str, str)
+    script_finished = pyqtSignal(str, dict)
+    finished = pyqtSignal(list, float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = RunnerPool(self)
+        self.runners = []
+        self.workers = 1
+        # ScriptRunner occupé → script
+        self.running = {}
+        self.scripts = []
+        self.pending = []
+        self.requirements = {}
+        self.results = {}
+        self.timeout = 0
+        self.settings = (None, DEFAULT_PRELOAD, None)
+        self.start_time = 0.0
+        self.active = False
+
+    def is_running(self):
+        return self.active
+
+    def start(self, scripts, dependencies=None, workers=0, db_path=None,
+              preload=DEFAULT_PRELOAD, working_dir=None, timeout=0):
+        """Lancer le lot (workers : scripts en parallèle, 0 : un par processeur)"""
+        if self.is_running():
+            raise RuntimeError("Un lot de scripts est déjà en cours d'exécution")
+
+        self.scripts = list(dict.fromkeys(scripts))
+        order, cyclic = batch_order(self.scripts, dependencies or {})
+        self.requirements = {script: [d for d in (dependencies or {}).get(script, ())
+                                      if d in self.scripts and d != script]
+                             for script in self.scripts}
+        self.pending = order
+        self.results = {}
+        self.timeout = timeout
+        self.settings = (db_path, preload, working_dir)
+        self.start_time = time.perf_counter()
+        self.active = True
+
+        for script in cyclic:
+            self.skip(script, "cycle de dépendances")
+
+        # Un processus neuf par script : pas d'état partagé, mémoire mesurée par script
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(order) or 1))
+        self.pool.configure(db_path, self.workers, 1, preload, working_dir)
+        while len(self.runners) < self.workers:
+            runner = ScriptRunner(self.pool, self)
+            runner.output.connect(
+                lambda text, output_type, runner=runner: self.on_output(runner, text, output_type))
+            runner.finished.connect(
+                lambda exit_code, elapsed, reason, runner=runner:
+                    self.on_runner_finished(runner, exit_code, elapsed, reason))
+            self.runners.append(runner)
+
+        self.schedule()
+
+    def schedule(self):
+        """Démarrer les scripts dont les dépendances sont satisfaites"""
+        for script in list(self.pending):
+            if script not in self.pending:
+                # Déjà lancé : un échec de démarrage relance schedule()
+                continue
+            statuses = [self.results[d]['status'] if d in self.results else None
+                        for d in self.requirements[script]]
+            failed = [d for d, status in zip(self.requirements[script], statuses)
+                      if status not in (None, SUCCESS)]
+            if failed:
+                self.pending.remove(script)
+                self.skip(script, f"dépendance en échec : {os.path.basename(failed[0])}")
+                continue
+            if None in statuses:
+                continue
+
+            runner = next((r for r in self.runners[:self.workers] if r not in self.running), None)
+            if runner is None:
+                break
+            self.pending.remove(script)
+            self.running[runner] = script
+            self.script_started.emit(script)
+            runner.run(script, self.timeout, self.settings[2])
+
+        if not self.running and not self.pending:
+            self.finish()
+
+    def skip(self, script, message):
+        self.add_result(script, SKIPPED, None, 0.0, 0, message)
+
+    def add_result(self, script, status, exit_code, elapsed, peak, message=''):
+        result = {'script': script, 'status': status, 'exit_code': exit_code,
+                  'elapsed': elapsed, 'peak': peak, 'message': message}
+        self.results[script] = result
+        self.script_finished.emit(script, result)
+
+    def on_output(self, runner, text, output_type):
+        script = self.running.get(runner)
+        if script is not None:
+            self.output.emit(script, text, output_type)
+
+    def on_runner_finished(self, runner, exit_code, elapsed, reason):
+        script = self.running.pop(runner, None)
+        if script is None:
+            return
+        status = reason or (SUCCESS if exit_code == 0 else FAILED)
+        self.add_result(script, status, exit_code, elapsed, runner.peak_memory)
+        self.schedule()
+
+    def stop(self):
+        """Arrêter le lot : les scripts en attente sont ignorés"""
+        pending, self.pending = self.pending, []
+        for script in pending:
+            self.skip(script, "lot arrêté")
+        for runner in list(self.running):
+            runner.stop()
+        if not self.running:
+            self.finish()
+
+    def finish(self):
+        if not self.active:
+            return
+        self.active = False
+        # Pas de processus inactifs entre deux lots
+        db_path, preload, working_dir = self.settings
+        self.pool.configure(db_path, 0, 1, preload, working_dir)
+        results = [self.results[script] for script in self.scripts if script in self.results]
+        self.finished.emit(results, time.perf_counter() - self.start_time)
+
+    def shutdown(self):
+        """Arrêter les scripts et les processus (fermeture de l'IDE)"""
+        self.pending = []
+        for runner in list(self.running):
+            runner.shutdown()
+        self.pool.shutdown()
@@ -0,0 +1,135 @@
+# batch_view.py
+"""Module pour l'affichage d'une exécution en lot"""
+
+import os
+
+from PyQt6.QtWidgets import (QSplitter, QStackedWidget, QTableWidget, QTableWidgetItem,
+                             QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor
+
+from theme import ModernTheme
+from console import OutputConsole
+from batch_runner import PENDING, RUNNING, SUCCESS, SKIPPED
+
+
+COLUMNS = ("Script", "État", "Durée (s)", "Code", "Mémoire max (Mo)")
+
+# Libellés et couleurs des états
+STATUSES = {
+    PENDING: ("⏳ En attente", 'text_secondary'),
+    RUNNING: ("▶ En cours", 'accent'),
+    SUCCESS: ("✓ Réussi", 'success'),
+    'failed': ("✗ Échec", 'error'),
+    'timeout': ("⏱ Délai dépassé", 'error'),
+    'stopped': ("⏹ Arrêté", 'warning'),
+    'crashed': ("✗ Arrêt brutal", 'error'),
+    SKIPPED: ("⤼ Ignoré", 'warning'),
+}
+
+
+def _number_item(value):
+    item = QTableWidgetItem()
+    item.setData(Qt.ItemDataRole.DisplayRole, value)
+    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+    return item
+
+
+class BatchView(QSplitter):
+    """Tableau récapitulatif du lot et sortie de chaque script
+
+    La sortie du script sélectionné dans le tableau est affichée à droite.
+    """
+
+    def __init__(self):
+        super().__init__(Qt.Orientation.Horizontal)
+        # Script → ligne du tableau (et page de la sortie)
+        self.rows = {}
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setStyleSheet(f"""
+            QTableWidget {{
+                border: none;
+                gridline-color: {ModernTheme.COLORS['border']};
+            }}
+            QHeaderView::section {{
+                background-color: {ModernTheme.COLORS['panel']};
+                padding: 4px;
+                border: none;
+                border-right: 1px solid {ModernTheme.COLORS['border']};
+                border-bottom: 1px solid {ModernTheme.COLORS['border']};
+            }}
+        """)
+        self.table.currentCellChanged.connect(self.on_current_changed)
+
+        self.consoles = QStackedWidget()
+
+        self.addWidget(self.table)
+        self.addWidget(self.consoles)
+        self.setSizes([450, 700])
+
+    def start(self, scripts, base_dir=None):
+        """Préparer une ligne et une sortie par script"""
+        self.rows = {}
+        while self.consoles.count():
+            console = self.consoles.widget(0)
+            self.consoles.removeWidget(console)
+            console.deleteLater()
+
+        self.table.setRowCount(len(scripts))
+        for row, script in enumerate(scripts):
+            self.rows[script] = row
+            name = os.path.relpath(script, base_dir) if base_dir else os.path.basename(script)
+            item = QTableWidgetItem(name)
+            item.setToolTip(script)
+            self.table.setItem(row, 0, item)
+            for column in range(2, len(COLUMNS)):
+                self.table.setItem(row, column, QTableWidgetItem())
+            self.set_status(script, PENDING)
+            self.consoles.addWidget(OutputConsole())
+        self.table.resizeColumnToContents(1)
+        if scripts:
+            self.table.selectRow(0)
+
+    def set_status(self, script, status, message=''):
+        text, color = STATUSES.get(status, (status, 'text'))
+        item = QTableWidgetItem(text)
+        item.setForeground(QColor(ModernTheme.COLORS[color]))
+        if message:
+            item.setToolTip(message)
+        self.table.setItem(self.rows[script], 1, item)
+
+    def console(self, script):
+        return self.consoles.widget(self.rows[script])
+
+    def script_started(self, script):
+        self.set_status(script, RUNNING)
+        self.console(script).write_output(f"▶ {script}", 'info')
+
+    def write(self, script, text, output_type):
+        self.console(script).write_output(text, output_type)
+
+    def script_finished(self, script, result):
+        """Remplir la ligne du script avec son résultat"""
+        row = self.rows[script]
+        self.set_status(script, result['status'], result['message'])
+        if result['status'] != SKIPPED:
+            self.table.setItem(row, 2, _number_item(round(result['elapsed'], 2)))
+            self.table.setItem(row, 3, _number_item(result['exit_code']))
+            if result['peak']:
+                self.table.setItem(row, 4, _number_item(round(result['peak'] / (1024 * 1024), 1)))
+
+        text, _ = STATUSES.get(result['status'], (result['status'], 'text'))
+        level = 'success' if result['status'] == SUCCESS else 'warning' if result['status'] == SKIPPED else 'error'
+        details = result['message'] or f"{result['elapsed']:.2f} s"
+        self.console(script).write_output(f"{text} ({details})", level)
+
+    def on_current_changed(self, row, column, previous_row, previous_column):
+        if 0 <= row < self.consoles.count():
+            self.consoles.setCurrentIndex(row)
@@ -0,0 +1,144 @@
+# cdx.py
+"""Module pour la lecture des index Visual FoxPro (.cdx, .idx)"""
+
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+from dbf import DbfError
+
+
+NODE_SIZE = 512
+HEADER_SIZE = 1024
+
+# Options de l'en-tête d'index
+INDEX_UNIQUE = 0x01
+INDEX_FOR = 0x08
+INDEX_COMPACT = 0x20
+INDEX_COMPOUND = 0x40
+
+# Attributs des nœuds
+NODE_LEAF = 0x02
+
+IndexTag = namedtuple('IndexTag', 'name expression for_expression unique descending key_length')
+
+
+def _expressions(pool, has_for):
+    """Expression de clé et clause FOR, séparées par des octets nuls"""
+    parts = pool.split(b'\x00')
+    expression = parts[0].decode('cp1252', 'replace').strip()
+    for_expression = parts[1].decode('cp1252', 'replace').strip() if has_for and len(parts) > 1 else ''
+    return expression, for_expression or None
+
+
+def _read_tag_header(mm, offset, name):
+    """Lire l'en-tête d'un index compact (tag d'un .cdx ou .idx compact)"""
+    if offset + HEADER_SIZE > len(mm):
+        raise DbfError(f"en-tête du tag {name} hors du fichier")
+    key_length, options = struct.unpack_from('<HB', mm, offset + 12)
+    descending = struct.unpack_from('<H', mm, offset + 502)[0] == 1
+    expression, for_expression = _expressions(mm[offset + 512:offset + HEADER_SIZE],
+                                               options & INDEX_FOR)
+    return IndexTag(name, expression, for_expression, bool(options & INDEX_UNIQUE),
+                    descending, key_length)
+
+
+def _leaf_keys(mm, offset, key_length):
+    """Décoder les clés d'une feuille compacte : [(clé, numéro d'enregistrement)]
+
+    Les informations de chaque clé (numéro, octets communs avec la clé
+    précédente, espaces de fin) sont des champs de bits en tête de nœud ;
+    les octets propres des clés sont rangés depuis la fin du nœud.
+    """
+    count = struct.unpack_from('<H', mm, offset + 2)[0]
+    (record_mask, duplicate_mask, trail_mask, record_bits, duplicate_bits,
+     _, info_size) = struct.unpack_from('<IBBBBBB', mm, offset + 14)
+
+    keys = []
+    previous = b''
+    data_end = offset + NODE_SIZE
+    for i in range(count):
+        start = offset + 24 + i * info_size
+        info = int.from_bytes(mm[start:start + info_size], 'little')
+        record = info & record_mask
+        duplicate = (info >> record_bits) & duplicate_mask
+        trail = (info >> (record_bits + duplicate_bits)) & trail_mask
+
+        size = key_length - duplicate - trail
+        data_end -= size
+        key = previous[:duplicate] + mm[data_end:data_end + size] + b' ' * trail
+        keys.append((key, record))
+        previous = key
+    return keys
+
+
+def _walk_leaves(mm, root, key_length):
+    """Parcourir les feuilles d'un arbre compact de gauche à droite"""
+    node = root
+    # Descendre par le premier pointeur de chaque nœud intérieur
+    for _ in range(64):
+        if node < 0 or node + NODE_SIZE > len(mm):
+            return
+        attributes = struct.unpack_from('<H', mm, node)[0]
+        if attributes & NODE_LEAF:
+            break
+        node = struct.unpack_from('>I', mm, node + 12 + key_length + 4)[0]
+    else:
+        return
+
+    visited = set()
+    while 0 <= node < len(mm) and node not in visited:
+        visited.add(node)
+        yield from _leaf_keys(mm, node, key_length)
+        node = struct.unpack_from('<i', mm, node + 8)[0]
+
+
+def read_tags(path):
+    """Lire les tags d'un index .cdx (ou l'unique tag d'un .idx)"""
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:
+            raise DbfError(f"{path}: index vide ({e})")
+
+    try:
+        if len(mm) < NODE_SIZE:
+            raise DbfError(f"{path}: index tronqué")
+
+        root, _, _, key_length, options = struct.unpack_from('<iiiHB', mm, 0)
+        stem = os.path.splitext(os.path.basename(path))[0].upper()
+
+        if not options & INDEX_COMPACT:
+            # Ancien .idx FoxBASE : expressions de 220 octets dans l'en-tête
+            expression = mm[16:236].split(b'\x00')[0].decode('cp1252', 'replace').strip()
+            for_expression = mm[236:456].split(b'\x00')[0].decode('cp1252', 'replace').strip()
+            return [IndexTag(stem, expression, for_expression or None,
+                             bool(options & INDEX_UNIQUE), False, key_length)]
+
+        if not options & INDEX_COMPOUND:
+            return [_read_tag_header(mm, 0, stem)]
+
+        # .cdx : l'index d'en-tête a pour clés les noms des tags, et pour
+        # numéros d'enregistrement les positions de leurs en-têtes
+        tags = []
+        for key, offset in _walk_leaves(mm, root, key_length):
+            name = key.rstrip(b' \x00').decode('cp1252', 'replace')
+            tags.append(_read_tag_header(mm, offset, name))
+        return tags
+
+    except struct.error as e:
+        raise DbfError(f"{path}: index invalide ({e})")
+    finally:
+        mm.close()
+
+
+def index_files(table_path):
+    """Fichiers d'index d'une table : .cdx structurel et .idx du même nom"""
+    stem = os.path.splitext(os.path.basename(table_path))[0].lower()
+    directory = os.path.dirname(table_path) or '.'
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if os.path.splitext(name)[0].lower() == stem
+        and os.path.splitext(name)[1].lower() in ('.cdx', '.idx')
+    )
@@ -0,0 +1,295 @@
+# cell_cache.py
+"""Module pour le cache des cellules « # %% cache » du noyau de session
+
+Une cellule marquée est identifiée par son code normalisé (arbre syntaxique,
+sans commentaires ni mise en forme), les valeurs des variables qu'elle lit
+avant de les définir et l'état de la base connectée (PRAGMA data_version,
+date et taille du fichier et de son journal WAL). Si rien n'a changé, les
+variables qu'elle a définies et sa sortie sont reprises du disque au lieu de
+la réexécuter.
+"""
+
+import ast
+import hashlib
+import importlib
+import marshal
+import os
+import pickle
+import tempfile
+import time
+import types
+
+
+# Dossier et taille maximale (Mo) par défaut du cache
+CACHE_DIR = os.path.join(tempfile.gettempdir(), 'pyfoxpro_cache')
+DEFAULT_CACHE_SIZE = 256
+
+CACHE_SUFFIX = '.pkl'
+
+# Noms de l'espace de noms jamais repris du cache
+IGNORED_NAMES = ('__builtins__', '__name__', '__file__', 'db', 'sqlite3')
+
+
+class NotCacheable(Exception):
+    """Valeur lue ou produite par la cellule impossible à sérialiser"""
+
+
+def normalized_code(code):
+    """Forme canonique du code (None si le code ne s'analyse pas)"""
+    try:
+        return ast.dump(ast.parse(code))
+    except SyntaxError:
+        return None
+
+
+def _loaded(tree):
+    """Noms lus dans un arbre (la cible d'un « x += ... » est aussi lue),
+    hors variables locales des compréhensions et des lambdas"""
+    names = set()
+    local = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+            names.add(node.target.id)
+        elif isinstance(node, ast.comprehension):
+            local.update(_stored(node.target))
+        elif isinstance(node, ast.arg):
+            local.add(node.arg)
+    return names - local
+
+
+def _stored(tree):
+    """Noms affectés, importés ou définis dans un arbre"""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            names.add(node.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((alias.asname or alias.name).split('.')[0] for alias in node.names)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+    return names
+
+
+def read_names(code):
+    """Noms que la cellule lit avant de les définir (ses entrées)
+
+    Les instructions sont parcourues dans l'ordre : un nom affecté par une
+    instruction précédente de la cellule n'est plus une entrée.
+    """
+    free = set()
+    _scan(ast.parse(code).body, free, set())
+    return sorted(free)
+
+
+def _scan(statements, free, bound):
+    """Parcourir des instructions dans l'ordre d'exécution"""
+    def read(*trees):
+        for tree in trees:
+            if tree is not None:
+                free.update(_loaded(tree) - bound)
+
+    for statement in statements:
+        if isinstance(statement, (ast.For, ast.AsyncFor)):
+            read(statement.iter)
+            bound.update(_stored(statement.target))
+            _scan(statement.body + statement.orelse, free, bound)
+        elif isinstance(statement, (ast.While, ast.If)):
+            read(statement.test)
+            _scan(statement.body + statement.orelse, free, bound)
+        elif isinstance(statement, (ast.With, ast.AsyncWith)):
+            for item in statement.items:
+                read(item.context_expr)
+                if item.optional_vars is not None:
+                    bound.update(_stored(item.optional_vars))
+            _scan(statement.body, free, bound)
+        elif isinstance(statement, ast.Try):
+            _scan(statement.body, free, bound)
+            for handler in statement.handlers:
+                read(handler.type)
+                if handler.name:
+                    bound.add(handler.name)
+                _scan(handler.body, free, bound)
+            _scan(statement.orelse + statement.finalbody, free, bound)
+        elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            # Corps exécuté plus tard : ses variables locales ne sont pas des entrées
+            free.update(_loaded(statement) - bound - _stored(statement))
+            bound.add(statement.name)
+        else:
+            read(statement)
+            bound.update(_stored(statement))
+
+
+def stored_names(code):
+    """Noms affectés, importés ou définis par la cellule"""
+    return _stored(ast.parse(code))
+
+
+def value_digest(name, value):
+    """Empreinte d'une valeur lue par la cellule"""
+    if isinstance(value, types.ModuleType):
+        data = value.__name__.encode('utf-8')
+    elif isinstance(value, types.FunctionType):
+        # Fonctions du script : non sérialisables par pickle (définies dans __main__)
+        data = marshal.dumps(value.__code__)
+    elif isinstance(value, type):
+        data = f"{value.__module__}.{value.__qualname__}".encode('utf-8')
+    else:
+        try:
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            raise NotCacheable(name)
+    return hashlib.sha256(data).hexdigest()
+
+
+def input_digests(code, namespace):
+    """Empreintes des variables que la cellule lit (nom → empreinte)
+
+    Lève NotCacheable si une variable lue ne peut pas être sérialisée.
+    """
+    return {name: value_digest(name, namespace[name]) for name in read_names(code)
+            if name in namespace and name not in IGNORED_NAMES}
+
+
+def database_state(connection, db_path):
+    """Version des données de la base : change dès qu'elle est modifiée"""
+    if connection is None or not db_path:
+        return None
+    try:
+        data_version = connection.execute('PRAGMA data_version').fetchone()[0]
+    except Exception:
+        data_version = None
+    files = []
+    for path in (db_path, db_path + '-wal'):
+        try:
+            stat = os.stat(path)
+            files.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            files.append(None)
+    return (os.path.abspath(db_path), data_version, files)
+
+
+class CellCache:
+    """Résultats de cellules sérialisés sur disque, taille bornée (LRU)
+
+    La date de modification d'une entrée est mise à jour à chaque lecture :
+    les entrées les moins récemment utilisées sont supprimées en premier.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_size=DEFAULT_CACHE_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.max_bytes = int(max_size) * 1024 * 1024
+
+    def key(self, code, inputs, connection=None, db_path=None):
+        """Clé de la cellule, ou None si le code ne s'analyse pas
+
+        inputs : empreintes des variables lues (input_digests).
+        """
+        normalized = normalized_code(code)
+        if normalized is None:
+            return None
+        digest = hashlib.sha256(normalized.encode('utf-8'))
+        for name, value in sorted(inputs.items()):
+            digest.update(f"\0{name}={value}".encode('utf-8'))
+        digest.update(repr(database_state(connection, db_path)).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def get(self, key):
+        """Résultat enregistré ({'values', 'modules', 'output', 'created'}) ou None"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Entrée illisible (classe disparue, fichier tronqué)
+            self.remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key, values, output):
+        """Enregistrer les variables définies et la sortie d'une cellule
+
+        Lève NotCacheable si une variable ne peut pas être sérialisée.
+        Retourne False si le résultat dépasse la taille du cache.
+        """
+        # Modules importés par la cellule : enregistrés par leur nom
+        modules = {name: value.__name__ for name, value in values.items()
+                   if isinstance(value, types.ModuleType)}
+        values = {name: value for name, value in values.items() if name not in modules}
+        result = {'values': values, 'modules': modules, 'output': output, 'created': time.time()}
+        try:
+            data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            for name, value in values.items():
+                try:
+                    pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+                except Exception:
+                    raise NotCacheable(name)
+            raise NotCacheable('')
+        if len(data) > self.max_bytes:
+            return False
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as f:
+            f.write(data)
+        os.replace(temporary, path)
+        self.evict()
+        return True
+
+    @staticmethod
+    def restore(result, namespace):
+        """Rétablir dans l'espace de noms les variables d'un résultat"""
+        for name, module in result['modules'].items():
+            namespace[name] = importlib.import_module(module)
+        namespace.update(result['values'])
+
+    def entries(self):
+        """Entrées (date d'utilisation, taille, chemin), plus anciennes d'abord"""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if name.endswith(CACHE_SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        """Supprimer les entrées les moins récemment utilisées au-delà de la taille maximale"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self.remove(path)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self.remove(path)
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
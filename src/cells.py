@@ -0,0 +1,70 @@
+# cells.py
+"""Module pour le découpage des scripts en cellules et blocs exécutables"""
+
+import ast
+import re
+import textwrap
+from collections import namedtuple
+
+
+# Marqueur de cellule : « # %% » suivi d'options facultatives
+CELL_MARKER = re.compile(r'^\s*#\s*%%(.*)$')
+
+# Option d'une cellule dont le résultat est mis en cache (« # %% cache »)
+CACHE_OPTION = 'cache'
+
+# Extrait de code, numéros (1..n) de ses lignes dans l'éditeur et options de
+# la cellule
+CodeBlock = namedtuple('CodeBlock', 'code first_line last_line options')
+
+
+def cell_bounds(lines, line):
+    """Lignes (première, dernière) de la cellule # %% contenant la ligne,
+    ou None si le script n'a pas de marqueur"""
+    markers = [i + 1 for i, text in enumerate(lines) if CELL_MARKER.match(text)]
+    if not markers:
+        return None
+    start = max((marker for marker in markers if marker <= line), default=0)
+    end = min((marker for marker in markers if marker > line), default=len(lines) + 1)
+    return start + 1, end - 1
+
+
+def statement_bounds(text, line):
+    """Lignes de l'instruction de premier niveau contenant la ligne (avec ses
+    décorateurs), ou None si le texte ne s'analyse pas"""
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        return None
+    for node in tree.body:
+        first = min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', [])])
+        if first <= line <= node.end_lineno:
+            return first, node.end_lineno
+    return None
+
+
+def cell_options(lines, first):
+    """Options de la cellule commençant à la ligne first (mots suivant « # %% »)"""
+    if first < 2:
+        return ()
+    match = CELL_MARKER.match(lines[first - 2])
+    return tuple(match.group(1).lower().split()) if match else ()
+
+
+def make_block(lines, first, last, options=()):
+    """Extrait des lignes first..last, désindenté (sélection dans un bloc)"""
+    code = textwrap.dedent('\n'.join(lines[first - 1:last]))
+    return CodeBlock(code, first, last, options)
+
+
+def current_block(text, line):
+    """Bloc à exécuter pour une position du curseur sans sélection : la
+    cellule # %% si le script en contient, sinon l'instruction de premier
+    niveau, sinon la ligne seule"""
+    lines = text.split('\n')
+    line = min(max(line, 1), len(lines))
+    cell = cell_bounds(lines, line)
+    if cell is not None:
+        return make_block(lines, *cell, cell_options(lines, cell[0]))
+    bounds = statement_bounds(text, line) or (line, line)
+    return make_block(lines, *bounds)
@@ -1,21 +1,45 @@
 # console.py
 """Module pour la console de sortie"""
 
+from collections import deque
+
 from PyQt6.QtWidgets import QTextEdit
+from PyQt6.QtCore import QTimer
 from PyQt6.QtGui import QFont, QTextCharFormat, QColor, QTextCursor
 
 from theme import ModernTheme
 
 
+# Lignes conservées dans la console (les plus anciennes sont supprimées)
+MAX_LINES = 10000
+
+# Délai (ms) de regroupement des écritures avant affichage
+FLUSH_INTERVAL = 30
+
+# Couleur du texte selon le type de sortie
+OUTPUT_COLORS = {
+    'error': 'error',
+    'success': 'success',
+    'warning': 'warning',
+    'info': 'text',
+}
+
+
 class OutputConsole(QTextEdit):
-    """Console de sortie pour l'exécution"""
+    """Console de sortie pour l'exécution
+
+    Les écritures sont mises en file et affichées par lots : un script qui
+    écrit des milliers de lignes ne redessine pas la console à chaque ligne.
+    """
 
-    def __init__(self):
+    def __init__(self, max_lines=MAX_LINES):
         super().__init__()
 
         # Configuration
         self.setReadOnly(True)
         self.setFont(QFont('Consolas', 10))
+        self.setUndoRedoEnabled(False)
+        self.document().setMaximumBlockCount(max_lines)
 
         # Style
         self.setStyleSheet(f"""
@@ -26,24 +50,58 @@ class OutputConsole(QTextEdit):
             }}
         """)
 
+        # Formats créés une fois pour toutes
+        self.formats = {}
+        for output_type, color in OUTPUT_COLORS.items():
+            self.formats[output_type] = QTextCharFormat()
+            self.formats[output_type].setForeground(QColor(ModernTheme.COLORS[color]))
+
+        # Lignes en attente d'affichage : au-delà de max_lines, les plus
+        # anciennes ne seraient jamais visibles
+        self.pending = deque(maxlen=max_lines)
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(FLUSH_INTERVAL)
+        self.flush_timer.timeout.connect(self.flush)
+
     def write_output(self, text, output_type='info'):
         """Écrire dans la console avec couleur"""
-        cursor = self.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
+        self.pending.append((text, output_type))
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
 
-        # Format selon le type
-        format = QTextCharFormat()
+    def flush(self):
+        """Afficher les lignes en attente"""
+        self.flush_timer.stop()
+        if not self.pending:
+            return
+
+        # Défilement automatique seulement si la fin était visible
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        # Lignes consécutives de même type insérées ensemble
+        lines = []
+        current_type = None
+        while self.pending:
+            text, output_type = self.pending.popleft()
+            if output_type != current_type and lines:
+                self.insert_lines(cursor, lines, current_type)
+                lines = []
+            current_type = output_type
+            lines.append(text)
+        self.insert_lines(cursor, lines, current_type)
+        cursor.endEditBlock()
 
-        if output_type == 'error':
-            format.setForeground(QColor(ModernTheme.COLORS['error']))
-        elif output_type == 'success':
-            format.setForeground(QColor(ModernTheme.COLORS['success']))
-        elif output_type == 'warning':
-            format.setForeground(QColor(ModernTheme.COLORS['warning']))
-        else:
-            format.setForeground(QColor(ModernTheme.COLORS['text']))
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
 
-        cursor.insertText(text + '\n', format)
+    def insert_lines(self, cursor, lines, output_type):
+        cursor.insertText('\n'.join(lines) + '\n', self.formats.get(output_type, self.formats['info']))
 
-        # Scroll vers le bas
-        self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
\ No newline at end of file
+    def clear(self):
+        self.pending.clear()
+        super().clear()
@@ -0,0 +1,494 @@
+# data_transfer.py
+"""Module pour l'import et l'export de données CSV"""
+
+import csv
+import itertools
+import os
+import sqlite3
+import time
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
+                             QListWidget, QListWidgetItem, QLineEdit, QPushButton,
+                             QDialogButtonBox, QFileDialog, QLabel, QComboBox,
+                             QCheckBox, QTableWidget, QTableWidgetItem)
+from PyQt6.QtCore import Qt
+
+from theme import ModernTheme
+from schema_cache import quote_identifier
+
+
+# Lignes lues par fetchmany pendant l'export
+EXPORT_BATCH_SIZE = 5000
+
+# Taille du tampon du fichier exporté
+EXPORT_BUFFER_SIZE = 1 << 20
+
+# Lignes insérées par appel à executemany pendant l'import
+IMPORT_CHUNK_SIZE = 50000
+
+# Lignes lues pour deviner le format et le type des colonnes
+IMPORT_SAMPLE_ROWS = 1000
+
+# Réglages SQLite pendant un import (restaurés ensuite)
+IMPORT_PRAGMAS = {
+    'synchronous': 'OFF',
+    'cache_size': -262144,  # 256 Mo
+    'temp_store': 'MEMORY',
+}
+
+
+def build_select(table_name, columns=None, where=None):
+    """Construire la requête d'export d'une table"""
+    column_list = ", ".join(quote_identifier(col) for col in columns) if columns else "*"
+    sql = f"SELECT {column_list} FROM {quote_identifier(table_name)}"
+    if where:
+        sql += f" WHERE {where}"
+    return sql
+
+
+def format_progress(done, total, elapsed):
+    """Formater l'avancement : lignes, débit et temps restant"""
+    rate = done / elapsed if elapsed > 0 else 0
+    text = f"{done:,} lignes".replace(",", " ")
+    if total:
+        text = f"{done:,} / {total:,} lignes".replace(",", " ")
+    text += f" — {rate:,.0f} lignes/s".replace(",", " ")
+
+    if total and rate > 0 and done < total:
+        remaining = int((total - done) / rate)
+        text += f" — reste {remaining // 60}:{remaining % 60:02d}"
+    return text
+
+
+def export_csv(connection, sql, file_path, params=(), total=0,
+               progress=None, check_cancelled=None, batch_size=EXPORT_BATCH_SIZE):
+    """Exporter le résultat d'une requête en CSV, par lots
+
+    Les lignes sont lues par fetchmany et écrites dans un fichier à grand
+    tampon : la mémoire utilisée ne dépend pas de la taille de la table.
+    Le fichier partiel est supprimé en cas d'erreur ou d'annulation.
+    Retourne le nombre de lignes écrites.
+    """
+    start = time.monotonic()
+    count = 0
+
+    try:
+        cursor = connection.execute(sql, params)
+        with open(file_path, 'w', newline='', encoding='utf-8',
+                  buffering=EXPORT_BUFFER_SIZE) as f:
+            writer = csv.writer(f)
+
+            # En-têtes
+            writer.writerow([desc[0] for desc in cursor.description])
+
+            # Données
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+
+                writer.writerows(rows)
+                count += len(rows)
+
+                if check_cancelled:
+                    check_cancelled()
+                if progress:
+                    progress(count, total, format_progress(count, total, time.monotonic() - start))
+
+    except BaseException:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+
+    return count
+
+
+def export_job(job, sql, file_path, params=(), total=None):
+    """Exporter une requête en CSV (tâche du worker)
+
+    Sans total connu, les lignes sont d'abord comptées pour estimer le
+    temps restant.
+    """
+    if total is None:
+        job.report(0, 0, "Comptage des lignes...")
+        total = job.connection.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+
+    return export_csv(job.connection, sql, file_path, params, total,
+                      progress=job.report, check_cancelled=job.check_cancelled)
+
+
+def infer_column_type(values):
+    """Deviner le type SQLite d'une colonne à partir d'un échantillon"""
+    kind = 'INTEGER'
+    for value in values:
+        if value == '':
+            continue
+        if kind == 'INTEGER':
+            try:
+                int(value)
+                continue
+            except ValueError:
+                kind = 'REAL'
+        try:
+            float(value)
+        except ValueError:
+            return 'TEXT'
+    return kind
+
+
+def unique_column_names(headers):
+    """Nettoyer les en-têtes : noms vides remplacés, doublons suffixés"""
+    names = []
+    seen = set()
+    for i, header in enumerate(headers, 1):
+        name = header.strip() or f"col{i}"
+        base, n = name, 2
+        while name.lower() in seen:
+            name = f"{base}_{n}"
+            n += 1
+        seen.add(name.lower())
+        names.append(name)
+    return names
+
+
+def sniff_csv(file_path, encoding='utf-8', has_header=True):
+    """Lire un échantillon : format, colonnes et types devinés
+
+    Retourne (dialecte, [(colonne, type)]).
+    """
+    with open(file_path, 'r', newline='', encoding=encoding) as f:
+        sample = f.read(1 << 16)
+
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+
+    with open(file_path, 'r', newline='', encoding=encoding) as f:
+        reader = csv.reader(f, dialect)
+        first = next(reader, [])
+        rows = list(itertools.islice(reader, IMPORT_SAMPLE_ROWS))
+
+    if has_header:
+        headers = unique_column_names(first)
+    else:
+        headers = [f"col{i}" for i in range(1, len(first) + 1)]
+        rows.insert(0, first)
+
+    columns = []
+    for i, name in enumerate(headers):
+        columns.append((name, infer_column_type(row[i] for row in rows if i < len(row))))
+    return dialect, columns
+
+
+def import_csv(connection, file_path, table_name, columns, dialect=csv.excel,
+               encoding='utf-8', has_header=True, indexes=(), progress=None,
+               check_cancelled=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """Importer un fichier CSV dans une nouvelle table
+
+    Le fichier est lu par blocs insérés avec executemany dans une seule
+    transaction, avec des réglages SQLite adaptés au chargement en masse.
+    Les valeurs restent des chaînes : l'affinité des colonnes les convertit
+    dans SQLite, et NULLIF transforme les champs vides des colonnes non
+    textuelles en NULL. Les index
+    sont créés après le chargement. Retourne le nombre de lignes importées.
+    """
+    width = len(columns)
+    table = quote_identifier(table_name)
+    column_defs = ", ".join(f"{quote_identifier(name)} {kind}" for name, kind in columns)
+    placeholders = ", ".join("?" if kind == 'TEXT' else "NULLIF(?, '')" for _, kind in columns)
+    insert_sql = f"INSERT INTO {table} VALUES ({placeholders})"
+
+    def fit(row):
+        # Lignes trop courtes ou trop longues ramenées au nombre de colonnes
+        return (row + [''] * width)[:width]
+
+    saved = {name: connection.execute(f"PRAGMA {name}").fetchone()[0] for name in IMPORT_PRAGMAS}
+    for name, value in IMPORT_PRAGMAS.items():
+        connection.execute(f"PRAGMA {name} = {value}")
+
+    # Journal en mémoire, sauf en mode WAL (qui ne peut changer qu'en exclusif)
+    journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+    if journal_mode.lower() in ('delete', 'truncate', 'persist'):
+        connection.execute("PRAGMA journal_mode = MEMORY")
+        saved['journal_mode'] = journal_mode
+
+    size = os.path.getsize(file_path) or 1
+    start = time.monotonic()
+    count = 0
+
+    try:
+        connection.execute("BEGIN")
+        connection.execute(f"CREATE TABLE {table} ({column_defs})")
+
+        with open(file_path, 'r', newline='', encoding=encoding,
+                  buffering=EXPORT_BUFFER_SIZE) as f:
+            reader = csv.reader(f, dialect)
+            if has_header:
+                next(reader, None)
+
+            while True:
+                chunk = list(itertools.islice(reader, chunk_size))
+                if not chunk:
+                    break
+
+                connection.executemany(
+                    insert_sql, (row if len(row) == width else fit(row) for row in chunk))
+                count += len(chunk)
+
+                if check_cancelled:
+                    check_cancelled()
+                if progress:
+                    # Avancement en Ko lus
+                    done = f.buffer.tell()
+                    progress(done // 1024, size // 1024,
+                             format_progress(count, 0, time.monotonic() - start))
+
+        # Index créés une fois les données chargées
+        for column in indexes:
+            if progress:
+                progress(size // 1024, size // 1024, f"Création de l'index sur {column}...")
+            index_name = quote_identifier(f"idx_{table_name}_{column}")
+            connection.execute(f"CREATE INDEX {index_name} ON {table} ({quote_identifier(column)})")
+
+        connection.execute("COMMIT")
+
+    except BaseException:
+        if connection.in_transaction:
+            connection.execute("ROLLBACK")
+        raise
+
+    finally:
+        for name, value in saved.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+
+    return count
+
+
+def import_job(job, file_path, table_name, columns, dialect=csv.excel,
+               encoding='utf-8', has_header=True, indexes=()):
+    """Importer un CSV (tâche du worker, avec une connexion d'écriture)"""
+    connection = sqlite3.connect(job.db_path, isolation_level=None)
+    connection.set_progress_handler(lambda: 1 if job.cancelled else 0, 100000)
+    try:
+        return import_csv(connection, file_path, table_name, columns, dialect,
+                          encoding, has_header, indexes,
+                          progress=job.report, check_cancelled=job.check_cancelled)
+    finally:
+        connection.close()
+
+
+class ExportDialog(QDialog):
+    """Options d'export : colonnes, filtre et fichier"""
+
+    def __init__(self, table_name, columns, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Exporter {table_name}")
+        self.resize(420, 480)
+
+        self.setStyleSheet(ModernTheme.get_stylesheet())
+
+        self.table_name = table_name
+
+        layout = QVBoxLayout()
+
+        # Colonnes à exporter
+        layout.addWidget(QLabel("Colonnes:"))
+        self.columns_list = QListWidget()
+        for column in columns:
+            item = QListWidgetItem(column)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked)
+            self.columns_list.addItem(item)
+        layout.addWidget(self.columns_list)
+
+        form = QFormLayout()
+
+        # Filtre
+        self.where_edit = QLineEdit()
+        self.where_edit.setPlaceholderText("ex: montant > 100")
+        form.addRow("WHERE:", self.where_edit)
+
+        # Fichier
+        self.path_edit = QLineEdit(f"{table_name}.csv")
+        path_btn = QPushButton("...")
+        path_btn.clicked.connect(self.select_file)
+
+        path_layout = QHBoxLayout()
+        path_layout.addWidget(self.path_edit)
+        path_layout.addWidget(path_btn)
+        form.addRow("Fichier:", path_layout)
+
+        layout.addLayout(form)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok |
+            QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.setLayout(layout)
+
+    def select_file(self):
+        """Choisir le fichier de destination"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            f"Exporter {self.table_name}",
+            self.path_edit.text(),
+            "CSV Files (*.csv)"
+        )
+        if file_path:
+            self.path_edit.setText(file_path)
+
+    def selected_columns(self):
+        """Colonnes cochées (None si toutes)"""
+        columns = []
+        for i in range(self.columns_list.count()):
+            item = self.columns_list.item(i)
+            if item.checkState() == Qt.CheckState.Checked:
+                columns.append(item.text())
+        return None if len(columns) == self.columns_list.count() else columns
+
+    def get_sql(self):
+        """Requête d'export selon les options"""
+        return build_select(self.table_name, self.selected_columns(),
+                            self.where_edit.text().strip())
+
+    def get_file_path(self):
+        """Fichier de destination"""
+        return self.path_edit.text().strip()
+
+
+class ImportDialog(QDialog):
+    """Options d'import : fichier, table, types des colonnes et index"""
+
+    ENCODINGS = ['utf-8', 'utf-8-sig', 'cp1252', 'latin-1']
+    TYPES = ['INTEGER', 'REAL', 'TEXT', 'BLOB']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Importer un fichier CSV")
+        self.resize(520, 560)
+
+        self.setStyleSheet(ModernTheme.get_stylesheet())
+
+        self.dialect = csv.excel
+
+        layout = QVBoxLayout()
+        form = QFormLayout()
+
+        # Fichier
+        self.path_edit = QLineEdit()
+        path_btn = QPushButton("...")
+        path_btn.clicked.connect(self.select_file)
+
+        path_layout = QHBoxLayout()
+        path_layout.addWidget(self.path_edit)
+        path_layout.addWidget(path_btn)
+        form.addRow("Fichier:", path_layout)
+
+        self.encoding_combo = QComboBox()
+        self.encoding_combo.addItems(self.ENCODINGS)
+        self.encoding_combo.currentTextChanged.connect(self.analyze)
+        form.addRow("Encodage:", self.encoding_combo)
+
+        self.header_check = QCheckBox("Première ligne = en-têtes")
+        self.header_check.setChecked(True)
+        self.header_check.toggled.connect(self.analyze)
+        form.addRow("", self.header_check)
+
+        self.table_edit = QLineEdit()
+        form.addRow("Table:", self.table_edit)
+
+        layout.addLayout(form)
+
+        # Colonnes : nom, type deviné, index à créer
+        layout.addWidget(QLabel("Colonnes (types devinés sur un échantillon):"))
+        self.columns_table = QTableWidget(0, 3)
+        self.columns_table.setHorizontalHeaderLabels(["Colonne", "Type", "Index"])
+        self.columns_table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.columns_table)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok |
+            QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.setLayout(layout)
+
+    def select_file(self):
+        """Choisir le fichier à importer"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Importer un fichier CSV",
+            "",
+            "CSV Files (*.csv *.txt);;All Files (*)"
+        )
+        if file_path:
+            self.path_edit.setText(file_path)
+            if not self.table_edit.text():
+                self.table_edit.setText(os.path.splitext(os.path.basename(file_path))[0])
+            self.analyze()
+
+    def analyze(self):
+        """Deviner le format et les colonnes du fichier"""
+        file_path = self.get_file_path()
+        if not file_path or not os.path.isfile(file_path):
+            return
+
+        try:
+            self.dialect, columns = sniff_csv(file_path, self.get_encoding(),
+                                              self.header_check.isChecked())
+        except (OSError, UnicodeDecodeError, csv.Error):
+            self.columns_table.setRowCount(0)
+            return
+
+        self.columns_table.setRowCount(len(columns))
+        for row, (name, kind) in enumerate(columns):
+            self.columns_table.setItem(row, 0, QTableWidgetItem(name))
+
+            type_combo = QComboBox()
+            type_combo.addItems(self.TYPES)
+            type_combo.setCurrentText(kind)
+            self.columns_table.setCellWidget(row, 1, type_combo)
+
+            index_item = QTableWidgetItem()
+            index_item.setFlags(index_item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            index_item.setCheckState(Qt.CheckState.Unchecked)
+            self.columns_table.setItem(row, 2, index_item)
+
+    def get_file_path(self):
+        """Fichier à importer"""
+        return self.path_edit.text().strip()
+
+    def get_encoding(self):
+        """Encodage du fichier"""
+        return self.encoding_combo.currentText()
+
+    def get_table_name(self):
+        """Table à créer"""
+        return self.table_edit.text().strip()
+
+    def get_columns(self):
+        """Colonnes et types choisis"""
+        return [(self.columns_table.item(row, 0).text(),
+                 self.columns_table.cellWidget(row, 1).currentText())
+                for row in range(self.columns_table.rowCount())]
+
+    def get_indexes(self):
+        """Colonnes à indexer après le chargement"""
+        return [self.columns_table.item(row, 0).text()
+                for row in range(self.columns_table.rowCount())
+                if self.columns_table.item(row, 2).checkState() == Qt.CheckState.Checked]
+
+    def import_options(self):
+        """Arguments de import_job"""
+        return dict(file_path=self.get_file_path(), table_name=self.get_table_name(),
+                    columns=self.get_columns(), dialect=self.dialect,
+                    encoding=self.get_encoding(), has_header=self.header_check.isChecked(),
+                    indexes=self.get_indexes())
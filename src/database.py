@@ -0,0 +1,847 @@
+# database.py
+"""Module pour l'explorateur et le navigateur de base de données"""
+
+import sqlite3
+from collections import OrderedDict
+
+from PyQt6.QtWidgets import (QTreeWidget, QTreeWidgetItem, QTableView, QMenu,
+                             QFileDialog, QMessageBox, QApplication, QHeaderView,
+                             QDialog)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QAction
+
+from theme import ModernTheme
+from query_executor import QueryExecutor
+from data_transfer import ExportDialog, ImportDialog, export_csv, export_job, import_job
+from schema_cache import SchemaCache, quote_identifier
+
+
+# Taille d'une fenêtre de lignes lue dans SQLite
+PAGE_SIZE = 500
+
+# Nombre maximal de fenêtres gardées en mémoire par le modèle
+MAX_CACHED_PAGES = 40
+
+
+# Dossiers de l'explorateur : type d'objet SQLite -> (libellé, icône des éléments)
+SCHEMA_FOLDERS = [
+    ('table', "📁 Tables", "📋"),
+    ('view', "📁 Vues", "📄"),
+    ('index', "📁 Index", "🔖"),
+    ('trigger', "📁 Déclencheurs", "🔔"),
+]
+
+# Rôles des éléments de l'arbre
+OBJECT_ROLE = Qt.ItemDataRole.UserRole  # (type, nom) de l'objet
+LAZY_ROLE = Qt.ItemDataRole.UserRole.value + 1  # enfants pas encore chargés
+
+
+def node_table(kind, name, schema_cache):
+    """Retourner la table dont dépend le contenu d'un nœud"""
+    if kind == 'index':
+        return schema_cache.owner(name)
+    return name
+
+
+def read_node_children(schema_cache, kind, name, connection=None):
+    """Lire les enfants d'un nœud de l'arbre depuis le cache du schéma
+
+    Retourne une liste de (texte, type, nom, chargement différé).
+    """
+    children = []
+
+    if kind in ('table', 'view'):
+        for col in schema_cache.columns(name, connection):
+            icon = "🔑" if col['pk'] else "•"
+            children.append((f"{icon} {col['name']} ({col['type']})", 'column', col['name'], False))
+
+        if kind == 'table':
+            children.append(("📁 Index", 'table_indexes', name, True))
+            children.append(("📁 Clés étrangères", 'table_foreign_keys', name, True))
+            children.append(("📁 Déclencheurs", 'table_triggers', name, True))
+
+    elif kind == 'table_indexes':
+        for index in schema_cache.indexes(name, connection):
+            unique = " (unique)" if index['unique'] else ""
+            children.append((f"🔖 {index['name']}{unique}", 'index', index['name'], True))
+
+    elif kind == 'index':
+        for column in schema_cache.index_columns(name, connection):
+            column = column if column is not None else "<expression>"
+            children.append((f"• {column}", 'column', column, False))
+
+    elif kind == 'table_foreign_keys':
+        for fk in schema_cache.foreign_keys(name, connection):
+            children.append((f"🔗 {fk['column']} → {fk['table']}({fk['to']})",
+                             'foreign_key', fk['column'], False))
+
+    elif kind == 'table_triggers':
+        for trigger in schema_cache.triggers(name, connection):
+            children.append((f"🔔 {trigger}", 'trigger', trigger, False))
+
+    return children
+
+
+def sort_uses_index(connection, sql, params=()):
+    """Indiquer si SQLite peut trier sans B-tree temporaire"""
+    plan = connection.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return not any("TEMP B-TREE" in row[-1] and "ORDER BY" in row[-1] for row in plan)
+
+
+def inspect_table(connection, table_name):
+    """Lire les colonnes d'une table et choisir sa clé de pagination"""
+    table = quote_identifier(table_name)
+    cursor = connection.execute(f"SELECT * FROM {table} LIMIT 0")
+    columns = [desc[0] for desc in cursor.description]
+
+    # Les vues et les tables WITHOUT ROWID n'ont pas de rowid
+    kind = connection.execute(
+        "SELECT type FROM sqlite_master WHERE name = ?", (table_name,)
+    ).fetchone()
+    if kind and kind[0] == 'view':
+        return columns, None
+
+    names = {name.lower() for name in columns}
+    for alias in ('rowid', '_rowid_', 'oid'):
+        if alias in names:
+            continue
+        try:
+            connection.execute(f"SELECT {alias} FROM {table} LIMIT 0")
+            return columns, alias
+        except sqlite3.OperationalError:
+            break
+    return columns, None
+
+
+class ModernDatabaseExplorer(QTreeWidget):
+    """Explorateur de base de données moderne"""
+
+    def __init__(self):
+        super().__init__()
+        self.db_connection = None
+        self.db_path = None
+        self.executor = None
+        self.schema_cache = None
+        self.objects = {}
+        self.generation = 0  # incrémenté à chaque reconstruction de l'arbre
+
+        # Configuration
+        self.setHeaderHidden(True)
+        self.setAnimated(True)
+
+        # Les nœuds sont chargés à leur première ouverture
+        self.itemExpanded.connect(self.on_item_expanded)
+
+        # Style
+        self.setStyleSheet(f"""
+            QTreeWidget {{
+                border: none;
+                background-color: {ModernTheme.COLORS['panel']};
+                padding: 4px;
+            }}
+            QTreeWidget::item {{
+                padding: 4px;
+            }}
+            QTreeWidget::item:hover {{
+                background-color: {ModernTheme.COLORS['selection']};
+            }}
+            QTreeWidget::item:selected {{
+                background-color: {ModernTheme.COLORS['accent']};
+            }}
+        """)
+
+        # Menu contextuel
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.show_context_menu)
+
+    def connect_database(self, db_path):
+        """Se connecter à une base de données"""
+        try:
+            connection = sqlite3.connect(db_path)
+            self.shutdown()
+
+            self.db_connection = connection
+            self.db_path = db_path
+
+            # Exécuteur avec sa propre connexion de lecture
+            self.executor = QueryExecutor(db_path, self)
+
+            # Schéma partagé avec le générateur SQL et l'éditeur
+            self.schema_cache = SchemaCache(connection, db_path)
+
+            self.refresh()
+            return True
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Impossible de se connecter: {str(e)}")
+            return False
+
+    def shutdown(self):
+        """Enregistrer le schéma et arrêter l'exécuteur"""
+        if self.schema_cache is not None:
+            self.schema_cache.save()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def refresh(self):
+        """Rafraîchir l'arbre"""
+        if not self.executor:
+            self.clear()
+            return
+
+        # Schéma inchangé : l'arbre est construit depuis le cache
+        if self.schema_cache.is_fresh():
+            self.populate(self.schema_cache.get_objects())
+            return
+
+        schema_cache = self.schema_cache
+        self.executor.submit(lambda job: schema_cache.get_objects(job.connection),
+                             description="Lecture du schéma...",
+                             on_result=self.populate,
+                             on_error=lambda message: QMessageBox.critical(
+                                 self, "Erreur", f"Impossible de lire le schéma: {message}"))
+
+    def populate(self, objects):
+        """Construire l'arbre à partir de la liste des objets"""
+        self.clear()
+        self.generation += 1
+        self.objects = objects
+        self.schema_cache.save()
+
+        # Nœud racine
+        root = QTreeWidgetItem(self, ["📊 Base de données"])
+        root.setExpanded(True)
+
+        # Un dossier par type d'objet, rempli à l'ouverture
+        for kind, label, _ in SCHEMA_FOLDERS:
+            folder = self._add_node(root, f"{label} ({len(objects.get(kind, []))})",
+                                    'folder', kind, lazy=True)
+            if kind == 'table':
+                folder.setExpanded(True)
+
+    def _add_node(self, parent, text, kind, name, lazy=False):
+        """Ajouter un nœud, éventuellement chargé à sa première ouverture"""
+        item = QTreeWidgetItem(parent, [text])
+        item.setData(0, OBJECT_ROLE, (kind, name))
+        if lazy:
+            item.setData(0, LAZY_ROLE, True)
+            item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
+        return item
+
+    def item_object(self, item):
+        """Retourner le (type, nom) de l'objet d'un élément"""
+        return item.data(0, OBJECT_ROLE) or (None, None)
+
+    def on_item_expanded(self, item):
+        """Charger les enfants d'un nœud à sa première ouverture"""
+        if not item.data(0, LAZY_ROLE):
+            return
+        item.setData(0, LAZY_ROLE, False)
+
+        kind, name = self.item_object(item)
+
+        # Les dossiers de premier niveau utilisent la liste déjà lue
+        if kind == 'folder':
+            icon = next(icon for folder_kind, _, icon in SCHEMA_FOLDERS if folder_kind == name)
+            lazy = name in ('table', 'view', 'index')
+            self._add_children(item, [(f"{icon} {child}", name, child, lazy)
+                                      for child in self.objects.get(name, [])])
+            return
+
+        if not self.executor:
+            return
+
+        # Détail déjà en cache : pas de lecture
+        schema_cache = self.schema_cache
+        if (schema_cache.is_fresh()
+                and node_table(kind, name, schema_cache) in schema_cache.cached_tables()):
+            self._add_children(item, read_node_children(schema_cache, kind, name))
+            return
+
+        placeholder = QTreeWidgetItem(item, ["⏳ Chargement..."])
+        generation = self.generation
+        self.executor.submit(
+            lambda job: read_node_children(schema_cache, kind, name, job.connection),
+            description=f"Lecture de {name}...",
+            on_result=lambda children: self._node_loaded(generation, item, placeholder, children),
+            on_error=lambda message: self._node_loaded(generation, item, placeholder, []))
+
+    def _node_loaded(self, generation, item, placeholder, children):
+        # L'arbre a pu être reconstruit entre-temps
+        if generation != self.generation:
+            return
+
+        item.removeChild(placeholder)
+        self._add_children(item, children)
+
+    def _add_children(self, item, children):
+        for text, kind, name, lazy in children:
+            self._add_node(item, text, kind, name, lazy)
+
+        if not children:
+            item.setChildIndicatorPolicy(
+                QTreeWidgetItem.ChildIndicatorPolicy.DontShowIndicatorWhenChildless)
+
+    def show_context_menu(self, position):
+        """Afficher le menu contextuel"""
+        item = self.itemAt(position)
+        if not item and not self.executor:
+            return
+
+        menu = QMenu(self)
+
+        # Actions selon le type d'élément
+        kind, table_name = self.item_object(item) if item else (None, None)
+        if kind in ('table', 'view'):
+            view_action = QAction("👁️ Voir les données", self)
+            view_action.triggered.connect(lambda: self.view_table_data(table_name))
+            menu.addAction(view_action)
+
+            export_action = QAction("💾 Exporter en CSV", self)
+            export_action.triggered.connect(lambda: self.export_table_csv(table_name))
+            menu.addAction(export_action)
+
+        if self.executor:
+            if not menu.isEmpty():
+                menu.addSeparator()
+
+            import_action = QAction("📥 Importer un CSV...", self)
+            import_action.triggered.connect(self.import_csv)
+            menu.addAction(import_action)
+
+        menu.exec(self.mapToGlobal(position))
+
+    def import_csv(self):
+        """Importer un fichier CSV dans une nouvelle table"""
+        dialog = ImportDialog(self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        if not dialog.get_file_path() or not dialog.get_table_name() or not dialog.get_columns():
+            return
+
+        table_name = dialog.get_table_name()
+
+        def done(count):
+            self.refresh()
+            QMessageBox.information(self, "Succès", f"{count} lignes importées dans {table_name}")
+
+        self.executor.submit(
+            import_job, **dialog.import_options(),
+            description=f"Import dans {table_name}...",
+            on_result=done,
+            on_error=lambda message: QMessageBox.critical(
+                self, "Erreur", f"Erreur lors de l'import: {message}"))
+
+    def view_table_data(self, table_name):
+        """Voir les données d'une table"""
+        # Émettre un signal ou appeler une méthode parent
+        pass
+
+    def export_table_csv(self, table_name):
+        """Exporter une table en CSV"""
+        dialog = ExportDialog(table_name, self.schema_cache.column_names(table_name), self)
+        if dialog.exec() != QDialog.DialogCode.Accepted or not dialog.get_file_path():
+            return
+
+        file_path = dialog.get_file_path()
+        self.executor.submit(
+            export_job, dialog.get_sql(), file_path,
+            description=f"Export de {table_name}...",
+            on_result=lambda count: QMessageBox.information(
+                self, "Succès", f"{count} lignes exportées vers {file_path}"),
+            on_error=lambda message: QMessageBox.critical(
+                self, "Erreur", f"Erreur lors de l'export: {message}"))
+
+
+class SqliteTableModel(QAbstractTableModel):
+    """Modèle de table SQLite lu par fenêtres de lignes
+
+    Les lignes sont lues par pages de PAGE_SIZE au fur et à mesure que la vue
+    les demande (canFetchMore/fetchMore). La pagination se fait par clé
+    (rowid) plutôt que par OFFSET, et seules MAX_CACHED_PAGES pages restent en
+    mémoire : une page évincée est relue à partir de la clé de la page
+    précédente. Avec un exécuteur, les pages sont lues par son worker et
+    insérées à leur arrivée ; sinon elles sont lues sur la connexion fournie.
+    """
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, connection, table_name, parent=None, executor=None):
+        super().__init__(parent)
+        self.connection = connection
+        self.table_name = table_name
+        self.executor = executor
+
+        self.columns = []
+        self.rowid_column = None
+        self.pages = OrderedDict()  # numéro de page -> lignes (ordre LRU)
+        self.page_keys = []  # clé de la dernière ligne de chaque page lue
+        self.loaded_rows = 0
+        self.has_more = False
+
+        self.pending = {}  # numéro de page -> identifiant de tâche
+        self.generation = 0  # incrémenté à chaque rechargement
+        self.disposed = False
+
+        # Tri exécuté par SQLite (ORDER BY)
+        self.sort_column = None
+        self.sort_descending = False
+        self.sort_indexed = None  # None tant que le plan n'est pas connu
+
+    def open(self):
+        """Lire la structure de la table puis la première page"""
+        if self.executor is None:
+            self._set_structure(inspect_table(self.connection, self.table_name))
+            return
+
+        table_name = self.table_name
+        self.executor.submit(lambda job: inspect_table(job.connection, table_name),
+                             description=f"Ouverture de {table_name}...",
+                             on_result=self._set_structure,
+                             on_error=self._on_error)
+
+    def dispose(self):
+        """Abandonner le modèle et annuler ses lectures en cours"""
+        self.disposed = True
+        self._cancel_pending()
+
+    def _cancel_pending(self):
+        if self.executor is not None:
+            for job_id in list(self.pending.values()):
+                self.executor.cancel(job_id)
+        self.pending.clear()
+
+    def _set_structure(self, structure):
+        if self.disposed:
+            return
+
+        self.columns, self.rowid_column = structure
+        self._reload()
+
+    def _reload(self):
+        """Vider le cache et relire la première page"""
+        self._cancel_pending()
+        self.generation += 1
+
+        self.beginResetModel()
+        self.pages.clear()
+        self.page_keys = []
+        self.loaded_rows = 0
+        self.has_more = True
+        self.endResetModel()
+
+        self.fetchMore(QModelIndex())
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Trier côté SQLite (ORDER BY) puis relire la fenêtre visible"""
+        sort_column = self.columns[column] if 0 <= column < len(self.columns) else None
+        descending = sort_column is not None and order == Qt.SortOrder.DescendingOrder
+        if (sort_column, descending) == (self.sort_column, self.sort_descending):
+            return
+
+        self.sort_column = sort_column
+        self.sort_descending = descending
+        self.sort_indexed = None
+        self.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, max(len(self.columns) - 1, 0))
+
+        if not self.columns:
+            return
+
+        self._reload()
+        if sort_column is not None:
+            self._explain_sort()
+
+    def _explain_sort(self):
+        """Déterminer si le tri peut utiliser un index"""
+        sql, params = self._page_query(0)
+        generation = self.generation
+
+        if self.executor is None:
+            self._sort_explained(generation, sort_uses_index(self.connection, sql, params))
+            return
+
+        self.executor.submit(lambda job: sort_uses_index(job.connection, sql, params),
+                             description="Analyse du tri...",
+                             on_result=lambda indexed: self._sort_explained(generation, indexed))
+
+    def _sort_explained(self, generation, indexed):
+        if self.disposed or generation != self.generation:
+            return
+
+        self.sort_indexed = indexed
+        section = self.columns.index(self.sort_column)
+        self.headerDataChanged.emit(Qt.Orientation.Horizontal, section, section)
+
+    def _on_error(self, message):
+        if not self.disposed:
+            self.load_failed.emit(message)
+
+    def _page_query(self, page):
+        """Construire la requête d'une page
+
+        Les lignes lues commencent par les colonnes de la clé de pagination
+        (colonne triée puis rowid), retirées à la réception de la page.
+        """
+        table = quote_identifier(self.table_name)
+        direction = "DESC" if self.sort_descending else "ASC"
+
+        if not self.rowid_column:
+            order = ""
+            if self.sort_column is not None:
+                order = f" ORDER BY {quote_identifier(self.sort_column)} {direction}"
+            return (f"SELECT * FROM {table}{order} LIMIT ? OFFSET ?",
+                    (PAGE_SIZE, page * PAGE_SIZE))
+
+        rowid = self.rowid_column
+        after = self.page_keys[page - 1] if page else None
+
+        if self.sort_column is None:
+            if after is None:
+                return f"SELECT {rowid}, * FROM {table} ORDER BY {rowid} LIMIT ?", (PAGE_SIZE,)
+            return (f"SELECT {rowid}, * FROM {table} WHERE {rowid} > ? ORDER BY {rowid} LIMIT ?",
+                    (after, PAGE_SIZE))
+
+        # Pagination par clé (colonne, rowid) ; les NULL sont en tête en ASC
+        column = quote_identifier(self.sort_column)
+        where, params = "", ()
+        if after is not None:
+            value, key = after
+            if not self.sort_descending:
+                if value is None:
+                    where = f" WHERE ({column} IS NULL AND {rowid} > ?) OR {column} IS NOT NULL"
+                    params = (key,)
+                else:
+                    where = f" WHERE ({column}, {rowid}) > (?, ?)"
+                    params = (value, key)
+            else:
+                if value is None:
+                    where = f" WHERE {column} IS NULL AND {rowid} < ?"
+                    params = (key,)
+                else:
+                    where = f" WHERE ({column}, {rowid}) < (?, ?) OR {column} IS NULL"
+                    params = (value, key)
+
+        return (f"SELECT {column}, {rowid}, * FROM {table}{where} "
+                f"ORDER BY {column} {direction}, {rowid} {direction} LIMIT ?",
+                params + (PAGE_SIZE,))
+
+    def _order_by(self):
+        """Clause ORDER BY correspondant à l'ordre affiché"""
+        direction = "DESC" if self.sort_descending else "ASC"
+        terms = []
+        if self.sort_column is not None:
+            terms.append(f"{quote_identifier(self.sort_column)} {direction}")
+        if self.rowid_column:
+            terms.append(f"{self.rowid_column} {direction}")
+        return " ORDER BY " + ", ".join(terms) if terms else ""
+
+    def selection_query(self, ranges):
+        """Requête retournant des plages de lignes (premier, dernier), dans l'ordre affiché"""
+        base = f"SELECT * FROM {quote_identifier(self.table_name)}{self._order_by()}"
+        parts, params = [], []
+        for top, bottom in ranges:
+            parts.append(f"SELECT * FROM ({base} LIMIT ? OFFSET ?)")
+            params += [bottom - top + 1, top]
+        return " UNION ALL ".join(parts), tuple(params)
+
+    def _key_width(self):
+        """Nombre de colonnes de clé en tête des lignes lues"""
+        if not self.rowid_column:
+            return 0
+        return 1 if self.sort_column is None else 2
+
+    def _request_page(self, page, append):
+        """Lire une page, en arrière-plan si un exécuteur est disponible"""
+        if page in self.pending:
+            return
+
+        sql, params = self._page_query(page)
+        generation = self.generation
+
+        if self.executor is None:
+            rows = self.connection.execute(sql, params).fetchall()
+            self._page_loaded(generation, page, append, rows)
+            return
+
+        self.pending[page] = self.executor.submit(
+            lambda job: job.connection.execute(sql, params).fetchall(),
+            description=f"Lecture de {self.table_name}...",
+            on_result=lambda rows: self._page_loaded(generation, page, append, rows),
+            on_error=lambda message: self._page_failed(page, message),
+            on_cancel=lambda: self.pending.pop(page, None))
+
+    def _page_failed(self, page, message):
+        self.pending.pop(page, None)
+        self._on_error(message)
+
+    def _page_loaded(self, generation, page, append, rows):
+        """Intégrer une page lue"""
+        if self.disposed or generation != self.generation:
+            return
+        self.pending.pop(page, None)
+
+        last_key = None
+        width = self._key_width()
+        if width and rows:
+            last_key = rows[-1][0] if width == 1 else tuple(rows[-1][:2])
+            rows = [row[width:] for row in rows]
+
+        if not append:
+            # Page évincée puis relue : rafraîchir les cellules visibles
+            self._store_page(page, rows)
+            if rows:
+                first = page * PAGE_SIZE
+                self.dataChanged.emit(self.index(first, 0),
+                                      self.index(first + len(rows) - 1, len(self.columns) - 1))
+            return
+
+        self.has_more = len(rows) == PAGE_SIZE
+        if not rows:
+            return
+
+        self.beginInsertRows(QModelIndex(), self.loaded_rows, self.loaded_rows + len(rows) - 1)
+        self.page_keys.append(last_key)
+        self._store_page(page, rows)
+        self.loaded_rows += len(rows)
+        self.endInsertRows()
+
+    def _store_page(self, page, rows):
+        """Garder une page en cache en évinçant les plus anciennes"""
+        self.pages[page] = rows
+        self.pages.move_to_end(page)
+        while len(self.pages) > MAX_CACHED_PAGES:
+            self.pages.popitem(last=False)
+
+    def _row(self, row):
+        """Retourner une ligne, en relisant sa page si elle a été évincée"""
+        page = row // PAGE_SIZE
+        rows = self.pages.get(page)
+        if rows is None:
+            self._request_page(page, append=False)
+            rows = self.pages.get(page)
+            if rows is None:
+                return None
+        else:
+            self.pages.move_to_end(page)
+
+        offset = row % PAGE_SIZE
+        return rows[offset] if offset < len(rows) else None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.loaded_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.columns)
+
+    def canFetchMore(self, parent):
+        if parent.isValid():
+            return False
+        return self.has_more and len(self.page_keys) not in self.pending
+
+    def fetchMore(self, parent):
+        """Lire la fenêtre de lignes suivante"""
+        if parent.isValid() or not self.has_more:
+            return
+
+        self._request_page(len(self.page_keys), append=True)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        row = self._row(index.row())
+        if row is None:
+            return None
+
+        value = row[index.column()]
+        if value is None:
+            return ""
+        if isinstance(value, bytes):
+            return f"<BLOB {len(value)} octets>"
+        return str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation != Qt.Orientation.Horizontal:
+            return str(section + 1) if role == Qt.ItemDataRole.DisplayRole else None
+
+        if section >= len(self.columns):
+            return None
+        name = self.columns[section]
+        sorted_here = name == self.sort_column and self.sort_indexed is not None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if sorted_here:
+                return f"{name} {'⚡' if self.sort_indexed else '⏳'}"
+            return name
+
+        if role == Qt.ItemDataRole.ToolTipRole and sorted_here:
+            if self.sort_indexed:
+                return "Tri par index"
+            return "Tri sans index : parcours complet de la table"
+
+        return None
+
+
+class ModernDataBrowser(QTableView):
+    """Navigateur de données moderne"""
+
+    def __init__(self):
+        super().__init__()
+        self.executor = None
+
+        # Configuration
+        self.setAlternatingRowColors(True)
+        self.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+
+        # Hauteur de ligne fixe : la vue n'a pas à mesurer chaque ligne
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+
+        # Tri délégué au modèle (ORDER BY dans SQLite)
+        self.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.setSortingEnabled(True)
+
+        # Style
+        self.setStyleSheet(f"""
+            QTableView {{
+                border: none;
+                gridline-color: {ModernTheme.COLORS['border']};
+            }}
+            QTableView::item {{
+                padding: 4px;
+            }}
+            QTableView::item:selected {{
+                background-color: {ModernTheme.COLORS['accent']};
+            }}
+            QHeaderView::section {{
+                background-color: {ModernTheme.COLORS['panel']};
+                padding: 4px;
+                border: none;
+                border-right: 1px solid {ModernTheme.COLORS['border']};
+                border-bottom: 1px solid {ModernTheme.COLORS['border']};
+            }}
+        """)
+
+        # Menu contextuel
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.show_context_menu)
+
+    def set_executor(self, executor):
+        """Utiliser un exécuteur pour lire les données en arrière-plan"""
+        self.executor = executor
+
+    def load_table(self, connection, table_name):
+        """Charger les données d'une table"""
+        try:
+            model = SqliteTableModel(connection, table_name, self, self.executor)
+            model.load_failed.connect(self.on_load_failed)
+            model.rowsInserted.connect(self.on_rows_inserted)
+
+            old_model = self.model()
+            self.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+            self.setModel(model)
+            if old_model is not None:
+                old_model.dispose()
+                old_model.deleteLater()
+
+            model.open()
+
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement: {str(e)}")
+
+    def on_rows_inserted(self, parent, first, last):
+        """Ajuster les colonnes à l'arrivée de la première page"""
+        if first == 0:
+            # Seules les lignes visibles sont mesurées
+            self.resizeColumnsToContents()
+
+    def on_load_failed(self, message):
+        """Afficher une erreur de lecture"""
+        QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement: {message}")
+
+    def show_context_menu(self, position):
+        """Afficher le menu contextuel"""
+        menu = QMenu(self)
+
+        copy_action = QAction("📋 Copier", self)
+        copy_action.triggered.connect(self.copy_selection)
+        menu.addAction(copy_action)
+
+        export_action = QAction("💾 Exporter la sélection", self)
+        export_action.triggered.connect(self.export_selection)
+        menu.addAction(export_action)
+
+        menu.exec(self.mapToGlobal(position))
+
+    def copy_selection(self):
+        """Copier la sélection dans le presse-papier"""
+        model = self.model()
+        if model is None:
+            return
+
+        indexes = sorted(self.selectionModel().selectedIndexes(),
+                         key=lambda index: (index.row(), index.column()))
+        if indexes:
+            # Regrouper les cellules sélectionnées par ligne
+            lines = []
+            current_row = None
+            row_data = []
+            for index in indexes:
+                if index.row() != current_row:
+                    if row_data:
+                        lines.append("\t".join(row_data))
+                    current_row = index.row()
+                    row_data = []
+                row_data.append(model.data(index) or "")
+            lines.append("\t".join(row_data))
+
+            QApplication.clipboard().setText("\n".join(lines) + "\n")
+
+    def export_selection(self):
+        """Exporter la sélection"""
+        model = self.model()
+        if model is None:
+            return
+
+        # Plages de lignes sélectionnées, fusionnées
+        ranges = []
+        for selection_range in sorted(self.selectionModel().selection(),
+                                      key=lambda r: r.top()):
+            top, bottom = selection_range.top(), selection_range.bottom()
+            if ranges and top <= ranges[-1][1] + 1:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], bottom))
+            else:
+                ranges.append((top, bottom))
+        if not ranges:
+            return
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Exporter la sélection",
+            f"{model.table_name}_selection.csv",
+            "CSV Files (*.csv)"
+        )
+        if not file_path:
+            return
+
+        sql, params = model.selection_query(ranges)
+        total = sum(bottom - top + 1 for top, bottom in ranges)
+
+        def done(count):
+            QMessageBox.information(self, "Succès", f"{count} lignes exportées vers {file_path}")
+
+        def failed(message):
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de l'export: {message}")
+
+        if self.executor is None:
+            try:
+                done(export_csv(model.connection, sql, file_path, params, total))
+            except Exception as e:
+                failed(str(e))
+            return
+
+        self.executor.submit(export_job, sql, file_path, params, total,
+                             description="Export de la sélection...",
+                             on_result=done, on_error=failed)
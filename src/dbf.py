@@ -0,0 +1,598 @@
+# dbf.py
+"""Module pour la lecture des tables DBF (Visual FoxPro, dBase)"""
+
+import datetime
+import functools
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+
+
+# Versions de fichier Visual FoxPro (champs B = double, mémos sur 4 octets)
+VFP_VERSIONS = (0x30, 0x31, 0x32)
+
+# Marque de page de code (octet 29 de l'en-tête) -> encodage Python
+CODEPAGES = {
+    0x01: 'cp437', 0x02: 'cp850', 0x03: 'cp1252', 0x04: 'mac_roman',
+    0x64: 'cp852', 0x65: 'cp866', 0x66: 'cp865', 0x67: 'cp861',
+    0x6A: 'cp737', 0x6B: 'cp857', 0x78: 'cp950', 0x79: 'cp949',
+    0x7A: 'cp936', 0x7B: 'cp932', 0x7C: 'cp874', 0x7D: 'cp1255',
+    0x7E: 'cp1256', 0x96: 'mac_cyrillic', 0x97: 'mac_latin2',
+    0x98: 'mac_greek', 0xC8: 'cp1250', 0xC9: 'cp1251', 0xCA: 'cp1254',
+    0xCB: 'cp1253', 0xCC: 'cp1257',
+}
+
+# Encodage utilisé quand l'en-tête n'indique pas de page de code
+DEFAULT_ENCODING = 'cp1252'
+
+# Indicateurs des champs (octet 18 du descripteur)
+FIELD_SYSTEM = 0x01
+FIELD_NULLABLE = 0x02
+FIELD_BINARY = 0x04
+
+# Types dont la valeur est un numéro de bloc dans le fichier mémo
+MEMO_TYPES = ('M', 'G', 'P', 'W')
+
+# Extension du fichier mémo associé à chaque type de table
+MEMO_EXTENSIONS = {
+    '.dbf': '.fpt', '.dbc': '.dct', '.scx': '.sct', '.vcx': '.vct',
+    '.frx': '.frt', '.lbx': '.lbt', '.mnx': '.mnt', '.pjx': '.pjt',
+}
+
+# Taille des morceaux copiés depuis un fichier mémo
+MEMO_CHUNK_SIZE = 1 << 20
+
+DELETED = 0x2A  # '*'
+JULIAN_ORDINAL_OFFSET = 1721425  # jour julien -> date.toordinal()
+
+
+DbfField = namedtuple('DbfField', 'name type length decimals flags offset')
+
+
+class DbfError(Exception):
+    """Fichier DBF invalide"""
+
+
+def _blank_to_none(converter):
+    def convert(raw):
+        raw = raw.strip()
+        if not raw:
+            return None
+        return converter(raw)
+    return convert
+
+
+def _numeric(raw):
+    raw = raw.strip()
+    if not raw or raw[0] == DELETED:  # vide ou dépassement ('***')
+        return None
+    try:
+        return float(raw) if b'.' in raw else int(raw)
+    except ValueError:
+        return None
+
+
+# Les dates se répètent beaucoup d'un enregistrement à l'autre
+@functools.lru_cache(maxsize=65536)
+def _date(raw):
+    if not raw.strip(b' \x00'):
+        return None
+    try:
+        value = int(raw)
+        return datetime.date(value // 10000, value // 100 % 100, value % 100)
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=65536)
+def _iso_date(raw):
+    if not raw.strip(b' \x00'):
+        return None
+    return f"{raw[:4].decode()}-{raw[4:6].decode()}-{raw[6:8].decode()}"
+
+
+_LOGICAL = {b'T': True, b't': True, b'Y': True, b'y': True,
+            b'F': False, b'f': False, b'N': False, b'n': False}
+
+
+_datetime_struct = struct.Struct('<ii')
+_DATETIME_ORIGIN = datetime.datetime(1, 1, 1)
+
+
+def _datetime(raw):
+    day, ms = _datetime_struct.unpack(raw)
+    if day == 0:
+        return None
+    return _DATETIME_ORIGIN + datetime.timedelta(days=day - JULIAN_ORDINAL_OFFSET - 1, milliseconds=ms)
+
+
+def _iso_datetime(raw):
+    value = _datetime(raw)
+    return value.isoformat(' ') if value is not None else None
+
+
+def _currency(value):
+    # Monétaire : entier sur 8 octets, 4 décimales implicites
+    return value / 10000 if isinstance(value, int) else _numeric(value)
+
+
+def _memo_block(raw):
+    # Numéro de bloc : entier sur 4 octets (VFP) ou texte sur 10 (dBase)
+    if len(raw) == 4:
+        block = int.from_bytes(raw, 'little')
+    else:
+        raw = raw.strip()
+        block = int(raw) if raw.isdigit() else 0
+    return block or None
+
+
+class FptFile:
+    """Fichier mémo FoxPro (.fpt) lu par projection mémoire
+
+    Chaque mémo occupe des blocs consécutifs : un en-tête de 8 octets (type
+    et longueur, gros-boutiste) suivi des données. Les données sont lues
+    directement dans la projection, sans lire le fichier entier.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.next_block, self.block_size = struct.unpack_from('>I2xH', self._mmap, 0)
+        except (ValueError, OSError, struct.error) as e:
+            self._file.close()
+            raise DbfError(f"{path}: en-tête FPT invalide ({e})")
+        self.block_size = self.block_size or 1
+
+    def locate(self, block):
+        """Retourner (type, position, longueur) des données d'un mémo"""
+        offset = block * self.block_size
+        if offset + 8 > len(self._mmap):
+            raise DbfError(f"{self.path}: bloc mémo {block} hors du fichier")
+        kind, length = struct.unpack_from('>II', self._mmap, offset)
+        start = offset + 8
+        return kind, start, min(length, len(self._mmap) - start)
+
+    def length(self, block):
+        """Longueur d'un mémo, sans lire ses données"""
+        return self.locate(block)[2]
+
+    def read(self, block):
+        """Lire les données d'un mémo"""
+        _, start, length = self.locate(block)
+        return self._mmap[start:start + length]
+
+    def chunks(self, block, size=MEMO_CHUNK_SIZE):
+        """Produire les données d'un mémo par morceaux, sans copie"""
+        _, start, length = self.locate(block)
+        view = memoryview(self._mmap)
+        try:
+            for position in range(start, start + length, size):
+                chunk = view[position:min(position + size, start + length)]
+                try:
+                    yield chunk
+                finally:
+                    chunk.release()
+        finally:
+            view.release()
+
+    def copy_to(self, block, target):
+        """Copier un mémo dans un fichier ou un blob SQLite (méthode write)"""
+        copied = 0
+        for chunk in self.chunks(block):
+            target.write(chunk)
+            copied += len(chunk)
+        return copied
+
+    def close(self):
+        """Fermer le fichier"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Memo:
+    """Référence à un mémo, lue seulement à la demande
+
+    Peut être passée telle quelle à sqlite3 : __conform__ lit la valeur au
+    moment de l'insertion.
+    """
+
+    __slots__ = ('fpt', 'block', 'binary', 'encoding')
+
+    def __init__(self, fpt, block, binary, encoding):
+        self.fpt = fpt
+        self.block = block
+        self.binary = binary
+        self.encoding = encoding
+
+    def __len__(self):
+        return self.fpt.length(self.block)
+
+    def read(self):
+        """Données brutes du mémo"""
+        return self.fpt.read(self.block)
+
+    def text(self):
+        """Texte du mémo"""
+        return self.read().decode(self.encoding, 'replace')
+
+    def value(self):
+        """Texte (mémo) ou octets (mémo binaire, général, image)"""
+        return self.read() if self.binary else self.text()
+
+    def copy_to(self, target):
+        """Copier le mémo par morceaux dans un fichier ou un blob SQLite"""
+        return self.fpt.copy_to(self.block, target)
+
+    def __conform__(self, protocol):
+        return self.value()
+
+    def __repr__(self):
+        return f"<Memo bloc {self.block}>"
+
+
+class DbfTable:
+    """Table DBF lue par projection mémoire
+
+    L'en-tête et les descripteurs de champs sont lus une seule fois. Les
+    enregistrements sont produits un à un sous forme de tuples : la mémoire
+    utilisée ne dépend pas de la taille du fichier. Chaque enregistrement est
+    découpé par un struct.Struct précompilé dans lequel les champs non
+    demandés sont des octets de remplissage : ils ne sont jamais décodés.
+    """
+
+    def __init__(self, path, encoding=None):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._read_header()
+        except (ValueError, OSError, struct.error) as e:
+            self._file.close()
+            raise DbfError(f"{path}: en-tête DBF invalide ({e})")
+
+        self.encoding = encoding or CODEPAGES.get(self.codepage, DEFAULT_ENCODING)
+        self._memo_file = None
+
+    def _read_header(self):
+        mm = self._mmap
+        (self.version, year, month, day, self.header_record_count,
+         self.header_length, self.record_length) = struct.unpack_from('<BBBBIHH', mm, 0)
+        self.table_flags = mm[28]
+        self.codepage = mm[29]
+
+        try:
+            self.last_update = datetime.date(1900 + year, month or 1, day or 1)
+        except ValueError:
+            self.last_update = None
+
+        # Descripteurs de champs jusqu'au terminateur 0x0D
+        self.all_fields = []
+        offset = 1  # octet de suppression
+        position = 32
+        while position + 32 <= self.header_length and mm[position] != 0x0D:
+            name = mm[position:position + 11].split(b'\x00', 1)[0].decode('ascii', 'replace')
+            field_type = chr(mm[position + 11])
+            length = mm[position + 16]
+            decimals = mm[position + 17]
+            flags = mm[position + 18]
+            self.all_fields.append(DbfField(name, field_type, length, decimals, flags, offset))
+            offset += length
+            position += 32
+
+        if offset > self.record_length:
+            raise DbfError("longueur d'enregistrement incohérente")
+
+        # Fichier tronqué : ne pas lire au-delà de la fin
+        available = max(0, (len(mm) - self.header_length) // self.record_length)
+        self.record_count = min(self.header_record_count, available)
+
+        self.fields = [f for f in self.all_fields if not f.flags & FIELD_SYSTEM]
+        self._null_bits = self._assign_null_bits()
+
+    def _assign_null_bits(self):
+        """Bits de _NullFlags : (longueur variable, nul) par champ"""
+        bits = {}
+        bit = 0
+        for field in self.all_fields:
+            if field.flags & FIELD_SYSTEM:
+                continue
+            var_bit = null_bit = None
+            if field.type in ('V', 'Q'):
+                var_bit = bit
+                bit += 1
+            if field.flags & FIELD_NULLABLE:
+                null_bit = bit
+                bit += 1
+            if var_bit is not None or null_bit is not None:
+                bits[field.name] = (var_bit, null_bit)
+        return bits
+
+    @property
+    def field_names(self):
+        """Noms des champs (hors champs système)"""
+        return [f.name for f in self.fields]
+
+    @property
+    def is_visual_foxpro(self):
+        return self.version in VFP_VERSIONS
+
+    def is_memo(self, field):
+        """Indiquer si un champ est stocké dans le fichier mémo"""
+        return field.type in MEMO_TYPES or (field.type == 'B' and not self.is_visual_foxpro)
+
+    @property
+    def memo_path(self):
+        """Chemin du fichier mémo (.fpt, .sct, .vct...), None s'il n'existe pas"""
+        stem, extension = os.path.splitext(self.path)
+        wanted = os.path.basename(stem + MEMO_EXTENSIONS.get(extension.lower(), '.fpt')).lower()
+        directory = os.path.dirname(self.path) or '.'
+        for name in os.listdir(directory):
+            if name.lower() == wanted:
+                return os.path.join(directory, name)
+        return None
+
+    @property
+    def memo_file(self):
+        """Fichier mémo, ouvert à la première lecture d'un mémo"""
+        if self._memo_file is None:
+            path = self.memo_path
+            if path is None:
+                raise DbfError(f"{self.path}: fichier mémo introuvable")
+            self._memo_file = FptFile(path)
+        return self._memo_file
+
+    def field(self, name):
+        """Retourner un descripteur de champ par son nom"""
+        name = name.upper()
+        for field in self.fields:
+            if field.name.upper() == name:
+                return field
+        raise KeyError(name)
+
+    def _converter(self, field, iso_dates, memos):
+        """Fonction de décodage d'un champ (None : valeur déjà décodée par struct)"""
+        encoding = self.encoding
+        kind = field.type
+
+        if self.is_memo(field):
+            if memos == 'block':
+                return _memo_block
+            fpt = self.memo_file
+            binary = kind != 'M' or bool(field.flags & FIELD_BINARY)
+
+            def memo(raw):
+                block = _memo_block(raw)
+                return Memo(fpt, block, binary, encoding) if block else None
+
+            if memos == 'lazy':
+                return memo
+            return lambda raw: (value := memo(raw)) and value.value()
+
+        if kind in ('C', 'V'):
+            if field.flags & FIELD_BINARY:
+                return lambda raw: raw.rstrip(b'\x00')
+            return lambda raw: raw.rstrip(b' \x00').decode(encoding, 'replace')
+        if kind in ('N', 'F'):
+            return _numeric
+        if kind == 'D':
+            return _iso_date if iso_dates else _date
+        if kind == 'L':
+            return _LOGICAL.get
+        if kind == 'T':
+            return _iso_datetime if iso_dates else _datetime
+        if kind == 'Q':
+            return lambda raw: raw
+        if kind == 'Y':
+            return _currency
+        if kind in ('I', '+', 'B'):
+            return None
+        return _blank_to_none(lambda raw: raw.decode(encoding, 'replace'))
+
+    def _struct_code(self, field):
+        """Code struct d'un champ lu"""
+        if field.type in ('I', '+') and field.length == 4:
+            return 'i'
+        if field.type == 'B' and self.is_visual_foxpro and field.length == 8:
+            return 'd'
+        if field.type == 'Y' and field.length == 8:
+            return 'q'
+        return f'{field.length}s'
+
+    def _plan(self, names, iso_dates, memos):
+        """Préparer la lecture d'une projection de champs"""
+        if names is None:
+            selected = list(self.fields)
+        else:
+            selected = [self.field(name) for name in names]
+        wanted = {f.name for f in selected}
+
+        null_field = next((f for f in self.all_fields if f.type == '0'), None)
+        need_nulls = null_field is not None and any(f.name in self._null_bits for f in selected)
+
+        # Struct couvrant tout l'enregistrement ; champs ignorés = remplissage
+        codes = ['<x']
+        order = []
+        for field in self.all_fields:
+            if field.name in wanted:
+                codes.append(self._struct_code(field))
+                order.append(field.name)
+            elif need_nulls and field is null_field:
+                codes.append(f'{field.length}s')
+                order.append(None)
+            else:
+                codes.append(f'{field.length}x')
+        padding = self.record_length - 1 - sum(f.length for f in self.all_fields)
+        if padding > 0:
+            codes.append(f'{padding}x')
+        layout = struct.Struct(''.join(codes))
+
+        # Position de chaque champ demandé dans le tuple décodé par struct
+        positions = {name: i for i, name in enumerate(order) if name is not None}
+        indexes = [positions[f.name] for f in selected]
+        converters = [self._converter(f, iso_dates, memos) for f in selected]
+        null_index = order.index(None) if need_nulls else None
+        null_fields = [(i, self._null_bits[f.name], f.type) for i, f in enumerate(selected)
+                       if need_nulls and f.name in self._null_bits]
+        return layout, indexes, converters, null_index, null_fields
+
+    def records(self, fields=None, deleted=False, recno=False, iso_dates=False,
+                memos='lazy', start=0, stop=None):
+        """Produire les enregistrements sous forme de tuples
+
+        fields : noms des champs à lire (tous par défaut) ;
+        deleted : inclure les enregistrements marqués supprimés ;
+        recno : ajouter le numéro d'enregistrement (1..n) en tête ;
+        iso_dates : dates et dates-heures en texte ISO ('AAAA-MM-JJ hh:mm:ss') ;
+        memos : 'lazy' (objets Memo lus à la demande), 'value' (texte ou
+        octets lus aussitôt) ou 'block' (numéros de bloc) ;
+        start/stop : plage d'enregistrements (indices à partir de 0).
+        """
+        layout, indexes, converters, null_index, null_fields = self._plan(fields, iso_dates, memos)
+        unpack_from = layout.unpack_from
+        mm = self._mmap
+        record_length = self.record_length
+        stop = self.record_count if stop is None else min(stop, self.record_count)
+        pairs = list(zip(indexes, converters))
+
+        offset = self.header_length + start * record_length
+        for number in range(start + 1, stop + 1):
+            if not deleted and mm[offset] == DELETED:
+                offset += record_length
+                continue
+
+            raw = unpack_from(mm, offset)
+            offset += record_length
+
+            values = [raw[i] if convert is None else convert(raw[i]) for i, convert in pairs]
+
+            if null_fields:
+                flags = int.from_bytes(raw[null_index], 'little')
+                for i, (var_bit, null_bit), kind in null_fields:
+                    if null_bit is not None and flags >> null_bit & 1:
+                        values[i] = None
+                    elif var_bit is not None and flags >> var_bit & 1:
+                        # Longueur réelle dans le dernier octet du champ
+                        data = raw[indexes[i]]
+                        data = data[:data[-1]]
+                        values[i] = data if kind == 'Q' else data.decode(self.encoding, 'replace')
+
+            if recno:
+                values.insert(0, number)
+            yield tuple(values)
+
+    def block_hashes(self, block_records, digest_size=16):
+        """Empreintes blake2b des enregistrements, par blocs de block_records
+
+        Les octets bruts sont hachés directement dans la projection mémoire.
+        Pour une table à mémos, l'empreinte d'un bloc couvre aussi le contenu
+        des mémos de ses enregistrements (un mémo peut être réécrit sur place).
+        """
+        memo_fields = [f.name for f in self.fields if self.is_memo(f)]
+        if memo_fields and self.memo_path is None:
+            memo_fields = []
+
+        hashes = []
+        view = memoryview(self._mmap)
+        try:
+            for start in range(0, self.record_count, block_records):
+                stop = min(start + block_records, self.record_count)
+                digest = hashlib.blake2b(digest_size=digest_size)
+                digest.update(view[self.header_length + start * self.record_length:
+                                   self.header_length + stop * self.record_length])
+                if memo_fields:
+                    memo_file = self.memo_file
+                    for blocks in self.records(memo_fields, deleted=True, memos='block',
+                                               start=start, stop=stop):
+                        for block in blocks:
+                            if block:
+                                digest.update(memo_file.read(block))
+                hashes.append(digest.hexdigest())
+        finally:
+            view.release()
+        return hashes
+
+    def __iter__(self):
+        return self.records()
+
+    def __len__(self):
+        return self.record_count
+
+    def close(self):
+        """Fermer le fichier et son fichier mémo"""
+        if self._memo_file is not None:
+            self._memo_file.close()
+            self._memo_file = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_dbf(path, encoding=None):
+    """Ouvrir une table DBF"""
+    return DbfTable(path, encoding)
+
+
+def benchmark(path, fields=None, encoding=None):
+    """Mesurer le débit de lecture d'une table (Mo/s)"""
+    with open_dbf(path, encoding) as table:
+        start = time.perf_counter()
+        count = 0
+        for _ in table.records(fields):
+            count += 1
+        elapsed = time.perf_counter() - start
+
+    size = os.path.getsize(path)
+    return {
+        'records': count,
+        'seconds': elapsed,
+        'mb_per_s': size / (1024 * 1024) / elapsed if elapsed > 0 else 0.0,
+        'records_per_s': count / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    """Afficher la structure d'une table DBF et mesurer son débit de lecture"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lecture et benchmark d'une table DBF")
+    parser.add_argument('path', help="fichier .dbf")
+    parser.add_argument('--fields', help="champs à lire, séparés par des virgules")
+    parser.add_argument('--encoding', help="encodage (par défaut : page de code de l'en-tête)")
+    args = parser.parse_args(argv)
+
+    fields = args.fields.split(',') if args.fields else None
+
+    with open_dbf(args.path, args.encoding) as table:
+        print(f"{args.path}: version 0x{table.version:02X}, {table.record_count} enregistrements, "
+              f"encodage {table.encoding}")
+        for field in table.fields:
+            print(f"  {field.name:<11} {field.type} {field.length:>3} {field.decimals}")
+
+    result = benchmark(args.path, fields, args.encoding)
+    print(f"{result['records']} enregistrements en {result['seconds']:.2f} s : "
+          f"{result['mb_per_s']:.1f} Mo/s, {result['records_per_s']:,.0f} enr./s")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,10 @@
 # editor.py
 """Module pour l'éditeur de code avec coloration syntaxique"""
 
-from PyQt6.QtWidgets import QPlainTextEdit, QWidget, QTextEdit
-from PyQt6.QtCore import Qt, QRect, QSize, pyqtSignal
+import re
+
+from PyQt6.QtWidgets import QPlainTextEdit, QWidget, QTextEdit, QCompleter, QToolTip
+from PyQt6.QtCore import Qt, QEvent, QPoint, QRect, QSize, QStringListModel, pyqtSignal
 from PyQt6.QtGui import (QColor, QTextCharFormat, QFont, QPainter,
                          QSyntaxHighlighter, QTextCursor, QFontMetricsF,
                          QTextFormat, QRegularExpression)
@@ -10,6 +12,28 @@ from PyQt6.QtGui import (QColor, QTextCharFormat, QFont, QPainter,
 from theme import ModernTheme
 
 
+# Largeur (en caractères) des colonnes de temps et de mémoire de la marge
+ANNOTATION_CHARS = 7
+
+
+def format_duration(seconds):
+    """Durée courte pour la marge : 12µs, 480ms, 1.2s"""
+    if seconds >= 1:
+        return f"{seconds:.1f}s"
+    if seconds >= 0.001:
+        return f"{seconds * 1000:.0f}ms"
+    return f"{seconds * 1e6:.0f}µs"
+
+
+def format_size(size):
+    """Taille courte pour la marge : 432B, 3.2K, 17M"""
+    for unit in ('B', 'K', 'M'):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == 'B' or size >= 10 else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}G"
+
+
 class PythonHighlighter(QSyntaxHighlighter):
     """Coloration syntaxique pour Python"""
 
@@ -114,6 +138,17 @@ class LineNumberArea(QWidget):
     def paintEvent(self, event):
         self.editor.line_number_area_paint_event(event)
 
+    def event(self, event):
+        # Détail des mesures d'une ligne au survol
+        if event.type() == QEvent.Type.ToolTip:
+            text = self.editor.annotation_tooltip(event.position().toPoint().y())
+            if text:
+                QToolTip.showText(event.globalPosition().toPoint(), text, self)
+            else:
+                QToolTip.hideText()
+            return True
+        return super().event(event)
+
 
 class ModernCodeEditor(QPlainTextEdit):
     """Éditeur de code avec numéros de ligne et coloration syntaxique"""
@@ -144,6 +179,129 @@ class ModernCodeEditor(QPlainTextEdit):
         # Tab
         self.setTabStopDistance(QFontMetricsF(font).horizontalAdvance(' ') * 4)
 
+        # Mesures par ligne (mode lignes) affichées dans la marge
+        self.line_annotations = {}
+        self.annotation_max = (0.0, 0)
+        self.document().contentsChanged.connect(self.clear_line_annotations)
+
+        # Complétion des tables et colonnes (Ctrl+Espace)
+        self.schema_cache = None
+        self.completer = QCompleter(self)
+        self.completer.setWidget(self)
+        self.completer.setModel(QStringListModel(self.completer))
+        self.completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
+        self.completer.activated.connect(self.insert_completion)
+
+    def set_schema_cache(self, schema_cache):
+        """Utiliser le cache du schéma de la base connectée"""
+        self.schema_cache = schema_cache
+
+    def update_completions(self):
+        """Construire la liste : tables, puis colonnes des tables citées"""
+        words = []
+        if self.schema_cache is not None:
+            tables = self.schema_cache.table_names()
+            words.extend(tables)
+
+            # Seules les tables présentes dans le texte sont détaillées
+            used = set(re.findall(r'[A-Za-z_][A-Za-z0-9_]*', self.toPlainText()))
+            for table in tables:
+                if table in used:
+                    words.extend(self.schema_cache.column_names(table))
+
+        self.completer.model().setStringList(sorted(set(words), key=str.lower))
+
+    def word_under_cursor(self):
+        """Retourner le début du mot sous le curseur"""
+        cursor = self.textCursor()
+        cursor.select(QTextCursor.SelectionType.WordUnderCursor)
+        return cursor.selectedText()
+
+    def insert_completion(self, completion):
+        """Remplacer le mot courant par la complétion choisie"""
+        cursor = self.textCursor()
+        cursor.select(QTextCursor.SelectionType.WordUnderCursor)
+        cursor.insertText(completion)
+        self.setTextCursor(cursor)
+
+    def keyPressEvent(self, event):
+        """Gérer la complétion au clavier"""
+        popup = self.completer.popup()
+        if popup.isVisible() and event.key() in (Qt.Key.Key_Enter, Qt.Key.Key_Return,
+                                                 Qt.Key.Key_Escape, Qt.Key.Key_Tab,
+                                                 Qt.Key.Key_Backtab):
+            # Touches traitées par la liste de complétion
+            event.ignore()
+            return
+
+        shortcut = (event.modifiers() & Qt.KeyboardModifier.ControlModifier
+                    and event.key() == Qt.Key.Key_Space)
+        if not shortcut:
+            super().keyPressEvent(event)
+            if not popup.isVisible():
+                return
+        else:
+            self.update_completions()
+
+        prefix = self.word_under_cursor()
+        if not shortcut and not prefix:
+            popup.hide()
+            return
+
+        self.completer.setCompletionPrefix(prefix)
+        popup.setCurrentIndex(self.completer.completionModel().index(0, 0))
+
+        rect = self.cursorRect()
+        rect.setWidth(popup.sizeHintForColumn(0) + popup.verticalScrollBar().sizeHint().width())
+        self.completer.complete(rect)
+
+    def go_to_line(self, line):
+        """Placer le curseur au début d'une ligne (1..n) et l'afficher"""
+        block = self.document().findBlockByNumber(max(line - 1, 0))
+        if not block.isValid():
+            return
+        self.setTextCursor(QTextCursor(block))
+        self.centerCursor()
+        self.setFocus()
+
+    def set_line_annotations(self, lines):
+        """Afficher les mesures d'une exécution (ligne → hits, time,
+        allocated, retained) en carte de chaleur dans la marge"""
+        self.line_annotations = {int(line): values for line, values in lines.items()}
+        self.annotation_max = (
+            max((values['time'] for values in self.line_annotations.values()), default=0.0),
+            max((values['allocated'] for values in self.line_annotations.values()), default=0))
+        self.update_line_number_area_width(0)
+        self.line_number_area.update()
+
+    def clear_line_annotations(self):
+        """Effacer les mesures (le texte ne correspond plus à l'exécution)"""
+        if self.line_annotations:
+            self.line_annotations = {}
+            self.update_line_number_area_width(0)
+            self.line_number_area.update()
+
+    def annotation_width(self):
+        if not self.line_annotations:
+            return 0
+        return 2 * self.fontMetrics().horizontalAdvance('9') * ANNOTATION_CHARS
+
+    def annotation_tooltip(self, y):
+        """Texte d'aide pour la ligne à la position y de la marge"""
+        if not self.line_annotations:
+            return ''
+        # La marge et la zone de texte ont la même origine verticale
+        block = self.cursorForPosition(QPoint(0, y)).block()
+        values = self.line_annotations.get(block.blockNumber() + 1)
+        if not values:
+            return ''
+        return (f"Ligne {block.blockNumber() + 1}\n"
+                f"Passages : {values['hits']}\n"
+                f"Temps : {format_duration(values['time'])}\n"
+                f"Mémoire allouée : {format_size(values['allocated'])}\n"
+                f"Mémoire retenue à la fin : {format_size(values['retained'])}")
+
     def line_number_area_width(self):
         """Calculer la largeur de la zone des numéros"""
         digits = 1
@@ -153,7 +311,7 @@ class ModernCodeEditor(QPlainTextEdit):
             digits += 1
 
         space = 3 + self.fontMetrics().horizontalAdvance('9') * digits + 10
-        return space
+        return space + self.annotation_width()
 
     def update_line_number_area_width(self, _):
         """Mettre à jour la largeur"""
@@ -206,8 +364,31 @@ class ModernCodeEditor(QPlainTextEdit):
 
         painter.setPen(QColor(ModernTheme.COLORS['text_secondary']))
 
+        # Colonnes des mesures à gauche des numéros
+        column = self.annotation_width() // 2
+        max_time, max_allocated = self.annotation_max
+
         while block.isValid() and top <= event.rect().bottom():
             if block.isVisible() and bottom >= event.rect().top():
+                values = self.line_annotations.get(block_number + 1)
+                if values:
+                    height = bottom - top
+                    # Intensité relative à la ligne la plus coûteuse
+                    time_heat = QColor(ModernTheme.COLORS['error'])
+                    time_heat.setAlphaF(values['time'] / max_time if max_time else 0.0)
+                    memory_heat = QColor(ModernTheme.COLORS['accent'])
+                    memory_heat.setAlphaF(values['allocated'] / max_allocated if max_allocated else 0.0)
+                    painter.fillRect(0, top, column, height, time_heat)
+                    painter.fillRect(column, top, column, height, memory_heat)
+
+                    painter.setPen(QColor(ModernTheme.COLORS['text']))
+                    painter.drawText(0, top, column - 4, self.fontMetrics().height(),
+                                     Qt.AlignmentFlag.AlignRight, format_duration(values['time']))
+                    if values['allocated']:
+                        painter.drawText(column, top, column - 4, self.fontMetrics().height(),
+                                         Qt.AlignmentFlag.AlignRight, format_size(values['allocated']))
+                    painter.setPen(QColor(ModernTheme.COLORS['text_secondary']))
+
                 number = str(block_number + 1)
                 painter.drawText(0, top, self.line_number_area.width() - 5,
                                  self.fontMetrics().height(),
@@ -1,13 +1,18 @@
 # form_designer.py
 """Module pour le concepteur de formulaires drag & drop"""
 
+import os
+import time
+
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QListWidget, QListWidgetItem, QTableWidget, QTableWidgetItem,
-                             QToolBar, QAction, QLabel, QDialog, QTextEdit,
-                             QPushButton, QMessageBox, QApplication)
-from PyQt6.QtCore import Qt, QSize, pyqtSignal, QEvent, QMimeData
-from PyQt6.QtGui import QFont, QDrag
+                             QToolBar, QLabel, QDialog, QTextEdit, QFileDialog,
+                             QInputDialog, QPushButton, QMessageBox, QApplication)
+from PyQt6.QtCore import Qt, QSize, QPoint, pyqtSignal, QEvent, QMimeData
+from PyQt6.QtGui import QFont, QDrag, QAction
 
+from dbf import DbfError
+from scx import combo_items, control_text, list_classes, read_form
 from theme import ModernTheme
 
 
@@ -122,11 +127,50 @@ class FormDesigner(QMainWindow):
         clear_action = QAction("Effacer tout", self)
         clear_action.triggered.connect(self.clear_form)
 
+        import_action = QAction("Importer SCX/VCX...", self)
+        import_action.triggered.connect(self.import_form_dialog)
+
+        toolbar.addAction(import_action)
         toolbar.addAction(generate_action)
         toolbar.addAction(preview_action)
         toolbar.addSeparator()
         toolbar.addAction(clear_action)
 
+    def import_form_dialog(self):
+        """Choisir un formulaire VFP à importer"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Importer un formulaire VFP", "",
+            "Formulaires VFP (*.scx *.SCX *.vcx *.VCX);;Tous les fichiers (*.*)")
+        if path:
+            self.import_form(path)
+
+    def import_form(self, path, class_name=None):
+        """Importer un formulaire .scx ou une classe .vcx dans la zone de conception"""
+        try:
+            if class_name is None and path.lower().endswith('.vcx'):
+                classes = list_classes(path)
+                if len(classes) > 1:
+                    class_name, ok = QInputDialog.getItem(
+                        self, "Importer une classe", "Classe :", classes, 0, False)
+                    if not ok:
+                        return
+            start = time.perf_counter()
+            form = read_form(path, class_name)
+        except DbfError as e:
+            QMessageBox.critical(self, "Erreur", f"Impossible de lire le formulaire:\n{e}")
+            return
+
+        self.design_area.load_form(form)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self.setWindowTitle(f"Concepteur de formulaires - {form.caption} ({os.path.basename(path)})")
+        message = f"{len(form.controls)} contrôle(s) importé(s) en {elapsed:.0f} ms"
+        if form.skipped:
+            message += f", {len(form.skipped)} ignoré(s)"
+        self.statusBar().showMessage(message)
+        if form.skipped:
+            self.statusBar().setToolTip("Non importés :\n" + "\n".join(form.skipped))
+
     def on_widget_selected(self, widget):
         """Quand un widget est sélectionné"""
         self.selected_widget = widget
@@ -180,8 +224,15 @@ class GeneratedForm(QWidget):
             code += f"        self.{widget_name} = {widget_type}(self)\n"
             code += f"        self.{widget_name}.setGeometry({widget.x()}, {widget.y()}, {widget.width()}, {widget.height()})\n"
 
-            if hasattr(widget, 'text') and widget.text():
-                code += f"        self.{widget_name}.setText('{widget.text()}')\n"
+            # repr() : les libellés VFP contiennent souvent des apostrophes
+            if hasattr(widget, 'setTitle'):
+                if widget.title():
+                    code += f"        self.{widget_name}.setTitle({widget.title()!r})\n"
+            elif hasattr(widget, 'text') and widget.text():
+                code += f"        self.{widget_name}.setText({widget.text()!r})\n"
+
+            if widget.property("controlSource"):
+                code += f"        # ControlSource : {widget.property('controlSource')}\n"
 
             code += "\n"
 
@@ -225,7 +276,9 @@ if __name__ == '__main__':
             new_widget = widget_type(preview)
             new_widget.setGeometry(widget.geometry())
 
-            if hasattr(widget, 'text'):
+            if hasattr(widget, 'setTitle'):
+                new_widget.setTitle(widget.title())
+            elif hasattr(widget, 'text'):
                 new_widget.setText(widget.text())
 
         preview.exec()
@@ -324,6 +377,41 @@ class FormDesignArea(QWidget):
 
         return super().eventFilter(obj, event)
 
+    def load_form(self, form):
+        """Construire les contrôles d'un formulaire VFP en une seule passe
+
+        L'affichage est suspendu pendant la création : la zone n'est
+        redessinée qu'une fois, quel que soit le nombre de contrôles.
+        """
+        self.setUpdatesEnabled(False)
+        try:
+            self.clear_widgets()
+            self.setMinimumSize(form.width, form.height)
+
+            for control in form.controls:
+                widget = self.create_widget(control.widget_class,
+                                            QPoint(control.left, control.top))
+                widget.resize(control.width, control.height)
+                widget.setObjectName(control.name)
+
+                text = control_text(control)
+                if hasattr(widget, 'setTitle'):
+                    widget.setTitle(text)
+                elif hasattr(widget, 'setText'):
+                    widget.setText(text)
+                if control.widget_class == "QComboBox":
+                    widget.addItems(combo_items(control))
+
+                # Source de données VFP conservée pour la génération du code
+                if 'ControlSource' in control.properties:
+                    widget.setProperty("controlSource", control.properties['ControlSource'])
+                widget.setToolTip(control.path)
+
+                widget.show()
+                self.form_widgets.append(widget)
+        finally:
+            self.setUpdatesEnabled(True)
+
     def clear_widgets(self):
         """Effacer tous les widgets"""
         for widget in self.form_widgets:
@@ -4,27 +4,47 @@
 import sys
 import os
 import sqlite3
-import io
-import contextlib
-import traceback
 
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                            QHBoxLayout, QSplitter, QTabWidget, QLabel,
-                           QToolBar, QFileDialog, QMessageBox, QAction, QStyle)
+                           QToolBar, QFileDialog, QMessageBox, QStyle, QDialog,
+                           QSpinBox)
 from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QFont
+from PyQt6.QtGui import QFont, QAction
 
 # Import des modules
 from theme import ModernTheme
-from editor import ModernCodeEditor
+from editor import ModernCodeEditor, format_duration, format_size
 from database import ModernDatabaseExplorer, ModernDataBrowser
 from console import OutputConsole
+from query_executor import QueryExecutor, QueryProgressWidget
+from script_runner import Kernel, RunnerPool, ScriptRunner, report_path, write_script
+from profiling import read_report
+from profile_view import ProfileView
+from batch_runner import BatchRunner, SUCCESS, SKIPPED
+from batch_view import BatchView
+from cells import CACHE_OPTION, current_block, make_block
+from cell_cache import CellCache
+from migration import migration_job, project_manifest, store_manifest
+from vfp_translator import DEFAULT_DATABASE, translation_job
 from sql_builder import SQLQueryBuilder
 from form_designer import FormDesigner
 from templates import CodeTemplates
 from project import ProjectManager
 
 
+# Message affiché au lancement selon le mode d'exécution
+RUN_MESSAGES = {
+    'run': "▶ Exécution du script...",
+    'profile': "⏱ Profilage du script...",
+    'lines': "⏱ Mesure ligne par ligne (temps et mémoire)...",
+    'cell': "▶ Noyau : lignes {first}-{last}...",
+}
+
+# Lignes les plus coûteuses résumées dans la console
+TOP_LINES = 3
+
+
 class EnhancedVFPIDE(QMainWindow):
     """IDE complet avec toutes les fonctionnalités"""
 
@@ -32,6 +52,25 @@ class EnhancedVFPIDE(QMainWindow):
         super().__init__()
         self.setWindowTitle("PyFoxPro IDE - Édition Complète")
         self.setGeometry(100, 100, 1600, 900)
+        self.task_executor = None
+
+        # Scripts exécutés dans des processus démarrés à l'avance
+        self.runner_pool = RunnerPool(self)
+        self.script_runner = ScriptRunner(self.runner_pool, self)
+        self.run_editor = None
+        self.run_info = ('run', None, None, None)
+        self.script_runner.output.connect(self.on_script_output)
+        self.script_runner.finished.connect(self.on_script_finished)
+
+        # Noyau de session : extraits exécutés dans un espace de noms conservé
+        self.kernel = Kernel(self)
+        self.kernel_runner = ScriptRunner(self.kernel, self)
+        self.kernel_runner.output.connect(self.on_script_output)
+        self.kernel_runner.finished.connect(self.on_script_finished)
+        self.active_runner = self.script_runner
+
+        # Exécution en lot des scripts du projet
+        self.batch_runner = BatchRunner(self)
 
         # Appliquer le thème
         self.setStyleSheet(ModernTheme.get_stylesheet())
@@ -42,6 +81,7 @@ class EnhancedVFPIDE(QMainWindow):
         # Ajouter les nouvelles fonctionnalités
         self.add_project_manager()
         self.add_menu_items()
+        self.configure_runner_pool()
 
     def init_base_ui(self):
         """Initialiser l'interface de base"""
@@ -106,6 +146,17 @@ class EnhancedVFPIDE(QMainWindow):
         self.data_browser = ModernDataBrowser()
         self.output_tabs.addTab(self.data_browser, "DONNÉES")
 
+        self.profile_view = ProfileView()
+        self.profile_view.location_requested.connect(self.go_to_location)
+        self.output_tabs.addTab(self.profile_view, "PROFIL")
+
+        self.batch_view = BatchView()
+        self.output_tabs.addTab(self.batch_view, "LOT")
+        self.batch_runner.script_started.connect(self.batch_view.script_started)
+        self.batch_runner.output.connect(self.batch_view.write)
+        self.batch_runner.script_finished.connect(self.batch_view.script_finished)
+        self.batch_runner.finished.connect(self.on_batch_finished)
+
         output_layout.addWidget(self.output_tabs)
         output_widget.setLayout(output_layout)
 
@@ -126,6 +177,9 @@ class EnhancedVFPIDE(QMainWindow):
         """Ajouter le gestionnaire de projets"""
         self.project_manager = ProjectManager()
         self.project_manager.file_opened.connect(self.open_file_from_path)
+        self.project_manager.translate_requested.connect(self.start_translation)
+        self.project_manager.batch_requested.connect(self.run_batch)
+        self.project_manager.settings_changed.connect(self.configure_runner_pool)
 
         self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.project_manager)
 
@@ -146,6 +200,10 @@ class EnhancedVFPIDE(QMainWindow):
         templates_action.triggered.connect(self.open_templates)
         tools_menu.addAction(templates_action)
 
+        translate_action = QAction('🔄 Traduire des programmes VFP...', self)
+        translate_action.triggered.connect(self.translate_programs)
+        tools_menu.addAction(translate_action)
+
         # Ajouter à la barre d'outils
         toolbar = self.findChild(QToolBar)
         if toolbar:
@@ -169,7 +227,9 @@ class EnhancedVFPIDE(QMainWindow):
     def open_sql_builder(self):
         """Ouvrir le générateur SQL"""
         if self.db_explorer.db_connection:
-            dialog = SQLQueryBuilder(self.db_explorer.db_connection, self)
+            dialog = SQLQueryBuilder(self.db_explorer.db_connection, self,
+                                     self.db_explorer.executor,
+                                     self.db_explorer.schema_cache)
             if dialog.exec() == QDialog.DialogCode.Accepted:
                 # Insérer le SQL dans l'éditeur actuel
                 current_editor = self.editor_tabs.currentWidget()
@@ -179,10 +239,12 @@ class EnhancedVFPIDE(QMainWindow):
         else:
             QMessageBox.warning(self, "Attention", "Veuillez d'abord connecter une base de données")
 
-    def open_form_designer(self):
-        """Ouvrir le concepteur de formulaires"""
+    def open_form_designer(self, form_path=None):
+        """Ouvrir le concepteur de formulaires (avec un formulaire VFP à importer)"""
         designer = FormDesigner(self)
         designer.show()
+        if form_path:
+            designer.import_form(form_path)
 
     def open_templates(self):
         """Ouvrir les modèles de code"""
@@ -196,9 +258,17 @@ class EnhancedVFPIDE(QMainWindow):
 
     def open_file_from_path(self, file_path):
         """Ouvrir un fichier depuis un chemin"""
+        if file_path.lower().endswith(('.scx', '.vcx')):
+            self.open_form_designer(file_path)
+            return
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except UnicodeDecodeError:
+                # Programmes VFP : page de code Windows
+                with open(file_path, 'r', encoding='cp1252') as f:
+                    content = f.read()
 
             filename = os.path.basename(file_path)
 
@@ -250,6 +320,14 @@ class EnhancedVFPIDE(QMainWindow):
         connect_db.triggered.connect(self.connect_database)
         db_menu.addAction(connect_db)
 
+        migrate_action = QAction('Migrer un dossier DBF...', self)
+        migrate_action.triggered.connect(self.migrate_dbf)
+        db_menu.addAction(migrate_action)
+
+        sync_action = QAction('Resynchroniser les tables DBF', self)
+        sync_action.triggered.connect(self.sync_dbf)
+        db_menu.addAction(sync_action)
+
         # Menu Exécuter
         run_menu = menubar.addMenu('Exécuter')
 
@@ -258,6 +336,37 @@ class EnhancedVFPIDE(QMainWindow):
         run_action.triggered.connect(self.run_code)
         run_menu.addAction(run_action)
 
+        profile_action = QAction('Profiler le script', self)
+        profile_action.setShortcut('Ctrl+F5')
+        profile_action.triggered.connect(self.profile_code)
+        run_menu.addAction(profile_action)
+
+        lines_action = QAction('Mesurer par ligne (temps, mémoire)', self)
+        lines_action.setShortcut('Alt+F5')
+        lines_action.triggered.connect(self.profile_lines)
+        run_menu.addAction(lines_action)
+
+        self.stop_menu_action = QAction('Arrêter le script', self)
+        self.stop_menu_action.setShortcut('Shift+F5')
+        self.stop_menu_action.setEnabled(False)
+        self.stop_menu_action.triggered.connect(self.stop_code)
+        run_menu.addAction(self.stop_menu_action)
+
+        run_menu.addSeparator()
+
+        block_action = QAction('Exécuter la sélection / le bloc', self)
+        block_action.setShortcut('Ctrl+Return')
+        block_action.triggered.connect(self.run_block)
+        run_menu.addAction(block_action)
+
+        restart_action = QAction('Redémarrer le noyau', self)
+        restart_action.triggered.connect(self.restart_kernel)
+        run_menu.addAction(restart_action)
+
+        clear_cache_action = QAction('Vider le cache des cellules', self)
+        clear_cache_action.triggered.connect(self.clear_cell_cache)
+        run_menu.addAction(clear_cache_action)
+
     def create_toolbar(self):
         """Créer la barre d'outils"""
         toolbar = self.addToolBar('Principal')
@@ -281,7 +390,21 @@ class EnhancedVFPIDE(QMainWindow):
         run_action = QAction('▶️ Exécuter', self)
         run_action.triggered.connect(self.run_code)
 
+        self.stop_action = QAction('⏹️ Arrêter', self)
+        self.stop_action.setToolTip('Arrêter le script en cours')
+        self.stop_action.setEnabled(False)
+        self.stop_action.triggered.connect(self.stop_code)
+
+        # Délai maximal d'exécution (0 : sans limite)
+        self.timeout_spin = QSpinBox()
+        self.timeout_spin.setRange(0, 86400)
+        self.timeout_spin.setSuffix(' s')
+        self.timeout_spin.setSpecialValueText('Sans limite')
+        self.timeout_spin.setToolTip("Délai maximal d'exécution d'un script")
+
         toolbar.addAction(run_action)
+        toolbar.addAction(self.stop_action)
+        toolbar.addWidget(self.timeout_spin)
 
     def create_status_bar(self):
         """Créer la barre de statut"""
@@ -297,7 +420,11 @@ class EnhancedVFPIDE(QMainWindow):
         self.status_db = QLabel(' 🗄️ Aucune base connectée ')
         self.status_line = QLabel(' Ln 1, Col 1 ')
 
+        # Progression des requêtes en arrière-plan
+        self.query_progress = QueryProgressWidget()
+
         status.addWidget(self.status_db)
+        status.addPermanentWidget(self.query_progress)
         status.addPermanentWidget(self.status_line)
 
     def add_new_editor(self, filename="sans_titre.py", content=""):
@@ -305,6 +432,7 @@ class EnhancedVFPIDE(QMainWindow):
         editor = ModernCodeEditor()
         if content:
             editor.setPlainText(content)
+        editor.set_schema_cache(self.db_explorer.schema_cache)
 
         index = self.editor_tabs.addTab(editor, filename)
         self.editor_tabs.setCurrentIndex(index)
@@ -360,19 +488,167 @@ class EnhancedVFPIDE(QMainWindow):
         )
 
         if file_path:
-            if self.db_explorer.connect_database(file_path):
-                self.console.write_output(f"✓ Base de données connectée: {file_path}", 'success')
-                self.status_db.setText(f' 🗄️ {os.path.basename(file_path)} ')
+            self.open_database(file_path)
+
+    def open_database(self, file_path):
+        """Connecter l'explorateur et les vues à une base"""
+        if not self.db_explorer.connect_database(file_path):
+            return False
+
+        self.query_progress.set_executor(self.db_explorer.executor)
+        self.data_browser.set_executor(self.db_explorer.executor)
+        for i in range(self.editor_tabs.count()):
+            editor = self.editor_tabs.widget(i)
+            if isinstance(editor, ModernCodeEditor):
+                editor.set_schema_cache(self.db_explorer.schema_cache)
+        self.console.write_output(f"✓ Base de données connectée: {file_path}", 'success')
+        self.status_db.setText(f' 🗄️ {os.path.basename(file_path)} ')
+        self.configure_runner_pool()
+        return True
+
+    def migrate_dbf(self):
+        """Migrer les tables DBF d'un dossier dans une base SQLite"""
+        source_dir = QFileDialog.getExistingDirectory(self, "Dossier des tables DBF")
+        if not source_dir:
+            return
+
+        target_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Base SQLite de destination",
+            os.path.join(source_dir, 'data.db'),
+            "SQLite Database (*.db *.sqlite);;All Files (*)"
+        )
+        if not target_path:
+            return
+
+        self.start_migration(source_dir, target_path)
+
+    def sync_dbf(self):
+        """Relancer la migration enregistrée dans le projet (incrémentale)"""
+        settings = self.project_manager.project_data.get('migration')
+        if not self.project_manager.project_path or not settings:
+            QMessageBox.information(self, "Information",
+                                    "Aucune migration DBF enregistrée dans le projet")
+            return
+        self.start_migration(settings['source'], settings['target'])
+
+    def start_migration(self, source_dir, target_path):
+        """Lancer la migration en arrière-plan
+
+        Si un projet est ouvert, son manifeste rend la migration incrémentale.
+        """
+        # La base doit exister pour la connexion de l'explorateur
+        sqlite3.connect(target_path).close()
+        if not self.open_database(target_path):
+            return
+
+        manifest = None
+        if self.project_manager.project_path:
+            manifest = project_manifest(self.project_manager.project_data, source_dir, target_path)
+
+        self.output_tabs.setCurrentWidget(self.console)
+        self.console.write_output(f"▶ Migration de {source_dir}...", 'info')
+        # Exécuteur séparé : la navigation dans la base reste possible pendant la migration
+        self.standalone_executor().submit(
+            migration_job, source_dir, target_path, manifest=manifest,
+            description="Migration DBF...",
+            on_result=lambda result: self.on_migration_finished(source_dir, target_path, result),
+            on_error=lambda message: self.on_migration_stopped(f"✗ Migration: {message}", 'error'),
+            on_cancel=lambda: self.on_migration_stopped("Migration annulée", 'warning'),
+        )
+
+    def on_migration_finished(self, source_dir, target_path, result):
+        """Afficher le rapport de migration et enregistrer le manifeste"""
+        for line in result['lines']:
+            self.console.write_output(line, 'error' if line.startswith('✗') else 'success')
+
+        if result['manifest'] is not None:
+            store_manifest(self.project_manager.project_data, source_dir, target_path,
+                           result['manifest'])
+            self.project_manager.save_project()
+        self.db_explorer.refresh()
+        self.query_progress.set_executor(self.db_explorer.executor)
+
+    def on_migration_stopped(self, message, level):
+        self.console.write_output(message, level)
+        self.query_progress.set_executor(self.db_explorer.executor)
+
+    def translate_programs(self):
+        """Traduire les programmes .prg d'un dossier en Python"""
+        source = QFileDialog.getExistingDirectory(self, "Dossier des programmes VFP",
+                                                  self.project_manager.project_path or "")
+        if source:
+            self.start_translation(source)
+
+    def background_executor(self):
+        """Exécuteur des tâches de fond : celui de la base, sinon un exécuteur sans base"""
+        if self.db_explorer.executor is not None:
+            return self.db_explorer.executor
+        return self.standalone_executor()
+
+    def standalone_executor(self):
+        """Exécuteur sans base, suivi par la barre de progression"""
+        if self.task_executor is None:
+            self.task_executor = QueryExecutor(None, self)
+        self.query_progress.set_executor(self.task_executor)
+        return self.task_executor
+
+    def start_translation(self, source):
+        """Traduire un programme ou un dossier en arrière-plan
+
+        Le code généré utilise la base du projet (cible de la migration) et
+        les types des champs lus dans les tables DBF d'origine.
+        """
+        migration = self.project_manager.project_data.get('migration') or {}
+        database = (self.project_manager.project_data.get('database')
+                    or migration.get('target') or self.db_explorer.db_path or DEFAULT_DATABASE)
+
+        self.output_tabs.setCurrentWidget(self.console)
+        self.console.write_output(f"▶ Traduction de {source}...", 'info')
+        self.background_executor().submit(
+            translation_job, source, database=database, dbf_dir=migration.get('source'),
+            description="Traduction des programmes VFP...",
+            on_result=lambda result: self.on_translation_finished(source, result),
+            on_error=lambda message: self.console.write_output(f"✗ Traduction: {message}", 'error'),
+            on_cancel=lambda: self.console.write_output("Traduction annulée", 'warning'),
+        )
+
+    def on_translation_finished(self, source, result):
+        """Afficher le rapport de traduction"""
+        for line in result['lines']:
+            if line.startswith('✗'):
+                level = 'error'
+            elif line.lstrip().startswith('⚠'):
+                level = 'warning'
+            else:
+                level = 'success'
+            self.console.write_output(line, level)
+
+        if self.project_manager.project_path:
+            self.project_manager.refresh_tree()
+        if os.path.isfile(source) and len(result['outputs']) == 1:
+            self.open_file_from_path(result['outputs'][0])
 
     def on_table_double_click(self, item, column):
         """Double-clic sur une table"""
-        if item.parent() and item.parent().text(0) == "📁 Tables":
-            table_name = item.text(0)[2:]
+        kind, table_name = self.db_explorer.item_object(item)
+        if kind in ('table', 'view'):
             if self.db_explorer.db_connection:
                 self.data_browser.load_table(self.db_explorer.db_connection, table_name)
                 self.output_tabs.setCurrentWidget(self.data_browser)
                 self.console.write_output(f"✓ Table '{table_name}' chargée", 'success')
 
+    def closeEvent(self, event):
+        """Arrêter les tâches en arrière-plan avant de fermer"""
+        self.db_explorer.shutdown()
+        self.script_runner.shutdown()
+        self.batch_runner.shutdown()
+        self.kernel_runner.abandon('stopped')
+        self.kernel.shutdown()
+        if self.task_executor is not None:
+            self.task_executor.shutdown()
+        super().closeEvent(event)
+
     def update_cursor_position(self):
         """Mettre à jour la position du curseur"""
         editor = self.sender()
@@ -383,34 +659,252 @@ class EnhancedVFPIDE(QMainWindow):
             self.status_line.setText(f' Ln {line}, Col {col} ')
 
     def run_code(self):
-        """Exécuter le code Python"""
-        current_editor = self.editor_tabs.currentWidget()
-        if isinstance(current_editor, ModernCodeEditor):
-            code = current_editor.toPlainText()
+        """Exécuter le code Python dans un processus séparé"""
+        self.start_script('run')
 
-            self.output_tabs.setCurrentWidget(self.console)
-            self.console.write_output("▶ Exécution du script...", 'info')
+    def profile_code(self):
+        """Exécuter le code sous le profileur (fonctions et requêtes SQLite)"""
+        self.start_script('profile')
 
-            output_buffer = io.StringIO()
+    def profile_lines(self):
+        """Exécuter le code en mesurant temps et mémoire de chaque ligne"""
+        self.start_script('lines')
 
-            globals_dict = {
-                'db': self.db_explorer.db_connection,
-                'sqlite3': sqlite3,
-                '__name__': '__main__'
-            }
+    def start_script(self, mode):
+        """Lancer l'éditeur courant dans un processus du pool"""
+        current_editor = self.editor_tabs.currentWidget()
+        if not isinstance(current_editor, ModernCodeEditor):
+            return
+        script_path, name = self.prepare_run(current_editor)
+        if script_path is None:
+            return
+
+        self.console.write_output(RUN_MESSAGES[mode], 'info')
+        self.active_runner = self.script_runner
+        self.set_script_running(True)
+
+        # Éditeur exécuté : cible des liens du rapport
+        self.run_editor = current_editor
+        self.run_info = (mode, script_path, name, report_path(mode) if mode != 'run' else None)
+        if self.run_info[3] and os.path.exists(self.run_info[3]):
+            # Pas de rapport périmé si le processus s'arrête brutalement
+            os.remove(self.run_info[3])
+
+        self.configure_runner_pool()
+        self.script_runner.run(script_path, self.timeout_spin.value(),
+                               self.project_manager.project_path, mode, self.run_info[3])
+
+    def prepare_run(self, editor):
+        """Écrire le contenu de l'éditeur dans un fichier temporaire ; retourne
+        (chemin, nom de l'onglet), ou (None, None) si une exécution est en cours"""
+        if self.active_runner.is_running():
+            self.console.write_output("⚠ Un script est déjà en cours d'exécution", 'warning')
+            return None, None
+
+        name = self.editor_tabs.tabText(self.editor_tabs.currentIndex())
+        try:
+            script_path = write_script(name, editor.toPlainText())
+        except OSError as e:
+            self.console.write_output(f"✗ Erreur: {e}", 'error')
+            return None, None
 
-            try:
-                with contextlib.redirect_stdout(output_buffer):
-                    exec(code, globals_dict)
+        self.output_tabs.setCurrentWidget(self.console)
+        return script_path, name
 
-                output = output_buffer.getvalue()
-                if output:
-                    self.console.write_output(output, 'info')
-                self.console.write_output("✓ Script exécuté avec succès", 'success')
+    def run_block(self):
+        """Exécuter la sélection, ou la cellule # %% / l'instruction sous le
+        curseur, dans le noyau de session"""
+        current_editor = self.editor_tabs.currentWidget()
+        if not isinstance(current_editor, ModernCodeEditor):
+            return
+
+        cursor = current_editor.textCursor()
+        if cursor.hasSelection():
+            document = current_editor.document()
+            first = document.findBlock(cursor.selectionStart()).blockNumber() + 1
+            end = document.findBlock(cursor.selectionEnd())
+            last = end.blockNumber() + 1
+            if last > first and cursor.selectionEnd() == end.position():
+                # Sélection terminée en début de ligne : cette ligne est exclue
+                last -= 1
+            # Lignes complètes : une sélection partielle est étendue
+            block = make_block(current_editor.toPlainText().split('\n'), first, last)
+        else:
+            block = current_block(current_editor.toPlainText(), cursor.blockNumber() + 1)
+        if not block.code.strip():
+            return
+
+        # Le fichier complet : les traces d'erreur affichent les lignes du bloc
+        script_path, name = self.prepare_run(current_editor)
+        if script_path is None:
+            return
+
+        self.console.write_output(RUN_MESSAGES['cell'].format(first=block.first_line,
+                                                              last=block.last_line), 'info')
+        self.active_runner = self.kernel_runner
+        self.set_script_running(True)
+        self.run_editor = current_editor
+        self.run_info = ('cell', script_path, name, None)
+
+        # Cellule « # %% cache » : résultat repris si code, variables lues et base
+        # sont inchangés
+        cache_size = None
+        if CACHE_OPTION in block.options:
+            cache_size = self.project_manager.runner_settings()['cache_size']
+        self.kernel_runner.run_code(block.code, script_path, block.first_line,
+                                    self.db_explorer.db_path, self.timeout_spin.value(),
+                                    self.project_manager.project_path, cache_size)
+
+    def restart_kernel(self):
+        """Relancer le noyau : l'espace de noms de la session est perdu"""
+        self.kernel_runner.abandon('restarted')
+        self.kernel.restart()
+        self.console.write_output("🔁 Noyau redémarré", 'info')
+
+    def clear_cell_cache(self):
+        """Supprimer les résultats enregistrés des cellules « # %% cache »"""
+        CellCache().clear()
+        self.console.write_output("✓ Cache des cellules vidé", 'success')
+
+    def configure_runner_pool(self):
+        """Adapter le pool d'exécution à la base connectée et au projet
+
+        Chaque processus ouvre sa propre connexion sur le fichier de la base.
+        """
+        settings = self.project_manager.runner_settings()
+        self.runner_pool.configure(self.db_explorer.db_path, settings['pool_size'],
+                                   settings['max_runs'], settings['preload'],
+                                   self.project_manager.project_path)
+        # Pris en compte au prochain démarrage du noyau
+        self.kernel.preload = settings['preload']
+
+    def stop_code(self):
+        """Arrêter le script ou l'extrait en cours, sinon le lot"""
+        if self.active_runner.is_running():
+            self.active_runner.stop()
+        elif self.batch_runner.is_running():
+            self.batch_runner.stop()
+
+    def set_script_running(self, running):
+        running = running or self.batch_runner.is_running()
+        self.stop_action.setEnabled(running)
+        self.stop_menu_action.setEnabled(running)
+
+    def run_batch(self, scripts):
+        """Exécuter des scripts du projet en parallèle (onglet LOT)"""
+        if self.batch_runner.is_running():
+            self.console.write_output("⚠ Un lot de scripts est déjà en cours d'exécution", 'warning')
+            return
+
+        settings = self.project_manager.runner_settings()
+        self.console.write_output(f"▶ Exécution en lot de {len(scripts)} script(s)...", 'info')
+        self.batch_view.start(scripts, self.project_manager.project_path)
+        self.output_tabs.setCurrentWidget(self.batch_view)
+        self.set_script_running(True)
+        self.batch_runner.start(scripts, self.project_manager.script_dependencies(),
+                                settings['batch_workers'], self.db_explorer.db_path,
+                                settings['preload'], self.project_manager.project_path,
+                                self.timeout_spin.value())
+
+    def on_batch_finished(self, results, elapsed):
+        """Résumer le lot dans la console"""
+        self.set_script_running(self.active_runner.is_running())
+        succeeded = sum(1 for result in results if result['status'] == SUCCESS)
+        skipped = sum(1 for result in results if result['status'] == SKIPPED)
+        failed = len(results) - succeeded - skipped
+        summary = f"{succeeded} réussi(s), {failed} en échec, {skipped} ignoré(s) en {elapsed:.1f} s"
+        if failed or skipped:
+            self.console.write_output(f"✗ Lot terminé : {summary}", 'error' if failed else 'warning')
+        else:
+            self.console.write_output(f"✓ Lot terminé : {summary}", 'success')
+
+        if self.db_explorer.db_connection:
+            self.db_explorer.refresh()
+
+    def on_script_output(self, text, output_type):
+        self.console.write_output(text, output_type)
+
+    def on_script_finished(self, exit_code, elapsed, reason):
+        self.set_script_running(False)
+        if reason == 'restarted':
+            return
+        if reason == 'timeout':
+            self.console.write_output(f"✗ Script arrêté : délai de {self.timeout_spin.value()} s dépassé", 'error')
+        elif reason == 'stopped':
+            self.console.write_output(f"⏹ Script arrêté après {elapsed:.1f} s", 'warning')
+        elif reason == 'crashed':
+            self.console.write_output("✗ Le processus du script s'est arrêté brutalement", 'error')
+        elif exit_code == 0:
+            self.console.write_output(f"✓ Script exécuté avec succès ({elapsed:.2f} s)", 'success')
+        else:
+            self.console.write_output(f"✗ Script terminé avec le code {exit_code}", 'error')
 
-            except Exception as e:
-                self.console.write_output(f"✗ Erreur: {str(e)}", 'error')
-                self.console.write_output(traceback.format_exc(), 'error')
+        # Le script a pu modifier le schéma
+        if self.db_explorer.db_connection:
+            self.db_explorer.refresh()
+
+        mode, script_path, name, report = self.run_info
+        if reason in ('timeout', 'stopped'):
+            return
+        if mode == 'profile':
+            self.show_profile(report, script_path, name)
+        elif mode == 'lines':
+            self.show_line_report(report, script_path)
+
+    def show_profile(self, report, script_path, name):
+        """Afficher le rapport de profilage dans l'onglet PROFIL"""
+        try:
+            data = read_report(report)
+        except (OSError, ValueError) as e:
+            self.console.write_output(f"✗ Rapport de profilage illisible: {e}", 'error')
+            return
+        self.profile_view.show_report(data, script_path, name)
+        self.output_tabs.setCurrentWidget(self.profile_view)
+
+    def show_line_report(self, report, script_path):
+        """Afficher les mesures par ligne dans la marge de l'éditeur exécuté"""
+        try:
+            data = read_report(report)
+        except (OSError, ValueError) as e:
+            self.console.write_output(f"✗ Rapport de mesure illisible: {e}", 'error')
+            return
+
+        editor = self.run_editor
+        if self.editor_tabs.indexOf(editor) < 0:
+            return
+        # Mesures valables seulement pour le texte exécuté
+        with open(script_path, encoding='utf-8') as f:
+            if f.read() != editor.toPlainText():
+                self.console.write_output("⚠ Script modifié pendant la mesure : marge non annotée", 'warning')
+                return
+        editor.set_line_annotations(data['lines'])
+
+        lines = data['lines']
+        self.console.write_output(f"Pic mémoire : {format_size(data['peak'])}, "
+                                  f"durée mesurée : {format_duration(data['elapsed'])}", 'info')
+        slowest = sorted(lines.items(), key=lambda item: item[1]['time'], reverse=True)[:TOP_LINES]
+        for line, values in slowest:
+            self.console.write_output(f"  ligne {line} : {format_duration(values['time'])} "
+                                      f"({values['hits']} passages)", 'info')
+        largest = sorted(lines.items(), key=lambda item: item[1]['allocated'], reverse=True)[:TOP_LINES]
+        for line, values in largest:
+            if values['allocated']:
+                self.console.write_output(f"  ligne {line} : {format_size(values['allocated'])} alloués, "
+                                          f"{format_size(values['retained'])} retenus", 'info')
+
+    def go_to_location(self, path, line):
+        """Afficher une ligne d'un rapport dans l'éditeur"""
+        mode, script_path, name, report = self.run_info
+        if path == script_path and self.editor_tabs.indexOf(self.run_editor) >= 0:
+            editor = self.run_editor
+            self.editor_tabs.setCurrentWidget(editor)
+        elif os.path.isfile(path):
+            self.open_file_from_path(path)
+            editor = self.editor_tabs.currentWidget()
+        else:
+            return
+        if isinstance(editor, ModernCodeEditor):
+            editor.go_to_line(line)
 
 
 def main():
@@ -0,0 +1,649 @@
+# migration.py
+"""Module pour la migration des tables DBF vers SQLite"""
+
+import multiprocessing
+import os
+import queue
+import sqlite3
+import sys
+import time
+
+import cdx
+from dbf import DbfError, FIELD_BINARY, FptFile, open_dbf
+from schema_cache import quote_identifier
+from vfp_expr import VfpExprError, field_names, parse, to_sql
+
+
+# Enregistrements envoyés par lot au processus d'écriture
+MIGRATION_BATCH_SIZE = 20000
+
+# Mémos binaires plus grands : copiés par morceaux dans le blob SQLite
+MEMO_INLINE_SIZE = 1 << 16
+
+# Enregistrements par bloc d'empreinte du manifeste
+MANIFEST_BLOCK_RECORDS = 4096
+
+# Lots en attente par worker (borne la mémoire utilisée)
+QUEUE_BATCHES_PER_WORKER = 4
+
+# Table de travail d'une synchronisation incrémentale (suffixe du nom)
+STAGING_SUFFIX = '__sync'
+
+# Réglages SQLite pendant la migration (restaurés ensuite) ; une
+# synchronisation incrémentale garde synchronous et le journal de la base
+MIGRATION_PRAGMAS = {
+    'synchronous': 'OFF',
+    'cache_size': -262144,  # 256 Mo
+    'temp_store': 'MEMORY',
+}
+
+
+def find_tables(directory):
+    """Lister les fichiers .dbf d'un dossier"""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith('.dbf') and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def is_binary_memo(table, field):
+    """Mémo copié en BLOB (général, image, mémo binaire)"""
+    return table.is_memo(field) and (field.type != 'M' or bool(field.flags & FIELD_BINARY))
+
+
+def sqlite_type(field, blob_dir=None):
+    """Type SQLite d'un champ DBF"""
+    if field.type == 'M' and not field.flags & FIELD_BINARY:
+        return 'TEXT'
+    if field.type in ('M', 'G', 'P', 'W'):
+        return 'TEXT' if blob_dir else 'BLOB'
+    if field.type in ('C', 'V'):
+        return 'TEXT'
+    if field.type == 'N':
+        return 'REAL' if field.decimals else 'INTEGER'
+    if field.type in ('F', 'B', 'Y'):
+        return 'REAL'
+    if field.type in ('I', '+'):
+        return 'INTEGER'
+    if field.type == 'D':
+        return 'DATE'
+    if field.type == 'T':
+        return 'DATETIME'
+    if field.type == 'L':
+        return 'BOOLEAN'
+    if field.type == 'Q':
+        return 'BLOB'
+    return 'TEXT'
+
+
+def migrated_fields(table):
+    """Champs copiés dans SQLite (les mémos si le fichier .fpt existe)"""
+    has_memos = table.memo_path is not None
+    return [f for f in table.fields
+            if has_memos or not table.is_memo(f)]
+
+
+def table_name_for(path):
+    """Nom de la table SQLite d'un fichier DBF"""
+    return os.path.splitext(os.path.basename(path))[0].lower()
+
+
+def index_statements(table_name, tags, fields):
+    """Traduire les tags d'index VFP en instructions CREATE INDEX
+
+    Retourne [(tag, instruction, statut, détail)] ; statut vaut 'translated'
+    (index sur l'expression traduite), 'fallback' (index sur les champs de
+    l'expression, ou sans sa clause FOR) ou 'skipped'.
+    """
+    fields = {f.name.upper(): f for f in fields}
+    table = quote_identifier(table_name)
+    statements = []
+
+    for tag in tags:
+        index = quote_identifier(f"{table_name}_{tag.name.lower()}")
+        order = " DESC" if tag.descending else ""
+        status, detail = 'translated', tag.expression
+
+        try:
+            key = to_sql(tag.expression, fields) + order
+        except VfpExprError as e:
+            # Index sur les champs utilisés par l'expression
+            try:
+                columns = [name for name in field_names(parse(tag.expression)) if name in fields]
+            except VfpExprError:
+                columns = []
+            if not columns:
+                statements.append((tag.name, None, 'skipped', str(e)))
+                continue
+            key = ", ".join(quote_identifier(name.lower()) for name in columns)
+            status, detail = 'fallback', f"index sur {', '.join(columns).lower()} ({e})"
+
+        where = ""
+        if tag.for_expression:
+            try:
+                condition = to_sql(tag.for_expression, fields)
+            except VfpExprError as e:
+                status, detail = 'fallback', f"{detail} ; FOR ignoré ({e})"
+            else:
+                if condition == '0':
+                    statements.append((tag.name, None, 'skipped', f"FOR {tag.for_expression} toujours faux"))
+                    continue
+                if condition != '1':
+                    where = f" WHERE {condition}"
+
+        sql = f"CREATE INDEX {index} ON {table} ({key}){where}"
+        statements.append((tag.name, sql, status, detail))
+    return statements
+
+
+def read_index_tags(path):
+    """Tags des index (.cdx, .idx) d'une table ; retourne (tags, erreurs)"""
+    tags, errors = [], []
+    for index_path in cdx.index_files(path):
+        try:
+            tags.extend(cdx.read_tags(index_path))
+        except DbfError as e:
+            errors.append(str(e))
+    return tags, errors
+
+
+# Processus de lecture
+
+_queue = None
+
+
+def _init_reader(message_queue):
+    global _queue
+    _queue = message_queue
+
+
+def _read_table(path, name, fields, encoding, batch_size, stream_blobs, blob_dir,
+                hashes=False, previous=None, block_records=MANIFEST_BLOCK_RECORDS):
+    """Décoder une table et envoyer ses enregistrements par lots (worker)
+
+    Les mémos texte sont lus à la demande. Un mémo binaire est soit écrit
+    dans un fichier de blob_dir (son chemin relatif va dans la colonne),
+    soit envoyé tel quel s'il est petit, soit remplacé par sa longueur :
+    le processus d'écriture le copie alors du .fpt vers le blob SQLite.
+
+    Avec hashes, les empreintes des blocs d'enregistrements sont calculées
+    et renvoyées avec le message 'done' ; si previous (empreintes de la
+    migration précédente) est fourni, seuls les blocs modifiés ou ajoutés
+    sont relus, après un message 'clear' listant les plages à remplacer.
+    """
+    start = time.perf_counter()
+    count = 0
+    block_hashes = None
+    try:
+        with open_dbf(path, encoding) as table:
+            ranges = [(0, table.record_count)]
+            if hashes:
+                block_hashes = table.block_hashes(block_records)
+            if previous is not None:
+                ranges = changed_ranges(previous, block_hashes, block_records, table.record_count)
+                _queue.put(('clear', name, ranges))
+
+            # Position des mémos dans l'enregistrement (0 : numéro d'enregistrement)
+            selected = [table.field(field) for field in fields]
+            text_memos = [i + 1 for i, f in enumerate(selected)
+                          if table.is_memo(f) and not is_binary_memo(table, f)]
+            binary_memos = [(i + 1, f.name.lower()) for i, f in enumerate(selected)
+                            if is_binary_memo(table, f)]
+
+            batch = []
+            streams = []
+            for range_start, range_stop in ranges:
+                for record in table.records(fields, recno=True, iso_dates=True,
+                                            start=range_start, stop=range_stop):
+                    if text_memos or binary_memos:
+                        record = list(record)
+                        for i in text_memos:
+                            if record[i] is not None:
+                                record[i] = record[i].text()
+                        for i, column in binary_memos:
+                            memo = record[i]
+                            if memo is None:
+                                continue
+                            if blob_dir:
+                                record[i] = _write_blob_file(blob_dir, name, record[0], column, memo)
+                            elif not stream_blobs or len(memo) <= MEMO_INLINE_SIZE:
+                                record[i] = memo.read()
+                            else:
+                                record[i] = len(memo)
+                                streams.append((record[0], column, memo.block))
+
+                    batch.append(record)
+                    if len(batch) >= batch_size:
+                        _queue.put(('rows', name, batch, streams))
+                        count += len(batch)
+                        batch = []
+                        streams = []
+            if batch:
+                _queue.put(('rows', name, batch, streams))
+                count += len(batch)
+    except Exception as e:
+        _queue.put(('error', name, f"{type(e).__name__}: {e}"))
+        return
+    _queue.put(('done', name, count, time.perf_counter() - start, block_hashes))
+
+
+def changed_ranges(previous, current, block_records, record_count):
+    """Plages d'enregistrements [début, fin) dont l'empreinte a changé"""
+    ranges = []
+    for i, digest in enumerate(current):
+        if i < len(previous) and previous[i] == digest:
+            continue
+        start, stop = i * block_records, min((i + 1) * block_records, record_count)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], stop)
+        else:
+            ranges.append((start, stop))
+    return ranges
+
+
+def _write_blob_file(blob_dir, table_name, recno, column, memo):
+    """Copier un mémo binaire dans un fichier ; retourne son chemin relatif"""
+    relative_path = os.path.join(table_name, f"{recno}_{column}.bin")
+    path = os.path.join(blob_dir, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        memo.copy_to(f)
+    return relative_path
+
+
+# Processus d'écriture
+
+def file_state(path):
+    """Taille et date de modification d'un fichier (None s'il n'existe pas)"""
+    if not path or not os.path.exists(path):
+        return None
+    info = os.stat(path)
+    return [info.st_size, info.st_mtime_ns]
+
+
+def table_structure(table):
+    """Signature de la structure d'une table"""
+    return ";".join(f"{f.name}:{f.type}:{f.length}:{f.decimals}:{f.flags}" for f in table.all_fields)
+
+
+def migrate_directory(source_dir, target_path, workers=None, encoding=None,
+                      batch_size=MIGRATION_BATCH_SIZE, progress=None, check_cancelled=None,
+                      blob_dir=None, manifest=None):
+    """Migrer toutes les tables DBF d'un dossier dans une base SQLite
+
+    Les tables sont décodées en parallèle par un pool de processus (une
+    table par worker) ; le processus appelant est le seul à écrire et insère
+    les lots reçus avec executemany, un lot par transaction. Le numéro
+    d'enregistrement DBF devient le rowid. Les tables existantes du même nom
+    sont remplacées. Les grands mémos binaires sont copiés par morceaux du
+    .fpt vers des blobs SQLite, ou vers des fichiers de blob_dir si ce
+    dossier est indiqué. Retourne une liste de rapports, un par table.
+
+    Avec un manifeste (dictionnaire table -> état de la migration
+    précédente), la migration est incrémentale : les tables dont la taille,
+    la date, le nombre d'enregistrements et la structure n'ont pas changé
+    sont ignorées ; pour les autres, seuls les blocs d'enregistrements dont
+    l'empreinte a changé sont remplacés (par rowid) et les enregistrements
+    ajoutés sont insérés. Une table réduite (PACK) ou restructurée est
+    rechargée entièrement. Chaque table est écrite dans une table de travail
+    reportée dans la table migrée quand sa lecture est terminée : une table
+    en erreur garde son contenu et son état précédents. Tout se fait dans une
+    seule transaction, avec le journal et le réglage synchronous de la base :
+    une synchronisation interrompue laisse la base dans son état précédent.
+    Le nouvel état de chaque table est dans report['manifest'].
+    """
+    reports = {}
+    plans = []
+    incremental = manifest is not None
+
+    connection = sqlite3.connect(target_path, isolation_level=None)
+    existing = {row[0] for row in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    # Lecture des en-têtes : structure et nombre d'enregistrements
+    for path in find_tables(source_dir):
+        name = table_name_for(path)
+        report = {'table': name, 'source': path, 'rows': 0, 'records': 0, 'seconds': 0.0,
+                  'error': None, 'indexes': [], 'mode': 'full', 'manifest': None}
+        reports[name] = report
+        try:
+            with open_dbf(path, encoding) as table:
+                fields = migrated_fields(table)
+                blobs = [f.name.lower() for f in fields if is_binary_memo(table, f)]
+                report['records'] = table.record_count
+                state = {
+                    'file': file_state(path),
+                    'memo': file_state(table.memo_path),
+                    'records': table.record_count,
+                    'structure': table_structure(table),
+                    'block_records': MANIFEST_BLOCK_RECORDS,
+                }
+        except DbfError as e:
+            report['error'] = str(e)
+            if incremental and name in existing:
+                # Table non relue : son état précédent reste valable
+                report['manifest'] = manifest.get(name)
+            continue
+
+        plan = {'path': path, 'name': name, 'fields': fields, 'blobs': blobs,
+                'memo_path': table.memo_path, 'previous': None}
+
+        if incremental:
+            old = manifest.get(name)
+            reusable = (old is not None and name in existing
+                        and old.get('structure') == state['structure']
+                        and old.get('block_records') == state['block_records']
+                        and old.get('records', 0) <= state['records'])
+            if reusable and all(old.get(key) == state[key] for key in ('file', 'memo', 'records')):
+                report['mode'] = 'unchanged'
+                report['manifest'] = old
+                continue
+            if reusable:
+                report['mode'] = 'incremental'
+                plan['previous'] = old.get('blocks', [])
+            report['manifest'] = state
+
+        if not plan['previous']:
+            tags, errors = read_index_tags(path)
+            report['indexes'] = [(None, None, 'skipped', error) for error in errors]
+            report['indexes'].extend(index_statements(name, tags, fields))
+        plans.append(plan)
+
+    if not plans:
+        connection.close()
+        return list(reports.values())
+
+    # Transaction unique d'une synchronisation : un arrêt brutal avec un
+    # journal en mémoire ou sans synchronisation peut corrompre la base
+    pragmas = dict(MIGRATION_PRAGMAS)
+    if incremental:
+        del pragmas['synchronous']
+    saved = {name: connection.execute(f"PRAGMA {name}").fetchone()[0] for name in pragmas}
+    for name, value in pragmas.items():
+        connection.execute(f"PRAGMA {name} = {value}")
+
+    # Journal en mémoire, sauf en mode WAL (qui ne peut changer qu'en exclusif)
+    journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+    if not incremental and journal_mode.lower() in ('delete', 'truncate', 'persist'):
+        connection.execute("PRAGMA journal_mode = MEMORY")
+        saved['journal_mode'] = journal_mode
+
+    # Blobs copiés par morceaux (Python 3.11+), sinon envoyés entiers
+    stream_blobs = blob_dir is None and hasattr(connection, 'blobopen')
+    memo_files = {}
+
+    inserts = {}
+    # Table écrite pour chaque table migrée (table de travail si incrémental)
+    targets = {}
+    connection.execute("BEGIN")
+    for plan in plans:
+        name, fields = plan['name'], plan['fields']
+        table = quote_identifier(name)
+        column_defs = ", ".join(f"{quote_identifier(f.name.lower())} {sqlite_type(f, blob_dir)}"
+                                for f in fields)
+        columns = ", ".join(["rowid"] + [quote_identifier(f.name.lower()) for f in fields])
+        # Longueur entière à la place d'un blob : zeroblob() réserve la place
+        placeholders = ", ".join(["?1"] + [
+            f"CASE WHEN typeof(?{i}) = 'integer' THEN zeroblob(?{i}) ELSE ?{i} END"
+            if stream_blobs and f.name.lower() in plan['blobs'] else f"?{i}"
+            for i, f in enumerate(fields, 2)])
+        if plan['blobs'] and stream_blobs:
+            memo_files[name] = plan['memo_path']
+        if incremental:
+            # Une erreur de lecture laisse la table migrée intacte
+            targets[name] = name + STAGING_SUFFIX
+            table = quote_identifier(targets[name])
+            connection.execute(f"DROP TABLE IF EXISTS {table}")
+            connection.execute(f"CREATE TABLE {table} ({column_defs})")
+        else:
+            targets[name] = name
+            connection.execute(f"DROP TABLE IF EXISTS {table}")
+            connection.execute(f"CREATE TABLE {table} ({column_defs})")
+        inserts[name] = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+    if not incremental:
+        connection.execute("COMMIT")
+
+    # Plus grandes tables d'abord pour équilibrer les workers
+    plans.sort(key=lambda plan: reports[plan['name']]['records'], reverse=True)
+    total = sum(reports[plan['name']]['records'] for plan in plans)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(plans)))
+
+    # spawn : pas de fork d'un processus qui a déjà des threads (Qt)
+    context = multiprocessing.get_context('spawn')
+    message_queue = context.Queue(maxsize=workers * QUEUE_BATCHES_PER_WORKER)
+    pool = context.Pool(workers, initializer=_init_reader, initargs=(message_queue,))
+
+    start = time.perf_counter()
+    done = 0
+    pending = len(plans)
+    plans_by_name = {plan['name']: plan for plan in plans}
+
+    try:
+        for plan in plans:
+            name = plan['name']
+            pool.apply_async(_read_table,
+                             (plan['path'], name, [f.name for f in plan['fields']], encoding,
+                              batch_size, stream_blobs, blob_dir, incremental, plan['previous']),
+                             error_callback=lambda e, name=name: message_queue.put(('error', name, str(e))))
+        pool.close()
+
+        while pending:
+            if check_cancelled:
+                check_cancelled()
+            try:
+                message = message_queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+
+            kind, name = message[0], message[1]
+            report = reports[name]
+            if kind == 'rows':
+                rows, streams = message[2], message[3]
+                if not incremental:
+                    connection.execute("BEGIN")
+                connection.executemany(inserts[name], rows)
+                if streams:
+                    if not isinstance(memo_files[name], FptFile):
+                        memo_files[name] = FptFile(memo_files[name])
+                    for recno, column, block in streams:
+                        with connection.blobopen(targets[name], column, recno) as blob:
+                            memo_files[name].copy_to(block, blob)
+                if not incremental:
+                    connection.execute("COMMIT")
+                report['rows'] += len(rows)
+                done += len(rows)
+                if progress:
+                    elapsed = time.perf_counter() - start
+                    progress(done, total, f"Migration : {name} — {_count(done)} / {_count(total)} "
+                                          f"lignes, {_count(done / elapsed)} lignes/s")
+            elif kind == 'clear':
+                # Blocs modifiés : remplacés par rowid une fois la table relue
+                report['blocks'] = message[2]
+            elif kind == 'done':
+                report['seconds'] = message[3]
+                if report['manifest'] is not None:
+                    report['manifest']['blocks'] = message[4]
+                if incremental:
+                    _apply_staged(connection, plans_by_name[name], report.get('blocks', []))
+                pending -= 1
+            else:
+                report['error'] = message[2]
+                if incremental:
+                    # Table précédente et son état conservés
+                    connection.execute(f"DROP TABLE IF EXISTS {quote_identifier(targets[name])}")
+                    report['manifest'] = manifest.get(name) if name in existing else None
+                else:
+                    report['manifest'] = None
+                    connection.execute(f"DROP TABLE IF EXISTS {quote_identifier(name)}")
+                pending -= 1
+
+        pool.join()
+
+        # Index créés une fois les données chargées
+        for report in reports.values():
+            if report['error']:
+                continue
+            for i, (tag, sql, status, detail) in enumerate(report['indexes']):
+                if sql is None:
+                    continue
+                if check_cancelled:
+                    check_cancelled()
+                if progress:
+                    progress(total, total, f"Création de l'index {report['table']}.{tag}...")
+                try:
+                    connection.execute(sql)
+                except sqlite3.Error as e:
+                    report['indexes'][i] = (tag, None, 'skipped', str(e))
+
+        if connection.in_transaction:
+            connection.execute("COMMIT")
+
+    except BaseException:
+        pool.terminate()
+        pool.join()
+        if connection.in_transaction:
+            connection.execute("ROLLBACK")
+        raise
+
+    finally:
+        for memo_file in memo_files.values():
+            if isinstance(memo_file, FptFile):
+                memo_file.close()
+        for name, value in saved.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        connection.close()
+
+    return list(reports.values())
+
+
+def _apply_staged(connection, plan, ranges):
+    """Reporter la table de travail d'une synchronisation dans la table migrée
+
+    Table rechargée : elle remplace l'ancienne. Sinon, les plages relues
+    sont supprimées puis remplacées par les enregistrements de travail.
+    """
+    table = quote_identifier(plan['name'])
+    stage = quote_identifier(plan['name'] + STAGING_SUFFIX)
+    if not plan['previous']:
+        connection.execute(f"DROP TABLE IF EXISTS {table}")
+        connection.execute(f"ALTER TABLE {stage} RENAME TO {table}")
+        return
+    for range_start, range_stop in ranges:
+        connection.execute(f"DELETE FROM {table} WHERE rowid > ? AND rowid <= ?",
+                           (range_start, range_stop))
+    columns = ", ".join(["rowid"] + [quote_identifier(f.name.lower()) for f in plan['fields']])
+    connection.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {stage}")
+    connection.execute(f"DROP TABLE {stage}")
+
+
+def build_manifest(reports):
+    """Manifeste des tables migrées (table -> état) ; une table en erreur
+    garde l'état de la migration précédente s'il est encore valable"""
+    return {report['table']: report['manifest'] for report in reports
+            if report.get('manifest') is not None}
+
+
+def _count(value):
+    return f"{value:,.0f}".replace(",", " ")
+
+
+def format_report(reports, elapsed=None):
+    """Formater les rapports de migration (une ligne par table)"""
+    lines = []
+    rows = 0
+    for report in sorted(reports, key=lambda report: report['table']):
+        if report['error']:
+            lines.append(f"✗ {report['table']}: {report['error']}")
+            continue
+        if report.get('mode') == 'unchanged':
+            lines.append(f"= {report['table']}: inchangée")
+            continue
+        rows += report['rows']
+        rate = report['rows'] / report['seconds'] if report['seconds'] > 0 else 0
+        action = "lignes"
+        if report.get('mode') == 'incremental':
+            action = f"lignes remplacées ou ajoutées ({len(report.get('blocks', []))} plage(s))"
+        lines.append(f"✓ {report['table']}: {_count(report['rows'])} {action} en "
+                     f"{report['seconds']:.2f} s ({_count(rate)} lignes/s)")
+        for tag, _, status, detail in report.get('indexes', ()):
+            mark = {'translated': '⚡', 'fallback': '↪'}.get(status, '✗')
+            lines.append(f"    {mark} {tag or 'index'}: {detail}")
+
+    summary = f"{len(reports)} tables, {_count(rows)} lignes"
+    if elapsed:
+        summary += f" en {elapsed:.2f} s ({_count(rows / elapsed)} lignes/s)"
+    lines.append(summary)
+    return lines
+
+
+def migration_job(job, source_dir, target_path, workers=None, encoding=None, manifest=None):
+    """Migrer un dossier DBF dans la base target_path (tâche du worker)
+
+    Retourne les lignes du rapport et le nouveau manifeste (None si la
+    migration n'est pas incrémentale).
+    """
+    start = time.perf_counter()
+    reports = migrate_directory(source_dir, target_path, workers, encoding,
+                                progress=job.report, check_cancelled=job.check_cancelled,
+                                manifest=manifest)
+    return {
+        'lines': format_report(reports, time.perf_counter() - start),
+        'manifest': build_manifest(reports) if manifest is not None else None,
+    }
+
+
+def project_manifest(project_data, source_dir, target_path):
+    """Manifeste enregistré dans un projet pour ce couple source / base"""
+    settings = project_data.get('migration') or {}
+    if (settings.get('source') == os.path.abspath(source_dir)
+            and settings.get('target') == os.path.abspath(target_path)):
+        return dict(settings.get('tables', {}))
+    return {}
+
+
+def store_manifest(project_data, source_dir, target_path, manifest):
+    """Enregistrer le manifeste dans les données du projet"""
+    project_data['migration'] = {
+        'source': os.path.abspath(source_dir),
+        'target': os.path.abspath(target_path),
+        'tables': manifest,
+    }
+
+
+def main(argv=None):
+    """Migrer un dossier DBF en ligne de commande"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Migration d'un dossier DBF vers SQLite")
+    parser.add_argument('source', help="dossier contenant les fichiers .dbf")
+    parser.add_argument('target', help="base SQLite à créer ou compléter")
+    parser.add_argument('--workers', type=int, help="processus de lecture (par défaut : tous les cœurs)")
+    parser.add_argument('--encoding', help="encodage (par défaut : page de code de chaque table)")
+    parser.add_argument('--batch-size', type=int, default=MIGRATION_BATCH_SIZE,
+                        help="enregistrements par transaction")
+    parser.add_argument('--blob-dir', help="dossier où écrire les mémos binaires (au lieu de BLOB)")
+    parser.add_argument('--project', help="fichier .vfpproj : migration incrémentale avec son manifeste")
+    args = parser.parse_args(argv)
+
+    project_data = manifest = None
+    if args.project:
+        with open(args.project, 'r') as f:
+            project_data = json.load(f)
+        manifest = project_manifest(project_data, args.source, args.target)
+
+    start = time.perf_counter()
+    reports = migrate_directory(args.source, args.target, args.workers, args.encoding,
+                                args.batch_size, blob_dir=args.blob_dir, manifest=manifest)
+    for line in format_report(reports, time.perf_counter() - start):
+        print(line)
+
+    if project_data is not None:
+        store_manifest(project_data, args.source, args.target, build_manifest(reports))
+        with open(args.project, 'w') as f:
+            json.dump(project_data, f, indent=4)
+    return 1 if any(report['error'] for report in reports) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
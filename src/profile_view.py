@@ -0,0 +1,108 @@
+# profile_view.py
+"""Module pour l'affichage des rapports de profilage"""
+
+import os
+
+from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QColor
+
+from theme import ModernTheme
+
+
+COLUMNS = ("Type", "Fonction / requête", "Fichier", "Ligne", "Appels",
+           "Temps propre (ms)", "Temps cumulé (ms)")
+
+# Libellés des types de ligne
+KINDS = {'python': "🐍 Python", 'sql': "🗄️ SQL"}
+
+
+def _number_item(value):
+    """Cellule numérique (triée par valeur, pas par texte)"""
+    item = QTableWidgetItem()
+    item.setData(Qt.ItemDataRole.DisplayRole, value)
+    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+    return item
+
+
+class ProfileView(QTableWidget):
+    """Tableau des points chauds : fonctions Python et requêtes SQLite"""
+    location_requested = pyqtSignal(str, int)
+
+    def __init__(self):
+        super().__init__(0, len(COLUMNS))
+        self.script_path = None
+        self.script_name = None
+
+        self.setHorizontalHeaderLabels(COLUMNS)
+        self.setAlternatingRowColors(True)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.verticalHeader().setVisible(False)
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.setSortingEnabled(True)
+
+        self.setStyleSheet(f"""
+            QTableWidget {{
+                border: none;
+                gridline-color: {ModernTheme.COLORS['border']};
+            }}
+            QHeaderView::section {{
+                background-color: {ModernTheme.COLORS['panel']};
+                padding: 4px;
+                border: none;
+                border-right: 1px solid {ModernTheme.COLORS['border']};
+                border-bottom: 1px solid {ModernTheme.COLORS['border']};
+            }}
+        """)
+
+        self.cellDoubleClicked.connect(self.on_double_click)
+
+    def show_report(self, report, script_path=None, script_name=None):
+        """Remplir le tableau (le script exécuté est affiché sous le nom de son onglet)"""
+        self.script_path = script_path
+        self.script_name = script_name
+
+        self.setSortingEnabled(False)
+        self.setRowCount(0)
+        self.setRowCount(len(report['rows']))
+        sql_color = QColor(ModernTheme.COLORS['warning'])
+
+        for row, entry in enumerate(report['rows']):
+            path = entry['file']
+            if path and path == script_path and script_name:
+                file_text = script_name
+            else:
+                file_text = os.path.basename(path)
+
+            kind = QTableWidgetItem(KINDS.get(entry['kind'], entry['kind']))
+            # Emplacement conservé pour le double-clic
+            kind.setData(Qt.ItemDataRole.UserRole, (path, entry['line']))
+            name = QTableWidgetItem(entry['name'])
+            name.setToolTip(entry['name'])
+            if entry['kind'] == 'sql':
+                name.setForeground(sql_color)
+                if 'max' in entry:
+                    name.setToolTip(f"{entry['name']}\nExécution la plus longue : "
+                                    f"{entry['max'] * 1000:.1f} ms")
+            location = QTableWidgetItem(file_text)
+            location.setToolTip(path)
+
+            self.setItem(row, 0, kind)
+            self.setItem(row, 1, name)
+            self.setItem(row, 2, location)
+            self.setItem(row, 3, _number_item(entry['line']))
+            self.setItem(row, 4, _number_item(entry['calls']))
+            self.setItem(row, 5, _number_item(round(entry['own'] * 1000, 2)))
+            self.setItem(row, 6, _number_item(round(entry['cumulative'] * 1000, 2)))
+
+        self.setSortingEnabled(True)
+        self.sortItems(6, Qt.SortOrder.DescendingOrder)
+        self.resizeColumnToContents(0)
+
+    def on_double_click(self, row, column):
+        """Aller à la ligne de la fonction ou de la requête"""
+        path, line = self.item(row, 0).data(Qt.ItemDataRole.UserRole)
+        if path and line:
+            self.location_requested.emit(path, line)
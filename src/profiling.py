@@ -0,0 +1,374 @@
+# profiling.py
+"""Module pour le profilage des scripts (fonctions, requêtes SQLite, temps et mémoire par ligne)"""
+
+import cProfile
+import json
+import pstats
+import re
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+
+# Nombre maximal de fonctions conservées dans le rapport (par temps cumulé)
+MAX_FUNCTIONS = 500
+
+# Nombre maximal de requêtes conservées dans le rapport (par temps cumulé)
+MAX_STATEMENTS = 500
+
+# Longueur maximale du texte d'une requête dans le rapport
+MAX_SQL_LENGTH = 300
+
+# Littéraux SQL (blobs, chaînes, nombres) remplacés par « ? » : SQLite
+# transmet les requêtes paramètres substitués
+SQL_LITERAL = re.compile(r"\b[xX]'[0-9a-fA-F]*'|'(?:[^']|'')*'|(?<![\w.])\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b")
+
+# Listes de paramètres (IN (?, ?, ?), VALUES multiples) ramenées à un élément
+SQL_PARAMETER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+SQL_ROW_LIST = re.compile(r"(\(\?[^()]*\))(?:\s*,\s*\(\?[^()]*\))+")
+
+# Fichiers de l'hôte exclus des rapports
+HOST_FILES = ('script_host.py', 'profiling.py')
+
+# Fonctions C appelées par l'hôte autour du script
+HOST_FUNCTIONS = ('<built-in method builtins.exec>', "<method 'disable' of '_lsprof.Profiler' objects>")
+
+
+def _is_host_file(filename):
+    # Sans os.path.basename : la mesure n'appelle pas de fonction Python profilée
+    return filename.replace('\\', '/').rsplit('/', 1)[-1] in HOST_FILES
+
+
+def normalize_sql(statement):
+    """Texte d'une requête sans ses valeurs : les exécutions d'une même
+    requête paramétrée sont regroupées"""
+    statement = SQL_LITERAL.sub('?', ' '.join(statement.split()))
+    statement = SQL_PARAMETER_LIST.sub('?, ...', statement)
+    # Remplacement par fonction : un modèle « \\1 » serait analysé par le module re
+    return SQL_ROW_LIST.sub(lambda match: match.group(1) + ', ...', statement)[:MAX_SQL_LENGTH]
+
+
+def _caller(limit=20):
+    """Première frame du script (hors hôte) : fichier et ligne"""
+    frame = sys._getframe(2)
+    while frame is not None and limit:
+        filename = frame.f_code.co_filename
+        if not _is_host_file(filename) and not filename.startswith('<'):
+            return filename, frame.f_lineno
+        frame = frame.f_back
+        limit -= 1
+    return '', 0
+
+
+class SqlTimer:
+    """Durée des requêtes SQLite de la connexion du script
+
+    Le script reçoit une TimedConnection : seule la durée des appels à
+    SQLite (execute, executemany, fetch..., parcours d'un curseur, commit)
+    est comptée, sans le traitement Python entre deux lignes lues. Une
+    exécution regroupe l'execute et les lectures de son curseur.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.statements = {}
+
+    def begin(self, sql):
+        """Nouvelle exécution d'une requête : [entrée du rapport, durée]"""
+        filename, line = _caller()
+        entry = self.statements.setdefault((normalize_sql(sql), filename, line), [0, 0.0, 0.0])
+        entry[0] += 1
+        return [entry, 0.0]
+
+    @staticmethod
+    def timed(execution, method, *args):
+        """Appeler SQLite ; la durée de l'appel est ajoutée à l'exécution"""
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            if execution is not None:
+                entry = execution[0]
+                execution[1] += elapsed
+                entry[1] += elapsed
+                entry[2] = max(entry[2], execution[1])
+
+    def rows(self):
+        rows = [{'kind': 'sql', 'name': sql, 'file': filename, 'line': line,
+                 'calls': calls, 'own': total, 'cumulative': total, 'max': longest}
+                for (sql, filename, line), (calls, total, longest) in self.statements.items()]
+        rows.sort(key=lambda row: row['cumulative'], reverse=True)
+        return rows[:MAX_STATEMENTS]
+
+
+class _Timed:
+    """Délègue les attributs à l'objet SQLite enveloppé (lecture et écriture)"""
+
+    def __init__(self, timer, target):
+        object.__setattr__(self, '_timer', timer)
+        object.__setattr__(self, '_target', target)
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+    def __setattr__(self, name, value):
+        # row_factory, isolation_level... : réglages de l'objet SQLite
+        setattr(self._target, name, value)
+
+
+class TimedCursor(_Timed):
+    """Curseur dont les appels à SQLite sont chronométrés"""
+
+    def __init__(self, timer, cursor):
+        super().__init__(timer, cursor)
+        object.__setattr__(self, '_execution', None)
+
+    def _run(self, method, sql, *args):
+        object.__setattr__(self, '_execution', self._timer.begin(sql))
+        self._timer.timed(self._execution, method, sql, *args)
+        return self
+
+    def execute(self, sql, *args):
+        return self._run(self._target.execute, sql, *args)
+
+    def executemany(self, sql, *args):
+        return self._run(self._target.executemany, sql, *args)
+
+    def executescript(self, sql):
+        return self._run(self._target.executescript, sql)
+
+    def fetchone(self):
+        return self._timer.timed(self._execution, self._target.fetchone)
+
+    def fetchmany(self, *args):
+        return self._timer.timed(self._execution, self._target.fetchmany, *args)
+
+    def fetchall(self):
+        return self._timer.timed(self._execution, self._target.fetchall)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._timer.timed(self._execution, self._target.__next__)
+
+
+class TimedConnection(_Timed):
+    """Connexion du script en mode profilage (voir SqlTimer)"""
+
+    # isinstance(db, sqlite3.Connection) reste vrai (pandas.read_sql...)
+    @property
+    def __class__(self):
+        return sqlite3.Connection
+
+    def cursor(self, *args):
+        return TimedCursor(self._timer, self._target.cursor(*args))
+
+    def execute(self, sql, *args):
+        return self.cursor().execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        return self.cursor().executemany(sql, *args)
+
+    def executescript(self, sql):
+        return self.cursor().executescript(sql)
+
+    def commit(self):
+        return self._timer.timed(self._timer.begin('COMMIT'), self._target.commit)
+
+    def rollback(self):
+        return self._timer.timed(self._timer.begin('ROLLBACK'), self._target.rollback)
+
+    def __enter__(self):
+        self._target.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        execution = self._timer.begin('COMMIT' if exc_info[0] is None else 'ROLLBACK')
+        return self._timer.timed(execution, self._target.__exit__, *exc_info)
+
+
+class Profiler:
+    """Exécution d'un script sous cProfile, avec mesure des requêtes"""
+
+    def __init__(self, connection=None):
+        self.profile = cProfile.Profile()
+        self.sql = SqlTimer(connection)
+        self.elapsed = 0.0
+
+    def run(self, code, globals_dict):
+        if self.sql.connection is not None:
+            globals_dict['db'] = TimedConnection(self.sql, self.sql.connection)
+        start = time.perf_counter()
+        self.profile.enable()
+        try:
+            exec(code, globals_dict)
+        finally:
+            self.profile.disable()
+            self.elapsed = time.perf_counter() - start
+
+    def function_rows(self):
+        stats = pstats.Stats(self.profile).stats
+        rows = []
+        for (filename, line, name), (primitive, calls, own, cumulative, callers) in stats.items():
+            if _is_host_file(filename) or name in HOST_FUNCTIONS:
+                continue
+            if 'sqlite3.' not in name:
+                # Appels faits par l'hôte et la mesure des requêtes (perf_counter,
+                # normalize_sql...) : hors du rapport
+                for (caller, _, _), counts in callers.items():
+                    if _is_host_file(caller):
+                        primitive -= counts[1]
+                        calls -= counts[0]
+                        own -= counts[2]
+                        cumulative -= counts[3]
+                if calls <= 0:
+                    continue
+            if filename == '~':
+                # Fonction C : « <built-in method ...> »
+                filename, line = '', 0
+            rows.append({'kind': 'python', 'name': name, 'file': filename, 'line': line,
+                         'calls': calls, 'primitive': primitive,
+                         'own': own, 'cumulative': cumulative})
+        rows.sort(key=lambda row: row['cumulative'], reverse=True)
+        return rows[:MAX_FUNCTIONS]
+
+    def report(self):
+        return {'mode': 'profile', 'elapsed': self.elapsed,
+                'rows': self.function_rows() + self.sql.rows()}
+
+
+class LineProfiler:
+    """Temps et mémoire ligne par ligne pour le fichier du script
+
+    Le temps écoulé entre deux lignes du script est attribué à la première :
+    une ligne qui appelle une bibliothèque ou SQLite porte la durée de
+    l'appel. sys.monitoring est utilisé s'il existe (Python 3.12+), sinon
+    sys.settrace.
+
+    La mémoire est suivie par tracemalloc : la croissance de la mémoire
+    tracée entre deux lignes est attribuée à la première (allocations de la
+    ligne, cumulées sur ses passages), et un instantané final donne ce que
+    chaque ligne retient encore à la fin du script.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # Ligne → [passages, durée, octets alloués]
+        self.lines = {}
+        self.previous = None
+        self.last = 0.0
+        self.last_memory = 0
+        self.final_snapshot = None
+        self.elapsed = 0.0
+        self.peak = 0
+
+    def line(self, lineno):
+        now = time.perf_counter()
+        memory = tracemalloc.get_traced_memory()[0]
+        if self.previous is not None:
+            entry = self.lines[self.previous]
+            entry[1] += now - self.last
+            if memory > self.last_memory:
+                entry[2] += memory - self.last_memory
+        entry = self.lines.get(lineno)
+        if entry is None:
+            entry = self.lines[lineno] = [0, 0.0, 0]
+        entry[0] += 1
+        self.previous = lineno
+        self.last_memory = memory
+        # La mesure elle-même n'est pas comptée
+        self.last = time.perf_counter()
+
+    def close(self):
+        if self.previous is not None:
+            entry = self.lines[self.previous]
+            entry[1] += time.perf_counter() - self.last
+            memory = tracemalloc.get_traced_memory()[0]
+            if memory > self.last_memory:
+                entry[2] += memory - self.last_memory
+            self.previous = None
+
+    def _trace(self, frame, event, arg):
+        # Trace globale : seules les frames du script sont suivies
+        if frame.f_code.co_filename != self.path:
+            return None
+        return self._trace_lines
+
+    def _trace_lines(self, frame, event, arg):
+        if event == 'line':
+            self.line(frame.f_lineno)
+        return self._trace_lines
+
+    def _start_tracing(self):
+        monitoring = getattr(sys, 'monitoring', None)
+        if monitoring is not None:
+            tool = monitoring.PROFILER_ID
+            monitoring.use_tool_id(tool, 'pyfoxpro')
+
+            def on_line(code, lineno):
+                if code.co_filename != self.path:
+                    return monitoring.DISABLE
+                self.line(lineno)
+
+            monitoring.register_callback(tool, monitoring.events.LINE, on_line)
+            monitoring.set_events(tool, monitoring.events.LINE)
+        else:
+            sys.settrace(self._trace)
+
+    def _stop_tracing(self):
+        monitoring = getattr(sys, 'monitoring', None)
+        if monitoring is not None:
+            tool = monitoring.PROFILER_ID
+            monitoring.set_events(tool, 0)
+            monitoring.register_callback(tool, monitoring.events.LINE, None)
+            monitoring.free_tool_id(tool)
+        else:
+            sys.settrace(None)
+
+    def run(self, code, globals_dict):
+        tracemalloc.start()
+        start = time.perf_counter()
+        self.last = start
+        self._start_tracing()
+        try:
+            exec(code, globals_dict)
+        finally:
+            self._stop_tracing()
+            self.close()
+            self.elapsed = time.perf_counter() - start
+            # Instantané avant la libération des variables du script
+            self.final_snapshot = tracemalloc.take_snapshot()
+            self.peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def retained(self):
+        """Octets encore alloués à la fin, par ligne du script"""
+        if self.final_snapshot is None:
+            return {}
+        # Regrouper d'abord : filtrer les traces une à une est bien plus lent
+        return {stat.traceback[0].lineno: stat.size
+                for stat in self.final_snapshot.statistics('lineno')
+                if stat.traceback[0].filename == self.path and stat.traceback[0].lineno > 0}
+
+    def report(self):
+        retained = self.retained()
+        lines = {}
+        for lineno in set(self.lines) | set(retained):
+            hits, elapsed, allocated = self.lines.get(lineno, (0, 0.0, 0))
+            lines[lineno] = {'hits': hits, 'time': elapsed, 'allocated': allocated,
+                             'retained': retained.get(lineno, 0)}
+        return {'mode': 'lines', 'file': self.path, 'elapsed': self.elapsed,
+                'peak': self.peak, 'lines': lines}
+
+
+def write_report(path, report):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f)
+
+
+def read_report(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
@@ -8,14 +8,20 @@ from PyQt6.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QHBoxLayout,
                            QToolBar, QTreeWidget, QTreeWidgetItem, QMenu,
                            QDialog, QFormLayout, QLineEdit, QPushButton,
                            QDialogButtonBox, QFileDialog, QMessageBox,
-                           QInputDialog, QStyle)
+                           QInputDialog, QStyle, QSpinBox, QAbstractItemView,
+                           QListWidget, QListWidgetItem, QLabel)
 from PyQt6.QtCore import Qt, QSize, pyqtSignal
 from PyQt6.QtGui import QAction
 
+from script_runner import DEFAULT_RUNNER_SETTINGS
+
 
 class ProjectManager(QDockWidget):
     """Gestionnaire de projets"""
     file_opened = pyqtSignal(str)
+    translate_requested = pyqtSignal(str)
+    batch_requested = pyqtSignal(list)
+    settings_changed = pyqtSignal()
 
     def __init__(self):
         super().__init__("Gestionnaire de projet")
@@ -48,14 +54,25 @@ class ProjectManager(QDockWidget):
         save_project_action = QAction("💾 Sauvegarder", self)
         save_project_action.triggered.connect(self.save_project)
 
+        runner_action = QAction("⚙️ Exécution", self)
+        runner_action.setToolTip("Processus d'exécution des scripts du projet")
+        runner_action.triggered.connect(self.edit_runner_settings)
+
+        batch_action = QAction("▶ Tout exécuter", self)
+        batch_action.setToolTip("Exécuter tous les scripts du projet en parallèle")
+        batch_action.triggered.connect(lambda: self.run_folder(self.project_path))
+
         toolbar.addAction(new_project_action)
         toolbar.addAction(open_project_action)
         toolbar.addAction(save_project_action)
+        toolbar.addAction(runner_action)
+        toolbar.addAction(batch_action)
 
         # Arbre des fichiers
         self.file_tree = QTreeWidget()
         self.file_tree.setHeaderLabel("Fichiers du projet")
         self.file_tree.itemDoubleClicked.connect(self.open_file)
+        self.file_tree.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
 
         # Menu contextuel
         self.file_tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
@@ -114,6 +131,7 @@ class ProjectManager(QDockWidget):
                 # Créer le fichier projet
                 self.save_project()
                 self.refresh_tree()
+                self.settings_changed.emit()
 
     def open_project(self):
         """Ouvrir un projet existant"""
@@ -135,10 +153,79 @@ class ProjectManager(QDockWidget):
 
             self.project_path = os.path.dirname(file_path)
             self.refresh_tree()
+            self.settings_changed.emit()
 
         except Exception as e:
             QMessageBox.critical(self, "Erreur", f"Impossible de charger le projet: {e}")
 
+    def runner_settings(self):
+        """Réglages du pool d'exécution (valeurs par défaut hors projet)"""
+        settings = dict(DEFAULT_RUNNER_SETTINGS)
+        settings.update(self.project_data.get('runner', {}))
+        return settings
+
+    def edit_runner_settings(self):
+        """Régler le pool d'exécution des scripts du projet"""
+        if not self.project_path:
+            QMessageBox.information(self, "Information", "Aucun projet ouvert")
+            return
+        settings = self.runner_settings()
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Exécution des scripts")
+        layout = QFormLayout()
+
+        pool_spin = QSpinBox()
+        pool_spin.setRange(0, 16)
+        pool_spin.setValue(settings['pool_size'])
+        pool_spin.setToolTip("Processus démarrés à l'avance (0 : démarrage à chaque exécution)")
+
+        runs_spin = QSpinBox()
+        runs_spin.setRange(1, 1000)
+        runs_spin.setValue(settings['max_runs'])
+        runs_spin.setToolTip("Exécutions servies par un processus avant son remplacement")
+
+        batch_spin = QSpinBox()
+        batch_spin.setRange(0, 64)
+        batch_spin.setSpecialValueText("Automatique")
+        batch_spin.setValue(settings['batch_workers'])
+        batch_spin.setToolTip("Scripts exécutés en parallèle par « Tout exécuter » (0 : un par processeur)")
+
+        preload_edit = QLineEdit(', '.join(settings['preload']))
+        preload_edit.setToolTip("Modules importés au démarrage des processus")
+
+        cache_spin = QSpinBox()
+        cache_spin.setRange(0, 100000)
+        cache_spin.setSuffix(" Mo")
+        cache_spin.setValue(settings['cache_size'])
+        cache_spin.setToolTip("Taille maximale du cache des cellules « # %% cache » (0 : désactivé)")
+
+        layout.addRow("Processus préchargés:", pool_spin)
+        layout.addRow("Exécutions par processus:", runs_spin)
+        layout.addRow("Modules préchargés:", preload_edit)
+        layout.addRow("Cache des cellules:", cache_spin)
+        layout.addRow("Scripts en parallèle:", batch_spin)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok |
+            QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout.addRow(buttons)
+        dialog.setLayout(layout)
+
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.project_data['runner'] = {
+                'pool_size': pool_spin.value(),
+                'max_runs': runs_spin.value(),
+                'preload': [name.strip() for name in preload_edit.text().split(',') if name.strip()],
+                'cache_size': cache_spin.value(),
+                'batch_workers': batch_spin.value(),
+            }
+            self.save_project()
+            self.settings_changed.emit()
+
     def save_project(self):
         """Sauvegarder le projet"""
         if not self.project_path:
@@ -192,7 +279,8 @@ class ProjectManager(QDockWidget):
 
             # Ajouter les fichiers
             for file in sorted(files):
-                if file.endswith(('.py', '.db', '.sqlite', '.json', '.csv', '.txt')):
+                if file.endswith(('.py', '.db', '.sqlite', '.json', '.csv', '.txt', '.prg', '.PRG',
+                                   '.scx', '.SCX', '.vcx', '.VCX')):
                     file_item = QTreeWidgetItem(parent, [file])
 
                     # Icône selon le type
@@ -231,6 +319,24 @@ class ProjectManager(QDockWidget):
             open_action.triggered.connect(lambda: self.file_opened.emit(file_path))
             menu.addAction(open_action)
 
+            if file_path.endswith('.py'):
+                scripts = self.selected_scripts()
+                if file_path not in scripts:
+                    scripts = [file_path]
+                label = "▶ Exécuter en lot" if len(scripts) == 1 else f"▶ Exécuter les {len(scripts)} scripts"
+                batch_action = QAction(label, self)
+                batch_action.triggered.connect(lambda: self.batch_requested.emit(scripts))
+                menu.addAction(batch_action)
+
+                dependencies_action = QAction("🔗 Dépendances...", self)
+                dependencies_action.triggered.connect(lambda: self.edit_dependencies(file_path))
+                menu.addAction(dependencies_action)
+
+            if file_path.lower().endswith('.prg'):
+                translate_action = QAction("🔄 Traduire en Python", self)
+                translate_action.triggered.connect(lambda: self.translate_requested.emit(file_path))
+                menu.addAction(translate_action)
+
             delete_action = QAction("Supprimer", self)
             delete_action.triggered.connect(lambda: self.delete_file(file_path))
             menu.addAction(delete_action)
@@ -241,8 +347,107 @@ class ProjectManager(QDockWidget):
             new_file_action.triggered.connect(self.new_file)
             menu.addAction(new_file_action)
 
+            folder_path = self.folder_path(item)
+            translate_action = QAction("🔄 Traduire les programmes VFP", self)
+            translate_action.triggered.connect(lambda: self.translate_requested.emit(folder_path))
+            menu.addAction(translate_action)
+
+            batch_action = QAction("▶ Exécuter les scripts du dossier", self)
+            batch_action.triggered.connect(lambda: self.run_folder(folder_path))
+            menu.addAction(batch_action)
+
         menu.exec(self.file_tree.mapToGlobal(position))
 
+    def project_scripts(self, folder=None):
+        """Scripts Python d'un dossier du projet (dossiers cachés exclus)"""
+        scripts = []
+        for root_dir, dirs, files in os.walk(folder or self.project_path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            scripts.extend(os.path.join(root_dir, file) for file in sorted(files)
+                           if file.endswith('.py'))
+        return scripts
+
+    def selected_scripts(self):
+        """Scripts Python sélectionnés dans l'arbre"""
+        paths = [item.data(0, Qt.ItemDataRole.UserRole) for item in self.file_tree.selectedItems()]
+        return [path for path in paths if path and path.endswith('.py') and os.path.isfile(path)]
+
+    def run_folder(self, folder):
+        """Demander l'exécution en lot des scripts d'un dossier"""
+        if not self.project_path:
+            QMessageBox.information(self, "Information", "Aucun projet ouvert")
+            return
+        scripts = self.project_scripts(folder)
+        if not scripts:
+            QMessageBox.information(self, "Information", "Aucun script Python dans ce dossier")
+            return
+        self.batch_requested.emit(scripts)
+
+    def script_dependencies(self):
+        """Dépendances déclarées dans le projet : script → scripts à exécuter
+        avant lui (chemins complets)
+
+        Le fichier .vfpproj les enregistre en chemins relatifs au projet :
+        "dependencies": {"rapports/ventes.py": ["import/clients.py"]}
+        """
+        def full_path(name):
+            return os.path.normpath(os.path.join(self.project_path, name))
+
+        return {full_path(script): [full_path(name) for name in names]
+                for script, names in self.project_data.get('dependencies', {}).items()}
+
+    def relative_path(self, path):
+        return os.path.relpath(path, self.project_path).replace(os.sep, '/')
+
+    def edit_dependencies(self, file_path):
+        """Choisir les scripts à exécuter avant file_path dans un lot"""
+        script = self.relative_path(file_path)
+        current = set(self.project_data.get('dependencies', {}).get(script, []))
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"Dépendances de {os.path.basename(file_path)}")
+        dialog.resize(400, 400)
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Scripts à exécuter avant celui-ci (exécution en lot) :"))
+
+        scripts_list = QListWidget()
+        for path in self.project_scripts():
+            name = self.relative_path(path)
+            if name == script:
+                continue
+            item = QListWidgetItem(name)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked if name in current else Qt.CheckState.Unchecked)
+            scripts_list.addItem(item)
+        layout.addWidget(scripts_list)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok |
+            QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout.addWidget(buttons)
+        dialog.setLayout(layout)
+
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            names = [scripts_list.item(i).text() for i in range(scripts_list.count())
+                     if scripts_list.item(i).checkState() == Qt.CheckState.Checked]
+            dependencies = self.project_data.setdefault('dependencies', {})
+            if names:
+                dependencies[script] = names
+            else:
+                dependencies.pop(script, None)
+            self.save_project()
+
+    def folder_path(self, item):
+        """Chemin d'un dossier de l'arbre (la racine est le dossier du projet)"""
+        parts = []
+        while item.parent() is not None:
+            parts.insert(0, item.text(0))
+            item = item.parent()
+        return os.path.join(self.project_path, *parts)
+
     def new_file(self):
         """Créer un nouveau fichier"""
         if not self.project_path:
@@ -0,0 +1,298 @@
+# query_executor.py
+"""Module pour l'exécution des requêtes SQL en arrière-plan"""
+
+import itertools
+import sqlite3
+import time
+from urllib.request import pathname2url
+
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QLabel, QProgressBar, QPushButton
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+
+# Nombre d'instructions SQLite entre deux appels du progress handler
+PROGRESS_STEPS = 10000
+
+# Délai minimal (secondes) entre deux signaux de progression
+PROGRESS_INTERVAL = 0.1
+
+
+class QueryCancelled(Exception):
+    """Tâche annulée par l'utilisateur"""
+
+
+class QueryJob:
+    """Tâche exécutée par le worker avec sa connexion de lecture"""
+
+    def __init__(self, job_id, function, args, kwargs, description):
+        self.job_id = job_id
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.description = description
+
+        self.cancelled = False
+        self.connection = None
+        self.db_path = None
+        self.worker = None
+        self._last_report = 0.0
+
+    def report(self, done, total=0, text=''):
+        """Signaler l'avancement (limité à un signal par PROGRESS_INTERVAL)"""
+        now = time.monotonic()
+        if self.worker is None or now - self._last_report < PROGRESS_INTERVAL:
+            return
+        self._last_report = now
+        self.worker.progress.emit(self.job_id, int(done), int(total), text)
+
+    def check_cancelled(self):
+        """Interrompre la tâche si elle a été annulée"""
+        if self.cancelled:
+            raise QueryCancelled()
+
+
+class QueryWorker(QObject):
+    """Worker exécutant les tâches dans son propre thread"""
+    started = pyqtSignal(int, str)
+    progress = pyqtSignal(int, int, int, str)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    cancelled = pyqtSignal(int)
+
+    def __init__(self, db_path):
+        super().__init__()
+        self.db_path = db_path
+        self.connection = None
+        self.current_job = None
+
+    def open_connection(self):
+        """Ouvrir la connexion de lecture (dans le thread du worker)"""
+        uri = f"file:{pathname2url(self.db_path)}?mode=ro"
+        self.connection = sqlite3.connect(uri, uri=True)
+
+    @pyqtSlot(object)
+    def run_job(self, job):
+        """Exécuter une tâche"""
+        if job.cancelled:
+            self.cancelled.emit(job.job_id)
+            return
+
+        try:
+            # Sans base (db_path None) : tâches qui n'utilisent pas SQLite
+            if self.connection is None and self.db_path:
+                self.open_connection()
+        except Exception as e:
+            self.failed.emit(job.job_id, str(e))
+            return
+
+        job.connection = self.connection
+        job.db_path = self.db_path
+        job.worker = self
+        self.current_job = job
+        self.started.emit(job.job_id, job.description)
+
+        steps = 0
+
+        def progress_handler():
+            nonlocal steps
+            steps += PROGRESS_STEPS
+            job.report(steps, 0, job.description)
+            return 1 if job.cancelled else 0
+
+        if self.connection is not None:
+            self.connection.set_progress_handler(progress_handler, PROGRESS_STEPS)
+
+        try:
+            result = job.function(job, *job.args, **job.kwargs)
+        except (QueryCancelled, sqlite3.OperationalError) as e:
+            if job.cancelled:
+                self.cancelled.emit(job.job_id)
+            else:
+                self.failed.emit(job.job_id, str(e))
+        except Exception as e:
+            self.failed.emit(job.job_id, str(e))
+        else:
+            if job.cancelled:
+                self.cancelled.emit(job.job_id)
+            else:
+                self.finished.emit(job.job_id, result)
+        finally:
+            if self.connection is not None:
+                self.connection.set_progress_handler(None, 0)
+                if self.connection.in_transaction:
+                    self.connection.rollback()
+            self.current_job = None
+
+    @pyqtSlot()
+    def close(self):
+        """Fermer la connexion de lecture"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class QueryExecutor(QObject):
+    """Exécuteur de requêtes : un thread worker avec sa propre connexion
+
+    Les tâches sont des fonctions appelées dans le thread du worker avec un
+    QueryJob en premier argument (job.connection est la connexion de lecture).
+    Les résultats reviennent dans le thread de l'interface par signaux et
+    par les callbacks on_result/on_error/on_cancel passés à submit().
+    Avec db_path None, l'exécuteur sert aux tâches de fond sans base.
+    """
+    job_started = pyqtSignal(int, str)
+    job_progress = pyqtSignal(int, int, int, str)
+    job_finished = pyqtSignal(int, object)
+    job_failed = pyqtSignal(int, str)
+    job_cancelled = pyqtSignal(int)
+    idle = pyqtSignal()
+
+    _dispatch = pyqtSignal(object)
+    _close = pyqtSignal()
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.jobs = {}
+        self._ids = itertools.count(1)
+
+        # Worker dans son propre thread
+        self.thread = QThread()
+        self.worker = QueryWorker(db_path)
+        self.worker.moveToThread(self.thread)
+
+        self._dispatch.connect(self.worker.run_job)
+        self._close.connect(self.worker.close)
+        self.worker.started.connect(self.job_started)
+        self.worker.progress.connect(self.job_progress)
+        self.worker.finished.connect(self._on_finished)
+        self.worker.failed.connect(self._on_failed)
+        self.worker.cancelled.connect(self._on_cancelled)
+
+        self.thread.start()
+
+    def submit(self, function, *args, description='', on_result=None,
+               on_error=None, on_cancel=None, **kwargs):
+        """Soumettre une tâche, retourne son identifiant"""
+        job = QueryJob(next(self._ids), function, args, kwargs, description)
+        self.jobs[job.job_id] = (job, on_result, on_error, on_cancel)
+        self._dispatch.emit(job)
+        return job.job_id
+
+    def cancel(self, job_id=None):
+        """Annuler une tâche (ou toutes les tâches si job_id est None)"""
+        if job_id is None:
+            targets = [entry[0] for entry in self.jobs.values()]
+        else:
+            entry = self.jobs.get(job_id)
+            targets = [entry[0]] if entry else []
+
+        for job in targets:
+            job.cancelled = True
+            if self.worker.current_job is job and self.worker.connection is not None:
+                # interrupt() peut être appelé depuis un autre thread
+                self.worker.connection.interrupt()
+
+    def is_busy(self):
+        """Indiquer si des tâches sont en cours ou en attente"""
+        return bool(self.jobs)
+
+    def shutdown(self):
+        """Annuler les tâches et arrêter le thread"""
+        self.cancel()
+        self._close.emit()
+        self.thread.quit()
+        self.thread.wait()
+
+    def _pop(self, job_id):
+        entry = self.jobs.pop(job_id, None)
+        if not self.jobs:
+            self.idle.emit()
+        return entry
+
+    def _on_finished(self, job_id, result):
+        entry = self._pop(job_id)
+        self.job_finished.emit(job_id, result)
+        if entry and entry[1]:
+            entry[1](result)
+
+    def _on_failed(self, job_id, message):
+        entry = self._pop(job_id)
+        self.job_failed.emit(job_id, message)
+        if entry and entry[2]:
+            entry[2](message)
+
+    def _on_cancelled(self, job_id):
+        entry = self._pop(job_id)
+        self.job_cancelled.emit(job_id)
+        if entry and entry[3]:
+            entry[3]()
+
+
+class QueryProgressWidget(QWidget):
+    """Indicateur de progression avec bouton d'annulation"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.executor = None
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.label = QLabel()
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(160)
+        self.progress_bar.setMaximumHeight(14)
+        self.progress_bar.setTextVisible(False)
+
+        self.cancel_btn = QPushButton("Annuler")
+        self.cancel_btn.clicked.connect(self.cancel)
+
+        layout.addWidget(self.label)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.cancel_btn)
+        self.setLayout(layout)
+
+        self.hide()
+
+    def set_executor(self, executor):
+        """Suivre les tâches d'un exécuteur"""
+        if self.executor is not None:
+            for signal, slot in self._connections():
+                signal.disconnect(slot)
+
+        self.executor = executor
+        if executor is not None:
+            for signal, slot in self._connections():
+                signal.connect(slot)
+        self.hide()
+
+    def _connections(self):
+        return [
+            (self.executor.job_started, self.on_started),
+            (self.executor.job_progress, self.on_progress),
+            (self.executor.idle, self.hide),
+        ]
+
+    def on_started(self, job_id, description):
+        self.label.setText(description or "Requête en cours...")
+        self.progress_bar.setRange(0, 0)
+        self.cancel_btn.setEnabled(True)
+        self.show()
+
+    def on_progress(self, job_id, done, total, text):
+        if total > 0:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(min(done, total))
+        else:
+            self.progress_bar.setRange(0, 0)
+        if text:
+            self.label.setText(text)
+
+    def cancel(self):
+        """Annuler les tâches en cours"""
+        if self.executor is not None:
+            self.cancel_btn.setEnabled(False)
+            self.label.setText("Annulation...")
+            self.executor.cancel()
@@ -0,0 +1,251 @@
+# schema_cache.py
+"""Module pour le cache du schéma des bases de données"""
+
+import hashlib
+import json
+import os
+import threading
+
+
+# Dossier par défaut des instantanés de schéma
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.pyfoxpro', 'schema_cache')
+
+# Types d'objets SQLite gardés dans le cache
+OBJECT_KINDS = ('table', 'view', 'index', 'trigger')
+
+
+def quote_identifier(name):
+    """Protéger un identifiant SQL (table, colonne)"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class SchemaCache:
+    """Cache du schéma d'une base SQLite
+
+    Les objets (tables, vues, index, déclencheurs) et le détail des tables
+    (colonnes, types, clé primaire, index, clés étrangères) sont lus une seule
+    fois, puis conservés tant que PRAGMA schema_version ne change pas. Le
+    détail d'une table n'est lu qu'à sa première demande.
+
+    Les méthodes acceptent une connexion optionnelle : le worker de requêtes
+    peut ainsi remplir le cache avec sa propre connexion. L'instantané est
+    enregistré sur disque pour afficher l'arbre immédiatement à la prochaine
+    ouverture de la base.
+    """
+
+    def __init__(self, connection, db_path=None, cache_dir=DEFAULT_CACHE_DIR):
+        self.connection = connection
+        self.db_path = os.path.abspath(db_path) if db_path else None
+        self.cache_dir = cache_dir
+
+        self.version = None
+        self.objects = None  # type -> [noms]
+        self.owners = {}  # index/déclencheur -> table
+        self.tables = {}  # table -> détail
+        self.dirty = False
+
+        self._lock = threading.RLock()
+        self.load_snapshot()
+
+    # Validation
+
+    def schema_version(self, connection=None):
+        """Lire PRAGMA schema_version"""
+        connection = connection or self.connection
+        return connection.execute("PRAGMA schema_version").fetchone()[0]
+
+    def validate(self, connection=None):
+        """Vider le cache si le schéma a changé ; retourne True s'il est à jour"""
+        version = self.schema_version(connection)
+        with self._lock:
+            if version == self.version:
+                return True
+
+            self.version = version
+            self.objects = None
+            self.owners = {}
+            self.tables = {}
+            self.dirty = True
+            return False
+
+    def is_fresh(self, connection=None):
+        """Indiquer si la liste des objets est disponible sans lecture"""
+        return self.validate(connection) and self.objects is not None
+
+    # Objets du schéma
+
+    def get_objects(self, connection=None):
+        """Retourner les noms des objets par type (une seule requête)"""
+        self.validate(connection)
+        with self._lock:
+            if self.objects is not None:
+                return self.objects
+
+        connection = connection or self.connection
+        rows = connection.execute(
+            "SELECT type, name, tbl_name FROM sqlite_master ORDER BY name"
+        ).fetchall()
+
+        objects = {kind: [] for kind in OBJECT_KINDS}
+        owners = {}
+        for kind, name, table in rows:
+            if kind in objects:
+                objects[kind].append(name)
+                if kind in ('index', 'trigger'):
+                    owners[name] = table
+
+        with self._lock:
+            self.objects = objects
+            self.owners = owners
+            self.dirty = True
+        return objects
+
+    def table_names(self, connection=None):
+        """Retourner les noms des tables"""
+        return list(self.get_objects(connection)['table'])
+
+    def owner(self, name, connection=None):
+        """Retourner la table d'un index ou d'un déclencheur"""
+        self.get_objects(connection)
+        return self.owners.get(name)
+
+    def triggers(self, table, connection=None):
+        """Retourner les déclencheurs d'une table"""
+        objects = self.get_objects(connection)
+        return [name for name in objects['trigger'] if self.owners.get(name) == table]
+
+    # Détail des tables
+
+    def table_info(self, table, connection=None):
+        """Retourner le détail d'une table (lu à la première demande)"""
+        self.validate(connection)
+        with self._lock:
+            info = self.tables.get(table)
+            if info is not None:
+                return info
+
+        info = self._read_table(connection or self.connection, table)
+        with self._lock:
+            self.tables[table] = info
+            self.dirty = True
+        return info
+
+    def _read_table(self, connection, table):
+        name = quote_identifier(table)
+
+        columns = [
+            {'name': col[1], 'type': col[2], 'notnull': bool(col[3]),
+             'default': col[4], 'pk': col[5]}
+            for col in connection.execute(f"PRAGMA table_info({name})")
+        ]
+
+        indexes = []
+        for index in connection.execute(f"PRAGMA index_list({name})").fetchall():
+            index_columns = [
+                col[2] for col in connection.execute(
+                    f"PRAGMA index_info({quote_identifier(index[1])})")
+            ]
+            sql = connection.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (index[1],)
+            ).fetchone()
+            indexes.append({'name': index[1], 'unique': bool(index[2]),
+                            'columns': index_columns, 'sql': sql[0] if sql else None})
+
+        foreign_keys = [
+            {'column': fk[3], 'table': fk[2], 'to': fk[4]}
+            for fk in connection.execute(f"PRAGMA foreign_key_list({name})")
+        ]
+
+        return {'columns': columns, 'indexes': indexes, 'foreign_keys': foreign_keys}
+
+    def columns(self, table, connection=None):
+        """Retourner les colonnes d'une table"""
+        return self.table_info(table, connection)['columns']
+
+    def column_names(self, table, connection=None):
+        """Retourner les noms des colonnes d'une table"""
+        return [col['name'] for col in self.columns(table, connection)]
+
+    def primary_key(self, table, connection=None):
+        """Retourner les colonnes de la clé primaire, dans l'ordre"""
+        columns = [col for col in self.columns(table, connection) if col['pk']]
+        return [col['name'] for col in sorted(columns, key=lambda col: col['pk'])]
+
+    def indexes(self, table, connection=None):
+        """Retourner les index d'une table"""
+        return self.table_info(table, connection)['indexes']
+
+    def foreign_keys(self, table, connection=None):
+        """Retourner les clés étrangères d'une table"""
+        return self.table_info(table, connection)['foreign_keys']
+
+    def index_columns(self, index, connection=None):
+        """Retourner les colonnes d'un index"""
+        table = self.owner(index, connection)
+        if table is None:
+            return []
+        for info in self.indexes(table, connection):
+            if info['name'] == index:
+                return info['columns']
+        return []
+
+    def cached_tables(self):
+        """Retourner les tables dont le détail est déjà en cache"""
+        with self._lock:
+            return list(self.tables)
+
+    # Instantané sur disque
+
+    def snapshot_path(self):
+        """Chemin de l'instantané de cette base"""
+        if not self.db_path or not self.cache_dir:
+            return None
+        digest = hashlib.sha1(self.db_path.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def load_snapshot(self):
+        """Charger l'instantané enregistré (validé à la première lecture)"""
+        path = self.snapshot_path()
+        if not path or not os.path.isfile(path):
+            return
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if snapshot.get('db_path') != self.db_path:
+            return
+
+        with self._lock:
+            self.version = snapshot.get('schema_version')
+            self.objects = snapshot.get('objects')
+            self.owners = snapshot.get('owners', {})
+            self.tables = snapshot.get('tables', {})
+            self.dirty = False
+
+    def save(self):
+        """Enregistrer l'instantané s'il a changé"""
+        path = self.snapshot_path()
+        if not path or not self.dirty:
+            return
+
+        with self._lock:
+            snapshot = {
+                'db_path': self.db_path,
+                'schema_version': self.version,
+                'objects': self.objects,
+                'owners': self.owners,
+                'tables': self.tables,
+            }
+            self.dirty = False
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(temp_path, path)
+        except OSError:
+            pass
@@ -0,0 +1,374 @@
+# script_host.py
+"""Module pour l'exécution d'un script dans un processus séparé
+
+Lancé par ScriptRunner : python -u script_host.py script.py [--db base.db]
+Le script dispose, comme dans l'IDE, de `db` (connexion SQLite propre au
+processus) et de `sqlite3`. Les modifications sont validées si le script se
+termine sans erreur.
+
+En mode --serve, le processus est démarré à l'avance (pool de RunnerPool) :
+il importe les modules courants, ouvre la connexion, puis attend sur
+l'entrée standard une requête JSON par exécution. En mode --kernel, il
+exécute des extraits de code dans un espace de noms conservé entre les
+requêtes (noyau de session).
+"""
+
+import argparse
+import ast
+import importlib
+import json
+import os
+import sqlite3
+import sys
+import traceback
+from datetime import datetime
+
+from cell_cache import (CACHE_DIR, DEFAULT_CACHE_SIZE, IGNORED_NAMES, CellCache, NotCacheable,
+                        input_digests, stored_names, value_digest)
+from profiling import HOST_FILES, LineProfiler, Profiler, write_report
+
+
+# Fin d'une exécution en mode serveur, écrite sur les deux sorties
+END_MARKER = '\x1epyfoxpro-end'
+
+# Modules importés par les processus préchargés
+DEFAULT_PRELOAD = ('json', 'csv', 're', 'datetime', 'decimal', 'vfp_functions', 'vfp_runtime')
+
+
+def open_connection(db_path):
+    return sqlite3.connect(db_path) if db_path else None
+
+
+def _print_exception():
+    """Trace de l'erreur sans les frames de l'hôte"""
+    etype, value, tb = sys.exc_info()
+    while tb is not None and os.path.basename(tb.tb_frame.f_code.co_filename) in HOST_FILES:
+        tb = tb.tb_next
+    traceback.print_exception(etype, value, tb, file=sys.__stderr__)
+
+
+def _prepare(path, working_dir=None):
+    """Dossier courant et chemins d'import pour un script"""
+    if working_dir:
+        os.chdir(working_dir)
+
+    # Le dossier du script remplace celui de l'hôte ; les modules de l'IDE
+    # (vfp_runtime pour le code traduit) restent importables
+    host_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path[0] = os.path.dirname(os.path.abspath(path))
+    if host_dir not in sys.path:
+        sys.path.append(host_dir)
+    sys.argv = [path]
+
+
+def _execute(function, connection=None):
+    """Appeler function() comme un script ; retourne le code de sortie
+
+    Les modifications de la base sont validées si l'exécution réussit,
+    annulées sinon.
+    """
+    # Entrée standard vide : en mode serveur elle porte les requêtes
+    stdin = sys.stdin
+    sys.stdin = open(os.devnull, encoding='utf-8')
+    try:
+        function()
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        _print_exception()
+        code = 1
+    else:
+        code = 0
+    finally:
+        sys.stdin.close()
+        sys.stdin = stdin
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+
+    if connection is not None:
+        try:
+            if code == 0 and connection.in_transaction:
+                connection.commit()
+            elif connection.in_transaction:
+                connection.rollback()
+        except sqlite3.ProgrammingError:
+            # Connexion fermée par le script
+            pass
+    return code
+
+
+def run_script(path, connection=None, working_dir=None, mode='run', report=None):
+    """Exécuter un script ; retourne le code de sortie
+
+    mode 'profile' : exécution sous cProfile ; mode 'lines' : temps et
+    mémoire par ligne. Le rapport JSON est écrit dans report.
+    """
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    _prepare(path, working_dir)
+
+    globals_dict = {
+        'db': connection,
+        'sqlite3': sqlite3,
+        '__name__': '__main__',
+        '__file__': path,
+    }
+
+    if mode == 'profile':
+        profiler = Profiler(connection)
+    elif mode == 'lines':
+        profiler = LineProfiler(path)
+    else:
+        profiler = None
+
+    def run():
+        code_object = compile(source, path, 'exec')
+        if profiler is not None:
+            profiler.run(code_object, globals_dict)
+        else:
+            exec(code_object, globals_dict)
+
+    code = _execute(run, connection)
+
+    # Rapport écrit même si le script a échoué
+    if profiler is not None and report:
+        write_report(report, profiler.report())
+    return code
+
+
+class _Tee:
+    """Sortie transmise à l'IDE et conservée (sortie d'une cellule en cache)"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def getvalue(self):
+        return ''.join(self.parts)
+
+
+def run_cell(code, path, first_line, namespace, connection=None, working_dir=None,
+             cache=None, db_path=None):
+    """Exécuter un extrait de script dans un espace de noms conservé
+
+    Les numéros de ligne des erreurs sont ceux de l'éditeur ; la valeur d'une
+    expression finale est affichée, comme dans une console interactive.
+    Avec un cache (cellule « # %% cache »), un résultat enregistré pour le
+    même code, les mêmes variables lues et la même version de la base est
+    repris au lieu de réexécuter la cellule.
+    """
+    _prepare(path, working_dir)
+    namespace['__file__'] = path
+
+    key = None
+    inputs = {}
+    if cache is not None:
+        try:
+            inputs = input_digests(code, namespace)
+            key = cache.key(code, inputs, connection, db_path)
+        except NotCacheable as e:
+            print(f"Cellule non mise en cache : la variable « {e} » n'est pas sérialisable")
+        result = cache.get(key) if key else None
+        if result is not None:
+            try:
+                cache.restore(result, namespace)
+            except Exception:
+                # Module importé par la cellule devenu introuvable
+                result = None
+        if result is not None:
+            sys.stdout.write(result['output'])
+            created = datetime.fromtimestamp(result['created']).strftime('%d/%m/%Y %H:%M:%S')
+            print(f"♻ Résultat repris du cache (exécution du {created})")
+            return 0
+
+    # Variables avant l'exécution : celles qui changent ou que la cellule
+    # affecte sont enregistrées, ainsi que les variables lues modifiées sur
+    # place (lookup.update(...))
+    before = {name: id(value) for name, value in namespace.items()}
+    output = None
+
+    def run():
+        nonlocal output
+        if key:
+            output = sys.stdout = _Tee(sys.stdout)
+        # Lignes vides en tête : les numéros de ligne suivent l'éditeur
+        tree = ast.parse('\n' * (first_line - 1) + code, path)
+        expression = None
+        if tree.body and isinstance(tree.body[-1], ast.Expr):
+            expression = ast.Expression(tree.body.pop().value)
+        exec(compile(tree, path, 'exec'), namespace)
+        if expression is not None:
+            value = eval(compile(expression, path, 'eval'), namespace)
+            if value is not None:
+                namespace['_'] = value
+                print(repr(value))
+
+    exit_code = _execute(run, connection)
+    if key and exit_code == 0:
+        stored = stored_names(code)
+        try:
+            stored.update(name for name, digest in inputs.items()
+                          if name in namespace and value_digest(name, namespace[name]) != digest)
+            values = {name: value for name, value in namespace.items()
+                      if name not in IGNORED_NAMES and (name in stored or before.get(name) != id(value))}
+            if not cache.put(key, values, output.getvalue()):
+                print("Cellule non mise en cache : résultat plus grand que le cache")
+        except NotCacheable as e:
+            print(f"Cellule non mise en cache : la variable « {e} » n'est pas sérialisable")
+        except OSError as e:
+            print(f"Cellule non mise en cache : {e}", file=sys.stderr)
+    return exit_code
+
+
+def _usable(connection):
+    try:
+        connection.total_changes
+        return True
+    except sqlite3.ProgrammingError:
+        return False
+
+
+def _preload(modules):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"Préchargement de {name} impossible: {e}", file=sys.stderr)
+
+
+def peak_memory():
+    """Mémoire résidente maximale du processus en octets (0 si inconnue)"""
+    try:
+        import resource
+    except ImportError:
+        # Windows : pas de module resource
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilo-octets sous Linux, octets sous macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _end_run(code):
+    """Marquer la fin d'une exécution sur les deux sorties (code de sortie
+    et mémoire maximale du processus)"""
+    for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+        stream.write(f"{END_MARKER} {code} {peak_memory()}\n")
+        stream.flush()
+
+
+def serve(db_path=None, runs=1, preload=DEFAULT_PRELOAD):
+    """Attendre et exécuter jusqu'à `runs` scripts"""
+    _preload(preload)
+    connection = open_connection(db_path)
+
+    for _ in range(runs):
+        line = sys.stdin.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        if connection is not None and not _usable(connection):
+            connection = open_connection(db_path)
+
+        code = run_script(request['script'], connection, request.get('cwd'),
+                          request.get('mode', 'run'), request.get('report'))
+        _end_run(code)
+
+    if connection is not None and _usable(connection):
+        connection.close()
+    return 0
+
+
+def kernel(preload=DEFAULT_PRELOAD):
+    """Noyau de session : exécuter les extraits reçus jusqu'à la fin de
+    l'entrée standard, dans un espace de noms conservé
+
+    Chaque requête indique la base connectée dans l'IDE ; la connexion `db`
+    est rouverte si elle change. Ctrl+C (SIGINT) interrompt l'extrait en
+    cours sans perdre l'espace de noms.
+    """
+    _preload(preload)
+    db_path = None
+    connection = None
+    cache = None
+    namespace = {'__name__': '__main__', 'sqlite3': sqlite3, 'db': None}
+
+    while True:
+        try:
+            line = sys.stdin.readline()
+        except KeyboardInterrupt:
+            # Interruption reçue entre deux extraits
+            continue
+        if not line:
+            break
+        request = json.loads(line)
+
+        if request.get('db') != db_path or (connection is not None and not _usable(connection)):
+            if connection is not None and _usable(connection):
+                connection.close()
+            db_path = request.get('db')
+            connection = open_connection(db_path)
+            namespace['db'] = connection
+
+        if request.get('cache'):
+            settings = (request.get('cache_dir') or CACHE_DIR,
+                        request.get('cache_size') or DEFAULT_CACHE_SIZE)
+            if cache is None or (cache.directory, cache.max_size) != settings:
+                cache = CellCache(*settings)
+
+        code = run_cell(request['code'], request['script'], request.get('first_line', 1),
+                        namespace, connection, request.get('cwd'),
+                        cache if request.get('cache') else None, db_path)
+        _end_run(code)
+
+    if connection is not None and _usable(connection):
+        connection.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exécuter un script de l'IDE")
+    parser.add_argument('script', nargs='?', help="Fichier Python à exécuter")
+    parser.add_argument('--db', help="Base SQLite ouverte dans la variable db")
+    parser.add_argument('--profile', metavar='RAPPORT',
+                        help="Profiler le script et écrire le rapport JSON")
+    parser.add_argument('--lines', metavar='RAPPORT',
+                        help="Mesurer temps et mémoire par ligne et écrire le rapport JSON")
+    parser.add_argument('--serve', action='store_true',
+                        help="Attendre les scripts sur l'entrée standard (requêtes JSON)")
+    parser.add_argument('--kernel', action='store_true',
+                        help="Noyau de session : extraits exécutés dans un espace de noms conservé")
+    parser.add_argument('--runs', type=int, default=1,
+                        help="Nombre d'exécutions avant de quitter (mode --serve)")
+    parser.add_argument('--preload', default=','.join(DEFAULT_PRELOAD),
+                        help="Modules importés au démarrage (mode --serve)")
+    args = parser.parse_args(argv)
+
+    preload = [name.strip() for name in args.preload.split(',') if name.strip()]
+    if args.kernel:
+        return kernel(preload)
+    if args.serve:
+        return serve(args.db, max(args.runs, 1), preload)
+    if not args.script:
+        parser.error("script manquant")
+
+    connection = open_connection(args.db)
+    try:
+        if args.profile:
+            return run_script(args.script, connection, mode='profile', report=args.profile)
+        if args.lines:
+            return run_script(args.script, connection, mode='lines', report=args.lines)
+        return run_script(args.script, connection)
+    finally:
+        if connection is not None and _usable(connection):
+            connection.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,434 @@
+# script_runner.py
+"""Module pour l'exécution des scripts dans un processus Python séparé"""
+
+import codecs
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+
+from PyQt6.QtCore import QObject, QProcess, QProcessEnvironment, QTimer, pyqtSignal
+
+from cell_cache import CACHE_DIR, DEFAULT_CACHE_SIZE
+from script_host import DEFAULT_PRELOAD, END_MARKER
+
+
+# Programme lancé dans le processus enfant
+HOST_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'script_host.py')
+
+# Réglages par défaut du pool (modifiables par projet)
+DEFAULT_POOL_SIZE = 1
+DEFAULT_MAX_RUNS = 1
+DEFAULT_RUNNER_SETTINGS = {
+    'pool_size': DEFAULT_POOL_SIZE,
+    'max_runs': DEFAULT_MAX_RUNS,
+    'preload': list(DEFAULT_PRELOAD),
+    'cache_size': DEFAULT_CACHE_SIZE,
+    'batch_workers': 0,
+}
+
+# Délai (ms) laissé au noyau pour traiter une interruption
+KERNEL_INTERRUPT_DELAY = 2000
+
+# Dossier des copies temporaires des éditeurs non enregistrés
+SCRIPT_DIR = os.path.join(tempfile.gettempdir(), 'pyfoxpro_scripts')
+
+
+class LineBuffer:
+    """Découpe un flux d'octets en lignes complètes"""
+
+    def __init__(self):
+        self.decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self.pending = ''
+
+    def feed(self, data):
+        """Ajouter des octets ; retourner les lignes terminées"""
+        text = self.pending + self.decoder.decode(data)
+        lines = text.split('\n')
+        self.pending = lines.pop()
+        return [line.rstrip('\r') for line in lines]
+
+    def flush(self):
+        """Dernière ligne incomplète"""
+        text = self.pending + self.decoder.decode(b'', final=True)
+        self.pending = ''
+        return [text.rstrip('\r')] if text else []
+
+
+def write_script(name, code):
+    """Écrire le contenu d'un éditeur dans un fichier temporaire (pour que
+    les traces d'erreur indiquent un nom et des numéros de ligne)"""
+    os.makedirs(SCRIPT_DIR, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(name))[0] or 'script'
+    path = os.path.join(SCRIPT_DIR, f"{stem}.py")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(code)
+    return path
+
+
+def report_path(mode):
+    """Fichier du rapport d'une exécution profilée"""
+    os.makedirs(SCRIPT_DIR, exist_ok=True)
+    return os.path.join(SCRIPT_DIR, f"{mode}_report.json")
+
+
+def start_host(parent, arguments, working_dir=None):
+    """Démarrer script_host.py dans un QProcess"""
+    process = QProcess(parent)
+    environment = QProcessEnvironment.systemEnvironment()
+    environment.insert('PYTHONUNBUFFERED', '1')
+    environment.insert('PYTHONIOENCODING', 'utf-8')
+    process.setProcessEnvironment(environment)
+    if working_dir:
+        process.setWorkingDirectory(working_dir)
+    process.start(sys.executable, ['-u', HOST_SCRIPT] + arguments)
+    return process
+
+
+class Worker:
+    """Processus préchargé et nombre d'exécutions qu'il peut encore servir"""
+
+    def __init__(self, process, runs, settings):
+        self.process = process
+        self.runs = runs
+        self.settings = settings
+
+    def is_alive(self):
+        return self.process.state() != QProcess.ProcessState.NotRunning
+
+
+class RunnerPool(QObject):
+    """Pool de processus Python démarrés à l'avance
+
+    Chaque processus a déjà importé les modules courants et ouvert sa
+    connexion : un script démarre sans attendre l'interpréteur. Un processus
+    est recyclé après max_runs exécutions (une seule par défaut, pour que les
+    scripts ne partagent aucun état).
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.settings = None
+        self.size = 0
+        self.idle = []
+
+    def configure(self, db_path=None, size=DEFAULT_POOL_SIZE, max_runs=DEFAULT_MAX_RUNS,
+                  preload=DEFAULT_PRELOAD, working_dir=None):
+        """Adapter le pool à la base et au projet ; les processus démarrés
+        avec d'autres réglages sont arrêtés"""
+        settings = (db_path, max(int(max_runs), 1), tuple(preload), working_dir)
+        self.size = max(int(size), 0)
+        if settings != self.settings:
+            self.settings = settings
+            self.clear()
+        for worker in self.idle[self.size:]:
+            self.retire(worker)
+        del self.idle[self.size:]
+        self.fill()
+
+    def spawn(self):
+        """Démarrer un processus (il attend sa requête sur l'entrée standard)"""
+        db_path, max_runs, preload, working_dir = self.settings or (None, 1, DEFAULT_PRELOAD, None)
+        arguments = ['--serve', '--runs', str(max_runs), '--preload', ','.join(preload)]
+        if db_path:
+            arguments += ['--db', db_path]
+        return Worker(start_host(self, arguments, working_dir), max_runs, self.settings)
+
+    def fill(self):
+        self.idle = [worker for worker in self.idle if worker.is_alive()]
+        while len(self.idle) < self.size:
+            self.idle.append(self.spawn())
+
+    def take(self):
+        """Processus prêt (démarré à froid si le pool est vide)"""
+        worker = None
+        while self.idle and worker is None:
+            candidate = self.idle.pop(0)
+            if candidate.is_alive():
+                worker = candidate
+            else:
+                candidate.process.deleteLater()
+        if worker is None:
+            worker = self.spawn()
+        self.fill()
+        return worker
+
+    def release(self, worker):
+        """Remettre un processus dans le pool après une exécution"""
+        worker.runs -= 1
+        if (worker.runs > 0 and worker.is_alive() and worker.settings == self.settings
+                and len(self.idle) < self.size):
+            self.idle.append(worker)
+        else:
+            self.retire(worker)
+        self.fill()
+
+    def stop(self, worker):
+        """Arrêter l'exécution en cours : le processus est tué"""
+        worker.process.kill()
+
+    def discard(self, worker):
+        worker.process.deleteLater()
+
+    def retire(self, worker):
+        # Fin de l'entrée standard : le processus se termine de lui-même
+        if worker.is_alive():
+            worker.process.closeWriteChannel()
+            worker.process.finished.connect(worker.process.deleteLater)
+        else:
+            worker.process.deleteLater()
+
+    def clear(self):
+        for worker in self.idle:
+            self.retire(worker)
+        self.idle = []
+
+    def shutdown(self):
+        """Arrêter tous les processus (fermeture de l'IDE)"""
+        self.size = 0
+        for worker in self.idle:
+            worker.process.kill()
+            worker.process.waitForFinished(1000)
+        self.idle = []
+
+
+class Kernel(QObject):
+    """Noyau de session : un processus persistant dont l'espace de noms est
+    conservé entre les exécutions (même interface que RunnerPool)"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.worker = None
+        self.preload = DEFAULT_PRELOAD
+
+        # Délai laissé à une interruption avant de tuer le processus
+        self.kill_timer = QTimer(self)
+        self.kill_timer.setSingleShot(True)
+        self.kill_timer.timeout.connect(self.kill)
+
+    def is_alive(self):
+        return self.worker is not None and self.worker.is_alive()
+
+    def take(self):
+        if not self.is_alive():
+            self.start()
+        return self.worker
+
+    def start(self):
+        arguments = ['--kernel', '--preload', ','.join(self.preload)]
+        self.worker = Worker(start_host(self, arguments), 0, None)
+
+    def release(self, worker):
+        self.kill_timer.stop()
+        if not worker.is_alive():
+            self.discard(worker)
+
+    def discard(self, worker):
+        """Oublier un processus terminé (redémarré à la prochaine exécution)"""
+        self.kill_timer.stop()
+        worker.process.deleteLater()
+        if worker is self.worker:
+            self.worker = None
+
+    def stop(self, worker):
+        """Interrompre l'extrait en cours (KeyboardInterrupt) ; le processus
+        n'est tué que s'il ne répond pas"""
+        if os.name == 'posix':
+            os.kill(int(worker.process.processId()), signal.SIGINT)
+            self.kill_timer.start(KERNEL_INTERRUPT_DELAY)
+        else:
+            # Windows : pas de signal d'interruption vers un autre processus
+            worker.process.kill()
+
+    def kill(self):
+        if self.is_alive():
+            self.worker.process.kill()
+
+    def restart(self):
+        """Relancer le noyau avec un espace de noms vide"""
+        self.shutdown()
+        self.start()
+
+    def shutdown(self):
+        self.kill_timer.stop()
+        if self.worker is not None:
+            process = self.worker.process
+            if self.worker.is_alive():
+                process.kill()
+                process.waitForFinished(1000)
+            process.deleteLater()
+            self.worker = None
+
+
+class ScriptRunner(QObject):
+    """Exécute un script dans un processus du pool et diffuse sa sortie
+
+    La sortie standard et la sortie d'erreur sont transmises ligne par ligne
+    (signal output) ; le processus peut être arrêté à tout moment ou au bout
+    d'un délai.
+    """
+    started = pyqtSignal(str)
+    output = pyqtSignal(str, str)
+    finished = pyqtSignal(int, float, str)
+
+    def __init__(self, pool, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.worker = None
+        self.script_path = None
+        self.stop_reason = ''
+        self.start_time = 0.0
+        self.buffers = {}
+        # Sorties dont le marqueur de fin a été reçu, code de sortie et
+        # mémoire maximale (octets) du processus
+        self.ended = set()
+        self.exit_code = 0
+        self.peak_memory = 0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.on_timeout)
+
+    def is_running(self):
+        return self.worker is not None
+
+    def _connections(self, process):
+        return [
+            (process.readyReadStandardOutput, self.on_stdout),
+            (process.readyReadStandardError, self.on_stderr),
+            (process.finished, self.on_finished),
+            (process.errorOccurred, self.on_error),
+        ]
+
+    def run(self, script_path, timeout=0, working_dir=None, mode='run', report=None):
+        """Lancer un script (timeout en secondes, 0 : sans limite)
+
+        mode 'profile' ou 'lines' : le processus écrit son rapport JSON dans report.
+        """
+        self.submit({'script': script_path, 'cwd': working_dir,
+                     'mode': mode, 'report': report}, timeout)
+
+    def run_code(self, code, script_path, first_line=1, db_path=None, timeout=0,
+                 working_dir=None, cache_size=None):
+        """Exécuter un extrait dans le noyau (numéros de ligne de l'éditeur)
+
+        cache_size (Mo) : résultat repris du cache des cellules s'il existe.
+        """
+        self.submit({'code': code, 'script': script_path, 'first_line': first_line,
+                     'db': db_path, 'cwd': working_dir, 'cache': bool(cache_size),
+                     'cache_dir': CACHE_DIR, 'cache_size': cache_size}, timeout)
+
+    def submit(self, request, timeout=0):
+        script_path = request['script']
+        if self.worker is not None:
+            raise RuntimeError("Un script est déjà en cours d'exécution")
+
+        self.worker = self.pool.take()
+        self.script_path = script_path
+        self.stop_reason = ''
+        self.buffers = {'info': LineBuffer(), 'error': LineBuffer()}
+        self.ended = set()
+        self.exit_code = 0
+        self.peak_memory = 0
+
+        process = self.worker.process
+        for signal_, slot in self._connections(process):
+            signal_.connect(slot)
+        if process.error() == QProcess.ProcessError.FailedToStart:
+            self.on_error(process.error())
+            return
+
+        self.start_time = time.perf_counter()
+        process.write((json.dumps(request) + '\n').encode('utf-8'))
+        if timeout:
+            self.timer.start(int(timeout * 1000))
+        self.started.emit(script_path)
+
+        # Sortie déjà produite par le processus (erreurs de préchargement)
+        self.on_stdout()
+        self.on_stderr()
+
+    def stop(self, reason='stopped'):
+        """Arrêter l'exécution en cours"""
+        if self.worker is not None and self.worker.is_alive():
+            self.stop_reason = reason
+            self.pool.stop(self.worker)
+
+    def abandon(self, reason):
+        """Le processus va être tué par son fournisseur (redémarrage du noyau) :
+        la fin de l'exécution porte la raison donnée"""
+        if self.worker is not None:
+            self.stop_reason = reason
+
+    def shutdown(self):
+        """Arrêter le script et attendre la fin du processus (fermeture de l'IDE)"""
+        if self.worker is not None:
+            process = self.worker.process
+            self.stop()
+            process.waitForFinished(2000)
+        self.pool.shutdown()
+
+    def on_timeout(self):
+        self.stop('timeout')
+
+    def read(self, output_type, data):
+        for line in self.buffers[output_type].feed(bytes(data)):
+            self.emit_line(line, output_type)
+
+    def emit_line(self, line, output_type):
+        if output_type in self.ended:
+            return
+        text, marker, code = line.partition(END_MARKER)
+        if text:
+            self.output.emit(text, output_type)
+        if marker:
+            self.ended.add(output_type)
+            fields = code.split()
+            self.exit_code = int(fields[0]) if fields else 0
+            self.peak_memory = int(fields[1]) if len(fields) > 1 else 0
+            if len(self.ended) == len(self.buffers):
+                self.finish(self.exit_code, self.stop_reason)
+
+    def on_stdout(self):
+        if self.worker is not None:
+            self.read('info', self.worker.process.readAllStandardOutput())
+
+    def on_stderr(self):
+        if self.worker is not None:
+            self.read('error', self.worker.process.readAllStandardError())
+
+    def on_error(self, error):
+        # Échec du lancement : finished n'est pas émis
+        if error == QProcess.ProcessError.FailedToStart and self.worker is not None:
+            self.output.emit(f"Impossible de lancer Python: {self.worker.process.errorString()}", 'error')
+            self.finish(-1, 'crashed')
+
+    def on_finished(self, exit_code, exit_status):
+        self.on_stdout()
+        self.on_stderr()
+        if self.worker is None:
+            return
+        for output_type, buffer in self.buffers.items():
+            for line in buffer.flush():
+                self.emit_line(line, output_type)
+        if self.worker is None:
+            return
+
+        reason = self.stop_reason
+        if not reason and exit_status == QProcess.ExitStatus.CrashExit:
+            reason = 'crashed'
+        self.finish(exit_code, reason)
+
+    def finish(self, exit_code, reason):
+        self.timer.stop()
+        worker, self.worker = self.worker, None
+        for signal_, slot in self._connections(worker.process):
+            signal_.disconnect(slot)
+        # Un processus interrompu mais vivant (noyau) reste utilisable
+        if worker.is_alive() or not reason:
+            self.pool.release(worker)
+        else:
+            self.pool.discard(worker)
+        self.finished.emit(exit_code, time.perf_counter() - self.start_time, reason)
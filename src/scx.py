@@ -0,0 +1,247 @@
+# scx.py
+"""Module pour la lecture des formulaires et bibliothèques de classes VFP (.scx, .vcx)"""
+
+import os
+from collections import namedtuple
+
+from dbf import DbfError, open_dbf
+
+
+# Champs lus dans la table du formulaire (les méthodes et le code objet ne
+# sont jamais décodés)
+SCX_FIELDS = ('PLATFORM', 'BASECLASS', 'OBJNAME', 'PARENT', 'PROPERTIES', 'RESERVED1')
+
+# Classes de base VFP → widgets de FormDesignArea.create_widget
+WIDGET_CLASSES = {
+    'label': 'QLabel',
+    'commandbutton': 'QPushButton',
+    'textbox': 'QLineEdit',
+    'spinner': 'QLineEdit',
+    'editbox': 'QTextEdit',
+    'checkbox': 'QCheckBox',
+    'optionbutton': 'QRadioButton',
+    'combobox': 'QComboBox',
+    'listbox': 'QComboBox',
+    'grid': 'QTableWidget',
+    'container': 'QGroupBox',
+    'optiongroup': 'QGroupBox',
+    'commandgroup': 'QGroupBox',
+    'pageframe': 'QGroupBox',
+    'shape': 'QGroupBox',
+}
+
+# Racines possibles d'un formulaire
+FORM_CLASSES = ('form', 'formset', 'toolbar')
+
+# Objets sans représentation visuelle (environnement de données, etc.)
+NON_VISUAL = ('dataenvironment', 'cursor', 'relation', 'cursoradapter', 'timer',
+              'custom', 'session', 'hyperlink', 'header', 'column')
+
+# Conteneurs dont les membres ne sont que des propriétés (« Page1.Caption = ... ») :
+# classe des membres, propriété donnant leur nombre, nom par défaut et
+# (largeur, hauteur, espacement vertical) par défaut
+MEMBERS = {
+    'optiongroup': ('optionbutton', 'ButtonCount', 'Option', (61, 17, 22)),
+    'commandgroup': ('commandbutton', 'ButtonCount', 'Command', (84, 27, 32)),
+    'pageframe': ('page', 'PageCount', 'Page', None),
+}
+
+# Hauteur des onglets d'un cadre de pages
+PAGE_TABS_HEIGHT = 25
+
+FormControl = namedtuple('FormControl', 'name path baseclass widget_class left top width height properties')
+VfpForm = namedtuple('VfpForm', 'name caption width height controls skipped')
+
+
+def parse_properties(text):
+    """Propriétés d'un objet : lignes « Nom = valeur » du mémo PROPERTIES"""
+    properties = {}
+    if not text:
+        return properties
+    for line in text.splitlines():
+        name, sep, value = line.partition(' = ')
+        if not sep:
+            continue
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+        properties[name.strip()] = value
+    return properties
+
+
+def _members(properties):
+    """Propriétés des membres d'un conteneur, par nom de membre"""
+    members = {}
+    for name, value in properties.items():
+        member, sep, prop = name.partition('.')
+        if sep:
+            members.setdefault(member.lower(), {})[prop] = value
+    return members
+
+
+def _number(properties, name, default=0):
+    try:
+        return int(float(properties.get(name, default)))
+    except ValueError:
+        return default
+
+
+def _rows(path, encoding=None):
+    """Enregistrements visuels (plateforme WINDOWS) du fichier, sans charger
+    les mémos des objets ignorés"""
+    try:
+        table = open_dbf(path, encoding)
+    except OSError as e:
+        raise DbfError(f"{path}: {e}") from e
+    with table:
+        for platform, baseclass, objname, parent, properties, reserved in table.records(SCX_FIELDS):
+            if platform.strip().upper() != 'WINDOWS' or baseclass is None:
+                continue
+            yield (baseclass.text().strip().lower(),
+                   objname.text().strip() if objname else '',
+                   parent.text().strip() if parent else '',
+                   properties,
+                   reserved.text().strip() if reserved else '')
+
+
+def list_classes(path, encoding=None):
+    """Noms des classes d'une bibliothèque .vcx (ou des formulaires d'un .scx)"""
+    return [objname for baseclass, objname, parent, _, reserved in _rows(path, encoding)
+            if not parent and (reserved.lower() == 'class' or baseclass in FORM_CLASSES)]
+
+
+def read_form(path, class_name=None, encoding=None):
+    """Lire un formulaire .scx ou une classe .vcx
+
+    Les enregistrements sont parcourus une seule fois ; un objet suit toujours
+    son conteneur, ce qui permet de calculer les positions absolues au fil de
+    la lecture. class_name choisit la racine (formulaire ou classe) ; la
+    première est prise par défaut.
+    """
+    root = None
+    form = {}
+    # Chemin d'un conteneur → (gauche, haut) absolus, ou None si son contenu
+    # n'est pas reproduit (grille, pages masquées)
+    origins = {}
+    controls = []
+    skipped = []
+    names = set()
+    subforms = []
+
+    def unique(name, path_):
+        # Noms uniques pour le code généré (Text1 dans deux conteneurs)
+        if name.lower() in names:
+            name = path_.split('.', 1)[-1].replace('.', '_')
+        base, count = name, 1
+        while name.lower() in names:
+            count += 1
+            name = f"{base}_{count}"
+        names.add(name.lower())
+        return name
+
+    for baseclass, objname, parent, memo, reserved in _rows(path, encoding):
+        if not parent:
+            if root is not None or baseclass in NON_VISUAL:
+                continue
+            if class_name and objname.lower() != class_name.lower():
+                continue
+            root = objname
+            form = parse_properties(memo.text() if memo else '')
+            origins[root.lower()] = (0, 0)
+            continue
+        if root is None:
+            continue
+
+        path_ = f"{parent}.{objname}"
+        key = parent.lower()
+        # Sous-formulaire d'un formset : coordonnées propres au formulaire
+        if key == root.lower() and baseclass == 'form':
+            first = not subforms
+            subforms.append(objname)
+            if first:
+                form.update(parse_properties(memo.text() if memo else ''))
+            else:
+                skipped.append(f"{path_} (form)")
+            origins[path_.lower()] = (0, 0) if first else None
+            continue
+        if key not in origins:
+            # Objet hors de la racine choisie
+            continue
+        origin = origins[key]
+        if origin is None:
+            origins[path_.lower()] = None
+            continue
+        if baseclass in NON_VISUAL:
+            skipped.append(f"{path_} ({baseclass})")
+            continue
+
+        properties = parse_properties(memo.text() if memo else '')
+        left = origin[0] + _number(properties, 'Left')
+        top = origin[1] + _number(properties, 'Top')
+
+        widget_class = WIDGET_CLASSES.get(baseclass)
+        if widget_class is None:
+            skipped.append(f"{path_} ({baseclass})")
+            origins[path_.lower()] = None
+            continue
+
+        # Les colonnes d'une grille restent dans le tableau
+        origins[path_.lower()] = None if baseclass == 'grid' else (left, top)
+        controls.append(FormControl(unique(objname, path_), path_, baseclass, widget_class,
+                                    left, top,
+                                    _number(properties, 'Width', 150),
+                                    _number(properties, 'Height', 30),
+                                    properties))
+
+        # Pages et boutons : membres décrits dans les propriétés du conteneur
+        if baseclass in MEMBERS:
+            member_class, count_property, default_name, defaults = MEMBERS[baseclass]
+            # Les membres renommés gardent leur ordre de déclaration
+            members = list(_members(properties).values())
+            for i in range(1, _number(properties, count_property) + 1):
+                member = members[i - 1] if i <= len(members) else {}
+                member_name = member.get('Name', f"{default_name}{i}")
+                member_path = f"{path_}.{member_name}"
+                if baseclass == 'pageframe':
+                    # Seule la première page est reproduite : les autres
+                    # occupent la même place
+                    first = _number(member, 'PageOrder', i) == 1
+                    origins[member_path.lower()] = (left, top + PAGE_TABS_HEIGHT) if first else None
+                    if not first:
+                        skipped.append(f"{member_path} (page)")
+                    continue
+                width, height, spacing = defaults
+                member_left = left + _number(member, 'Left', 5)
+                member_top = top + _number(member, 'Top', 5 + (i - 1) * spacing)
+                controls.append(FormControl(unique(member_name, member_path), member_path,
+                                            member_class, WIDGET_CLASSES[member_class],
+                                            member_left, member_top,
+                                            _number(member, 'Width', width),
+                                            _number(member, 'Height', height),
+                                            member))
+
+    if root is None:
+        what = f"classe {class_name}" if class_name else "formulaire"
+        raise DbfError(f"{os.path.basename(path)}: {what} introuvable")
+
+    return VfpForm(root, form.get('Caption', root),
+                   _number(form, 'Width', 375), _number(form, 'Height', 250),
+                   controls, skipped)
+
+
+def control_text(control):
+    """Texte affiché par un contrôle (Caption ou Value)"""
+    properties = control.properties
+    if 'Caption' in properties:
+        return properties['Caption']
+    if control.baseclass in ('textbox', 'editbox', 'spinner'):
+        return properties.get('Value', '')
+    return ''
+
+
+def combo_items(control):
+    """Éléments d'une liste dont la source est une valeur (RowSourceType 1)"""
+    properties = control.properties
+    if properties.get('RowSourceType') != '1' or not properties.get('RowSource'):
+        return []
+    return [item.strip() for item in properties['RowSource'].split(',')]
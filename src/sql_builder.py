@@ -0,0 +1,290 @@
+# sql_builder.py
+"""Module pour le générateur de requêtes SQL visuel"""
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGroupBox,
+                             QComboBox, QListWidget, QTableWidget, QPushButton,
+                             QLabel, QSpinBox, QTextEdit, QLineEdit, QMessageBox)
+from PyQt6.QtGui import QFont
+
+from theme import ModernTheme
+from query_executor import QueryProgressWidget
+from schema_cache import SchemaCache
+
+
+def count_query_rows(connection, sql):
+    """Compter les lignes retournées par une requête"""
+    return connection.execute(f"SELECT COUNT(*) FROM ({sql})").fetchone()[0]
+
+
+class SQLQueryBuilder(QDialog):
+    """Générateur de requêtes SQL visuel"""
+
+    def __init__(self, db_connection, parent=None, executor=None, schema_cache=None):
+        super().__init__(parent)
+        self.db_connection = db_connection
+        self.executor = executor
+        self.schema_cache = schema_cache or SchemaCache(db_connection)
+        self.setWindowTitle("Générateur de requêtes SQL")
+        self.setModal(True)
+        self.resize(800, 600)
+
+        self.setStyleSheet(ModernTheme.get_stylesheet())
+
+        self.init_ui()
+        self.load_tables()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        # Section SELECT
+        select_group = QGroupBox("SELECT - Colonnes à afficher")
+        select_layout = QVBoxLayout()
+
+        self.table_combo = QComboBox()
+        self.table_combo.currentTextChanged.connect(self.load_columns)
+
+        self.columns_list = QListWidget()
+        self.columns_list.setSelectionMode(QListWidget.SelectionMode.MultiSelection)
+
+        select_layout.addWidget(QLabel("Table:"))
+        select_layout.addWidget(self.table_combo)
+        select_layout.addWidget(QLabel("Colonnes:"))
+        select_layout.addWidget(self.columns_list)
+        select_group.setLayout(select_layout)
+
+        # Section WHERE
+        where_group = QGroupBox("WHERE - Conditions")
+        where_layout = QVBoxLayout()
+
+        self.conditions_table = QTableWidget(0, 4)
+        self.conditions_table.setHorizontalHeaderLabels(["Colonne", "Opérateur", "Valeur", "ET/OU"])
+
+        add_condition_btn = QPushButton("+ Ajouter une condition")
+        add_condition_btn.clicked.connect(self.add_condition)
+
+        where_layout.addWidget(self.conditions_table)
+        where_layout.addWidget(add_condition_btn)
+        where_group.setLayout(where_layout)
+
+        # Section ORDER BY
+        order_group = QGroupBox("ORDER BY - Tri")
+        order_layout = QHBoxLayout()
+
+        self.order_column = QComboBox()
+        self.order_direction = QComboBox()
+        self.order_direction.addItems(["ASC", "DESC"])
+
+        order_layout.addWidget(QLabel("Colonne:"))
+        order_layout.addWidget(self.order_column)
+        order_layout.addWidget(QLabel("Direction:"))
+        order_layout.addWidget(self.order_direction)
+        order_group.setLayout(order_layout)
+
+        # Section LIMIT
+        limit_group = QGroupBox("LIMIT - Nombre de résultats")
+        limit_layout = QHBoxLayout()
+
+        self.limit_spin = QSpinBox()
+        self.limit_spin.setMaximum(10000)
+        self.limit_spin.setValue(100)
+
+        limit_layout.addWidget(QLabel("Limiter à:"))
+        limit_layout.addWidget(self.limit_spin)
+        limit_layout.addWidget(QLabel("lignes"))
+        limit_layout.addStretch()
+        limit_group.setLayout(limit_layout)
+
+        # Aperçu SQL
+        preview_group = QGroupBox("Aperçu de la requête SQL")
+        preview_layout = QVBoxLayout()
+
+        self.sql_preview = QTextEdit()
+        self.sql_preview.setReadOnly(True)
+        self.sql_preview.setMaximumHeight(100)
+        self.sql_preview.setFont(QFont('Consolas', 10))
+
+        preview_layout.addWidget(self.sql_preview)
+        preview_group.setLayout(preview_layout)
+
+        # Boutons
+        buttons_layout = QHBoxLayout()
+
+        self.test_btn = QPushButton("Tester la requête")
+        self.test_btn.clicked.connect(self.test_query)
+
+        self.insert_btn = QPushButton("Insérer dans l'éditeur")
+        self.insert_btn.clicked.connect(self.accept)
+
+        cancel_btn = QPushButton("Annuler")
+        cancel_btn.clicked.connect(self.reject)
+
+        self.query_progress = QueryProgressWidget()
+        self.query_progress.set_executor(self.executor)
+
+        buttons_layout.addWidget(self.query_progress)
+        buttons_layout.addWidget(self.test_btn)
+        buttons_layout.addWidget(self.insert_btn)
+        buttons_layout.addWidget(cancel_btn)
+
+        # Assembler le layout
+        layout.addWidget(select_group)
+        layout.addWidget(where_group)
+        layout.addWidget(order_group)
+        layout.addWidget(limit_group)
+        layout.addWidget(preview_group)
+        layout.addLayout(buttons_layout)
+
+        self.setLayout(layout)
+
+        # Connecter les signaux pour mettre à jour l'aperçu
+        self.columns_list.itemSelectionChanged.connect(self.update_preview)
+        self.order_column.currentTextChanged.connect(self.update_preview)
+        self.order_direction.currentTextChanged.connect(self.update_preview)
+        self.limit_spin.valueChanged.connect(self.update_preview)
+
+    def load_tables(self):
+        """Charger la liste des tables"""
+        self.table_combo.addItems(self.schema_cache.table_names())
+
+    def load_columns(self, table_name):
+        """Charger les colonnes d'une table"""
+        if not table_name:
+            return
+
+        self.columns_list.clear()
+        self.order_column.clear()
+
+        columns = self.schema_cache.column_names(table_name)
+
+        self.columns_list.addItem("*")
+        self.order_column.addItem("")
+
+        self.columns_list.addItems(columns)
+        self.order_column.addItems(columns)
+
+        self.update_preview()
+
+    def add_condition(self):
+        """Ajouter une ligne de condition"""
+        row = self.conditions_table.rowCount()
+        self.conditions_table.insertRow(row)
+
+        # Colonne
+        col_combo = QComboBox()
+        table_name = self.table_combo.currentText()
+        if table_name:
+            col_combo.addItems(self.schema_cache.column_names(table_name))
+
+        # Opérateur
+        op_combo = QComboBox()
+        op_combo.addItems(["=", "!=", ">", "<", ">=", "<=", "LIKE", "IN", "NOT IN"])
+
+        # Valeur
+        value_edit = QLineEdit()
+
+        # ET/OU
+        and_or_combo = QComboBox()
+        and_or_combo.addItems(["ET", "OU"])
+
+        self.conditions_table.setCellWidget(row, 0, col_combo)
+        self.conditions_table.setCellWidget(row, 1, op_combo)
+        self.conditions_table.setCellWidget(row, 2, value_edit)
+        self.conditions_table.setCellWidget(row, 3, and_or_combo)
+
+        # Connecter pour mettre à jour l'aperçu
+        col_combo.currentTextChanged.connect(self.update_preview)
+        op_combo.currentTextChanged.connect(self.update_preview)
+        value_edit.textChanged.connect(self.update_preview)
+        and_or_combo.currentTextChanged.connect(self.update_preview)
+
+    def update_preview(self):
+        """Mettre à jour l'aperçu SQL"""
+        table = self.table_combo.currentText()
+        if not table:
+            return
+
+        # SELECT
+        selected_items = self.columns_list.selectedItems()
+        if selected_items:
+            columns = ", ".join([item.text() for item in selected_items])
+        else:
+            columns = "*"
+
+        sql = f"SELECT {columns}\nFROM {table}"
+
+        # WHERE
+        conditions = []
+        for row in range(self.conditions_table.rowCount()):
+            col_widget = self.conditions_table.cellWidget(row, 0)
+            op_widget = self.conditions_table.cellWidget(row, 1)
+            val_widget = self.conditions_table.cellWidget(row, 2)
+            and_or_widget = self.conditions_table.cellWidget(row, 3)
+
+            if col_widget and op_widget and val_widget:
+                col = col_widget.currentText()
+                op = op_widget.currentText()
+                val = val_widget.text()
+
+                if col and val:
+                    # Ajouter des guillemets pour les chaînes
+                    if op in ["LIKE", "=", "!="] and not val.isdigit():
+                        val = f"'{val}'"
+
+                    condition = f"{col} {op} {val}"
+
+                    if row > 0 and and_or_widget:
+                        and_or = "AND" if and_or_widget.currentText() == "ET" else "OR"
+                        condition = f"{and_or} {condition}"
+
+                    conditions.append(condition)
+
+        if conditions:
+            sql += "\nWHERE " + " ".join(conditions)
+
+        # ORDER BY
+        order_col = self.order_column.currentText()
+        if order_col:
+            order_dir = self.order_direction.currentText()
+            sql += f"\nORDER BY {order_col} {order_dir}"
+
+        # LIMIT
+        limit = self.limit_spin.value()
+        if limit > 0:
+            sql += f"\nLIMIT {limit}"
+
+        self.sql_preview.setText(sql)
+
+    def test_query(self):
+        """Tester la requête"""
+        sql = self.sql_preview.toPlainText()
+        if not sql:
+            return
+
+        if self.executor is None:
+            try:
+                self.on_test_result(count_query_rows(self.db_connection, sql))
+            except Exception as e:
+                self.on_test_error(str(e))
+            return
+
+        self.test_btn.setEnabled(False)
+        self.executor.submit(lambda job: count_query_rows(job.connection, sql),
+                             description="Test de la requête...",
+                             on_result=self.on_test_result,
+                             on_error=self.on_test_error,
+                             on_cancel=lambda: self.test_btn.setEnabled(True))
+
+    def on_test_result(self, count):
+        """Afficher le résultat du test"""
+        self.test_btn.setEnabled(True)
+        msg = f"Requête exécutée avec succès!\n{count} lignes retournées."
+        QMessageBox.information(self, "Test réussi", msg)
+
+    def on_test_error(self, message):
+        """Afficher l'erreur du test"""
+        self.test_btn.setEnabled(True)
+        QMessageBox.critical(self, "Erreur", f"Erreur dans la requête:\n{message}")
+
+    def get_sql(self):
+        """Obtenir la requête SQL générée"""
+        return self.sql_preview.toPlainText()
@@ -127,17 +127,17 @@ with open('export_clients.csv', 'w', newline='', encoding='utf-8') as f:
     writer.writerows(cursor.fetchall())
 ''',
 
-            "Import CSV": '''# Importer depuis CSV
+            "Import CSV": '''# Importer depuis CSV (en une transaction, par lots)
+# Pour les gros fichiers : clic droit dans l'explorateur > Importer un CSV
 import csv
 
 with open('clients.csv', 'r', encoding='utf-8') as f:
     reader = csv.DictReader(f)
 
-    for row in reader:
-        cursor.execute("""
-            INSERT INTO clients (nom, prenom, email) 
-            VALUES (:nom, :prenom, :email)
-        """, row)
+    cursor.executemany("""
+        INSERT INTO clients (nom, prenom, email) 
+        VALUES (:nom, :prenom, :email)
+    """, reader)
 
     conn.commit()
 ''',
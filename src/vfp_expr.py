@@ -0,0 +1,748 @@
+# vfp_expr.py
+"""Module pour l'analyse et la traduction des expressions Visual FoxPro"""
+
+import datetime
+import functools
+import re
+import types
+from collections import namedtuple
+
+import vfp_functions
+from schema_cache import quote_identifier
+
+
+class VfpExprError(Exception):
+    """Expression non reconnue ou non traduisible"""
+
+
+# Arbre syntaxique : kind = field, variable, alias, number, string, bool, date,
+# null, call, unary, binary (un champ préfixé garde son alias dans args)
+Node = namedtuple('Node', 'kind value args')
+
+# Noms complets des fonctions (VFP accepte les abréviations de 4 lettres)
+FUNCTIONS = (
+    'ABS', 'ALEN', 'ALIAS', 'ALLTRIM', 'ASC', 'AT', 'BETWEEN', 'BINTOC', 'BOF',
+    'CDOW', 'CEILING', 'CHR', 'CMONTH', 'CTOD', 'CTOT', 'DATE', 'DATETIME', 'DAY',
+    'DELETED', 'DOW', 'DTOC', 'DTOS', 'EMPTY', 'EOF', 'EVALUATE', 'EXP', 'FILE', 'FLOOR',
+    'FOUND', 'GETENV', 'GOMONTH', 'IIF', 'INLIST', 'INT', 'ISNULL', 'LEFT', 'LEN',
+    'LOG', 'LOWER', 'LTRIM', 'MAX', 'MESSAGEBOX', 'MIN', 'MOD', 'MONTH', 'NVL',
+    'OCCURS', 'PADC', 'PADL', 'PADR', 'PI', 'PROPER', 'RAT', 'RECCOUNT', 'RECNO',
+    'REPLICATE', 'RIGHT', 'ROUND', 'RTRIM', 'SECONDS', 'SIGN', 'SPACE', 'SQRT',
+    'STR', 'STRTRAN', 'STUFF', 'SUBSTR', 'TIME', 'TRANSFORM', 'TRIM', 'TTOC',
+    'TTOD', 'UPPER', 'USED', 'VAL', 'VARTYPE', 'YEAR',
+)
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<logic>\.(?:AND|OR|NOT|T|F|Y|N)\.)
+  | (?P<number>\d+(?:\.\d*)?|\.\d+)
+  | (?P<date>\{\s*\^?[^}]*\})
+  | (?P<string>'[^']*'|"[^"]*"|\[[^\]]*\])
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*(?:(?:\.(?!(?:AND|OR|NOT|T|F|Y|N)\.)|->)[A-Za-z_][A-Za-z0-9_]*)?)
+  | (?P<op>==|<>|!=|<=|>=|\*\*|[-+*/%^=<>#$!(),])
+""", re.VERBOSE | re.IGNORECASE)
+
+# Puissance de liaison des opérateurs binaires (du plus faible au plus fort)
+_BINARY = {
+    'OR': 1, 'AND': 2,
+    '=': 4, '==': 4, '<>': 4, '!=': 4, '#': 4, '<': 4, '>': 4, '<=': 4, '>=': 4, '$': 4,
+    '+': 5, '-': 5, '*': 6, '/': 6, '%': 6, '^': 7, '**': 7,
+}
+_NOT_POWER = 3
+_NEGATE_POWER = 8
+
+
+def tokenize(text):
+    """Découper une expression en jetons (type, valeur)"""
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match:
+            raise VfpExprError(f"caractère inattendu '{text[position]}' dans « {text} »")
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group()
+        if kind == 'space':
+            continue
+        if kind == 'logic':
+            word = value.strip('.').upper()
+            if word in ('T', 'Y'):
+                tokens.append(('bool', True))
+            elif word in ('F', 'N'):
+                tokens.append(('bool', False))
+            else:
+                tokens.append(('op', word))
+        elif kind == 'name' and value.upper() in ('AND', 'OR', 'NOT'):
+            tokens.append(('op', value.upper()))
+        elif kind == 'op' and value == '!':
+            tokens.append(('op', 'NOT'))
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+
+def function_name(name):
+    """Nom complet d'une fonction, abréviation comprise"""
+    name = name.upper()
+    if name in FUNCTIONS:
+        return name
+    if len(name) >= 4:
+        for full in FUNCTIONS:
+            if full.startswith(name):
+                return full
+    return name
+
+
+class _Parser:
+    """Analyseur à précédence d'opérateurs"""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        token = self.peek()
+        if token[0] is None or (value is not None and token[1] != value):
+            raise VfpExprError(f"« {value or 'expression'} » attendu dans « {self.text} »")
+        self.position += 1
+        return token
+
+    def parse(self):
+        node = self.expression(0)
+        if self.position != len(self.tokens):
+            raise VfpExprError(f"jeton inattendu '{self.peek()[1]}' dans « {self.text} »")
+        return node
+
+    def expression(self, power):
+        left = self.prefix()
+        while True:
+            kind, value = self.peek()
+            if kind != 'op' or value not in _BINARY or _BINARY[value] <= power:
+                return left
+            self.take()
+            operator = '^' if value == '**' else value
+            # ^ est associatif à droite
+            right = self.expression(_BINARY[value] - (1 if operator == '^' else 0))
+            left = Node('binary', operator, (left, right))
+
+    def prefix(self):
+        kind, value = self.take()
+        if kind == 'number':
+            return Node('number', float(value) if '.' in value else int(value), ())
+        if kind == 'string':
+            return Node('string', value[1:-1], ())
+        if kind == 'bool':
+            return Node('bool', value, ())
+        if kind == 'date':
+            text = value.strip('{} ^')
+            if not text:
+                return Node('null', None, ())
+            match = re.match(r'(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})(?:[ ,T]+(.*))?$', text)
+            if not match:
+                raise VfpExprError(f"date non reconnue {value}")
+            year, month, day, time = match.groups()
+            iso = f"{year}-{int(month):02d}-{int(day):02d}"
+            return Node('date', f"{iso} {time}" if time else iso, ())
+        if kind == 'op' and value == '(':
+            node = self.expression(0)
+            self.take(')')
+            return node
+        if kind == 'op' and value == 'NOT':
+            return Node('unary', 'NOT', (self.expression(_NOT_POWER),))
+        if kind == 'op' and value in ('-', '+'):
+            operand = self.expression(_NEGATE_POWER)
+            return operand if value == '+' else Node('unary', '-', (operand,))
+        if kind == 'name':
+            if self.peek() == ('op', '('):
+                self.take('(')
+                args = []
+                if self.peek() != ('op', ')'):
+                    args.append(self.expression(0))
+                    while self.peek() == ('op', ','):
+                        self.take(',')
+                        args.append(self.expression(0))
+                self.take(')')
+                return Node('call', function_name(value), tuple(args))
+            if value.upper() == 'NULL':
+                return Node('null', None, ())
+            parts = re.split(r'\.|->', value.upper())
+            if len(parts) == 1:
+                return Node('field', parts[0], ())
+            # m.nom : variable mémoire ; alias.champ ou alias->champ
+            if parts[0] == 'M':
+                return Node('variable', parts[1], ())
+            return Node('field', parts[1], (Node('alias', parts[0], ()),))
+        raise VfpExprError(f"jeton inattendu '{value}' dans « {self.text} »")
+
+
+def parse(text):
+    """Analyser une expression VFP"""
+    if not text or not text.strip():
+        raise VfpExprError("expression vide")
+    return _Parser(text.strip()).parse()
+
+
+def field_names(node):
+    """Champs utilisés par une expression, dans l'ordre d'apparition"""
+    names = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.kind == 'field' and current.value not in names:
+            names.append(current.value)
+        stack.extend(reversed(current.args))
+    return names
+
+
+def simplify(node):
+    """Remplacer DELETED() par faux (les enregistrements supprimés ne sont
+    pas migrés) et réduire les opérations logiques constantes"""
+    if node.kind == 'call' and node.value == 'DELETED':
+        return Node('bool', False, ())
+    if not node.args:
+        return node
+
+    args = tuple(simplify(arg) for arg in node.args)
+    constants = [arg.value if arg.kind == 'bool' else None for arg in args]
+
+    if node.kind == 'unary' and node.value == 'NOT' and constants[0] is not None:
+        return Node('bool', not constants[0], ())
+    if node.kind == 'binary' and node.value in ('AND', 'OR'):
+        absorbing = node.value == 'OR'
+        if absorbing in constants:
+            return Node('bool', absorbing, ())
+        if constants[0] is not None:
+            return args[1]
+        if constants[1] is not None:
+            return args[0]
+    return Node(node.kind, node.value, args)
+
+
+# Traduction en SQL
+
+# Résultat intermédiaire : texte SQL, type VFP (C, N, D, T, L), largeur fixe éventuelle
+_Sql = namedtuple('_Sql', 'sql type width padded')
+
+_FIELD_TYPES = {
+    'C': 'C', 'V': 'C', 'M': 'C', 'N': 'N', 'F': 'N', 'I': 'N', '+': 'N',
+    'B': 'N', 'Y': 'N', 'D': 'D', 'T': 'T', 'L': 'L',
+}
+
+
+def quote_string(text):
+    """Littéral chaîne SQL"""
+    return "'" + text.replace("'", "''") + "'"
+
+
+class SqlTranslator:
+    """Traduction d'une expression VFP en expression SQLite
+
+    fields associe le nom VFP (majuscules) d'un champ à son descripteur
+    (type, longueur, décimales) ; les colonnes SQLite portent le nom du champ
+    en minuscules. Les valeurs des champs caractères sont stockées sans les
+    espaces de fin : dans une concaténation, elles sont complétées à leur
+    largeur VFP pour que la clé ait le même ordre que l'index d'origine.
+    """
+
+    def __init__(self, fields):
+        self.fields = {name.upper(): field for name, field in fields.items()}
+
+    def translate(self, node):
+        """Retourner le texte SQL d'une expression"""
+        return self.emit(node).sql
+
+    def emit(self, node):
+        method = getattr(self, f'emit_{node.kind}', None)
+        if method is None:
+            raise VfpExprError(f"élément {node.kind} non traduit en SQL")
+        return method(node)
+
+    def emit_field(self, node):
+        field = self.fields.get(node.value)
+        if field is None:
+            raise VfpExprError(f"champ inconnu {node.value}")
+        kind = _FIELD_TYPES.get(field.type)
+        if kind is None:
+            raise VfpExprError(f"type de champ non pris en charge {field.type}")
+        width = field.length if kind == 'C' and field.type != 'M' else None
+        return _Sql(quote_identifier(node.value.lower()), kind, width, False)
+
+    def emit_number(self, node):
+        return _Sql(repr(node.value), 'N', None, True)
+
+    def emit_string(self, node):
+        return _Sql(quote_string(node.value), 'C', len(node.value), True)
+
+    def emit_bool(self, node):
+        return _Sql('1' if node.value else '0', 'L', None, True)
+
+    def emit_date(self, node):
+        return _Sql(quote_string(node.value), 'T' if ' ' in node.value else 'D', None, True)
+
+    def emit_null(self, node):
+        return _Sql('NULL', 'C', None, True)
+
+    def emit_unary(self, node):
+        operand = self.emit(node.args[0])
+        if node.value == 'NOT':
+            return _Sql(f"(NOT {operand.sql})", 'L', None, True)
+        return _Sql(f"(-{operand.sql})", 'N', None, True)
+
+    def emit_binary(self, node):
+        left, right = self.operands(node)
+        operator = node.value
+
+        if operator in ('AND', 'OR'):
+            return _Sql(f"({left.sql} {operator} {right.sql})", 'L', None, True)
+        if operator == '$':
+            return _Sql(f"(instr({right.sql}, {left.sql}) > 0)", 'L', None, True)
+        if operator in ('=', '==', '<>', '!=', '#', '<', '>', '<=', '>='):
+            return self.compare(operator, left, right)
+
+        if operator in ('+', '-') and left.type == 'C' and right.type == 'C':
+            if operator == '-':
+                # Concaténation avec déplacement des espaces de fin
+                return _Sql(f"(rtrim({left.sql}) || {right.sql})", 'C', None, True)
+            left, right = self.pad(left), self.pad(right)
+            width = left.width + right.width if left.width and right.width else None
+            return _Sql(f"({left.sql} || {right.sql})", 'C', width, True)
+        if left.type in ('D', 'T') and operator in ('+', '-') and right.type == 'N':
+            sign = '' if operator == '+' else '-'
+            function = 'date' if left.type == 'D' else 'datetime'
+            unit = 'days' if left.type == 'D' else 'seconds'
+            return _Sql(f"{function}({left.sql}, {sign}{right.sql} || ' {unit}')", left.type, None, True)
+        if left.type == 'N' and right.type == 'N':
+            if operator == '^':
+                raise VfpExprError("puissance non traduite")
+            return _Sql(f"({left.sql} {operator} {right.sql})", 'N', None, True)
+        raise VfpExprError(f"opérateur {operator} non traduit pour {left.type}/{right.type}")
+
+    def operands(self, node):
+        """Opérandes d'une opération binaire"""
+        return self.emit(node.args[0]), self.emit(node.args[1])
+
+    def compare(self, operator, left, right):
+        """Comparaison : = sur des chaînes suit SET EXACT OFF, comme vfp.eq()"""
+        if operator in ('=', '<>', '!=', '#') and left.type == 'C' and right.type == 'C':
+            # La valeur commence par celle de droite (sans ses espaces de fin)
+            sign = '=' if operator == '=' else '<>'
+            return _Sql(f"(instr({left.sql}, rtrim({right.sql})) {sign} 1)", 'L', None, True)
+        sql_operator = {'==': '=', '!=': '<>', '#': '<>'}.get(operator, operator)
+        return _Sql(f"({left.sql} {sql_operator} {right.sql})", 'L', None, True)
+
+    def pad(self, value):
+        """Compléter une chaîne à sa largeur VFP"""
+        if value.padded or not value.width:
+            return value
+        return _Sql(f"printf('%-{value.width}s', {value.sql})", 'C', value.width, True)
+
+    def emit_call(self, node):
+        name = node.value
+        args = [self.emit(arg) for arg in node.args]
+        method = getattr(self, f'call_{name.lower()}', None)
+        if method is None:
+            raise VfpExprError(f"fonction {name}() non traduite")
+        try:
+            return method(args, node.args)
+        except (IndexError, TypeError):
+            raise VfpExprError(f"arguments de {name}() non reconnus")
+
+    @staticmethod
+    def literal(node):
+        """Valeur d'un argument numérique littéral"""
+        if node.kind != 'number':
+            raise VfpExprError("argument numérique littéral attendu")
+        return int(node.value)
+
+    def call_upper(self, args, nodes):
+        return args[0]._replace(sql=f"upper({args[0].sql})")
+
+    def call_lower(self, args, nodes):
+        return args[0]._replace(sql=f"lower({args[0].sql})")
+
+    def call_alltrim(self, args, nodes):
+        return _Sql(f"trim({args[0].sql})", 'C', None, True)
+
+    def call_ltrim(self, args, nodes):
+        return _Sql(f"ltrim({args[0].sql})", 'C', None, True)
+
+    def call_rtrim(self, args, nodes):
+        return _Sql(f"rtrim({args[0].sql})", 'C', None, True)
+
+    call_trim = call_rtrim
+
+    def call_substr(self, args, nodes):
+        if len(args) > 2:
+            width = self.literal(nodes[2]) if nodes[2].kind == 'number' else None
+            return _Sql(f"substr({self.pad(args[0]).sql}, {args[1].sql}, {args[2].sql})",
+                        'C', width, False)
+        return _Sql(f"substr({self.pad(args[0]).sql}, {args[1].sql})", 'C', None, True)
+
+    def call_left(self, args, nodes):
+        width = self.literal(nodes[1]) if nodes[1].kind == 'number' else None
+        return _Sql(f"substr({args[0].sql}, 1, {args[1].sql})", 'C', width, False)
+
+    def call_right(self, args, nodes):
+        width = self.literal(nodes[1])
+        return _Sql(f"substr({self.pad(args[0]).sql}, -{width})", 'C', width, True)
+
+    def call_str(self, args, nodes):
+        width = self.literal(nodes[1]) if len(nodes) > 1 else 10
+        decimals = self.literal(nodes[2]) if len(nodes) > 2 else 0
+        return _Sql(f"printf('%{width}.{decimals}f', {args[0].sql})", 'C', width, True)
+
+    def call_padl(self, args, nodes):
+        width = self.literal(nodes[1])
+        return _Sql(f"printf('%{width}.{width}s', {args[0].sql})", 'C', width, True)
+
+    def call_padr(self, args, nodes):
+        width = self.literal(nodes[1])
+        return _Sql(f"printf('%-{width}.{width}s', {args[0].sql})", 'C', width, True)
+
+    def call_dtos(self, args, nodes):
+        return _Sql(f"replace(substr({args[0].sql}, 1, 10), '-', '')", 'C', 8, True)
+
+    def call_dtoc(self, args, nodes):
+        if len(nodes) < 2 or self.literal(nodes[1]) != 1:
+            raise VfpExprError("DTOC() dépend de SET DATE")
+        return self.call_dtos(args, nodes)
+
+    def call_ttoc(self, args, nodes):
+        if len(nodes) < 2 or self.literal(nodes[1]) != 1:
+            raise VfpExprError("TTOC() dépend de SET DATE")
+        return _Sql(f"replace(replace(replace({args[0].sql}, '-', ''), ' ', ''), ':', '')",
+                    'C', 14, True)
+
+    def call_ttod(self, args, nodes):
+        return _Sql(f"substr({args[0].sql}, 1, 10)", 'D', None, True)
+
+    def call_year(self, args, nodes):
+        return _Sql(f"CAST(strftime('%Y', {args[0].sql}) AS INTEGER)", 'N', None, True)
+
+    def call_month(self, args, nodes):
+        return _Sql(f"CAST(strftime('%m', {args[0].sql}) AS INTEGER)", 'N', None, True)
+
+    def call_day(self, args, nodes):
+        return _Sql(f"CAST(strftime('%d', {args[0].sql}) AS INTEGER)", 'N', None, True)
+
+    def call_val(self, args, nodes):
+        return _Sql(f"CAST({args[0].sql} AS REAL)", 'N', None, True)
+
+    def call_int(self, args, nodes):
+        return _Sql(f"CAST({args[0].sql} AS INTEGER)", 'N', None, True)
+
+    def call_abs(self, args, nodes):
+        return _Sql(f"abs({args[0].sql})", 'N', None, True)
+
+    def call_round(self, args, nodes):
+        return _Sql(f"round({args[0].sql}, {args[1].sql})", 'N', None, True)
+
+    def call_mod(self, args, nodes):
+        return _Sql(f"({args[0].sql} % {args[1].sql})", 'N', None, True)
+
+    def call_len(self, args, nodes):
+        return _Sql(f"length({self.pad(args[0]).sql})", 'N', None, True)
+
+    def call_bintoc(self, args, nodes):
+        # Représentation binaire ordonnée comme l'entier : la valeur suffit
+        return args[0]
+
+    def call_chr(self, args, nodes):
+        return _Sql(f"char({args[0].sql})", 'C', 1, True)
+
+    def call_asc(self, args, nodes):
+        return _Sql(f"unicode({args[0].sql})", 'N', None, True)
+
+    def call_space(self, args, nodes):
+        width = self.literal(nodes[0])
+        return _Sql(quote_string(' ' * width), 'C', width, True)
+
+    def call_iif(self, args, nodes):
+        return _Sql(f"(CASE WHEN {args[0].sql} THEN {args[1].sql} ELSE {args[2].sql} END)",
+                    args[1].type, args[1].width, args[1].padded)
+
+    def call_nvl(self, args, nodes):
+        return _Sql(f"coalesce({args[0].sql}, {args[1].sql})", args[0].type,
+                    args[0].width, args[0].padded)
+
+    def call_isnull(self, args, nodes):
+        return _Sql(f"({args[0].sql} IS NULL)", 'L', None, True)
+
+    def call_empty(self, args, nodes):
+        value = args[0]
+        if value.type == 'C':
+            return _Sql(f"(coalesce(trim({value.sql}), '') = '')", 'L', None, True)
+        if value.type in ('N', 'L'):
+            return _Sql(f"(coalesce({value.sql}, 0) = 0)", 'L', None, True)
+        return _Sql(f"(coalesce({value.sql}, '') = '')", 'L', None, True)
+
+    def call_between(self, args, nodes):
+        return _Sql(f"({args[0].sql} BETWEEN {args[1].sql} AND {args[2].sql})", 'L', None, True)
+
+    def call_inlist(self, args, nodes):
+        values = ", ".join(arg.sql for arg in args[1:])
+        return _Sql(f"({args[0].sql} IN ({values}))", 'L', None, True)
+
+    def call_min(self, args, nodes):
+        return _Sql(f"min({', '.join(arg.sql for arg in args)})", args[0].type, None, True)
+
+    def call_max(self, args, nodes):
+        return _Sql(f"max({', '.join(arg.sql for arg in args)})", args[0].type, None, True)
+
+
+def to_sql(text, fields):
+    """Traduire une expression VFP en SQL (fields : nom -> descripteur)"""
+    return SqlTranslator(fields).translate(simplify(parse(text)))
+
+
+# Traduction en Python
+
+# Résultat intermédiaire : code Python, type VFP (C, N, D, T, L) ou None si
+# inconnu, largeur VFP d'une chaîne lue sans ses espaces de fin (champ C)
+_Py = namedtuple('_Py', 'code type width', defaults=(None,))
+
+# Fonctions qui portent sur la zone de travail courante (méthodes de la session)
+WORK_AREA_FUNCTIONS = ('ALIAS', 'BOF', 'DELETED', 'EOF', 'EVALUATE', 'FOUND', 'RECCOUNT', 'RECNO',
+                       'USED')
+
+# Type du résultat des fonctions (les autres sont numériques)
+_RESULT_TYPES = {
+    'ALIAS': 'C', 'ALLTRIM': 'C', 'CDOW': 'C', 'CHR': 'C', 'CMONTH': 'C', 'DTOC': 'C',
+    'DTOS': 'C', 'GETENV': 'C', 'LEFT': 'C', 'LOWER': 'C', 'LTRIM': 'C', 'PADC': 'C',
+    'PADL': 'C', 'PADR': 'C', 'PROPER': 'C', 'REPLICATE': 'C', 'RIGHT': 'C', 'RTRIM': 'C',
+    'SPACE': 'C', 'STR': 'C', 'STRTRAN': 'C', 'STUFF': 'C', 'SUBSTR': 'C', 'TIME': 'C',
+    'TRANSFORM': 'C', 'TRIM': 'C', 'TTOC': 'C', 'UPPER': 'C', 'VARTYPE': 'C',
+    'CTOD': 'D', 'DATE': 'D', 'GOMONTH': 'D', 'TTOD': 'D', 'CTOT': 'T', 'DATETIME': 'T',
+    'BETWEEN': 'L', 'BOF': 'L', 'DELETED': 'L', 'EMPTY': 'L', 'EOF': 'L', 'FILE': 'L',
+    'FOUND': 'L', 'INLIST': 'L', 'ISNULL': 'L', 'USED': 'L', 'EVALUATE': None,
+}
+
+
+class PythonTranslator:
+    """Traduction d'une expression VFP en expression Python
+
+    Les fonctions VFP sont celles du module vfp_functions, importé sous le
+    nom vfp ; les fonctions de la zone de travail (EOF(), RECNO()...) sont
+    des méthodes de la session. resolve(node) donne le code d'un champ ou
+    d'une variable, call(nom, [codes]) celui d'une fonction du programme.
+    Sans type connu, les opérateurs dont le sens dépend des types (+ sur
+    les dates, = sur les chaînes) passent par vfp.add(), vfp.eq()... Comme
+    dans SqlTranslator, les champs caractères sont complétés à leur largeur
+    dans une concaténation et dans SUBSTR(), RIGHT() et LEN().
+    """
+
+    def __init__(self, resolve, call=None, fields=None, session='S'):
+        self.resolve = resolve
+        self.call = call
+        self.fields = {name.upper(): field for name, field in (fields or {}).items()}
+        self.session = session
+
+    def translate(self, node):
+        """Retourner le code Python d'une expression"""
+        return self.emit(node).code
+
+    def emit(self, node):
+        method = getattr(self, f'emit_{node.kind}', None)
+        if method is None:
+            raise VfpExprError(f"élément {node.kind} non traduit en Python")
+        return method(node)
+
+    def emit_field(self, node):
+        field = self.fields.get(node.value) if not node.args else None
+        kind = _FIELD_TYPES.get(field.type) if field else None
+        width = field.length if kind == 'C' and field.type != 'M' else None
+        return _Py(self.resolve(node), kind, width or None)
+
+    @staticmethod
+    def pad(value):
+        """Compléter une chaîne à sa largeur VFP (SqlTranslator.pad)"""
+        if not value.width:
+            return value
+        return _Py(f"vfp.fixed({value.code}, {value.width})", 'C')
+
+    def emit_variable(self, node):
+        return _Py(self.resolve(node), None)
+
+    def emit_number(self, node):
+        return _Py(repr(node.value), 'N')
+
+    def emit_string(self, node):
+        return _Py(repr(node.value), 'C')
+
+    def emit_bool(self, node):
+        return _Py(repr(node.value), 'L')
+
+    def emit_null(self, node):
+        return _Py('None', None)
+
+    def emit_date(self, node):
+        match = re.match(r'(\d+)-(\d+)-(\d+)(?: (\d+):(\d+)(?::(\d+))?\s*([AP]M)?)?$',
+                         node.value, re.IGNORECASE)
+        if not match:
+            raise VfpExprError(f"date non reconnue {node.value}")
+        year, month, day, hour, minute, second, meridian = match.groups()
+        if hour is None:
+            return _Py(f"datetime.date({int(year)}, {int(month)}, {int(day)})", 'D')
+        hour = int(hour)
+        if meridian:
+            hour = hour % 12 + (12 if meridian.upper() == 'PM' else 0)
+        return _Py(f"datetime.datetime({int(year)}, {int(month)}, {int(day)}, "
+                   f"{hour}, {int(minute)}, {int(second or 0)})", 'T')
+
+    def emit_unary(self, node):
+        operand = self.emit(node.args[0])
+        if node.value == 'NOT':
+            return _Py(f"(not {operand.code})", 'L')
+        return _Py(f"(-{operand.code})", 'N')
+
+    def emit_binary(self, node):
+        left, right = self.emit(node.args[0]), self.emit(node.args[1])
+        operator = node.value
+        types = {left.type, right.type}
+
+        if operator in ('AND', 'OR'):
+            return _Py(f"({left.code} {operator.lower()} {right.code})", 'L')
+        if operator == '$':
+            return _Py(f"({left.code} in {right.code})", 'L')
+        if operator in ('=', '<>', '!=', '#'):
+            # = compare les chaînes comme SET EXACT OFF
+            if 'C' in types or None in types:
+                code = f"vfp.eq({left.code}, {right.code})"
+                return _Py(code if operator == '=' else f"(not {code})", 'L')
+            return _Py(f"({left.code} {'==' if operator == '=' else '!='} {right.code})", 'L')
+        if operator in ('==', '<', '>', '<=', '>='):
+            return _Py(f"({left.code} {operator} {right.code})", 'L')
+
+        if operator == '+':
+            if 'C' in types:
+                return _Py(f"({self.pad(left).code} + {self.pad(right).code})", 'C')
+            if types == {'N'}:
+                return _Py(f"({left.code} + {right.code})", 'N')
+            return _Py(f"vfp.add({left.code}, {right.code})", left.type)
+        if operator == '-':
+            if types == {'N'}:
+                return _Py(f"({left.code} - {right.code})", 'N')
+            result = 'N' if types <= {'D', 'T'} and len(types) == 1 else left.type
+            return _Py(f"vfp.sub({left.code}, {right.code})", result)
+        python_operator = '**' if operator == '^' else operator
+        return _Py(f"({left.code} {python_operator} {right.code})", 'N')
+
+    def emit_call(self, node):
+        name = node.value
+        args = [self.emit(arg) for arg in node.args]
+        if name in ('SUBSTR', 'RIGHT', 'LEN') and args:
+            args[0] = self.pad(args[0])
+        codes = ", ".join(arg.code for arg in args)
+
+        if name == 'IIF':
+            if len(args) != 3:
+                raise VfpExprError("IIF() attend trois arguments")
+            return _Py(f"({args[1].code} if {args[0].code} else {args[2].code})",
+                       args[1].type or args[2].type, args[1].width)
+        if name in WORK_AREA_FUNCTIONS:
+            return _Py(f"{self.session}.{name.lower()}({codes})", _RESULT_TYPES.get(name, 'N'))
+        if name in FUNCTIONS:
+            width = None
+            if name in ('MAX', 'MIN', 'NVL'):
+                kind = args[0].type if args else None
+            else:
+                kind = _RESULT_TYPES.get(name, 'N')
+            if name in ('UPPER', 'LOWER', 'NVL') and args:
+                width = args[0].width
+            elif name in ('LEFT', 'SUBSTR') and len(node.args) > (1 if name == 'LEFT' else 2):
+                # Longueur littérale : chaîne à compléter, comme en SQL
+                length = node.args[-1]
+                width = int(length.value) if length.kind == 'number' else None
+            return _Py(f"vfp.{name.lower()}({codes})", kind, width)
+        if self.call is None:
+            raise VfpExprError(f"fonction {name}() inconnue")
+        return _Py(self.call(name, [arg.code for arg in args]), None)
+
+
+def to_python(text, resolve, call=None, fields=None):
+    """Traduire une expression VFP en Python (voir PythonTranslator)"""
+    return PythonTranslator(resolve, call, fields).translate(simplify(parse(text)))
+
+
+# Compilation des expressions évaluées par enregistrement
+
+# Expressions compilées gardées en mémoire (LRU)
+COMPILE_CACHE_SIZE = 4096
+
+# Expression compilée : fonction Python, texte SQL (None si non traduisible)
+# et type VFP du résultat (None si inconnu)
+CompiledExpression = namedtuple('CompiledExpression', 'text function sql type')
+
+_NO_VARIABLES = types.MappingProxyType({})
+
+
+def _aliased_field(record, alias, name):
+    """Champ préfixé par un alias : zone de la session, sinon l'enregistrement"""
+    area = getattr(record, 'area', None)
+    return area(alias)[name] if callable(area) else record[name]
+
+
+def compile_expression(text, fields=None):
+    """Compiler une expression VFP (clé d'index, filtre, ControlSource...)
+
+    Retourne une CompiledExpression dont la fonction reçoit l'enregistrement
+    (dictionnaire à clés en minuscules, sqlite3.Row, curseur ou session de
+    vfp_runtime) et le dictionnaire des variables m.nom. Avec fields (nom
+    -> descripteur de champ), les autres noms sont des variables, les types
+    guident les opérateurs et l'expression est aussi traduite en SQL si
+    elle ne porte que sur les champs. Le résultat est gardé en cache par
+    texte et structure : une expression évaluée sur des millions
+    d'enregistrements n'est analysée qu'une fois.
+    """
+    items = None
+    if fields is not None:
+        items = tuple(sorted((name.upper(), field) for name, field in fields.items()))
+    return _compile(text.strip(), items)
+
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _compile(text, items):
+    fields = dict(items) if items is not None else None
+    node = simplify(parse(text))
+
+    def resolve(node):
+        name = node.value.lower()
+        if node.kind == 'variable' or (fields is not None and not node.args
+                                       and node.value not in fields):
+            return f"V[{name!r}]"
+        if node.args:
+            return f"_field(R, {node.args[0].value.lower()!r}, {name!r})"
+        return f"R[{name!r}]"
+
+    result = PythonTranslator(resolve, fields=fields, session='R').emit(node)
+    namespace = {'vfp': vfp_functions, 'datetime': datetime, '_field': _aliased_field,
+                 '_V': _NO_VARIABLES}
+    function = eval(compile(f"lambda R, V=_V: {result.code}", f"<vfp: {text}>", 'eval'),
+                    namespace)
+
+    sql = None
+    aliased = any(current.kind == 'alias' for current in _walk(node))
+    if fields is not None and not aliased:
+        try:
+            sql = SqlTranslator(fields).translate(node)
+        except VfpExprError:
+            sql = None
+    return CompiledExpression(text, function, sql, result.type)
+
+
+def _walk(node):
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(current.args)
+
+
+def compile_cache_info():
+    """Statistiques du cache des expressions compilées"""
+    return _compile.cache_info()
@@ -0,0 +1,482 @@
+# vfp_functions.py
+"""Module pour les fonctions Visual FoxPro utilisées par le code traduit"""
+
+import builtins
+import datetime as dt
+import math
+import os
+import time as _time
+
+
+# Noms des jours et des mois (CDOW, CMONTH)
+DAY_NAMES = ('Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday')
+MONTH_NAMES = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December')
+
+
+# Opérateurs dont le sens dépend des types
+
+def eq(left, right):
+    """Opérateur = : une chaîne est égale à toute chaîne qui commence par la
+    valeur de droite (SET EXACT OFF)"""
+    if isinstance(left, builtins.str) and isinstance(right, builtins.str):
+        return left.startswith(right.rstrip()) if right.strip() else True
+    return left == right
+
+
+def add(left, right):
+    """Opérateur + : date + jours, datetime + secondes, sinon addition"""
+    if isinstance(left, dt.datetime):
+        return left + dt.timedelta(seconds=right)
+    if isinstance(left, dt.date):
+        return left + dt.timedelta(days=right)
+    return left + right
+
+
+def sub(left, right):
+    """Opérateur - : écart entre dates, concaténation avec déplacement des
+    espaces (chaînes), sinon soustraction"""
+    if isinstance(left, builtins.str):
+        return left.rstrip() + right + ' ' * (builtins.len(left) - builtins.len(left.rstrip()))
+    if isinstance(left, dt.datetime):
+        if isinstance(right, dt.datetime):
+            return (left - right).total_seconds()
+        return left - dt.timedelta(seconds=right)
+    if isinstance(left, dt.date):
+        if isinstance(right, dt.date):
+            return (left - right).days
+        return left - dt.timedelta(days=right)
+    return left - right
+
+
+def for_range(start, stop, step=1):
+    """Valeurs d'une boucle FOR ... TO ... STEP (bornes incluses)"""
+    if not step:
+        raise ValueError("STEP 0")
+    value = start
+    while (value <= stop) if step > 0 else (value >= stop):
+        yield value
+        value += step
+
+
+def dimension(rows, columns=None):
+    """DIMENSION tableau(lignes[, colonnes]) : éléments initialisés à .F."""
+    if columns:
+        return [[False] * builtins.int(columns) for _ in range(builtins.int(rows))]
+    return [False] * builtins.int(rows)
+
+
+# Chaînes
+
+def alltrim(text):
+    return None if text is None else text.strip()
+
+
+def ltrim(text):
+    return None if text is None else text.lstrip()
+
+
+def rtrim(text):
+    return None if text is None else text.rstrip()
+
+
+trim = rtrim
+
+
+def upper(text):
+    return None if text is None else text.upper()
+
+
+def lower(text):
+    return None if text is None else text.lower()
+
+
+def proper(text):
+    return None if text is None else text.title()
+
+
+def substr(text, start, length=None):
+    if text is None:
+        return None
+    start = builtins.int(start) - 1
+    return text[start:] if length is None else text[start:start + builtins.int(length)]
+
+
+def left(text, length):
+    return None if text is None else text[:builtins.max(builtins.int(length), 0)]
+
+
+def right(text, length):
+    length = builtins.int(length)
+    return None if text is None else (text[-length:] if length > 0 else '')
+
+
+def len(text):
+    return None if text is None else builtins.len(text)
+
+
+def at(search, text, occurrence=1):
+    """Position (1..n) de la n-ième occurrence, 0 si absente"""
+    position = -1
+    for _ in range(builtins.int(occurrence)):
+        position = text.find(search, position + 1)
+        if position < 0:
+            return 0
+    return position + 1
+
+
+def rat(search, text, occurrence=1):
+    position = builtins.len(text)
+    for _ in range(builtins.int(occurrence)):
+        position = text.rfind(search, 0, position)
+        if position < 0:
+            return 0
+    return position + 1
+
+
+def occurs(search, text):
+    return text.count(search) if search else 0
+
+
+def strtran(text, search, replacement='', start=1, count=-1):
+    if text is None:
+        return None
+    if start == 1:
+        return text.replace(search, replacement, builtins.int(count))
+    # Remplacer à partir de la start-ième occurrence
+    head = at(search, text, start)
+    if not head:
+        return text
+    return text[:head - 1] + text[head - 1:].replace(search, replacement, builtins.int(count))
+
+
+def stuff(text, start, count, replacement):
+    start = builtins.int(start) - 1
+    return text[:start] + replacement + text[start + builtins.int(count):]
+
+
+def space(count):
+    return ' ' * builtins.int(count)
+
+
+def replicate(text, count):
+    return text * builtins.int(count)
+
+
+def padl(value, width, fill=' '):
+    text = transform(value)
+    return text[:builtins.int(width)].rjust(builtins.int(width), fill)
+
+
+def padr(value, width, fill=' '):
+    text = transform(value)
+    return text[:builtins.int(width)].ljust(builtins.int(width), fill)
+
+
+def fixed(text, width):
+    """Champ caractère complété à sa largeur (NULL : espaces, comme printf() de SQLite)"""
+    return (text or '').ljust(builtins.int(width))
+
+
+def padc(value, width, fill=' '):
+    text = transform(value)
+    return text[:builtins.int(width)].center(builtins.int(width), fill)
+
+
+def chr(code):
+    return bytes([builtins.int(code)]).decode('cp1252')
+
+
+def asc(text):
+    return ord(text[0]) if text else 0
+
+
+def str(value, width=10, decimals=0):
+    """STR() : nombre justifié à droite, étoiles s'il dépasse la largeur"""
+    if value is None:
+        return None
+    text = f"{value:{builtins.int(width)}.{builtins.int(decimals)}f}"
+    return text if builtins.len(text) <= width else '*' * builtins.int(width)
+
+
+def val(text):
+    """VAL() : nombre au début de la chaîne, 0 sinon"""
+    text = (text or '').strip()
+    end = 0
+    for i, char in enumerate(text):
+        if char.isdigit() or char == '.' or (i == 0 and char in '+-'):
+            end = i + 1
+        else:
+            break
+    try:
+        return float(text[:end]) if end else 0.0
+    except ValueError:
+        return 0.0
+
+
+def transform(value, picture=None):
+    """TRANSFORM() sans masque : représentation VFP d'une valeur"""
+    if value is None:
+        return '.NULL.'
+    if isinstance(value, bool):
+        return '.T.' if value else '.F.'
+    if isinstance(value, dt.datetime):
+        return value.strftime('%m/%d/%Y %I:%M:%S %p')
+    if isinstance(value, dt.date):
+        return value.strftime('%m/%d/%Y')
+    if isinstance(value, float) and value.is_integer():
+        return repr(builtins.int(value))
+    return builtins.str(value)
+
+
+# Nombres
+
+def abs(value):
+    return None if value is None else builtins.abs(value)
+
+
+def int(value):
+    return None if value is None else math.trunc(value)
+
+
+def round(value, decimals=0):
+    if value is None:
+        return None
+    return builtins.round(value, builtins.int(decimals))
+
+
+def mod(value, divisor):
+    return value % divisor
+
+
+def sign(value):
+    return (value > 0) - (value < 0)
+
+
+def sqrt(value):
+    return math.sqrt(value)
+
+
+def ceiling(value):
+    return math.ceil(value)
+
+
+def floor(value):
+    return math.floor(value)
+
+
+def log(value):
+    return math.log(value)
+
+
+def exp(value):
+    return math.exp(value)
+
+
+def pi():
+    return math.pi
+
+
+def max(*values):
+    return builtins.max(values)
+
+
+def min(*values):
+    return builtins.min(values)
+
+
+def between(value, low, high):
+    if value is None or low is None or high is None:
+        return None
+    return low <= value <= high
+
+
+def inlist(value, *values):
+    return value in values
+
+
+# Valeurs vides et nulles
+
+def empty(value):
+    """EMPTY() : chaîne blanche, zéro, .F., date vide ou NULL"""
+    if value is None or value is False:
+        return True
+    if isinstance(value, builtins.str):
+        return not value.strip()
+    if isinstance(value, (builtins.int, float)):
+        return value == 0
+    return False
+
+
+def isnull(value):
+    return value is None
+
+
+def nvl(value, default):
+    return default if value is None else value
+
+
+def vartype(value):
+    if value is None:
+        return 'X'
+    if isinstance(value, bool):
+        return 'L'
+    if isinstance(value, (builtins.int, float)):
+        return 'N'
+    if isinstance(value, builtins.str):
+        return 'C'
+    if isinstance(value, dt.datetime):
+        return 'T'
+    if isinstance(value, dt.date):
+        return 'D'
+    return 'O'
+
+
+# Dates
+
+def date(year=None, month=None, day=None):
+    if year is None:
+        return dt.date.today()
+    return dt.date(builtins.int(year), builtins.int(month), builtins.int(day))
+
+
+def datetime(year=None, month=None, day=None, hour=0, minute=0, second=0):
+    if year is None:
+        return dt.datetime.now().replace(microsecond=0)
+    return dt.datetime(*(builtins.int(part) for part in
+                               (year, month, day, hour, minute, second)))
+
+
+def time():
+    return _time.strftime('%H:%M:%S')
+
+
+def seconds():
+    now = dt.datetime.now()
+    return now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+
+
+def _as_date(value):
+    if isinstance(value, builtins.str):
+        value = ctod(value) if builtins.len(value) <= 10 else ctot(value)
+    return value
+
+
+def year(value):
+    value = _as_date(value)
+    return None if value is None else value.year
+
+
+def month(value):
+    value = _as_date(value)
+    return None if value is None else value.month
+
+
+def day(value):
+    value = _as_date(value)
+    return None if value is None else value.day
+
+
+def dow(value, first_day=1):
+    """DOW() : 1 pour dimanche par défaut"""
+    value = _as_date(value)
+    return (value.isoweekday() % 7 - (builtins.int(first_day) - 1)) % 7 + 1
+
+
+def cdow(value):
+    return DAY_NAMES[_as_date(value).isoweekday() % 7]
+
+
+def cmonth(value):
+    return MONTH_NAMES[_as_date(value).month - 1]
+
+
+def gomonth(value, months):
+    value = _as_date(value)
+    index = value.month - 1 + builtins.int(months)
+    year_, month_ = value.year + index // 12, index % 12 + 1
+    # Dernier jour du mois si le jour n'existe pas (31 janvier + 1 mois)
+    for day_ in range(value.day, 27, -1):
+        try:
+            return value.replace(year=year_, month=month_, day=day_)
+        except ValueError:
+            continue
+    return value.replace(year=year_, month=month_, day=28)
+
+
+def dtos(value):
+    value = _as_date(value)
+    return ' ' * 8 if value is None else value.strftime('%Y%m%d')
+
+
+def dtoc(value, mode=0):
+    value = _as_date(value)
+    if value is None:
+        return ''
+    return value.strftime('%Y%m%d' if mode == 1 else '%m/%d/%Y')
+
+
+def ttoc(value, mode=0):
+    value = _as_date(value)
+    if value is None:
+        return ''
+    return value.strftime('%Y%m%d%H%M%S' if mode == 1 else '%m/%d/%Y %I:%M:%S %p')
+
+
+def ttod(value):
+    value = _as_date(value)
+    return None if value is None else dt.date(value.year, value.month, value.day)
+
+
+def ctod(text):
+    """CTOD() : accepte AAAA-MM-JJ (valeurs migrées) et MM/JJ/AAAA"""
+    text = (text or '').strip()
+    if not text:
+        return None
+    for pattern in ('%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y', '%Y%m%d'):
+        try:
+            return dt.datetime.strptime(text[:10], pattern).date()
+        except ValueError:
+            continue
+    return None
+
+
+def ctot(text):
+    text = (text or '').strip()
+    if not text:
+        return None
+    for pattern in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%m/%d/%Y %I:%M:%S %p',
+                    '%m/%d/%Y %H:%M:%S', '%Y-%m-%d'):
+        try:
+            return dt.datetime.strptime(text, pattern)
+        except ValueError:
+            continue
+    return None
+
+
+# Divers
+
+def alen(array, mode=0):
+    if mode == 1:
+        return builtins.len(array)
+    if mode == 2:
+        return builtins.len(array[0]) if array and isinstance(array[0], list) else 0
+    return builtins.sum(builtins.len(row) if isinstance(row, list) else 1 for row in array)
+
+
+def file(path):
+    return os.path.isfile(path)
+
+
+def getenv(name):
+    return os.environ.get(name, '')
+
+
+def messagebox(text, options=0, title=''):
+    """MESSAGEBOX() hors formulaire : message écrit sur la sortie"""
+    print(f"{title}: {text}" if title else text)
+    return 1
+
+
+def bintoc(value, width=4):
+    return value
@@ -0,0 +1,984 @@
+# vfp_runtime.py
+"""Module pour la navigation de type Visual FoxPro sur les tables SQLite"""
+
+import importlib
+import sqlite3
+import types
+
+from dbf import DbfField
+from schema_cache import SchemaCache, quote_identifier
+from vfp_expr import compile_expression
+
+
+# Enregistrements lus par requête lors de la navigation
+READ_AHEAD = 500
+
+# Enregistrements modifiés par REPLACE avant écriture groupée
+REPLACE_BATCH_SIZE = 1000
+
+
+# Type VFP des colonnes d'une table migrée, pour les expressions compilées
+_COLUMN_TYPES = {'TEXT': 'C', 'INTEGER': 'N', 'REAL': 'N', 'DATE': 'D', 'DATETIME': 'T',
+                 'BOOLEAN': 'L'}
+
+
+class VfpRuntimeError(Exception):
+    """Opération impossible sur le curseur (fin de fichier, tag inconnu...)"""
+
+
+def split_top_level(text, separator=','):
+    """Découper un texte SQL au niveau 0 des parenthèses, hors chaînes"""
+    parts = []
+    depth = 0
+    quote = None
+    current = []
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ('"', "'", '`'):
+            quote = char
+        elif char == '[':
+            quote = ']'
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    parts.append(''.join(current).strip())
+    return parts
+
+
+def parse_index_sql(sql):
+    """Clé et condition d'un CREATE INDEX
+
+    Retourne ([expression, ...], descendant, clause WHERE ou None).
+    """
+    upper = sql.upper()
+    start = upper.find(' ON ')
+    if start < 0:
+        raise VfpRuntimeError(f"index non reconnu : {sql}")
+
+    # Parenthèse ouvrante de la liste des colonnes, puis sa fermante
+    depth = 0
+    quote = None
+    opening = closing = None
+    for position in range(start, len(sql)):
+        char = sql[position]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ('"', "'", '`'):
+            quote = char
+        elif char == '[':
+            quote = ']'
+        elif char == '(':
+            if depth == 0 and opening is None:
+                opening = position
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0 and opening is not None:
+                closing = position
+                break
+    if closing is None:
+        raise VfpRuntimeError(f"index non reconnu : {sql}")
+
+    parts = []
+    descending = False
+    for part in split_top_level(sql[opening + 1:closing]):
+        words = part.rsplit(None, 1)
+        if len(words) == 2 and words[1].upper() in ('ASC', 'DESC'):
+            descending = descending or words[1].upper() == 'DESC'
+            part = words[0]
+        parts.append(part)
+
+    rest = sql[closing + 1:].strip()
+    where = rest[5:].strip() if rest.upper().startswith('WHERE') else None
+    return parts, descending, where
+
+
+class Cursor:
+    """Curseur VFP sur une table SQLite (équivalent d'une zone de travail)
+
+    Les enregistrements sont identifiés par leur rowid, qui vaut RECNO()
+    pour les tables migrées. La navigation (SKIP, GO, SCAN) lit des fenêtres
+    de read_ahead enregistrements dans l'ordre courant par pagination sur la
+    clé : un SKIP dans la fenêtre ne coûte aucune requête. SET ORDER TO
+    utilise les index de la table trouvés dans le cache du schéma (ceux de
+    la migration s'appellent table_tag), et SEEK interroge l'index avec son
+    expression exacte. Les REPLACE sont appliqués à la fenêtre puis écrits
+    par executemany, batch_size à la fois, dans une transaction.
+    """
+
+    def __init__(self, connection, table, schema_cache=None, order=None,
+                 read_ahead=READ_AHEAD, batch_size=REPLACE_BATCH_SIZE):
+        self.connection = connection
+        self.table = table
+        self.schema_cache = schema_cache or SchemaCache(connection)
+        self.read_ahead = read_ahead
+        self.batch_size = batch_size
+
+        self.columns = self.schema_cache.column_names(table, connection)
+        if not self.columns:
+            raise VfpRuntimeError(f"table inconnue : {table}")
+        self._column_index = {name.lower(): i for i, name in enumerate(self.columns)}
+        self._fields = None
+        self._select = ", ".join(quote_identifier(name) for name in self.columns)
+
+        self.order = None
+        self._key = []  # expressions de la clé d'ordre (rowid ajouté en dernier)
+        self._descending = False
+        self._tag_where = None
+        self._filter = None  # (condition SQL, paramètres)
+        self._locate = None
+
+        self._buffer = []  # [(clé, valeurs)]
+        self._position = 0
+        self._eof = self._bof = True
+        self._found = False
+        self._pending = {}  # rowid -> {colonne: valeur}
+
+        self.set_order(order)
+
+    # Ordre et filtre
+
+    def set_order(self, tag=None):
+        """SET ORDER TO [TAG] : None pour l'ordre physique (rowid)"""
+        self.flush()
+        if tag is None:
+            self.order = None
+            self._key, self._descending, self._tag_where = [], False, None
+        else:
+            index = self._find_index(tag)
+            if index is None:
+                raise VfpRuntimeError(f"tag {tag} introuvable sur {self.table}")
+            sql = index.get('sql') or self._index_sql(index['name'])
+            if sql:
+                self._key, self._descending, self._tag_where = parse_index_sql(sql)
+            else:
+                # Index automatique (clé primaire, UNIQUE) : colonnes seules
+                self._key = [quote_identifier(col) for col in index['columns']]
+                self._descending, self._tag_where = False, None
+            self.order = tag
+        self.go_top()
+
+    def _find_index(self, tag):
+        wanted = {tag.lower(), f"{self.table}_{tag}".lower()}
+        for index in self.schema_cache.indexes(self.table, self.connection):
+            if index['name'].lower() in wanted:
+                return index
+        return None
+
+    def _index_sql(self, name):
+        row = self.connection.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_filter(self, condition=None, *params):
+        """SET FILTER TO : condition SQL sur les colonnes de la table"""
+        self.flush()
+        self._filter = (condition, params) if condition else None
+        self.go_top()
+
+    # Lecture des fenêtres
+
+    def _fetch(self, after=None, backward=False, inclusive=False, where=None, params=(),
+               limit=None):
+        """Lire une fenêtre d'enregistrements dans l'ordre courant
+
+        after : clé à partir de laquelle lire (exclue sauf si inclusive) ;
+        backward : lire vers le début (la fenêtre est remise dans l'ordre).
+        """
+        self.flush()
+        key = self._key + ['rowid']
+        # Ordre inverse de l'index : parcours à l'envers
+        reverse = backward != self._descending
+        direction = " DESC" if reverse else ""
+
+        conditions = []
+        arguments = []
+        clauses = (self._filter or (None, ()), (self._tag_where, ()), (where, params))
+        for condition, values in clauses:
+            if condition:
+                conditions.append(f"({condition})")
+                arguments.extend(values)
+        if after is not None:
+            condition, values = self._after(key, after, reverse, inclusive)
+            conditions.append(condition)
+            arguments.extend(values)
+
+        sql = f"SELECT {', '.join(key)}, {self._select} FROM {quote_identifier(self.table)}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY " + ", ".join(part + direction for part in key)
+        sql += f" LIMIT {limit or self.read_ahead}"
+
+        width = len(key)
+        rows = [(tuple(row[:width]), list(row[width:]))
+                for row in self.connection.execute(sql, arguments)]
+        if backward:
+            rows.reverse()
+        return rows
+
+    @staticmethod
+    def _after(key, after, reverse, inclusive):
+        """Condition « clé après after » dans l'ordre de parcours
+
+        SQLite classe les NULL en tête et une comparaison de lignes
+        (a, b) > (?, ?) est NULL dès qu'une partie l'est : elle ne sert que
+        dans le sens croissant avec une clé sans NULL, les autres cas sont
+        développés partie par partie avec IS NULL / IS NOT NULL.
+        """
+        width = len(after)
+        if not reverse and None not in after:
+            operator = '>=' if inclusive else '>'
+            return (f"({', '.join(key[:width])}) {operator} ({', '.join('?' * width)})",
+                    list(after))
+
+        terms = []
+        arguments = []
+        for i, value in enumerate(after):
+            # Parties précédentes égales (IS : égalité qui accepte NULL)
+            equal = [f"{part} IS ?" for part in key[:i]]
+            if not reverse:
+                beyond = f"{key[i]} IS NOT NULL" if value is None else f"{key[i]} > ?"
+            elif value is None:
+                # Rien avant NULL dans le sens décroissant
+                continue
+            else:
+                beyond = f"({key[i]} < ? OR {key[i]} IS NULL)"
+            terms.append(" AND ".join(equal + [beyond]))
+            arguments.extend(after[:i])
+            if value is not None:
+                arguments.append(value)
+        if inclusive:
+            terms.append(" AND ".join(f"{part} IS ?" for part in key[:width]))
+            arguments.extend(after)
+        if not terms:
+            return "0", []
+        return "(" + " OR ".join(f"({term})" for term in terms) + ")", arguments
+
+    def _show(self, rows, position=0):
+        """Placer le curseur sur un enregistrement d'une fenêtre"""
+        self._buffer = rows
+        self._position = position
+        self._eof = not rows
+        self._bof = not rows
+
+    # Navigation
+
+    def go_top(self):
+        """GO TOP"""
+        self._show(self._fetch())
+
+    def go_bottom(self):
+        """GO BOTTOM"""
+        rows = self._fetch(backward=True)
+        self._show(rows, len(rows) - 1)
+
+    def go(self, recno):
+        """GO n : aller à l'enregistrement de rowid n"""
+        self.flush()
+        key = ", ".join(self._key + ['rowid'])
+        row = self.connection.execute(
+            f"SELECT {key}, {self._select} FROM {quote_identifier(self.table)} WHERE rowid = ?",
+            (recno,)).fetchone()
+        if row is None:
+            raise VfpRuntimeError(f"enregistrement {recno} hors de la table {self.table}")
+        width = len(self._key) + 1
+        first = (tuple(row[:width]), list(row[width:]))
+        self._show([first] + self._fetch(after=first[0], limit=self.read_ahead - 1))
+
+    def skip(self, count=1):
+        """SKIP [n] : avancer (ou reculer si n < 0) de n enregistrements"""
+        if count >= 0:
+            if self._eof:
+                if count:
+                    raise VfpRuntimeError("fin de fichier atteinte")
+                return
+            position = self._position + count
+            while position >= len(self._buffer):
+                rows = self._fetch(after=self._buffer[-1][0])
+                if not rows:
+                    # EOF() : le dernier enregistrement reste en mémoire pour SKIP -1
+                    self._position = len(self._buffer)
+                    self._eof = True
+                    return
+                position -= len(self._buffer)
+                self._buffer = rows
+            self._position = position
+            self._bof = False
+            return
+
+        if self._eof and self._buffer:
+            self._eof = False
+            position = len(self._buffer) + count
+        elif self._eof:
+            self.go_bottom()
+            position = self._position + count + 1
+        else:
+            position = self._position + count
+        while position < 0:
+            rows = self._fetch(after=self._buffer[0][0], backward=True)
+            if not rows:
+                # BOF() : le curseur reste sur le premier enregistrement
+                self._position = 0
+                self._bof = True
+                return
+            position += len(rows)
+            self._buffer = rows
+        self._position = position
+        self._eof = not self._buffer
+
+    def eof(self):
+        """EOF()"""
+        return self._eof
+
+    def bof(self):
+        """BOF()"""
+        return self._bof
+
+    def found(self):
+        """FOUND() : résultat du dernier SEEK ou LOCATE"""
+        return self._found
+
+    def recno(self):
+        """RECNO() : rowid courant (RECCOUNT() + 1 en fin de fichier)"""
+        if self._eof:
+            return self.reccount() + 1
+        return self._buffer[self._position][0][-1]
+
+    def reccount(self):
+        """RECCOUNT()"""
+        self.flush()
+        row = self.connection.execute(
+            f"SELECT max(rowid) FROM {quote_identifier(self.table)}").fetchone()
+        return row[0] or 0
+
+    # Recherche
+
+    def seek(self, value, tag=None):
+        """SEEK valeur [ORDER TAG] : recherche par l'index de l'ordre courant
+
+        Comme avec SET EXACT OFF, une chaîne trouve la première clé qui
+        commence par elle. Une valeur tuple interroge les premières parties
+        d'un index sur plusieurs colonnes. Sans résultat, le curseur est en
+        fin de fichier. Retourne FOUND().
+        """
+        if tag is not None and tag != self.order:
+            self.set_order(tag)
+        if not self._key:
+            raise VfpRuntimeError("SEEK sans ordre d'index (SET ORDER TO)")
+
+        values = tuple(value) if isinstance(value, (tuple, list)) else (value,)
+        if len(values) > len(self._key):
+            raise VfpRuntimeError("SEEK : trop de valeurs pour la clé")
+
+        bound = values
+        if self._descending and isinstance(values[-1], str):
+            # Ordre décroissant : les clés qui commencent par la chaîne
+            # sont avant elle, partir de la plus grande possible
+            bound = values[:-1] + (values[-1] + '\U0010ffff',)
+        rows = self._fetch(after=bound, inclusive=True)
+        self._found = bool(rows) and self._matches(rows[0][0], values)
+        if self._found:
+            self._show(rows)
+        else:
+            self._show([])
+        return self._found
+
+    @staticmethod
+    def _matches(key, values):
+        for i, value in enumerate(values):
+            actual = key[i]
+            if i == len(values) - 1 and isinstance(value, str) and isinstance(actual, str):
+                return actual.startswith(value)
+            if actual != value:
+                return False
+        return True
+
+    def locate(self, condition, *params):
+        """LOCATE FOR condition : premier enregistrement qui la vérifie
+
+        La condition est une clause SQL (paramètres ?) évaluée par SQLite,
+        ou une fonction Python appelée avec le curseur positionné.
+        """
+        self._locate = (condition, params)
+        return self._search(after=None)
+
+    def continue_locate(self):
+        """CONTINUE : enregistrement suivant qui vérifie la condition du LOCATE"""
+        if self._locate is None:
+            raise VfpRuntimeError("CONTINUE sans LOCATE")
+        if self._eof:
+            self._found = False
+            return False
+        return self._search(after=self._buffer[self._position][0])
+
+    def _search(self, after):
+        condition, params = self._locate
+        if callable(condition):
+            if after is None:
+                self.go_top()
+            else:
+                self.skip()
+            while not self._eof:
+                if condition(self):
+                    self._found = True
+                    return True
+                self.skip()
+            self._found = False
+            return False
+
+        # Fenêtre limitée à l'enregistrement trouvé : un CONTINUE ne relit pas
+        # read_ahead enregistrements, le SKIP suivant lit la suite
+        rows = self._fetch(after=after, where=condition, params=params, limit=1)
+        self._found = bool(rows)
+        self._show(rows)
+        return self._found
+
+    def scan(self, condition=None, *params, rest=False):
+        """SCAN [FOR condition] [REST] ... ENDSCAN
+
+        Générateur : le curseur est placé sur chaque enregistrement qui
+        vérifie la condition (clause SQL ou fonction Python) ; les REPLACE
+        faits dans la boucle sont écrits par lots. Le curseur finit en fin
+        de fichier, comme après ENDSCAN.
+        """
+        predicate = condition if callable(condition) else None
+        saved_filter = self._filter
+        if condition and predicate is None:
+            combined = condition
+            arguments = params
+            if saved_filter:
+                combined = f"({saved_filter[0]}) AND ({condition})"
+                arguments = tuple(saved_filter[1]) + tuple(params)
+            self._filter = (combined, arguments)
+
+        try:
+            if rest and not self._eof:
+                current = self._buffer[self._position][0]
+                self._show(self._fetch(after=current, inclusive=True))
+            else:
+                self.go_top()
+
+            while not self._eof:
+                if predicate is None or predicate(self):
+                    yield self
+                if self._eof:
+                    break
+                self.skip()
+        finally:
+            self._filter = saved_filter
+            self.flush()
+
+    # Valeurs des champs
+
+    def _values(self):
+        if self._eof or not self._buffer:
+            raise VfpRuntimeError("fin de fichier : aucun enregistrement courant")
+        return self._buffer[self._position][1]
+
+    def __getitem__(self, name):
+        index = self._column_index.get(name.lower())
+        if index is None:
+            raise KeyError(name)
+        return self._values()[index]
+
+    def __getattr__(self, name):
+        index = self.__dict__.get('_column_index', {}).get(name.lower())
+        if index is None:
+            raise AttributeError(name)
+        return self._values()[index]
+
+    def scatter(self):
+        """SCATTER NAME : valeurs de l'enregistrement courant"""
+        return dict(zip(self.columns, self._values()))
+
+    def fields(self):
+        """Champs de la table (nom VFP -> descripteur) pour compile_expression()"""
+        if self._fields is None:
+            self._fields = {
+                column['name'].upper(): DbfField(column['name'].upper(),
+                                                 _COLUMN_TYPES[column['type'].upper()], 0, 0, 0, 0)
+                for column in self.schema_cache.columns(self.table, self.connection)
+                if column['type'].upper() in _COLUMN_TYPES
+            }
+        return self._fields
+
+    def compile(self, text):
+        """Expression VFP sur les champs de la table, compilée une fois (cache LRU)"""
+        return compile_expression(text, self.fields())
+
+    def evaluate(self, text, variables=None):
+        """EVALUATE() : valeur d'une expression VFP pour l'enregistrement courant"""
+        return self.compile(text).function(self, variables or {})
+
+    # Écriture
+
+    def replace(self, **values):
+        """REPLACE champ WITH valeur [, ...] sur l'enregistrement courant"""
+        row = self._values()
+        recno = self._buffer[self._position][0][-1]
+        pending = self._pending.setdefault(recno, {})
+        for name, value in values.items():
+            index = self._column_index.get(name.lower())
+            if index is None:
+                raise VfpRuntimeError(f"champ inconnu : {name}")
+            row[index] = value
+            pending[self.columns[index]] = value
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def _where(self, condition=None, params=()):
+        """Clause WHERE d'une instruction sur toute la table : filtre, tag
+        filtré et condition ; retourne (texte, paramètres)"""
+        clauses = (self._filter or (None, ()), (self._tag_where, ()), (condition, params))
+        conditions = []
+        arguments = []
+        for text, values in clauses:
+            if text:
+                conditions.append(f"({text})")
+                arguments.extend(values)
+        if not conditions:
+            return "", arguments
+        return " WHERE " + " AND ".join(conditions), arguments
+
+    def replace_all(self, condition=None, *params, **values):
+        """REPLACE ALL ... [FOR condition] : une seule instruction UPDATE"""
+        self.flush()
+        assignments = ", ".join(f"{quote_identifier(name)} = ?" for name in values)
+        where, arguments = self._where(condition, params)
+        sql = f"UPDATE {quote_identifier(self.table)} SET {assignments}{where}"
+        with self.connection:
+            count = self.connection.execute(sql, list(values.values()) + arguments).rowcount
+        self.go_top()
+        return count
+
+    def update(self, assignments, condition=None, *params, values=()):
+        """SCAN FOR ... REPLACE ... ENDSCAN réécrit en une instruction UPDATE
+
+        assignments associe une colonne à une expression SQL sur la table,
+        dont les paramètres sont values ; condition (clause SQL) et params
+        restreignent les enregistrements. Le curseur finit en fin de
+        fichier, comme après ENDSCAN. Retourne le nombre de lignes modifiées.
+        """
+        self.flush()
+        for name in assignments:
+            if name.lower() not in self._column_index:
+                raise VfpRuntimeError(f"champ inconnu : {name}")
+        sets = ", ".join(f"{quote_identifier(name)} = {sql}" for name, sql in assignments.items())
+        where, arguments = self._where(condition, params)
+        sql = f"UPDATE {quote_identifier(self.table)} SET {sets}{where}"
+        with self.connection:
+            count = self.connection.execute(sql, list(values) + arguments).rowcount
+        self._show([])
+        return count
+
+    def insert_select(self, table, columns, condition=None, *params, values=()):
+        """SCAN FOR ... INSERT INTO ... ENDSCAN réécrit en INSERT ... SELECT
+
+        columns associe une colonne de table à une expression SQL sur la
+        table du curseur (paramètres values). Retourne le nombre de lignes
+        ajoutées.
+        """
+        self.flush()
+        names = ", ".join(quote_identifier(name) for name in columns)
+        expressions = ", ".join(columns.values())
+        where, arguments = self._where(condition, params)
+        sql = (f"INSERT INTO {quote_identifier(table)} ({names}) "
+               f"SELECT {expressions} FROM {quote_identifier(self.table)}{where}")
+        if self._key:
+            # Même ordre d'insertion que la boucle (RECNO() des nouvelles lignes)
+            sql += " ORDER BY " + ", ".join(
+                part + (" DESC" if self._descending else "") for part in self._key + ['rowid'])
+        with self.connection:
+            count = self.connection.execute(sql, list(values) + arguments).rowcount
+        self._show([])
+        return count
+
+    def gather(self, values):
+        """GATHER : écrire les valeurs d'un dictionnaire dans l'enregistrement"""
+        self.replace(**{name: value for name, value in values.items()
+                        if name.lower() in self._column_index})
+
+    def append(self, **values):
+        """APPEND BLANK / INSERT : ajouter un enregistrement et s'y placer"""
+        self.flush()
+        table = quote_identifier(self.table)
+        if values:
+            columns = ", ".join(quote_identifier(name) for name in values)
+            marks = ", ".join('?' * len(values))
+            sql = f"INSERT INTO {table} ({columns}) VALUES ({marks})"
+        else:
+            sql = f"INSERT INTO {table} DEFAULT VALUES"
+        with self.connection:
+            recno = self.connection.execute(sql, list(values.values())).lastrowid
+        self.go(recno)
+        return recno
+
+    def delete(self):
+        """DELETE : supprimer l'enregistrement courant
+
+        La ligne reste dans la fenêtre : SKIP continue après elle, comme
+        après un DELETE sous SET DELETED ON.
+        """
+        self._values()
+        recno = self._buffer[self._position][0][-1]
+        self._pending.pop(recno, None)
+        self.flush()
+        with self.connection:
+            self.connection.execute(
+                f"DELETE FROM {quote_identifier(self.table)} WHERE rowid = ?", (recno,))
+
+    def delete_all(self, condition=None, *params):
+        """DELETE ALL [FOR condition] : une seule instruction DELETE"""
+        self.flush()
+        where, arguments = self._where(condition, params)
+        with self.connection:
+            count = self.connection.execute(
+                f"DELETE FROM {quote_identifier(self.table)}{where}", arguments).rowcount
+        self.go_top()
+        return count
+
+    def flush(self):
+        """Écrire les REPLACE en attente (executemany, une transaction)"""
+        if not self.__dict__.get('_pending'):
+            return
+        pending, self._pending = self._pending, {}
+
+        # Un UPDATE par ensemble de colonnes modifiées
+        groups = {}
+        for recno, values in pending.items():
+            columns = tuple(values)
+            groups.setdefault(columns, []).append([values[col] for col in columns] + [recno])
+
+        table = quote_identifier(self.table)
+        with self.connection:
+            for columns, rows in groups.items():
+                assignments = ", ".join(f"{quote_identifier(col)} = ?" for col in columns)
+                self.connection.executemany(
+                    f"UPDATE {table} SET {assignments} WHERE rowid = ?", rows)
+
+    def close(self):
+        """USE : écrire les modifications et fermer la zone"""
+        self.flush()
+        self._buffer = []
+        self._eof = self._bof = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def use(connection, table, schema_cache=None, order=None):
+    """USE table [ORDER tag] : ouvrir un curseur sur une table"""
+    return Cursor(connection, table, schema_cache, order)
+
+
+class Session:
+    """Zones de travail d'un programme VFP traduit
+
+    Chaque alias ouvert par USE a son curseur ; SELECT change la zone
+    courante, sur laquelle portent les commandes de navigation, les
+    fonctions EOF(), RECNO()... et l'accès aux champs (S.nom ou S['nom']).
+    SET PROCEDURE TO et DO retrouvent les procédures dans les modules
+    Python des programmes traduits.
+    """
+
+    def __init__(self, connection, schema_cache=None):
+        self.connection = connection
+        self.schema_cache = schema_cache or SchemaCache(connection)
+        self.areas = {}  # alias -> Cursor
+        self.current = None
+        self.procedures = []  # modules de SET PROCEDURE TO
+
+    # Zones de travail
+
+    def use(self, table=None, alias=None, order=None, new_area=False):
+        """USE [table [ALIAS alias] [ORDER tag]] dans la zone courante
+
+        new_area (USE ... IN 0) ouvre la table dans une zone libre sans
+        changer la zone courante.
+        """
+        current = self.current
+        if self.current is not None and not new_area:
+            self.close(self.current)
+        if table is None:
+            return None
+        alias = (alias or table).lower()
+        if alias in self.areas:
+            self.close(alias)
+        self.areas[alias] = Cursor(self.connection, table, self.schema_cache, order)
+        self.current = current if new_area and current in self.areas else alias
+        return self.areas[alias]
+
+    def select(self, alias=None):
+        """SELECT alias (SELECT 0 : zone libre)"""
+        if not alias:
+            self.current = None
+            return
+        alias = str(alias).lower()
+        if alias not in self.areas:
+            raise VfpRuntimeError(f"alias {alias} introuvable")
+        self.current = alias
+
+    def area(self, alias=None):
+        """Curseur d'un alias (zone courante par défaut)"""
+        alias = str(alias).lower() if alias else self.current
+        cursor = self.areas.get(alias) if alias else None
+        if cursor is None:
+            raise VfpRuntimeError("aucune table ouverte dans cette zone de travail")
+        return cursor
+
+    def close(self, alias=None):
+        """USE IN alias : fermer une zone"""
+        alias = str(alias).lower() if alias else self.current
+        cursor = self.areas.pop(alias, None)
+        if cursor is not None:
+            cursor.close()
+        if alias == self.current:
+            self.current = None
+
+    def close_all(self):
+        """CLOSE TABLES / CLOSE DATABASES"""
+        for alias in list(self.areas):
+            self.close(alias)
+
+    def used(self, alias=None):
+        """USED()"""
+        return (str(alias).lower() if alias else self.current) in self.areas
+
+    def alias(self):
+        """ALIAS()"""
+        return (self.current or '').upper()
+
+    # Navigation et recherche dans la zone courante
+
+    def go_top(self):
+        self.area().go_top()
+
+    def go_bottom(self):
+        self.area().go_bottom()
+
+    def go(self, recno):
+        self.area().go(recno)
+
+    def skip(self, count=1):
+        self.area().skip(count)
+
+    def seek(self, value, tag=None):
+        return self.area().seek(value, tag)
+
+    def locate(self, condition, *params):
+        return self.area().locate(self._predicate(condition), *params)
+
+    def continue_locate(self):
+        return self.area().continue_locate()
+
+    def set_order(self, tag=None):
+        self.area().set_order(tag)
+
+    def set_filter(self, condition=None, *params):
+        self.area().set_filter(condition, *params)
+
+    def scan(self, condition=None, *params, rest=False):
+        """SCAN [FOR condition] : voir Cursor.scan()"""
+        return self.area().scan(self._predicate(condition), *params, rest=rest)
+
+    @staticmethod
+    def _predicate(condition):
+        # Condition traduite en Python : lambda sans argument
+        if callable(condition):
+            return lambda cursor: condition()
+        return condition
+
+    def evaluate(self, text, variables=None):
+        """EVALUATE() : expression VFP (chaîne) sur la zone courante
+
+        Les champs préfixés d'un alias sont lus dans leur zone.
+        """
+        return self.area().compile(text).function(self, variables or {})
+
+    def condition(self, text, variables=None):
+        """Condition VFP (chaîne) pour SET FILTER, LOCATE ou SCAN : clause SQL
+        si elle ne porte que sur les champs, sinon fonction Python"""
+        compiled = self.area().compile(text)
+        if compiled.sql is not None:
+            return compiled.sql
+        return lambda: compiled.function(self, variables or {})
+
+    def eof(self, alias=None):
+        return self.area(alias).eof() if self.used(alias) else True
+
+    def bof(self, alias=None):
+        return self.area(alias).bof() if self.used(alias) else True
+
+    def found(self, alias=None):
+        return self.area(alias).found() if self.used(alias) else False
+
+    def recno(self, alias=None):
+        return self.area(alias).recno() if self.used(alias) else 0
+
+    def reccount(self, alias=None):
+        return self.area(alias).reccount() if self.used(alias) else 0
+
+    def deleted(self, alias=None):
+        """DELETED() : les enregistrements supprimés ne sont pas conservés"""
+        return False
+
+    # Modifications
+
+    def replace(self, **values):
+        self.area().replace(**values)
+
+    def replace_all(self, condition=None, *params, **values):
+        return self.area().replace_all(condition, *params, **values)
+
+    def update(self, assignments, condition=None, *params, values=()):
+        return self.area().update(assignments, condition, *params, values=values)
+
+    def insert_select(self, table, columns, condition=None, *params, values=()):
+        """INSERT ... SELECT depuis la zone courante ; la table cible ouverte
+        se place sur le dernier enregistrement ajouté, comme après un INSERT"""
+        count = self.area().insert_select(table, columns, condition, *params, values=values)
+        target = self.areas.get(str(table).lower())
+        if count and target is not None:
+            target.go(target.reccount())
+        return count
+
+    def append_blank(self):
+        return self.area().append()
+
+    def insert(self, table, *values, **named):
+        """INSERT INTO table [(...)] VALUES (...)
+
+        Les valeurs positionnelles suivent l'ordre des colonnes de la table.
+        """
+        if values:
+            names = self.schema_cache.column_names(table)
+            if len(values) > len(names):
+                raise VfpRuntimeError(f"{table} : trop de valeurs pour INSERT")
+            named = dict(zip(names, values), **named)
+        values = named
+        columns = ", ".join(quote_identifier(name) for name in values)
+        marks = ", ".join('?' * len(values))
+        self.flush()
+        with self.connection:
+            recno = self.connection.execute(
+                f"INSERT INTO {quote_identifier(table)} ({columns}) VALUES ({marks})",
+                list(values.values())).lastrowid
+        # Comme en VFP, la table ouverte se place sur le nouvel enregistrement
+        if str(table).lower() in self.areas:
+            self.areas[str(table).lower()].go(recno)
+
+    def delete(self):
+        self.area().delete()
+
+    def delete_all(self, condition=None, *params):
+        return self.area().delete_all(condition, *params)
+
+    def scatter(self):
+        """SCATTER MEMVAR : dictionnaire des champs"""
+        return self.area().scatter()
+
+    def scatter_name(self):
+        """SCATTER NAME objet"""
+        return types.SimpleNamespace(**self.area().scatter())
+
+    def gather(self, values):
+        """GATHER MEMVAR / GATHER NAME objet"""
+        if not isinstance(values, dict):
+            values = vars(values)
+        self.area().gather(values)
+
+    def flush(self):
+        for cursor in self.areas.values():
+            cursor.flush()
+
+    # SQL
+
+    def execute(self, sql, params=()):
+        """Instruction SQL (UPDATE, DELETE, INSERT) après écriture des REPLACE"""
+        self.flush()
+        with self.connection:
+            return self.connection.execute(sql, params).rowcount
+
+    def select_into(self, name, sql, params=()):
+        """SELECT ... INTO CURSOR nom : table temporaire ouverte dans une zone"""
+        self.flush()
+        with self.connection:
+            self.connection.execute(f"DROP TABLE IF EXISTS temp.{quote_identifier(name)}")
+            self.connection.execute(f"CREATE TEMP TABLE {quote_identifier(name)} AS {sql}", params)
+        self.current = None
+        return self.use(name)
+
+    def fetch(self, sql, params=()):
+        """SELECT ... INTO ARRAY : liste des lignes"""
+        self.flush()
+        return [list(row) for row in self.connection.execute(sql, params)]
+
+    # Procédures
+
+    def set_procedure(self, *names, additive=False):
+        """SET PROCEDURE TO programme [, ...] [ADDITIVE]"""
+        modules = [importlib.import_module(name.lower()) for name in names]
+        self.procedures = (self.procedures if additive else []) + modules
+
+    def do(self, name, *args):
+        """DO procédure [WITH ...] ou appel d'une fonction d'un autre programme"""
+        name = name.lower()
+        for module in self.procedures:
+            function = getattr(module, name, None)
+            if callable(function):
+                return function(*args)
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            raise VfpRuntimeError(f"procédure {name} introuvable")
+        return module.main(*args)
+
+    # Champs de la zone courante
+
+    def __getitem__(self, name):
+        return self.area()[name]
+
+    def __getattr__(self, name):
+        if name.startswith('_') or 'areas' not in self.__dict__:
+            raise AttributeError(name)
+        try:
+            return self.area()[name]
+        except (KeyError, VfpRuntimeError):
+            raise AttributeError(name)
+
+
+# Sessions partagées par les programmes d'une même connexion
+_sessions = {}
+_active = None
+
+
+def session(connection=None, database=None):
+    """Session de travail commune aux programmes traduits d'une connexion
+
+    Sans connexion, un programme appelé par un autre reprend la session
+    active ; à défaut, la base database est ouverte.
+    """
+    global _active
+    if connection is None:
+        if _active is not None:
+            return _active
+        if database is None:
+            raise VfpRuntimeError("aucune base de données pour la session")
+        connection = sqlite3.connect(database)
+    current = _sessions.get(id(connection))
+    if current is None or current.connection is not connection:
+        current = _sessions[id(connection)] = Session(connection)
+    _active = current
+    return current
@@ -0,0 +1,1821 @@
+# vfp_translator.py
+"""Module pour la traduction des programmes Visual FoxPro (.prg) en Python"""
+
+import hashlib
+import keyword
+import multiprocessing
+import os
+import pickle
+import re
+import sys
+import time
+from collections import namedtuple
+
+from dbf import DbfError, open_dbf
+from migration import find_tables, table_name_for
+from vfp_expr import (FUNCTIONS, WORK_AREA_FUNCTIONS, Node, PythonTranslator, SqlTranslator,
+                      VfpExprError, _Sql, field_names, parse, simplify)
+from vfp_runtime import Session
+
+
+# Version du traducteur : invalide les arbres en cache et les fichiers générés
+TRANSLATOR_VERSION = 2
+
+# Dossier par défaut des arbres syntaxiques en cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.pyfoxpro', 'prg_cache')
+
+# Encodage des programmes VFP
+SOURCE_ENCODING = 'cp1252'
+
+# En-tête des fichiers générés : empreinte du programme et des options
+SOURCE_MARK = '# source: '
+
+# Base utilisée par le code généré hors de l'IDE
+DEFAULT_DATABASE = 'data.db'
+
+# Instruction : kind, arguments propres à chaque kind, blocs imbriqués,
+# numéro de ligne et texte d'origine
+Statement = namedtuple('Statement', 'kind args body line text')
+Procedure = namedtuple('Procedure', 'name params body line')
+Program = namedtuple('Program', 'body procedures defines')
+
+# Commandes reconnues (VFP accepte les abréviations de 4 lettres)
+COMMANDS = (
+    'APPEND', 'CASE', 'CATCH', 'CLOSE', 'CONTINUE', 'DECLARE', 'DEFINE', 'DELETE',
+    'DIMENSION', 'DO', 'ELSE', 'ENDCASE', 'ENDDEFINE', 'ENDDO', 'ENDFOR', 'ENDFUNC',
+    'ENDIF', 'ENDPROC', 'ENDSCAN', 'ENDTEXT', 'ENDTRY', 'EXIT', 'FINALLY', 'FOR',
+    'FUNCTION', 'GATHER', 'GO', 'GOTO', 'IF', 'INSERT', 'LOCATE', 'LOCAL', 'LOOP',
+    'LPARAMETERS', 'NEXT', 'OTHERWISE', 'PARAMETERS', 'PRIVATE', 'PROCEDURE',
+    'PUBLIC', 'RELEASE', 'REPLACE', 'RETURN', 'SCAN', 'SCATTER', 'SEEK', 'SELECT',
+    'SET', 'SKIP', 'STORE', 'TEXT', 'TRY', 'UPDATE', 'USE', 'WAIT', 'ZAP',
+)
+
+# Commandes qui terminent un programme principal ou une procédure
+_PROGRAM_ENDS = ('PROCEDURE', 'FUNCTION', 'DEFINE')
+
+# Objets VFP sans équivalent dans le code traduit
+_OBJECTS = ('THIS', 'THISFORM', 'THISFORMSET', '_SCREEN', '_VFP')
+
+_WORD = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_ASSIGNMENT = re.compile(r'''
+    (?P<target>(?:m\.)?[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*(?:\s*[\[(][^=]*?[\])])?)
+    \s*=(?!=)\s*(?P<value>.*)$
+''', re.VERBOSE | re.IGNORECASE | re.DOTALL)
+
+
+def command_name(word):
+    """Nom complet d'une commande, abréviation comprise"""
+    word = word.upper()
+    if word in COMMANDS:
+        return word
+    if len(word) >= 4:
+        for full in COMMANDS:
+            if full.startswith(word):
+                return full
+    return word
+
+
+def _matches(word, keyword):
+    return word == keyword or (len(word) >= 4 and keyword.startswith(word))
+
+
+# Lecture du source
+
+def strip_comment(line):
+    """Retirer le commentaire de fin de ligne (&&) hors des chaînes"""
+    quote = None
+    for i, char in enumerate(line):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif char == '[':
+            quote = ']'
+        elif line.startswith('&&', i):
+            return line[:i]
+    return line
+
+
+def logical_lines(text):
+    """Lignes logiques d'un programme : [(numéro, texte, lignes brutes)]
+
+    Les commentaires sont retirés, les lignes terminées par ; sont réunies à
+    la suivante. Un bloc TEXT ... ENDTEXT garde ses lignes brutes.
+    """
+    physical = text.splitlines()
+    lines = []
+    pending = None
+    position = 0
+    while position < len(physical):
+        number = position + 1
+        raw = physical[position]
+        position += 1
+        stripped = raw.strip()
+        if pending is None and (stripped.startswith('*') or stripped.startswith('&&')
+                                or re.match(r'note\b', stripped, re.IGNORECASE)):
+            continue
+
+        line = strip_comment(raw).strip()
+        if pending is not None:
+            number, line = pending[0], f"{pending[1]} {line}"
+        if line.endswith(';'):
+            pending = (number, line[:-1].rstrip())
+            continue
+        pending = None
+        if not line:
+            continue
+
+        if re.match(r'text\b(?!\s*=)', line, re.IGNORECASE):
+            block = []
+            while position < len(physical):
+                raw = physical[position]
+                position += 1
+                if re.match(r'\s*endt(?:e(?:xt?)?)?\b', raw, re.IGNORECASE):
+                    break
+                block.append(raw)
+            lines.append((number, line, tuple(block)))
+            continue
+        lines.append((number, line, None))
+    if pending is not None:
+        lines.append((pending[0], pending[1], None))
+    return lines
+
+
+def top_level_words(text):
+    """Mots hors chaînes, parenthèses et dates : [(début, fin, mot en majuscules)]"""
+    words = []
+    depth = 0
+    quote = None
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif char == '[':
+            quote = ']'
+        elif char in '({':
+            depth += 1
+        elif char in ')}':
+            depth -= 1
+        elif depth == 0 and (char.isalpha() or char == '_') and (
+                i == 0 or not (text[i - 1].isalnum() or text[i - 1] in '_.')):
+            match = _WORD.match(text, i)
+            words.append((i, match.end(), match.group().upper()))
+            i = match.end()
+            continue
+        i += 1
+    return words
+
+
+def split_clauses(text, keywords):
+    """Découper une commande en clauses : {mot-clé: texte}, '' pour le début"""
+    clauses = {}
+    current, start = '', 0
+    for begin, end, word in top_level_words(text):
+        found = next((key for key in keywords if _matches(word, key)), None)
+        if found:
+            clauses[current] = text[start:begin].strip()
+            current, start = found, end
+    clauses[current] = text[start:].strip()
+    return clauses
+
+
+def split_list(text):
+    """Découper une liste au niveau 0 (virgules hors chaînes et parenthèses)"""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+    parts.append(text[start:].strip())
+    return [part for part in parts if part]
+
+
+def expression(text):
+    """Arbre d'une expression, nœud raw si elle n'est pas reconnue"""
+    try:
+        return parse(text)
+    except VfpExprError as e:
+        return Node('raw', text, (str(e),))
+
+
+def _name(text):
+    """Nom d'une table, d'un alias ou d'un tag : chemin et extension retirés"""
+    text = text.strip().strip('"\'[]')
+    return os.path.splitext(os.path.basename(text.replace('\\', '/')))[0]
+
+
+# Analyse
+
+class _ProgramParser:
+    """Analyse d'un programme en blocs d'instructions"""
+
+    def __init__(self, text):
+        self.lines = logical_lines(text)
+        self.position = 0
+        self.defines = []
+
+    def parse(self):
+        body, end = self.block(())
+        procedures = []
+        while self.position < len(self.lines):
+            number, text, _ = self.lines[self.position]
+            self.position += 1
+            command, rest = self.split_command(text)
+            if command == 'DEFINE':
+                # Classes : hors du champ de la traduction
+                start = number
+                while self.position < len(self.lines):
+                    if self.split_command(self.lines[self.position][1])[0] == 'ENDDEFINE':
+                        self.position += 1
+                        break
+                    self.position += 1
+                body = body + (Statement('unknown', ("classe non traduite",), (), start, text),)
+                continue
+
+            match = re.match(r'(\w+)\s*(?:\((.*)\))?', rest)
+            if not match:
+                body = body + (Statement('unknown', ("procédure sans nom",), (), number, text),)
+                continue
+            params = [p.split()[0] for p in split_list(match.group(2) or '')]
+            statements, end = self.block(('ENDPROC', 'ENDFUNC'))
+            procedures.append(Procedure(match.group(1).upper(), tuple(p.upper() for p in params),
+                                        statements, number))
+            if end is not None:
+                # Lignes entre ENDPROC et la procédure suivante : ignorées par VFP
+                self.block(())
+        return Program(body, tuple(procedures), tuple(self.defines))
+
+    @staticmethod
+    def split_command(text):
+        """Commande (nom complet) et reste de la ligne"""
+        if text.startswith('??'):
+            return '??', text[2:].strip()
+        if text[0] in '?=':
+            return text[0], text[1:].strip()
+        if text[0] == '#':
+            match = re.match(r'#\s*(\w+)\s*(.*)', text, re.DOTALL)
+            return ('#' + match.group(1).upper(), match.group(2)) if match else ('#', '')
+        match = _WORD.match(text)
+        if not match:
+            return '', text
+        return command_name(match.group()), text[match.end():].strip()
+
+    def block(self, terminators):
+        """Instructions jusqu'à l'une des commandes de fin
+
+        Retourne (instructions, (commande, ligne, texte) de fin ou None). Une
+        nouvelle procédure arrête le bloc sans être consommée.
+        """
+        statements = []
+        while self.position < len(self.lines):
+            number, text, raw = self.lines[self.position]
+            command, rest = self.split_command(text)
+            if command in _PROGRAM_ENDS and not _ASSIGNMENT.match(text):
+                return tuple(statements), None
+            self.position += 1
+            if command in terminators and not _ASSIGNMENT.match(text):
+                return tuple(statements), (command, number, rest)
+            statements.append(self.statement(number, text, raw, command, rest))
+        return tuple(statements), None
+
+    def closed(self, statement, end, expected):
+        """Signaler un bloc non fermé"""
+        if end is None:
+            return statement._replace(args=statement.args + (f"{expected} manquant",))
+        return statement
+
+    def statement(self, number, text, raw, command, rest):
+        assignment = _ASSIGNMENT.match(text)
+        if assignment and command not in ('?', '??', '='):
+            return Statement('assign', (self.target(assignment.group('target')),
+                                        expression(assignment.group('value'))), (), number, text)
+
+        handler = getattr(self, 'parse_' + command.lower().lstrip('#?=') if command.isalpha()
+                          or command.startswith('#') else '', None)
+        if command == '?':
+            return Statement('print', (tuple(expression(p) for p in split_list(rest)), True),
+                             (), number, text)
+        if command == '??':
+            return Statement('print', (tuple(expression(p) for p in split_list(rest)), False),
+                             (), number, text)
+        if command == '=':
+            return Statement('expr', (expression(rest),), (), number, text)
+        if handler is None:
+            return Statement('unknown', ("commande non traduite",), (), number, text)
+        result = handler(rest, number, text, raw)
+        return result or Statement('unknown', ("syntaxe non reconnue",), (), number, text)
+
+    @staticmethod
+    def target(text):
+        """Cible d'une affectation"""
+        text = text.strip()
+        match = re.match(r'(?:m\.)?([A-Za-z_]\w*)\s*[\[(](.*)[\])]$', text, re.IGNORECASE)
+        if match:
+            return ('item', match.group(1).upper(),
+                    tuple(expression(p) for p in split_list(match.group(2))))
+        parts = text.upper().split('.')
+        if parts[0] == 'M' and len(parts) == 2:
+            return ('var', parts[1])
+        if len(parts) == 1:
+            return ('var', parts[0])
+        return ('attr', parts[0], tuple(parts[1:]))
+
+    # Structures de contrôle
+
+    def parse_if(self, rest, number, text, raw):
+        then, end = self.block(('ELSE', 'ENDIF'))
+        otherwise = ()
+        if end is not None and end[0] == 'ELSE':
+            otherwise, end = self.block(('ENDIF',))
+        return self.closed(Statement('if', (expression(rest),), (then, otherwise), number, text),
+                           end, 'ENDIF')
+
+    def parse_do(self, rest, number, text, raw):
+        words = rest.split(None, 1)
+        first = words[0].upper() if words else ''
+        if first == 'WHILE':
+            body, end = self.block(('ENDDO',))
+            return self.closed(Statement('while', (expression(words[1]),), (body,), number, text),
+                               end, 'ENDDO')
+        if first == 'CASE':
+            return self.parse_case(number, text)
+        clauses = split_clauses(rest, ('WITH', 'IN'))
+        name = _name(clauses[''])
+        if not name:
+            return None
+        args = tuple(expression(p) for p in split_list(clauses.get('WITH', '')))
+        return Statement('do', (name.upper(), args), (), number, text)
+
+    def parse_case(self, number, text):
+        branches = []
+        otherwise = ()
+        _, end = self.block(('CASE', 'OTHERWISE', 'ENDCASE'))
+        while end is not None and end[0] != 'ENDCASE':
+            command, _, condition = end
+            body, end = self.block(('CASE', 'OTHERWISE', 'ENDCASE'))
+            if command == 'CASE':
+                branches.append((expression(condition), body))
+            else:
+                otherwise = body
+        return self.closed(Statement('case', (tuple(branches),), (otherwise,), number, text),
+                           end, 'ENDCASE')
+
+    def parse_for(self, rest, number, text, raw):
+        match = re.match(r'each\s+(?:m\.)?(\w+)\s+in\s+(.*)$', rest, re.IGNORECASE)
+        if match:
+            body, end = self.block(('ENDFOR', 'NEXT'))
+            return self.closed(Statement('for_each', (match.group(1).upper(),
+                                                      expression(match.group(2))),
+                                         (body,), number, text), end, 'ENDFOR')
+        match = re.match(r'(?:m\.)?(\w+)\s*=(.*)$', rest, re.IGNORECASE | re.DOTALL)
+        if not match:
+            return None
+        clauses = split_clauses(match.group(2), ('TO', 'STEP'))
+        if 'TO' not in clauses:
+            return None
+        step = expression(clauses['STEP']) if 'STEP' in clauses else None
+        body, end = self.block(('ENDFOR', 'NEXT'))
+        return self.closed(Statement('for', (match.group(1).upper(), expression(clauses['']),
+                                             expression(clauses['TO']), step),
+                                     (body,), number, text), end, 'ENDFOR')
+
+    def parse_scan(self, rest, number, text, raw):
+        clauses = split_clauses(rest, ('FOR', 'WHILE', 'REST', 'ALL', 'NEXT'))
+        condition = expression(clauses['FOR']) if clauses.get('FOR') else None
+        while_condition = expression(clauses['WHILE']) if clauses.get('WHILE') else None
+        body, end = self.block(('ENDSCAN',))
+        return self.closed(Statement('scan', (condition, while_condition, 'REST' in clauses),
+                                     (body,), number, text), end, 'ENDSCAN')
+
+    def parse_try(self, rest, number, text, raw):
+        body, end = self.block(('CATCH', 'FINALLY', 'ENDTRY'))
+        handler = final = ()
+        variable = None
+        if end is not None and end[0] == 'CATCH':
+            match = re.match(r'to\s+(?:m\.)?(\w+)', end[2], re.IGNORECASE)
+            variable = match.group(1).upper() if match else None
+            handler, end = self.block(('FINALLY', 'ENDTRY'))
+        if end is not None and end[0] == 'FINALLY':
+            final, end = self.block(('ENDTRY',))
+        return self.closed(Statement('try', (variable,), (body, handler, final), number, text),
+                           end, 'ENDTRY')
+
+    def parse_exit(self, rest, number, text, raw):
+        return Statement('exit', (), (), number, text)
+
+    def parse_loop(self, rest, number, text, raw):
+        return Statement('loop', (), (), number, text)
+
+    def parse_return(self, rest, number, text, raw):
+        if rest.upper().startswith('TO '):
+            rest = ''
+        return Statement('return', (expression(rest) if rest else None,), (), number, text)
+
+    # Variables
+
+    def declaration(self, scope, rest, number, text):
+        names = []
+        for part in split_list(re.sub(r'^array\s+', '', rest, flags=re.IGNORECASE)):
+            part = re.sub(r'\s+as\s+\w+(\s+of\s+\S+)?$', '', part, flags=re.IGNORECASE)
+            match = re.match(r'(?:m\.)?(\w+)\s*(?:[\[(](.*)[\])])?$', part.strip(), re.IGNORECASE)
+            if not match:
+                return None
+            dimensions = tuple(expression(p) for p in split_list(match.group(2) or ''))
+            names.append((match.group(1).upper(), dimensions))
+        return Statement('declare', (scope, tuple(names)), (), number, text)
+
+    def parse_local(self, rest, number, text, raw):
+        return self.declaration('local', rest, number, text)
+
+    def parse_private(self, rest, number, text, raw):
+        if rest.upper().startswith(('ALL', 'LIKE', 'EXCEPT')):
+            return Statement('comment', (), (), number, text)
+        return self.declaration('local', rest, number, text)
+
+    def parse_public(self, rest, number, text, raw):
+        return self.declaration('public', rest, number, text)
+
+    def parse_dimension(self, rest, number, text, raw):
+        return self.declaration('local', rest, number, text)
+
+    parse_declare = parse_dimension
+
+    def parse_parameters(self, rest, number, text, raw):
+        names = [p.split()[0].upper() for p in split_list(rest)]
+        return Statement('parameters', (tuple(names),), (), number, text)
+
+    parse_lparameters = parse_parameters
+
+    def parse_store(self, rest, number, text, raw):
+        clauses = split_clauses(rest, ('TO',))
+        if 'TO' not in clauses:
+            return None
+        names = tuple(self.target(p) for p in split_list(clauses['TO']))
+        return Statement('store', (expression(clauses['']), names), (), number, text)
+
+    def parse_release(self, rest, number, text, raw):
+        return Statement('comment', (), (), number, text)
+
+    def parse_define(self, rest, number, text, raw):
+        match = re.match(r'(\w+)\s+(.*)$', rest, re.DOTALL)
+        if not match:
+            return None
+        self.defines.append((match.group(1).upper(), expression(match.group(2))))
+        return Statement('comment', (), (), number, text)
+
+    def parse_include(self, rest, number, text, raw):
+        return Statement('comment', (), (), number, text)
+
+    def parse_text(self, rest, number, text, raw):
+        match = re.match(r'to\s+(?:m\.)?(\w+)', rest, re.IGNORECASE)
+        return Statement('text', (match.group(1).upper() if match else None, raw or ()),
+                         (), number, text)
+
+    # Tables et zones de travail
+
+    def parse_use(self, rest, number, text, raw):
+        clauses = split_clauses(rest, ('ALIAS', 'ORDER', 'IN', 'AGAIN', 'SHARED', 'EXCLUSIVE',
+                                       'NOUPDATE', 'TAG'))
+        table = clauses['']
+        in_area = clauses.get('IN', '').strip()
+        if not table:
+            return Statement('close', (_name(in_area) if in_area else None,), (), number, text)
+        order = clauses.get('TAG') or clauses.get('ORDER')
+        return Statement('use', (
+            expression(table[1:-1]) if table.startswith('(') else _name(table).lower(),
+            _name(clauses['ALIAS']).lower() if clauses.get('ALIAS') else None,
+            _name(order.split()[-1]).lower() if order else None,
+            in_area == '0' or bool(in_area and not in_area.isdigit()),
+        ), (), number, text)
+
+    def parse_select(self, rest, number, text, raw):
+        if any(word == 'FROM' for _, _, word in top_level_words(rest)):
+            return Statement('sql', ('SELECT ' + rest,), (), number, text)
+        rest = rest.strip()
+        if rest.startswith('('):
+            return Statement('select', (expression(rest[1:-1]),), (), number, text)
+        return Statement('select', (None if rest in ('', '0') else _name(rest).lower(),),
+                         (), number, text)
+
+    def parse_go(self, rest, number, text, raw):
+        rest = split_clauses(rest, ('IN',))['']
+        word = rest.upper()
+        if word.startswith('TOP'):
+            return Statement('go', ('top',), (), number, text)
+        if word.startswith('BOTT'):
+            return Statement('go', ('bottom',), (), number, text)
+        rest = re.sub(r'^record\s+', '', rest, flags=re.IGNORECASE)
+        return Statement('go', (expression(rest),), (), number, text) if rest else None
+
+    parse_goto = parse_go
+
+    def parse_skip(self, rest, number, text, raw):
+        rest = split_clauses(rest, ('IN',))['']
+        return Statement('skip', (expression(rest) if rest else None,), (), number, text)
+
+    def parse_seek(self, rest, number, text, raw):
+        clauses = split_clauses(rest, ('ORDER', 'TAG', 'IN', 'ASCENDING', 'DESCENDING'))
+        order = clauses.get('TAG') or clauses.get('ORDER')
+        tag = _name(order.split()[-1]).lower() if order else None
+        return Statement('seek', (expression(clauses['']), tag), (), number, text)
+
+    def parse_locate(self, rest, number, text, raw):
+        clauses = split_clauses(rest, ('FOR', 'WHILE', 'ALL', 'REST', 'NEXT', 'IN'))
+        condition = expression(clauses['FOR']) if clauses.get('FOR') else None
+        return Statement('locate', (condition,), (), number, text)
+
+    def parse_continue(self, rest, number, text, raw):
+        return Statement('continue', (), (), number, text)
+
+    def parse_set(self, rest, number, text, raw):
+        match = re.match(r'(\w+)\s*(.*)$', rest, re.DOTALL)
+        if not match:
+            return None
+        option = command_name(match.group(1))
+        value = re.sub(r'^to\b\s*', '', match.group(2), flags=re.IGNORECASE)
+        if _matches(option, 'ORDER'):
+            value = re.sub(r'^tag\s+', '', value, flags=re.IGNORECASE)
+            value = split_clauses(value, ('IN', 'OF', 'ASCENDING', 'DESCENDING'))['']
+            tag = None if value in ('', '0') else _name(value).lower()
+            return Statement('set_order', (tag,), (), number, text)
+        if _matches(option, 'FILTER'):
+            return Statement('set_filter', (expression(value) if value else None,),
+                             (), number, text)
+        if _matches(option, 'PROCEDURE'):
+            clauses = split_clauses(value, ('ADDITIVE',))
+            names = tuple(_name(p).lower() for p in split_list(clauses['']))
+            return Statement('set_procedure', (names, 'ADDITIVE' in clauses), (), number, text)
+        return Statement('comment', (), (), number, text)
+
+    def parse_close(self, rest, number, text, raw):
+        if re.match(r'(tabl|data|all)', rest, re.IGNORECASE):
+            return Statement('close_all', (), (), number, text)
+        return None
+
+    # Modifications
+
+    def parse_replace(self, rest, number, text, raw):
+        clauses = split_clauses(rest, ('FOR', 'WHILE', 'ALL', 'REST', 'NEXT', 'RECORD', 'IN'))
+        # La liste des champs peut suivre la portée (REPLACE ALL champ WITH ...)
+        fields = clauses[''] or clauses.get('ALL') or clauses.get('REST') or ''
+        assignments = []
+        for part in split_list(fields):
+            pieces = split_clauses(part, ('WITH',))
+            if 'WITH' not in pieces:
+                return None
+            name = pieces[''].strip()
+            if not re.match(r'^(\w+\.)?\w+$', name):
+                return None
+            assignments.append((name.split('.')[-1].lower(), expression(pieces['WITH'])))
+        scope = next((key for key in ('ALL', 'REST', 'NEXT', 'RECORD') if key in clauses), None)
+        if 'FOR' in clauses and scope is None:
+            scope = 'ALL'
+        return Statement('replace', (
+            tuple(assignments), scope,
+            expression(clauses['FOR']) if clauses.get('FOR') else None,
+            expression(clauses['WHILE']) if clauses.get('WHILE') else None,
+            _name(clauses['IN']).lower() if clauses.get('IN') else None,
+        ), (), number, text)
+
+    def parse_append(self, rest, number, text, raw):
+        if rest.upper().startswith('BLAN'):
+            return Statement('append_blank', (), (), number, text)
+        return None
+
+    def parse_insert(self, rest, number, text, raw):
+        match = re.match(r'into\s+(\S+?)\s*(?:\((.*?)\))?\s*(values\s*\((.*)\)|from\s+(.*))$',
+                         rest, re.IGNORECASE | re.DOTALL)
+        if not match:
+            return None
+        table = _name(match.group(1)).lower()
+        fields = tuple(f.strip().lower() for f in split_list(match.group(2) or ''))
+        if match.group(4) is not None:
+            values = tuple(expression(p) for p in split_list(match.group(4)))
+            if fields and len(fields) != len(values):
+                return None
+            return Statement('insert', (table, fields, values, None), (), number, text)
+        source = match.group(5).strip()
+        name = re.match(r'name\s+(?:m\.)?(\w+)', source, re.IGNORECASE)
+        if source.upper().startswith('MEMV'):
+            return Statement('insert', (table, (), (), 'memvar'), (), number, text)
+        if name:
+            return Statement('insert', (table, (), (), name.group(1).upper()), (), number, text)
+        return None
+
+    def parse_delete(self, rest, number, text, raw):
+        if rest.upper().startswith('FROM') or rest.upper().startswith('TAG'):
+            if rest.upper().startswith('FROM'):
+                return Statement('sql', ('DELETE ' + rest,), (), number, text)
+            return None
+        clauses = split_clauses(rest, ('FOR', 'WHILE', 'ALL', 'REST', 'NEXT', 'RECORD', 'IN'))
+        scope = next((key for key in ('ALL', 'REST', 'NEXT', 'RECORD') if key in clauses), None)
+        if 'FOR' in clauses and scope is None:
+            scope = 'ALL'
+        return Statement('delete', (
+            scope, expression(clauses['FOR']) if clauses.get('FOR') else None,
+            expression(clauses['WHILE']) if clauses.get('WHILE') else None,
+        ), (), number, text)
+
+    def parse_zap(self, rest, number, text, raw):
+        return Statement('delete', ('ALL', None, None), (), number, text)
+
+    def parse_update(self, rest, number, text, raw):
+        return Statement('sql', ('UPDATE ' + rest,), (), number, text)
+
+    def parse_scatter(self, rest, number, text, raw):
+        clauses = split_clauses(rest, ('FIELDS', 'MEMVAR', 'NAME', 'BLANK', 'MEMO', 'TO'))
+        if 'NAME' in clauses:
+            return Statement('scatter', (clauses['NAME'].split()[0].upper(),), (), number, text)
+        if 'MEMVAR' in clauses:
+            return Statement('scatter', (None,), (), number, text)
+        return None
+
+    def parse_gather(self, rest, number, text, raw):
+        clauses = split_clauses(rest, ('FIELDS', 'MEMVAR', 'NAME', 'MEMO', 'FROM'))
+        if 'NAME' in clauses:
+            return Statement('gather', (clauses['NAME'].split()[0].upper(),), (), number, text)
+        if 'MEMVAR' in clauses:
+            return Statement('gather', (None,), (), number, text)
+        return None
+
+    def parse_wait(self, rest, number, text, raw):
+        clauses = split_clauses(rest, ('WINDOW', 'NOWAIT', 'TIMEOUT', 'TO', 'CLEAR', 'AT',
+                                       'NOCLEAR'))
+        message = clauses.get('WINDOW') or clauses['']
+        if not message:
+            return Statement('comment', (), (), number, text)
+        return Statement('print', ((expression(message),), True), (), number, text)
+
+
+def parse_program(text):
+    """Analyser un programme VFP"""
+    return _ProgramParser(text).parse()
+
+
+# Génération du code Python
+
+def python_name(name):
+    """Identifiant Python d'un nom VFP"""
+    name = name.lower()
+    if keyword.iskeyword(name) or name in ('S', 's', 'vfp', 'db', 'datetime', 'memvar', 'main'):
+        return name + '_'
+    return name
+
+
+def _statements(body):
+    """Parcourir toutes les instructions d'un bloc, blocs imbriqués compris"""
+    for statement in body:
+        yield statement
+        if statement.kind == 'case':
+            for _, branch in statement.args[0]:
+                yield from _statements(branch)
+        for block in statement.body:
+            yield from _statements(block)
+
+
+class _Scope:
+    """Variables d'une procédure (ou du programme principal)"""
+
+    def __init__(self, params, body):
+        self.params = list(params)
+        self.variables = set(params)
+        self.arrays = set()
+        self.objects = set()
+        self.assigned = set()
+
+        for statement in _statements(body):
+            kind, args = statement.kind, statement.args
+            if kind == 'parameters' and not self.params:
+                self.params = list(args[0])
+                self.variables.update(args[0])
+            elif kind == 'declare':
+                for name, dimensions in args[1]:
+                    self.variables.add(name)
+                    if dimensions:
+                        self.arrays.add(name)
+            elif kind == 'assign' and args[0][0] == 'var':
+                self.variables.add(args[0][1])
+                self.assigned.add(args[0][1])
+            elif kind == 'assign' and args[0][0] == 'item':
+                self.arrays.add(args[0][1])
+                self.variables.add(args[0][1])
+            elif kind == 'store':
+                for target in args[1]:
+                    if target[0] == 'var':
+                        self.variables.add(target[1])
+                        self.assigned.add(target[1])
+            elif kind in ('for', 'for_each'):
+                self.variables.add(args[0])
+                self.assigned.add(args[0])
+            elif kind == 'text' and args[0]:
+                self.variables.add(args[0])
+                self.assigned.add(args[0])
+            elif kind == 'try' and args[0]:
+                self.variables.add(args[0])
+            elif kind == 'scatter' and args[0]:
+                self.objects.add(args[0])
+                self.variables.add(args[0])
+                self.assigned.add(args[0])
+
+
+class PythonEmitter:
+    """Génération d'un module Python à partir de l'arbre d'un programme
+
+    Les tables sont celles de la base SQLite migrée, manipulées par la
+    session de vfp_runtime (S) ; les fonctions VFP sont celles de
+    vfp_functions (vfp). Les variables connues (LOCAL, paramètres,
+    affectations) restent des variables Python, les autres noms sont des
+    champs de la zone courante (S.nom). schema associe une table à ses
+    champs DBF : les types aident la traduction des opérateurs et des
+    conditions en SQL. Les instructions non traduites sont gardées en
+    commentaire TODO et listées dans warnings. Avec optimize, les boucles
+    SCAN / REPLACE FOR / DELETE FOR qui ne font qu'écrire dans les tables
+    deviennent une seule instruction SQL (voir loops).
+    """
+
+    def __init__(self, program, module_name, schema=None, database=DEFAULT_DATABASE,
+                 optimize=True):
+        self.program = program
+        self.module_name = module_name
+        self.schema = schema or {}
+        self.database = database
+        self.optimize = optimize
+        self.procedures = {procedure.name for procedure in program.procedures}
+        self.defines = dict(program.defines)
+        self.publics = {
+            name for statement in _statements(program.body + tuple(
+                s for procedure in program.procedures for s in procedure.body))
+            if statement.kind == 'declare' and statement.args[0] == 'public'
+            for name, _ in statement.args[1]
+        }
+        self.lines = []
+        self.warnings = []
+        self.loops = []  # [(ligne, réécrite en SQL, détail)]
+        self.indent = 0
+        self.scope = None
+        self.table = None  # table courante supposée (dernier USE / SELECT)
+        self.alias = None
+        self.areas = {}  # alias -> table
+        self.scattered = False
+
+    # Sortie
+
+    def write(self, text=''):
+        self.lines.append('    ' * self.indent + text if text else '')
+
+    def todo(self, statement, reason):
+        self.warnings.append((statement.line, reason))
+        for i, line in enumerate(statement.text.splitlines() or ['']):
+            self.write(f"# TODO VFP ({reason}) : {line}" if i == 0 else f"#   {line}")
+
+    def emit(self, source_hash=''):
+        """Retourner le code du module"""
+        self.write(f"# {self.module_name}.py")
+        self.write(f'"""Traduit de {self.module_name}.prg par Vfp2python"""')
+        self.write(f"{SOURCE_MARK}{source_hash}")
+        self.write()
+        self.write("import datetime")
+        self.write()
+        self.write("import vfp_functions as vfp")
+        self.write("from vfp_runtime import session")
+        self.write()
+        self.write()
+        self.write(f"DATABASE = {self.database!r}")
+        self.write()
+        self.write("# Connexion de l'IDE (variable db) ou base du projet")
+        self.write("S = session(globals().get('db'), DATABASE)")
+        for name, node in self.program.defines:
+            try:
+                self.write(f"{name} = {self.translator().translate(node)}")
+            except VfpExprError as e:
+                self.warnings.append((0, f"#DEFINE {name} : {e}"))
+        for name in sorted(self.publics):
+            self.write(f"{python_name(name)} = False")
+
+        for procedure in self.program.procedures:
+            self.write()
+            self.write()
+            self.function(python_name(procedure.name), procedure.params, procedure.body)
+
+        self.write()
+        self.write()
+        self.function('main', (), self.program.body)
+        self.write()
+        self.write()
+        self.write("if __name__ == '__main__':")
+        self.write("    main()")
+        return '\n'.join(self.lines) + '\n'
+
+    def function(self, name, params, body):
+        self.scope = _Scope(params, body)
+        self.scattered = False
+        arguments = ", ".join(f"{python_name(p)}=False" for p in self.scope.params)
+        self.write(f"def {name}({arguments}):")
+        self.indent += 1
+        shared = sorted(self.scope.assigned & self.publics)
+        if shared:
+            self.write(f"global {', '.join(python_name(n) for n in shared)}")
+        self.block(body, force=not shared)
+        self.indent -= 1
+
+    def block(self, body, force=True):
+        """Écrire un bloc, avec pass s'il ne contient aucune instruction"""
+        start = len(self.lines)
+        for statement in body:
+            mark, indent = len(self.lines), self.indent
+            try:
+                self.statement(statement)
+            except VfpExprError as e:
+                # Instruction intraduisible : gardée en commentaire
+                del self.lines[mark:]
+                self.indent = indent
+                self.todo(statement, str(e))
+        written = self.lines[start:]
+        if force and all(line.strip().startswith('#') for line in written):
+            self.write('pass')
+
+    def statement(self, statement):
+        if statement.args and isinstance(statement.args[-1], str) \
+                and statement.args[-1].endswith('manquant'):
+            self.warnings.append((statement.line, statement.args[-1]))
+        getattr(self, 'emit_' + statement.kind)(statement, *statement.args)
+
+    # Expressions
+
+    def translator(self):
+        fields = self.schema.get(self.table) if self.table else None
+        return PythonTranslator(self.resolve, self.call, fields)
+
+    def expr(self, node):
+        """Code Python d'une expression"""
+        if node.kind == 'raw':
+            raise VfpExprError(node.args[0] if node.args else "expression non reconnue")
+        return self.translator().translate(simplify(node))
+
+    def condition(self, node):
+        """Condition évaluée par enregistrement : lambda sans argument"""
+        return f"lambda: {self.expr(node)}"
+
+    def is_field(self, name):
+        fields = self.schema.get(self.table) if self.table else None
+        return bool(fields) and name in fields
+
+    def resolve(self, node):
+        name = node.value
+        if node.kind == 'variable':
+            if name in self.scope.variables or name in self.publics:
+                return python_name(name)
+            if self.scattered:
+                return f"memvar[{name.lower()!r}]"
+            return python_name(name)
+
+        if node.args:
+            alias = node.args[0].value
+            if alias in _OBJECTS:
+                raise VfpExprError(f"objet {alias} non traduit")
+            if alias in self.scope.objects or alias in self.scope.variables:
+                return f"{python_name(alias)}.{name.lower()}"
+            return f"S.area({alias.lower()!r})[{name.lower()!r}]"
+
+        if name in self.defines:
+            return name
+        if not self.is_field(name) and (name in self.scope.variables or name in self.publics):
+            return python_name(name)
+        return self.field(name)
+
+    @staticmethod
+    def field(name):
+        """Champ de la zone courante"""
+        name = name.lower()
+        if name.isidentifier() and not keyword.iskeyword(name) and not hasattr(Session, name):
+            return f"S.{name}"
+        return f"S[{name!r}]"
+
+    def call(self, name, args):
+        if name in self.scope.arrays:
+            return f"{python_name(name)}" + "".join(f"[{arg} - 1]" for arg in args)
+        if name in self.procedures:
+            return f"{python_name(name)}({', '.join(args)})"
+        return f"S.do({', '.join([repr(name.lower())] + args)})"
+
+    def target(self, target):
+        """Code Python de la cible d'une affectation"""
+        kind = target[0]
+        if kind == 'var':
+            return python_name(target[1])
+        if kind == 'item':
+            return python_name(target[1]) + "".join(f"[{self.expr(i)} - 1]" for i in target[2])
+        owner = target[1]
+        if owner in self.scope.variables and len(target[2]) == 1:
+            return f"{python_name(owner)}.{target[2][0].lower()}"
+        raise VfpExprError(f"propriété {owner}.{'.'.join(target[2])} non traduite")
+
+    # Instructions
+
+    def emit_unknown(self, statement, reason, *missing):
+        self.todo(statement, reason)
+
+    def emit_comment(self, statement, *args):
+        self.write(f"# {statement.text.splitlines()[0]}")
+
+    def emit_assign(self, statement, target, value):
+        self.write(f"{self.target(target)} = {self.expr(value)}")
+
+    def emit_store(self, statement, value, targets):
+        names = " = ".join(self.target(target) for target in targets)
+        self.write(f"{names} = {self.expr(value)}")
+
+    def emit_print(self, statement, values, newline):
+        arguments = [self.expr(value) for value in values]
+        if not newline:
+            arguments.append("end=''")
+        self.write(f"print({', '.join(arguments)})")
+
+    def emit_expr(self, statement, value):
+        self.write(self.expr(value))
+
+    def emit_declare(self, statement, scope, names):
+        for name, dimensions in names:
+            if scope == 'public' and not dimensions:
+                continue
+            target = python_name(name)
+            if dimensions:
+                self.write(f"{target} = vfp.dimension({', '.join(self.expr(d) for d in dimensions)})")
+            else:
+                self.write(f"{target} = False")
+
+    def emit_parameters(self, statement, names):
+        pass
+
+    def emit_text(self, statement, variable, lines):
+        text = '\n'.join(lines)
+        if variable:
+            self.write(f"{python_name(variable)} = {text!r}")
+        else:
+            self.write(f"print({text!r})")
+
+    def emit_define(self, statement, *args):
+        pass
+
+    def emit_if(self, statement, condition, *missing):
+        then, otherwise = statement.body
+        self.write(f"if {self.expr(condition)}:")
+        self.nested(then)
+        if otherwise:
+            self.write("else:")
+            self.nested(otherwise)
+
+    def nested(self, body):
+        self.indent += 1
+        self.block(body)
+        self.indent -= 1
+
+    def emit_while(self, statement, condition, *missing):
+        self.write(f"while {self.expr(condition)}:")
+        self.nested(statement.body[0])
+
+    def emit_case(self, statement, branches, *missing):
+        otherwise = statement.body[0]
+        for i, (condition, body) in enumerate(branches):
+            self.write(f"{'if' if i == 0 else 'elif'} {self.expr(condition)}:")
+            self.nested(body)
+        if otherwise and branches:
+            self.write("else:")
+            self.nested(otherwise)
+        elif otherwise:
+            self.block(otherwise)
+
+    def emit_for(self, statement, variable, start, stop, step, *missing):
+        name = python_name(variable)
+        literals = all(node is None or (node.kind == 'number' and isinstance(node.value, int))
+                       for node in (start, stop, step))
+        if literals:
+            increment = step.value if step is not None else 1
+            end = stop.value + (1 if increment > 0 else -1)
+            extra = f", {increment}" if increment != 1 else ""
+            self.write(f"for {name} in range({start.value}, {end}{extra}):")
+        else:
+            extra = f", {self.expr(step)}" if step is not None else ""
+            self.write(f"for {name} in vfp.for_range({self.expr(start)}, {self.expr(stop)}{extra}):")
+        self.nested(statement.body[0])
+
+    def emit_for_each(self, statement, variable, collection, *missing):
+        self.write(f"for {python_name(variable)} in {self.expr(collection)}:")
+        self.nested(statement.body[0])
+
+    def emit_scan(self, statement, condition, while_condition, rest, *missing):
+        if self.set_based(statement, self.rewrite_scan, condition, while_condition, rest,
+                          statement.body[0]):
+            return
+        arguments = [self.condition(condition)] if condition is not None else []
+        if rest:
+            arguments.append("rest=True")
+        self.write(f"for _ in S.scan({', '.join(arguments)}):")
+        self.indent += 1
+        if while_condition is not None:
+            self.write(f"if not {self.expr(while_condition)}:")
+            self.write("    break")
+        self.block(statement.body[0])
+        self.indent -= 1
+
+    def emit_try(self, statement, variable, *missing):
+        body, handler, final = statement.body
+        self.write("try:")
+        self.nested(body)
+        if handler or not final:
+            self.write(f"except Exception as {python_name(variable)}:" if variable
+                       else "except Exception:")
+            self.nested(handler)
+        if final:
+            self.write("finally:")
+            self.nested(final)
+
+    def emit_exit(self, statement):
+        self.write("break")
+
+    def emit_loop(self, statement):
+        self.write("continue")
+
+    def emit_return(self, statement, value):
+        self.write(f"return {self.expr(value)}" if value is not None else "return")
+
+    def emit_do(self, statement, name, args):
+        arguments = [self.expr(arg) for arg in args]
+        if name in self.procedures:
+            self.write(f"{python_name(name)}({', '.join(arguments)})")
+        else:
+            self.write(f"S.do({', '.join([repr(name.lower())] + arguments)})")
+
+    # Zones de travail
+
+    def emit_use(self, statement, table, alias, order, new_area):
+        arguments = [repr(table) if isinstance(table, str) else self.expr(table)]
+        if alias:
+            arguments.append(f"alias={alias!r}")
+        if order:
+            arguments.append(f"order={order!r}")
+        if new_area:
+            arguments.append("new_area=True")
+        self.write(f"S.use({', '.join(arguments)})")
+        if not isinstance(table, str):
+            self.table = self.alias = None
+            return
+        self.areas[alias or table] = table
+        if not new_area:
+            self.table, self.alias = table, alias or table
+
+    def emit_close(self, statement, alias):
+        self.write(f"S.close({alias.lower()!r})" if alias else "S.use()")
+
+    def emit_close_all(self, statement):
+        self.write("S.close_all()")
+
+    def emit_select(self, statement, alias):
+        if alias is None:
+            self.write("S.select()")
+            self.table = self.alias = None
+        elif isinstance(alias, str):
+            self.write(f"S.select({alias!r})")
+            self.table, self.alias = self.areas.get(alias, alias), alias
+        else:
+            self.write(f"S.select({self.expr(alias)})")
+            self.table = self.alias = None
+
+    def emit_go(self, statement, where):
+        if where == 'top':
+            self.write("S.go_top()")
+        elif where == 'bottom':
+            self.write("S.go_bottom()")
+        else:
+            self.write(f"S.go({self.expr(where)})")
+
+    def emit_skip(self, statement, count):
+        self.write(f"S.skip({self.expr(count)})" if count is not None else "S.skip()")
+
+    def emit_seek(self, statement, value, tag):
+        tag = f", {tag!r}" if tag else ""
+        self.write(f"S.seek({self.expr(value)}{tag})")
+
+    def emit_locate(self, statement, condition):
+        if condition is None:
+            self.write("S.go_top()")
+            return
+        # Condition sur les champs : recherche faite par SQLite, sinon
+        # fonction évaluée enregistrement par enregistrement
+        try:
+            translator = self.sql_translator()
+            sql = translator.translate(simplify(condition))
+        except VfpExprError:
+            self.write(f"S.locate({self.condition(condition)})")
+            return
+        self.write(f"S.locate({', '.join([repr(sql)] + translator.params)})")
+
+    def emit_continue(self, statement):
+        self.write("S.continue_locate()")
+
+    def emit_set_order(self, statement, tag):
+        self.write(f"S.set_order({tag!r})" if tag else "S.set_order()")
+
+    def emit_set_filter(self, statement, condition):
+        if condition is None:
+            self.write("S.set_filter()")
+            return
+        translator = self.sql_translator()
+        sql = translator.translate(simplify(condition))
+        self.write(f"S.set_filter({', '.join([repr(sql)] + translator.params)})")
+
+    def emit_set_procedure(self, statement, names, additive):
+        arguments = [repr(name) for name in names]
+        if additive:
+            arguments.append("additive=True")
+        self.write(f"S.set_procedure({', '.join(arguments)})")
+
+    # Modifications
+
+    def replacements(self, assignments):
+        """Groupes d'affectations d'un REPLACE
+
+        VFP affecte les champs dans l'ordre : un champ relu après avoir été
+        modifié commence un nouveau groupe.
+        """
+        groups = [[]]
+        changed = set()
+        for name, value in assignments:
+            used = {field.lower() for field in field_names(value)}
+            if used & changed:
+                groups.append([])
+                changed = set()
+            groups[-1].append((name, self.expr(value)))
+            changed.add(name)
+        return groups
+
+    @staticmethod
+    def keywords(pairs):
+        simple = all(name.isidentifier() and not keyword.iskeyword(name) for name, _ in pairs)
+        if simple:
+            return ", ".join(f"{name}={code}" for name, code in pairs)
+        return "**{" + ", ".join(f"{name!r}: {code}" for name, code in pairs) + "}"
+
+    def emit_replace(self, statement, assignments, scope, condition, while_condition, alias):
+        target = f"S.area({alias!r})" if alias else "S"
+        if scope in ('NEXT', 'RECORD'):
+            raise VfpExprError(f"portée {scope} non traduite")
+        if scope is None:
+            for group in self.replacements(assignments):
+                self.write(f"{target}.replace({self.keywords(group)})")
+            return
+        if self.set_based(statement, self.rewrite_replace, assignments, scope, condition,
+                          while_condition, alias):
+            return
+
+        # REPLACE ALL / REST [FOR] : une mise à jour par enregistrement
+        arguments = [self.condition(condition)] if condition is not None else []
+        if scope == 'REST':
+            arguments.append("rest=True")
+        self.write(f"for _ in {target}.scan({', '.join(arguments)}):")
+        self.indent += 1
+        if while_condition is not None:
+            self.write(f"if not {self.expr(while_condition)}:")
+            self.write("    break")
+        for group in self.replacements(assignments):
+            self.write(f"{target}.replace({self.keywords(group)})")
+        self.indent -= 1
+
+    def emit_append_blank(self, statement):
+        self.write("S.append_blank()")
+
+    def emit_insert(self, statement, table, fields, values, source):
+        if source == 'memvar':
+            self.write(f"S.insert({table!r}, **memvar)")
+        elif source:
+            self.write(f"S.insert({table!r}, **vars({python_name(source)}))")
+        elif fields:
+            pairs = [(name, self.expr(value)) for name, value in zip(fields, values)]
+            self.write(f"S.insert({table!r}, {self.keywords(pairs)})")
+        else:
+            self.write(f"S.insert({table!r}, {', '.join(self.expr(v) for v in values)})")
+
+    def emit_delete(self, statement, scope, condition, while_condition):
+        if scope in ('NEXT', 'RECORD'):
+            raise VfpExprError(f"portée {scope} non traduite")
+        if scope is None:
+            self.write("S.delete()")
+            return
+        if condition is None and while_condition is None and scope == 'ALL':
+            self.write("S.delete_all()")
+            return
+        if self.set_based(statement, self.rewrite_delete, scope, condition, while_condition):
+            return
+        arguments = [self.condition(condition)] if condition is not None else []
+        if scope == 'REST':
+            arguments.append("rest=True")
+        self.write(f"for _ in S.scan({', '.join(arguments)}):")
+        self.indent += 1
+        if while_condition is not None:
+            self.write(f"if not {self.expr(while_condition)}:")
+            self.write("    break")
+        self.write("S.delete()")
+        self.indent -= 1
+
+    def emit_scatter(self, statement, name):
+        if name:
+            self.write(f"{python_name(name)} = S.scatter_name()")
+        else:
+            self.write("memvar = S.scatter()")
+            self.scattered = True
+
+    def emit_gather(self, statement, name):
+        self.write(f"S.gather({python_name(name) if name else 'memvar'})")
+
+    def emit_sql(self, statement, sql):
+        sql, params, into = vfp_sql(sql, self.resolve_sql_variable)
+        arguments = [repr(sql)]
+        if params:
+            arguments.append(_tuple(params))
+        if into is None:
+            if sql.upper().startswith('SELECT'):
+                self.write(f"S.select_into('query', {', '.join(arguments)})")
+                self.table, self.alias = None, 'query'
+            else:
+                self.write(f"S.execute({', '.join(arguments)})")
+        elif into[0] == 'ARRAY':
+            self.write(f"{python_name(into[1])} = S.fetch({', '.join(arguments)})")
+        else:
+            self.write(f"S.select_into({into[1].lower()!r}, {', '.join(arguments)})")
+            self.areas[into[1].lower()] = None
+            self.table, self.alias = None, into[1].lower()
+
+    def resolve_sql_variable(self, name):
+        return self.resolve(Node('variable', name.upper(), ()))
+
+    # Réécriture des boucles en SQL
+
+    def set_based(self, statement, rewrite, *args):
+        """Écrire une boucle sous forme d'une instruction SQL si possible
+
+        rewrite retourne (code, forme SQL) ou lève VfpExprError avec la
+        raison ; la boucle est alors traduite telle quelle et ses REPLACE
+        sont écrits par lots (executemany) par le curseur.
+        """
+        if not self.optimize:
+            return False
+        try:
+            code, form = rewrite(*args)
+        except VfpExprError as e:
+            body = statement.body[0] if statement.kind == 'scan' else (statement,)
+            kinds = {s.kind for s in _statements(body)}
+            if kinds & {'replace', 'insert', 'delete', 'append_blank', 'gather'}:
+                batched = " (REPLACE écrits par executemany)" if 'replace' in kinds else ""
+                self.loops.append((statement.line, False, f"{e}{batched}"))
+            return False
+        self.write(f"# {_LOOP_LABELS[statement.kind]} → {form}")
+        self.write(code)
+        self.loops.append((statement.line, True, form))
+        return True
+
+    def sql_translator(self):
+        fields = self.schema.get(self.table) if self.table else None
+        if not fields:
+            raise VfpExprError("structure de la table courante inconnue")
+        return RowSqlTranslator(fields, self.alias, self.python_value, self.evaluated_once)
+
+    def python_value(self, node):
+        """Code Python et type d'une expression calculée une fois"""
+        return self.translator().emit(simplify(node))
+
+    def evaluated_once(self, name):
+        """Fonction qui peut être appelée une fois pour toute l'instruction"""
+        if name in self.scope.arrays:
+            return True
+        return name in FUNCTIONS and name not in _PER_RECORD_FUNCTIONS
+
+    def where(self, conditions):
+        """Clause SQL et paramètres des conditions d'une boucle"""
+        conditions = [node for node in conditions if node is not None]
+        if not conditions:
+            return []
+        node = conditions[0]
+        for other in conditions[1:]:
+            node = Node('binary', 'AND', (node, other))
+        translator = self.sql_translator()
+        return [repr(translator.translate(simplify(node)))] + translator.params
+
+    def update(self, assignments, conditions):
+        """S.update() des affectations (dans l'ordre VFP) et des conditions"""
+        fields = self.schema[self.table]
+        values = {}
+        for name, value in assignments:
+            field = fields.get(name.upper())
+            if field is None:
+                raise VfpExprError(f"{name} n'est pas un champ de {self.table}")
+            # Un champ relu après son affectation vaut sa nouvelle valeur
+            values[name.upper()] = _substitute(value, values)
+
+        translator = self.sql_translator()
+        columns = []
+        for name, value in values.items():
+            sql = translator.emit(simplify(value))
+            if sql.type == 'C' and fields[name].type == 'C':
+                # Valeurs caractères stockées sans espaces de fin
+                sql = sql._replace(sql=f"rtrim({sql.sql})")
+            columns.append(f"{name.lower()!r}: {sql.sql!r}")
+        arguments = ["{" + ", ".join(columns) + "}"] + self.where(conditions)
+        if translator.params:
+            arguments.append(f"values={_tuple(translator.params)}")
+        return f"S.update({', '.join(arguments)})"
+
+    def rewrite_scan(self, condition, while_condition, rest, body):
+        if rest or while_condition is not None:
+            raise VfpExprError("SCAN REST / WHILE dépend de la position du curseur")
+        conditions = [condition]
+        # SCAN ... IF condition ... ENDIF ENDSCAN : condition ajoutée au WHERE
+        if len(body) == 1 and body[0].kind == 'if' and not body[0].body[1] \
+                and len(body[0].args) == 1:
+            conditions.append(body[0].args[0])
+            body = body[0].body[0]
+        if not body:
+            raise VfpExprError("boucle sans écriture")
+        kinds = {statement.kind for statement in body}
+
+        if kinds == {'replace'}:
+            assignments = []
+            for statement in body:
+                pairs, scope, _, _, alias = statement.args
+                if scope is not None or (alias and alias != self.alias):
+                    raise VfpExprError("REPLACE sur une autre portée ou une autre zone")
+                assignments.extend(pairs)
+            return self.update(assignments, conditions), "UPDATE"
+
+        if kinds == {'delete'} and all(s.args[0] is None for s in body):
+            return f"S.delete_all({', '.join(self.where(conditions))})", "DELETE"
+
+        if kinds == {'insert'} and len(body) == 1:
+            return self.insert_select(body[0], conditions), "INSERT ... SELECT"
+
+        for statement in body:
+            if statement.kind not in ('replace', 'delete', 'insert'):
+                command = statement.text.split()[0].upper()
+                raise VfpExprError(f"boucle avec une instruction {command}")
+        raise VfpExprError("boucle mêlant plusieurs écritures")
+
+    def insert_select(self, statement, conditions):
+        table, fields, values, source = statement.args
+        if source:
+            raise VfpExprError("INSERT FROM MEMVAR / NAME")
+        if table == self.table:
+            raise VfpExprError("INSERT dans la table parcourue")
+        if not fields:
+            target = self.schema.get(table)
+            if not target or len(values) > len(target):
+                raise VfpExprError(f"structure de {table} inconnue")
+            fields = tuple(name.lower() for name in list(target)[:len(values)])
+        translator = self.sql_translator()
+        columns = [f"{name!r}: {translator.translate(simplify(value))!r}"
+                   for name, value in zip(fields, values)]
+        arguments = [repr(table), "{" + ", ".join(columns) + "}"] + self.where(conditions)
+        if translator.params:
+            arguments.append(f"values={_tuple(translator.params)}")
+        return f"S.insert_select({', '.join(arguments)})"
+
+    def rewrite_replace(self, assignments, scope, condition, while_condition, alias):
+        if scope != 'ALL' or while_condition is not None:
+            raise VfpExprError(f"REPLACE {scope or ''} WHILE dépend de la position du curseur")
+        if alias and alias != self.alias:
+            raise VfpExprError("REPLACE IN une autre zone")
+        return self.update(assignments, [condition]), "UPDATE"
+
+    def rewrite_delete(self, scope, condition, while_condition):
+        if scope != 'ALL' or while_condition is not None:
+            raise VfpExprError(f"DELETE {scope or ''} WHILE dépend de la position du curseur")
+        return f"S.delete_all({', '.join(self.where([condition]))})", "DELETE"
+
+
+# Boucles réécrites, dans les commentaires du code généré
+_LOOP_LABELS = {'scan': 'SCAN ... ENDSCAN', 'replace': 'REPLACE ALL', 'delete': 'DELETE FOR'}
+
+# Fonctions à évaluer pour chaque enregistrement
+_PER_RECORD_FUNCTIONS = tuple(name for name in WORK_AREA_FUNCTIONS
+                              if name not in ('ALIAS', 'USED')) + ('MESSAGEBOX',)
+
+_LITERALS = ('number', 'string', 'bool', 'date', 'null')
+
+
+def _tuple(codes):
+    """Code d'un tuple Python"""
+    return f"({', '.join(codes)}{',' if len(codes) == 1 else ''})"
+
+
+def _substitute(node, values):
+    """Remplacer les champs par les expressions déjà affectées"""
+    if node.kind == 'field' and not node.args and node.value in values:
+        return values[node.value]
+    if node.kind == 'raw' or not node.args:
+        return node
+    return Node(node.kind, node.value, tuple(_substitute(arg, values) for arg in node.args))
+
+
+class RowSqlTranslator(SqlTranslator):
+    """Traduction en SQL d'une expression évaluée pour chaque enregistrement
+
+    Les champs de la table parcourue (alias) deviennent des colonnes. Les
+    sous-expressions qui n'en dépendent pas (variables, fonctions VFP de
+    leurs valeurs) sont calculées une fois en Python : leur code est ajouté
+    à params et remplacé par un paramètre ?. python(node) donne le code et
+    le type d'une expression, once(nom) indique si une fonction peut être
+    calculée une seule fois. = sur des chaînes garde le sens de SET EXACT
+    OFF.
+    """
+
+    def __init__(self, fields, alias, python, once):
+        super().__init__(fields)
+        self.alias = alias
+        self.python = python
+        self.once = once
+        self.params = []
+
+    def is_column(self, node):
+        if node.value not in self.fields:
+            return False
+        return not node.args or node.args[0].value.lower() == self.alias
+
+    def is_constant(self, node):
+        """Expression indépendante de l'enregistrement"""
+        if node.kind in _LITERALS or node.kind == 'variable':
+            return True
+        if node.kind == 'field':
+            return not self.is_column(node)
+        if node.kind == 'call' and not self.once(node.value):
+            return False
+        if node.kind in ('call', 'unary', 'binary'):
+            return all(self.is_constant(arg) for arg in node.args)
+        return False
+
+    def emit(self, node):
+        if node.kind not in _LITERALS and self.is_constant(node):
+            value = self.python(node)
+            self.params.append(value.code)
+            return _Sql('?', value.type, None, True)
+        return super().emit(node)
+
+    def emit_raw(self, node):
+        raise VfpExprError(node.args[0] if node.args else "expression non reconnue")
+
+    def operands(self, node):
+        left, right = super().operands(node)
+        # Paramètre de type inconnu : celui de l'autre opérande
+        if left.type is None and right.type is None:
+            raise VfpExprError(f"types inconnus pour l'opérateur {node.value}")
+        if left.type is None:
+            left = left._replace(type=right.type)
+        elif right.type is None:
+            right = right._replace(type=left.type)
+        return left, right
+
+
+def vfp_sql(sql, resolve):
+    """Adapter une instruction SQL VFP à SQLite
+
+    Retourne (sql, [code Python des paramètres], (INTO, nom) ou None). Les
+    variables m.nom et ?nom deviennent des paramètres, les chaînes entre
+    guillemets doubles des chaînes SQL, .T. et .F. des entiers.
+    """
+    into = None
+    match = re.search(r'\binto\s+(cursor|table|dbf|array)\s+(\w+)(\s+readwrite|\s+nofilter)*',
+                      sql, re.IGNORECASE)
+    if match:
+        kind = match.group(1).upper()
+        into = ('ARRAY' if kind == 'ARRAY' else 'CURSOR', match.group(2))
+        sql = sql[:match.start()] + sql[match.end():]
+
+    params = []
+    parts = []
+    position = 0
+    pattern = re.compile(r'''"([^"]*)"|'[^']*'|\[([^\]]*)\]|\?(?:m\.)?(\w+)|\bm\.(\w+)|\.([TF])\.''',
+                         re.IGNORECASE)
+    for match in pattern.finditer(sql):
+        parts.append(sql[position:match.start()])
+        position = match.end()
+        double, bracket, question, memvar, logical = match.groups()
+        if double is not None or bracket is not None:
+            text = double if double is not None else bracket
+            parts.append("'" + text.replace("'", "''") + "'")
+        elif question or memvar:
+            parts.append('?')
+            params.append(resolve(question or memvar))
+        elif logical:
+            parts.append('1' if logical.upper() == 'T' else '0')
+        else:
+            parts.append(match.group())
+    parts.append(sql[position:])
+    sql = re.sub(r'\s+', ' ', ''.join(parts)).strip()
+    sql = re.sub(r'\s*(?:#|!=)\s*', ' <> ', sql)
+    return sql, params, into
+
+
+def translate_source(text, module_name, schema=None, database=DEFAULT_DATABASE, source_hash='',
+                     tree=None, optimize=True):
+    """Traduire le texte d'un programme
+
+    Retourne (code Python, [(ligne, avertissement)], [(ligne, réécrite en
+    SQL, détail)] des boucles d'écriture).
+    """
+    program = tree if tree is not None else parse_program(text)
+    emitter = PythonEmitter(program, module_name, schema, database, optimize)
+    code = emitter.emit(source_hash)
+    return code, sorted(emitter.warnings), sorted(emitter.loops)
+
+
+# Traduction d'un projet
+
+def tree_key(content):
+    """Clé d'un arbre syntaxique : empreinte du source et de l'analyseur"""
+    return hashlib.blake2b(b'%d:' % TRANSLATOR_VERSION + content, digest_size=16).hexdigest()
+
+
+def output_key(key, options):
+    """Empreinte d'un fichier généré : arbre et options de traduction"""
+    return hashlib.blake2b(f"{key}:{options!r}".encode('utf-8'), digest_size=16).hexdigest()
+
+
+def generated_key(path):
+    """Empreinte notée dans un fichier généré, '' si ce n'en est pas un"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for _ in range(4):
+                line = f.readline()
+                if line.startswith(SOURCE_MARK):
+                    return line[len(SOURCE_MARK):].strip()
+    except (OSError, UnicodeDecodeError):
+        pass
+    return ''
+
+
+def load_tree(cache_dir, key):
+    """Arbre en cache, None s'il est absent ou illisible"""
+    if not cache_dir:
+        return None
+    try:
+        with open(os.path.join(cache_dir, f"{key}.pickle"), 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def store_tree(cache_dir, key, tree):
+    """Enregistrer un arbre dans le cache"""
+    if not cache_dir:
+        return
+    path = os.path.join(cache_dir, f"{key}.pickle")
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(tree, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+
+
+def _translate_file(task):
+    """Traduire un programme (exécuté dans un processus du pool)"""
+    path, output_path, cache_dir, schema, database, optimize = task
+    start = time.perf_counter()
+    report = {'source': path, 'output': output_path, 'status': 'translated',
+              'warnings': [], 'loops': [], 'cached': False, 'error': None, 'seconds': 0.0}
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+        key = tree_key(content)
+        tree = load_tree(cache_dir, key)
+        report['cached'] = tree is not None
+        if tree is None:
+            tree = parse_program(content.decode(SOURCE_ENCODING, 'replace'))
+            store_tree(cache_dir, key, tree)
+
+        module_name = os.path.splitext(os.path.basename(output_path))[0]
+        code, report['warnings'], report['loops'] = translate_source(
+            None, module_name, schema, database,
+            output_key(key, (schema_digest(schema), database, optimize)), tree, optimize)
+        temp_path = output_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(code)
+        os.replace(temp_path, output_path)
+    except (OSError, RecursionError, ValueError) as e:
+        report['status'] = 'error'
+        report['error'] = str(e)
+    report['seconds'] = time.perf_counter() - start
+    return report
+
+
+def schema_digest(schema):
+    """Empreinte stable de la structure des tables"""
+    if not schema:
+        return ''
+    text = repr(sorted((table, sorted((name, tuple(field[1:4])) for name, field in fields.items()))
+                       for table, fields in schema.items()))
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def read_schema(dbf_dir):
+    """Champs des tables DBF d'un dossier : {table: {NOM: DbfField}}"""
+    schema = {}
+    if not dbf_dir or not os.path.isdir(dbf_dir):
+        return schema
+    for path in find_tables(dbf_dir):
+        try:
+            with open_dbf(path) as table:
+                schema[table_name_for(path)] = {field.name.upper(): field for field in table.fields}
+        except (DbfError, OSError):
+            continue
+    return schema
+
+
+def find_programs(source):
+    """Programmes .prg d'un dossier (récursif) ou fichier seul"""
+    if os.path.isfile(source):
+        return [source]
+    programs = []
+    for root, dirs, files in os.walk(source):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        programs.extend(os.path.join(root, name) for name in sorted(files)
+                        if name.lower().endswith('.prg'))
+    return programs
+
+
+def output_path_for(path, source, output_dir=None):
+    """Fichier Python d'un programme : à côté du source ou dans output_dir"""
+    name = python_name(os.path.splitext(os.path.basename(path))[0]) + '.py'
+    if not output_dir:
+        return os.path.join(os.path.dirname(path), name)
+    base = source if os.path.isdir(source) else os.path.dirname(source)
+    relative = os.path.relpath(os.path.dirname(path), base)
+    return os.path.normpath(os.path.join(output_dir, relative, name))
+
+
+def translate_project(source, output_dir=None, workers=None, cache_dir=DEFAULT_CACHE_DIR,
+                      database=DEFAULT_DATABASE, dbf_dir=None, force=False, optimize=True,
+                      progress=None, check_cancelled=None):
+    """Traduire les programmes d'un dossier (ou un programme) en Python
+
+    Un programme dont le fichier Python porte déjà l'empreinte (source et
+    options) n'est pas retraité. Les autres sont traduits dans un pool de
+    processus ; leurs arbres syntaxiques sont gardés en cache par empreinte
+    du contenu. Un fichier Python existant qui n'a pas été généré n'est
+    jamais écrasé. optimize réécrit les boucles d'écriture en instructions
+    SQL. Retourne la liste des rapports par programme.
+    """
+    schema = read_schema(dbf_dir)
+    options = (schema_digest(schema), database, optimize)
+    reports = []
+    tasks = []
+    for path in find_programs(source):
+        target = output_path_for(path, source, output_dir)
+        report = {'source': path, 'output': target, 'status': 'unchanged', 'warnings': [],
+                  'loops': [], 'cached': True, 'error': None, 'seconds': 0.0}
+        try:
+            with open(path, 'rb') as f:
+                key = output_key(tree_key(f.read()), options)
+        except OSError as e:
+            report.update(status='error', error=str(e))
+            reports.append(report)
+            continue
+
+        existing = generated_key(target) if os.path.exists(target) else None
+        if existing == '':
+            report.update(status='error', error=f"{os.path.basename(target)} existe et n'a pas "
+                                                "été généré par le traducteur")
+        elif existing != key or force:
+            if output_dir:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+            tasks.append((path, target, cache_dir, schema, database, optimize))
+            continue
+        reports.append(report)
+
+    total = len(tasks)
+    if not tasks:
+        return reports
+
+    workers = max(1, min(workers or os.cpu_count() or 1, total))
+    if workers == 1:
+        results = map(_translate_file, tasks)
+        pool = None
+    else:
+        # spawn : pas de fork d'un processus qui a déjà des threads (Qt)
+        pool = multiprocessing.get_context('spawn').Pool(workers)
+        results = pool.imap_unordered(_translate_file, tasks)
+
+    try:
+        for done, report in enumerate(results, 1):
+            reports.append(report)
+            if progress:
+                progress(done, total, f"Traduction : {os.path.basename(report['source'])} "
+                                      f"({done} / {total})")
+            if check_cancelled:
+                check_cancelled()
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    reports.sort(key=lambda report: report['source'])
+    return reports
+
+
+def format_report(reports, elapsed=None):
+    """Lignes du rapport de traduction"""
+    lines = []
+    counts = {'translated': 0, 'unchanged': 0, 'error': 0}
+    review = 0
+    rewritten = kept = 0
+    for report in reports:
+        counts[report['status']] += 1
+        source = os.path.basename(report['source'])
+        if report['status'] == 'error':
+            lines.append(f"✗ {source}: {report['error']}")
+            continue
+        if report['status'] == 'unchanged':
+            lines.append(f"= {source}: inchangé")
+            continue
+        output = os.path.basename(report['output'])
+        cached = ", arbre en cache" if report['cached'] else ""
+        lines.append(f"✓ {source} → {output} ({report['seconds']:.2f} s{cached})")
+        review += len(report['warnings'])
+        for line, message in report['warnings']:
+            where = f"ligne {line}" if line else "en-tête"
+            lines.append(f"    ⚠ {where} : {message}")
+        for line, set_based, detail in report['loops']:
+            if set_based:
+                rewritten += 1
+                lines.append(f"    ⚡ ligne {line} : boucle réécrite en {detail}")
+            else:
+                kept += 1
+                lines.append(f"    ↻ ligne {line} : boucle conservée, {detail}")
+
+    summary = (f"{len(reports)} programmes : {counts['translated']} traduits, "
+               f"{counts['unchanged']} inchangés, {counts['error']} en erreur, "
+               f"{review} instructions à revoir")
+    if rewritten or kept:
+        summary += f", {rewritten} boucles réécrites en SQL, {kept} conservées"
+    if elapsed:
+        summary += f" en {elapsed:.2f} s"
+    lines.append(summary)
+    return lines
+
+
+def translation_job(job, source, database=DEFAULT_DATABASE, dbf_dir=None, workers=None):
+    """Traduire des programmes en tâche de fond
+
+    Retourne les lignes du rapport et les fichiers Python écrits.
+    """
+    start = time.perf_counter()
+    reports = translate_project(source, workers=workers, database=database, dbf_dir=dbf_dir,
+                                progress=job.report, check_cancelled=job.check_cancelled)
+    return {
+        'lines': format_report(reports, time.perf_counter() - start),
+        'outputs': [report['output'] for report in reports if report['status'] == 'translated'],
+    }
+
+
+def main(argv=None):
+    """Traduire des programmes VFP en ligne de commande"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Traduction de programmes VFP (.prg) en Python")
+    parser.add_argument('source', help="programme .prg ou dossier à parcourir")
+    parser.add_argument('--output', help="dossier des fichiers Python (par défaut : à côté des .prg)")
+    parser.add_argument('--workers', type=int, help="processus de traduction (par défaut : tous les cœurs)")
+    parser.add_argument('--database', default=DEFAULT_DATABASE, help="base SQLite du code généré")
+    parser.add_argument('--dbf-dir', help="dossier des tables DBF d'origine (types des champs)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="cache des arbres syntaxiques")
+    parser.add_argument('--force', action='store_true', help="retraduire les programmes inchangés")
+    parser.add_argument('--no-optimize', action='store_true',
+                        help="traduire les boucles SCAN / REPLACE FOR telles quelles")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    reports = translate_project(args.source, args.output, args.workers, args.cache_dir,
+                                args.database, args.dbf_dir, args.force, not args.no_optimize)
+    for line in format_report(reports, time.perf_counter() - start):
+        print(line)
+    return 1 if any(report['status'] == 'error' for report in reports) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
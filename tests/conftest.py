@@ -0,0 +1,7 @@
+# conftest.py
+"""Configuration des tests : les modules de l'IDE sont dans src/"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,64 @@
+# test_vfp_expr.py
+"""Tests des expressions VFP compilées"""
+
+import sqlite3
+
+import pytest
+
+from dbf import DbfField
+from vfp_expr import compile_expression
+
+
+FIELDS = {
+    'NOM': DbfField('NOM', 'C', 10, 0, 0, 0),
+    'VILLE': DbfField('VILLE', 'C', 8, 0, 0, 0),
+    'ID': DbfField('ID', 'N', 6, 0, 0, 0),
+}
+
+# Valeurs des champs C stockées sans leurs espaces de fin, comme après migration
+ROWS = [('DUPONT', 'Paris', 12), ('DU', 'Lyon', 3), ('durand', None, 450),
+        ('MARTIN', 'Nice', 7), ('DUVAL', 'Paris', 99)]
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(':memory:')
+    connection.row_factory = sqlite3.Row
+    connection.execute("CREATE TABLE clients (nom TEXT, ville TEXT, id INTEGER)")
+    connection.executemany("INSERT INTO clients VALUES (?, ?, ?)", ROWS)
+    return connection
+
+
+@pytest.mark.parametrize('text', [
+    'UPPER(nom) + STR(id, 6)',
+    'nom + ville',
+    'LEFT(nom, 3) + ville',
+    'RIGHT(nom, 4)',
+    'LEN(nom)',
+    'SUBSTR(nom, 2, 3) + "|"',
+])
+def test_sql_and_python_values_agree(connection, text):
+    """Même valeur, champs complétés à leur largeur, dans les deux formes"""
+    compiled = compile_expression(text, FIELDS)
+    assert compiled.sql is not None
+    rows = connection.execute(f"SELECT {compiled.sql} AS value, * FROM clients ORDER BY rowid").fetchall()
+    assert [compiled.function(row) for row in rows] == [row['value'] for row in rows]
+
+
+@pytest.mark.parametrize('text', [
+    'nom = "DU"',
+    'UPPER(nom) = "DU"',
+    'nom == "DU"',
+    'nom <> "DU"',
+    'nom = ""',
+    'UPPER(nom) + STR(id, 6) = "DU"',
+    'nom < "DUR" AND id > 5',
+])
+def test_sql_and_python_conditions_agree(connection, text):
+    """Même sélection, = sur les chaînes suivant SET EXACT OFF"""
+    compiled = compile_expression(text, FIELDS)
+    assert compiled.sql is not None
+    rows = connection.execute("SELECT rowid, * FROM clients ORDER BY rowid").fetchall()
+    selected = [row['rowid'] for row in connection.execute(
+        f"SELECT rowid FROM clients WHERE {compiled.sql} ORDER BY rowid")]
+    assert [row['rowid'] for row in rows if compiled.function(row)] == selected
@@ -0,0 +1,66 @@
+# test_vfp_runtime.py
+"""Tests de la navigation VFP sur les tables SQLite"""
+
+import sqlite3
+
+import pytest
+
+from vfp_runtime import Cursor
+
+
+@pytest.fixture
+def connection():
+    """Table dont un tiers des noms est NULL (champs C vides migrés)"""
+    connection = sqlite3.connect(':memory:')
+    connection.execute("CREATE TABLE clients (nom TEXT, code INTEGER)")
+    connection.executemany("INSERT INTO clients VALUES (?, ?)",
+                           [(None if i % 3 == 0 else "abcde"[i % 5] * 2, None if i % 7 == 0 else i % 4)
+                            for i in range(1, 61)])
+    connection.execute("CREATE INDEX clients_nom ON clients (upper(nom), code)")
+    connection.execute("CREATE INDEX clients_nomd ON clients (upper(nom) DESC)")
+    return connection
+
+
+def expected(connection, order):
+    return [row[0] for row in connection.execute(f"SELECT rowid FROM clients ORDER BY {order}")]
+
+
+@pytest.mark.parametrize('tag, order', [
+    ('nom', "upper(nom), code, rowid"),
+    ('nomd', "upper(nom) DESC, rowid DESC"),
+])
+@pytest.mark.parametrize('read_ahead', [1, 4, 500])
+def test_walk_with_null_keys(connection, tag, order, read_ahead):
+    """SCAN et SKIP -1 parcourent toute la table malgré les clés NULL"""
+    cursor = Cursor(connection, 'clients', order=tag, read_ahead=read_ahead)
+    rows = expected(connection, order)
+
+    assert [record.recno() for record in cursor.scan()] == rows
+
+    cursor.go_bottom()
+    backward = []
+    while not cursor.bof():
+        backward.append(cursor.recno())
+        cursor.skip(-1)
+    assert backward == rows[::-1]
+
+    # GO sur un enregistrement de clé NULL, puis suite de l'ordre
+    cursor.go(3)
+    following = []
+    while not cursor.eof():
+        following.append(cursor.recno())
+        cursor.skip()
+    assert following == rows[rows.index(3):]
+
+
+def test_seek_and_continue_after_null_keys(connection):
+    cursor = Cursor(connection, 'clients', order='nom', read_ahead=2)
+    assert cursor.seek('CC')
+    assert cursor.nom == 'cc'
+
+    count = 0
+    found = cursor.locate("code = 2")
+    while found:
+        count += 1
+        found = cursor.continue_locate()
+    assert count == connection.execute("SELECT count(*) FROM clients WHERE code = 2").fetchone()[0]